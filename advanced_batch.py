@@ -20,8 +20,8 @@ def main():
                        help='博主视频基础目录路径')
     parser.add_argument('--skip-existing', action='store_true', default=True,
                        help='跳过已有分析报告的博主')
-    parser.add_argument('--delay', type=int, default=10,
-                       help='每次分析间的等待时间（秒）')
+    parser.add_argument('--delay', type=int,
+                       help='每次分析间的等待时间（秒），默认10；续跑时默认沿用原运行')
     parser.add_argument('--start-from', type=int, default=1,
                        help='从第几个博主目录开始分析')
     parser.add_argument('--max-count', type=int, default=0,
@@ -32,11 +32,25 @@ def main():
                        help='只包含匹配此模式的目录名')
     parser.add_argument('--exclude-pattern', type=str,
                        help='排除匹配此模式的目录名')
+    parser.add_argument('--policy', choices=['name', 'priority', 'sjf', 'fair'],
+                       help='调度策略：name（目录名）/ priority（状态+粉丝数）/ sjf（未缓存时长最短优先）/ fair（按分组公平轮转），默认读取 SCHEDULE_POLICY')
+    parser.add_argument('--order-by', type=str,
+                       help='自定义排序键，逗号分隔，前缀-表示降序（name, status, followers, duration, remaining, warmth），如 "status,-followers"')
+    parser.add_argument('--fair-key', choices=['platform', 'status'],
+                       help='fair 策略的分组字段，默认读取 SCHEDULE_FAIR_KEY')
+    parser.add_argument('--budget-yuan', type=float,
+                       help='金额预算（元）：预检时截取预算内的博主，运行中超出即停止')
+    parser.add_argument('--budget-hours', type=float,
+                       help='耗时预算（小时）：预检时截取预算内的博主，运行中超出即停止')
+    parser.add_argument('--resume', type=str,
+                       help='从批量日志（outputs/journals/*.jsonl）续跑：只处理未完成的博主，复用已完成的视频分析，'
+                            '未显式给出的预算与分析间隔沿用原运行')
     
     args = parser.parse_args()
     
     # 导入批量分析器
     from batch_analyze_bloggers import BatchBloggerAnalyzer
+    from src.ai_outreach.journal import BatchJournal, RUN_JOB
     from src.ai_outreach.utils.logger import setup_logger
     
     setup_logger()
@@ -44,6 +58,22 @@ def main():
     base_path = Path(args.base_path)
     analyzer = BatchBloggerAnalyzer()
     
+    journal = None
+    if args.resume:
+        journal_path = Path(args.resume)
+        if not journal_path.exists():
+            print(f"❌ 日志文件不存在: {journal_path}")
+            return
+        journal = BatchJournal(journal_path)
+        # 续跑沿用原运行的预算与分析间隔（本次显式给出的参数优先）
+        run_config = analyzer.resume_config(journal, budget_yuan=args.budget_yuan,
+                                            budget_hours=args.budget_hours, delay=args.delay)
+        args.budget_yuan = run_config.get('budget_yuan')
+        args.budget_hours = run_config.get('budget_hours')
+        args.delay = run_config.get('delay')
+    if args.delay is None:
+        args.delay = 10
+    
     print("🎯 AI外联军师 - 高级批量分析工具")
     print("=" * 50)
     print(f"📁 基础目录: {base_path}")
@@ -56,37 +86,81 @@ def main():
         print(f"✅ 包含模式: {args.include_pattern}")
     if args.exclude_pattern:
         print(f"❌ 排除模式: {args.exclude_pattern}")
+    if args.budget_yuan is not None:
+        print(f"💰 金额预算: ¥{args.budget_yuan:.2f}")
+    if args.budget_hours is not None:
+        print(f"⌛ 耗时预算: {args.budget_hours}小时")
+    if args.resume:
+        print(f"🔁 续跑日志: {args.resume}")
     print("=" * 50)
     
-    # 查找所有博主目录
-    all_dirs = analyzer.find_blogger_directories(base_path)
-    
-    # 应用过滤条件
-    filtered_dirs = []
-    for blogger_dir in all_dirs:
-        # 应用包含/排除模式
-        if args.include_pattern and args.include_pattern not in blogger_dir.name:
-            continue
-        if args.exclude_pattern and args.exclude_pattern in blogger_dir.name:
-            continue
-        filtered_dirs.append(blogger_dir)
-    
-    # 应用开始位置和最大数量限制
-    start_idx = max(0, args.start_from - 1)
-    if args.max_count > 0:
-        end_idx = min(len(filtered_dirs), start_idx + args.max_count)
-        target_dirs = filtered_dirs[start_idx:end_idx]
+    if args.resume:
+        # 续跑：目录、过滤与排序沿用原运行，只处理日志中未完成的博主
+        target_jobs = analyzer.resume_jobs(journal)
+        all_dirs = filtered_dirs = [job.directory for job in target_jobs]
+        start_idx = 0
     else:
-        target_dirs = filtered_dirs[start_idx:]
+        journal = BatchJournal.create("advanced_batch")
+        
+        # 查找所有博主目录
+        all_dirs = analyzer.find_blogger_directories(base_path)
+        
+        # 应用过滤条件
+        filtered_dirs = []
+        for blogger_dir in all_dirs:
+            # 应用包含/排除模式
+            if args.include_pattern and args.include_pattern not in blogger_dir.name:
+                continue
+            if args.exclude_pattern and args.exclude_pattern in blogger_dir.name:
+                continue
+            filtered_dirs.append(blogger_dir)
+        
+        # 按调度策略排序（开始位置与最大数量基于排序后的顺序）
+        order_by = [k.strip() for k in args.order_by.split(',') if k.strip()] if args.order_by else None
+        try:
+            jobs = analyzer.schedule_directories(filtered_dirs, policy=args.policy, order_by=order_by, group_by=args.fair_key)
+        except ValueError as e:
+            print(f"❌ {e}")
+            return
+        filtered_dirs = [job.directory for job in jobs]
+        
+        # 应用开始位置和最大数量限制
+        start_idx = max(0, args.start_from - 1)
+        if args.max_count > 0:
+            end_idx = min(len(filtered_dirs), start_idx + args.max_count)
+            target_jobs = jobs[start_idx:end_idx]
+        else:
+            target_jobs = jobs[start_idx:]
+    
+    # 预检规划：估算费用与耗时，按预算截取（续跑时已花费的金额与已运行的时间计入预算）
+    guard = analyzer.budget_guard(journal, args.budget_yuan, args.budget_hours)
+    if guard is not None and (guard.spent or args.resume):
+        print(f"💰 原运行已花费: ¥{guard.spent:.2f}, 已运行 {guard.elapsed / 3600:.2f}小时")
+    run_plan = analyzer.plan_run(target_jobs, budget_yuan=args.budget_yuan, budget_hours=args.budget_hours,
+                                 delay_seconds=args.delay, spent=guard.spent if guard else 0.0,
+                                 elapsed=guard.elapsed if guard else 0.0)
+    target_plans = run_plan.selected
+    target_dirs = [plan.job.directory for plan in target_plans]
+    totals = run_plan.totals()
     
     print(f"📋 总目录数: {len(all_dirs)}")
     print(f"🔍 过滤后: {len(filtered_dirs)}")
     print(f"🎯 将分析: {len(target_dirs)}")
+    if len(target_dirs) < len(target_jobs):
+        print(f"💰 超出预算未执行: {len(target_jobs) - len(target_dirs)}")
+    print(f"🧾 预估: ASR {totals['asr_minutes']:.1f}分钟, 缓存命中 {totals['cache_hits']}/{totals['videos']} 个视频, "
+          f"输入 {totals['input_tokens']:,} / 输出 {totals['output_tokens']:,} tokens, "
+          f"约 ¥{totals['cost']:.2f}, {totals['wall_hours']:.2f}小时")
     
     if args.dry_run:
         print("\\n🔍 预览模式 - 将要分析的目录:")
-        for i, blogger_dir in enumerate(target_dirs, start_idx + 1):
-            print(f"  {i:2d}. {blogger_dir.name}")
+        for i, plan in enumerate(run_plan.plans, start_idx + 1):
+            job = plan.job
+            mark = "" if plan.within_budget else "  (超出预算)"
+            print(f"  {i:2d}. {job.directory.name}  [{job.status or '-'}] 粉丝 {job.follower_count}, "
+                  f"{len(job.media)} 个视频 {job.duration / 60:.1f}分钟, ASR {plan.asr_seconds / 60:.1f}分钟, "
+                  f"缓存命中 {plan.cache_hits}, ~{plan.input_tokens + plan.output_tokens:,} tokens, "
+                  f"¥{plan.cost:.2f}, {plan.wall_seconds / 60:.1f}分钟{mark}")
         return
     
     if not target_dirs:
@@ -102,31 +176,32 @@ def main():
     # 开始批量分析
     print("\\n🚀 开始批量分析...")
     
-    # 修改analyzer以支持指定目录列表
-    analyzer.results = []
-    analyzer.failed_analyses = []
-    
-    success_count = 0
-    failed_count = 0
+    # 每个博主的状态变化追加写入日志，中断后可用 --resume 继续
+    if args.resume:
+        journal.record(RUN_JOB, 'resumed', **vars(args))
+    else:
+        analyzer.queue_plans(journal, target_plans, **vars(args))
+    print(f"🧾 运行日志: {journal.path}")
     
-    for i, blogger_dir in enumerate(target_dirs, 1):
+    for i, plan in enumerate(target_plans, 1):
+        blogger_dir = plan.job.directory
         print(f"\\n📊 [{i}/{len(target_dirs)}] {blogger_dir.name}")
         
         # 检查是否跳过
         if args.skip_existing and analyzer.has_existing_report(blogger_dir):
             print("⏭️  跳过（已有报告）")
+            journal.record(str(blogger_dir), 'skipped')
             continue
         
-        # 分析博主
-        result = analyzer.analyze_single_blogger(blogger_dir)
-        analyzer.results.append(result)
+        # 分析博主（运行中超出预算即停止）
+        result = analyzer.analyze_planned(plan, guard, journal)
+        if result is None:
+            print(f"💰 预算已用尽，停止（已花费 ¥{guard.spent:.2f}）")
+            break
         
         if result['status'] == 'success':
-            success_count += 1
             print(f"✅ 完成 ({result['duration']:.1f}秒)")
         else:
-            failed_count += 1
-            analyzer.failed_analyses.append(result)
             print(f"❌ 失败: {result['error']}")
         
         # 延迟
@@ -135,18 +210,15 @@ def main():
             import time
             time.sleep(args.delay)
     
-    # 生成最终报告
-    summary = {
+    # 由日志折叠出最终报告（续跑时包含之前运行的结果）
+    summary = journal.summary()
+    summary.update({
         'total_found': len(all_dirs),
         'filtered': len(filtered_dirs),
-        'processed': len(analyzer.results),
-        'success': success_count,
-        'failed': failed_count,
+        'plan': totals,
         'config': vars(args),
-        'results': analyzer.results,
-        'failed_analyses': analyzer.failed_analyses,
         'timestamp': datetime.now().isoformat()
-    }
+    })
     
     analyzer.print_summary(summary)
     
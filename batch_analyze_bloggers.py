@@ -8,22 +8,31 @@ import sys
 import os
 import time
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 
 # 添加项目根目录到Python路径
 sys.path.insert(0, str(Path(__file__).parent))
 
-from src.ai_outreach.blogger_analyzer import BloggerAnalyzer
-from src.ai_outreach.generator import ScriptGenerator
+from src.ai_outreach.blogger_analyzer import BloggerAnalyzer, BLOGGER_MEDIA_EXTENSIONS
+from src.ai_outreach.analyzer import describe_usage, usage_delta
+from src.ai_outreach.scheduler import BloggerJob, BloggerScheduler
+from src.ai_outreach.planner import BatchPlanner, BloggerPlan, BudgetGuard, RunPlan
+from src.ai_outreach.journal import BatchJournal, RUN_JOB
+from src.ai_outreach.services import ServiceContainer, get_services
 from src.ai_outreach.utils.logger import logger, setup_logger
 from src.ai_outreach.utils.exceptions import AIOutreachException
 
+# 两次博主分析之间的默认等待时间（秒）
+DEFAULT_DELAY_SECONDS = 5
+
 class BatchBloggerAnalyzer:
     """批量博主分析器"""
     
-    def __init__(self):
-        self.blogger_analyzer = BloggerAnalyzer()
-        self.script_generator = ScriptGenerator()
+    def __init__(self, services: ServiceContainer = None):
+        # 整个批次共享同一组ASR/LLM客户端与缓存
+        self.services = services or get_services()
+        self.blogger_analyzer = BloggerAnalyzer(services=self.services)
+        self.script_generator = self.services.generator
         self.results = []
         self.failed_analyses = []
         
@@ -45,6 +54,95 @@ class BatchBloggerAnalyzer:
         
         return blogger_dirs
     
+    def schedule_directories(self, blogger_dirs: List[Path], policy: Optional[str] = None,
+                             order_by: Optional[List[str]] = None, group_by: Optional[str] = None) -> List[BloggerJob]:
+        """按调度策略排序博主目录（读取缓存与媒体元数据，不产生付费调用）"""
+        scheduler = BloggerScheduler(
+            self.blogger_analyzer.parse_blogger_info_file,
+            transcript_cache=self.services.transcript_cache,
+            media_probe=self.services.media_probe
+        )
+        return scheduler.schedule(blogger_dirs, policy=policy, order_by=order_by, group_by=group_by)
+    
+    def resume_jobs(self, journal: BatchJournal) -> List[BloggerJob]:
+        """日志中未完成的博主（保持原运行的入队顺序，不重新排序）"""
+        scheduler = BloggerScheduler(
+            self.blogger_analyzer.parse_blogger_info_file,
+            transcript_cache=self.services.transcript_cache,
+            media_probe=self.services.media_probe
+        )
+        jobs = []
+        for job in journal.pending_jobs():
+            directory = Path(job)
+            if not directory.is_dir():
+                logger.warning(f"续跑时博主目录已不存在，跳过: {directory}")
+                continue
+            jobs.append(scheduler.survey(directory))
+        logger.info(f"从日志续跑: {journal.path.name}, 未完成 {len(jobs)} 个博主")
+        return jobs
+    
+    def resume_config(self, journal: BatchJournal, **explicit) -> Dict[str, Any]:
+        """
+        续跑时沿用日志中记录的运行参数（预算、分析间隔等）
+        
+        Args:
+            journal: 续跑的批量日志
+            **explicit: 本次显式给出的参数，值不为None时覆盖日志中的记录
+        
+        Returns:
+            本次续跑生效的运行参数
+        """
+        run_config = journal.run_config()
+        run_config.update({key: value for key, value in explicit.items() if value is not None})
+        return run_config
+    
+    def queue_plans(self, journal: BatchJournal, plans: List[BloggerPlan], **run_config):
+        """在日志中记录运行参数与入队的博主"""
+        journal.record(RUN_JOB, 'started', **run_config)
+        for plan in plans:
+            journal.record(str(plan.job.directory), 'queued')
+    
+    def plan_run(self, jobs: List[BloggerJob], budget_yuan: Optional[float] = None,
+                 budget_hours: Optional[float] = None, delay_seconds: float = 0.0,
+                 spent: float = 0.0, elapsed: float = 0.0) -> RunPlan:
+        """预估ASR时长、token、耗时与费用，并按预算截取可执行的博主（不产生付费调用）"""
+        return BatchPlanner(delay_seconds=delay_seconds).plan(jobs, budget_yuan=budget_yuan, budget_hours=budget_hours,
+                                                              spent=spent, elapsed=elapsed)
+    
+    def budget_guard(self, journal: BatchJournal, budget_yuan: Optional[float] = None,
+                     budget_hours: Optional[float] = None) -> Optional[BudgetGuard]:
+        """运行时预算检查（计入日志中已记录的花费与耗时）；未设置预算时返回None"""
+        if budget_yuan is None and budget_hours is None:
+            return None
+        return BudgetGuard(budget_yuan, budget_hours, spent=journal.spent(), elapsed=journal.elapsed())
+    
+    def analyze_planned(self, plan: BloggerPlan, guard: Optional[BudgetGuard] = None,
+                        journal: Optional[BatchJournal] = None) -> Optional[Dict[str, Any]]:
+        """
+        在预算内分析一个博主，按实际token用量记录花费
+        
+        设置 journal 时记录各阶段状态变化，并复用日志中已完成的视频分析
+        
+        Returns:
+            分析结果，预算不足时返回None
+        """
+        if guard is not None and not guard.allow(plan):
+            return None
+        
+        job = str(plan.job.directory)
+        progress = journal.progress_for(job) if journal is not None else None
+        completed = journal.completed_videos(job) if journal is not None else None
+        
+        usage_before = self.services.analyzer.usage_snapshot()
+        result = self.analyze_single_blogger(plan.job.directory, progress=progress, completed=completed)
+        usage_after = self.services.analyzer.usage_snapshot()
+        result['usage'] = usage_delta(usage_before, usage_after)
+        if guard is not None:
+            result['cost'] = guard.record(plan, usage_before, usage_after)
+        if journal is not None:
+            journal.record_result(result)
+        return result
+    
     def is_blogger_directory(self, directory: Path) -> bool:
         """检查是否是有效的博主目录"""
         # 检查是否包含博主信息文件
@@ -53,15 +151,14 @@ class BatchBloggerAnalyzer:
             return False
             
         # 检查是否包含视频文件
-        video_extensions = ['.mp4', '.avi', '.mkv', '.mov']
-        for ext in video_extensions:
+        for ext in BLOGGER_MEDIA_EXTENSIONS:
             if list(directory.glob(f"*{ext}")):
                 return True
                 
         return False
     
-    def analyze_single_blogger(self, blogger_dir: Path) -> Dict[str, Any]:
-        """分析单个博主目录"""
+    def analyze_single_blogger(self, blogger_dir: Path, progress=None, completed=None) -> Dict[str, Any]:
+        """分析单个博主目录（progress / completed 透传给 BloggerAnalyzer.analyze_blogger_folder）"""
         result = {
             'directory': str(blogger_dir),
             'blogger_name': '',
@@ -77,7 +174,8 @@ class BatchBloggerAnalyzer:
             logger.info(f"🔍 开始分析博主目录: {blogger_dir.name}")
             
             # 分析博主
-            analysis_result = self.blogger_analyzer.analyze_blogger_folder(blogger_dir)
+            analysis_result = self.blogger_analyzer.analyze_blogger_folder(blogger_dir, progress=progress,
+                                                                           completed=completed)
             
             # 提取博主名称
             blogger_name = analysis_result['blogger_info'].name
@@ -102,58 +200,85 @@ class BatchBloggerAnalyzer:
         return result
     
     def batch_analyze(self, base_path: str, skip_existing: bool = True, 
-                     delay_between_analyses: int = 5) -> Dict[str, Any]:
-        """批量分析所有博主"""
-        base_path = Path(base_path)
-        logger.info(f"🚀 开始批量博主分析: {base_path}")
+                     delay_between_analyses: Optional[int] = None, policy: Optional[str] = None,
+                     budget_yuan: Optional[float] = None, budget_hours: Optional[float] = None,
+                     resume: Optional[str] = None) -> Dict[str, Any]:
+        """
+        批量分析所有博主
         
-        # 查找所有博主目录
-        blogger_dirs = self.find_blogger_directories(base_path)
+        policy 为调度策略（默认读取 SCHEDULE_POLICY）；设置 budget_yuan / budget_hours 时
+        按预检规划截取预算内的博主，运行中超出预算即停止。
+        每个博主的状态变化追加写入批量日志；resume 为已有日志路径时，只继续其中未完成的博主
+        （已完成转录与分析的视频直接复用），未显式给出的预算与分析间隔沿用原运行，统计由日志折叠得到
+        """
+        if resume:
+            journal = BatchJournal(Path(resume))
+            run_config = self.resume_config(journal, budget_yuan=budget_yuan, budget_hours=budget_hours,
+                                            delay=delay_between_analyses)
+            budget_yuan = run_config.get('budget_yuan')
+            budget_hours = run_config.get('budget_hours')
+            delay_between_analyses = run_config.get('delay')
+            jobs = self.resume_jobs(journal)
+        else:
+            base_path = Path(base_path)
+            logger.info(f"🚀 开始批量博主分析: {base_path}")
+            
+            # 查找所有博主目录
+            blogger_dirs = self.find_blogger_directories(base_path)
+            
+            if not blogger_dirs:
+                logger.warning("未找到任何博主目录")
+                return {'total': 0, 'success': 0, 'failed': 0, 'results': []}
+            
+            journal = BatchJournal.create()
+            # 按调度策略排序：重要的或能很快完成的博主先出报告
+            jobs = self.schedule_directories(blogger_dirs, policy=policy)
+        if delay_between_analyses is None:
+            delay_between_analyses = DEFAULT_DELAY_SECONDS
         
-        if not blogger_dirs:
-            logger.warning("未找到任何博主目录")
-            return {'total': 0, 'success': 0, 'failed': 0, 'results': []}
+        # 续跑时已花费的金额与已运行的时间计入预算
+        guard = self.budget_guard(journal, budget_yuan, budget_hours)
+        run_plan = self.plan_run(jobs, budget_yuan=budget_yuan, budget_hours=budget_hours,
+                                 delay_seconds=delay_between_analyses, spent=guard.spent if guard else 0.0,
+                                 elapsed=guard.elapsed if guard else 0.0)
+        plans = run_plan.selected
+        if resume:
+            journal.record(RUN_JOB, 'resumed', **run_config)
+        else:
+            self.queue_plans(journal, plans, base_path=str(base_path), policy=policy,
+                             budget_yuan=budget_yuan, budget_hours=budget_hours, delay=delay_between_analyses)
         
-        total_dirs = len(blogger_dirs)
-        success_count = 0
-        failed_count = 0
+        total_dirs = len(plans)
         
-        logger.info(f"📋 计划分析 {total_dirs} 个博主目录")
+        logger.info(f"📋 计划分析 {total_dirs} 个博主目录，运行日志: {journal.path}")
         
         # 逐个分析
-        for i, blogger_dir in enumerate(blogger_dirs, 1):
+        for i, plan in enumerate(plans, 1):
+            blogger_dir = plan.job.directory
             logger.info(f"📊 进度: {i}/{total_dirs} ({i/total_dirs*100:.1f}%)")
             
             # 检查是否跳过已存在的报告
             if skip_existing and self.has_existing_report(blogger_dir):
                 logger.info(f"⏭️  跳过已存在报告的博主: {blogger_dir.name}")
+                journal.record(str(blogger_dir), 'skipped')
                 continue
             
-            # 分析博主
-            result = self.analyze_single_blogger(blogger_dir)
-            self.results.append(result)
-            
-            if result['status'] == 'success':
-                success_count += 1
-            else:
-                failed_count += 1
-                self.failed_analyses.append(result)
+            # 分析博主（超出预算时停止）
+            result = self.analyze_planned(plan, guard, journal)
+            if result is None:
+                break
             
             # 延迟以避免API限制
             if i < total_dirs and delay_between_analyses > 0:
                 logger.info(f"⏱️  等待 {delay_between_analyses} 秒...")
                 time.sleep(delay_between_analyses)
         
-        # 生成统计报告  
-        summary = {
-            'total': total_dirs,
-            'processed': len(self.results),
-            'success': success_count,
-            'failed': failed_count,
-            'skipped': total_dirs - len(self.results),
-            'results': self.results,
-            'failed_analyses': self.failed_analyses
-        }
+        # 由日志折叠出统计报告（续跑时包含之前运行的结果）
+        summary = journal.summary()
+        summary['plan'] = run_plan.totals()
+        summary['over_budget'] = len(run_plan.plans) - len(plans)
+        self.results = summary['results']
+        self.failed_analyses = summary['failed_analyses']
         
         self.print_summary(summary)
         return summary
@@ -189,6 +314,14 @@ class BatchBloggerAnalyzer:
         logger.info(f"成功: {summary['success']}")
         logger.info(f"失败: {summary['failed']}")
         logger.info(f"跳过: {summary['skipped']}")
+        if summary.get('over_budget'):
+            logger.info(f"超出预算未执行: {summary['over_budget']}")
+        if summary.get('pending'):
+            logger.info(f"未完成: {summary['pending']}")
+        if summary.get('spent') is not None:
+            logger.info(f"实际花费: ¥{summary['spent']:.2f}")
+        if summary.get('usage', {}).get('calls'):
+            logger.info(describe_usage(summary['usage']))
         
         if summary['failed_analyses']:
             logger.info("❌ 失败的分析:")
@@ -237,6 +370,7 @@ def main():
             json.dump(summary, f, ensure_ascii=False, indent=2, default=str)
         
         logger.info(f"📄 详细结果已保存到: {result_file}")
+        logger.info(f"🧾 运行日志: {summary.get('journal')}（中断后可用 advanced_batch.py --resume 继续）")
         
     except KeyboardInterrupt:
         logger.info("⏹️  用户中断分析")
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+
+"""
+CLI启动基准脚本 - 检查轻量命令的冷启动耗时与导入摘要
+"""
+
+import sys
+import argparse
+from pathlib import Path
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, str(Path(__file__).parent))
+
+from src.ai_outreach.utils.startup_profile import (
+    DEFAULT_STARTUP_BUDGET,
+    format_digest,
+    profile_command,
+)
+
+# 轻量命令：不应加载 yt-dlp / 腾讯云SDK / OpenAI / Jinja2
+LIGHT_COMMANDS = [
+    ["--help"],
+    ["config-check"],
+    ["cache-management", "stats"],
+]
+
+def main():
+    parser = argparse.ArgumentParser(description='CLI启动耗时基准检查')
+    parser.add_argument('--budget', type=float, default=DEFAULT_STARTUP_BUDGET,
+                       help='单个轻量命令允许的最长启动时间（秒）')
+    parser.add_argument('--runs', type=int, default=3,
+                       help='每个命令运行次数（取最快一次，排除磁盘缓存抖动）')
+    parser.add_argument('--top', type=int, default=10,
+                       help='摘要中展示的顶层包数量')
+
+    args = parser.parse_args()
+
+    print("🎯 AI外联军师 - CLI启动基准")
+    print("=" * 50)
+
+    failures = []
+
+    for argv in LIGHT_COMMANDS:
+        profiles = [profile_command(argv) for _ in range(max(1, args.runs))]
+        best = min(profiles, key=lambda p: p.wall_time)
+
+        print(format_digest(best, top=args.top))
+
+        heavy = best.heavy_imports()
+        if heavy:
+            failures.append(f"main.py {' '.join(argv)}: 加载了 {', '.join(heavy)}")
+        if best.wall_time > args.budget:
+            failures.append(f"main.py {' '.join(argv)}: {best.wall_time:.3f}s 超出预算 {args.budget:.1f}s")
+        print("-" * 50)
+
+    if failures:
+        print("❌ 启动基准未通过:")
+        for failure in failures:
+            print(f"  • {failure}")
+        sys.exit(1)
+
+    print(f"✅ 所有轻量命令均在 {args.budget:.1f}s 内启动，且未加载重量级依赖")
+
+if __name__ == "__main__":
+    main()
@@ -5,7 +5,7 @@ AI外联军师 - 主程序入口
 
 import typer
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional
 from rich.console import Console
 from rich.progress import Progress, SpinnerColumn, TextColumn
 from rich.panel import Panel
@@ -14,13 +14,10 @@ from rich.text import Text
 from src.ai_outreach.utils.config import config
 from src.ai_outreach.utils.logger import logger, setup_logger
 from src.ai_outreach.utils.exceptions import *
-from src.ai_outreach.utils.audio_utils import cleanup_temp_files
-from src.ai_outreach.fetcher import VideoFetcher
-from src.ai_outreach.file_handler import FileHandler
-from src.ai_outreach.transcriber import TencentASRTranscriber
-from src.ai_outreach.analyzer import ContentAnalyzer
-from src.ai_outreach.generator import ScriptGenerator
-from src.ai_outreach.blogger_analyzer import BloggerAnalyzer
+
+# 注意：yt-dlp / 腾讯云SDK / OpenAI / Jinja2 等重量级依赖只在具体子命令内部按需导入，
+# 保证 --help、config-check、cache-management 等轻量命令的启动时间在1秒以内。
+# 参见 benchmark_startup.py 的启动基准检查。
 
 # 创建Typer应用
 app = typer.Typer(
@@ -55,12 +52,29 @@ def validate_config():
     # 确保目录存在
     config.ensure_directories()
 
+def progress_steps(progress: Progress):
+    """把流水线的步骤回调映射为Rich进度行（新步骤开始时上一步标记为完成）"""
+    def step(description: str):
+        for task_id in progress.task_ids:
+            progress.update(task_id, total=1, completed=1)
+        progress.add_task(description, total=None)
+    return step
+
+def finish_steps(progress: Progress):
+    """标记全部步骤完成"""
+    for task_id in progress.task_ids:
+        progress.update(task_id, total=1, completed=1)
+
 @app.command()
 def analyze(
     url: Optional[str] = typer.Option(None, "--url", "-u", help="视频URL链接"),
     file: Optional[str] = typer.Option(None, "--file", "-f", help="本地视频/音频文件路径"),
     verbose: bool = typer.Option(False, "--verbose", "-v", help="启用详细输出"),
-    output: Optional[str] = typer.Option(None, "--output", "-o", help="指定输出文件路径")
+    output: Optional[str] = typer.Option(None, "--output", "-o", help="指定输出文件路径"),
+    full_video: bool = typer.Option(False, "--full-video", help="URL模式下载完整音视频（默认仅下载音频流）"),
+    quick: bool = typer.Option(False, "--quick", help="快速扫描：只转录若干代表性片段并进行轻量分析（用于初筛）"),
+    max_minutes: Optional[float] = typer.Option(None, "--max-minutes", help="URL模式只下载开头N分钟（无字幕需转录时生效）"),
+    sections: Optional[str] = typer.Option(None, "--sections", help="URL模式只下载指定区间，如 \"0-5:00,12:00-15:30\"")
 ):
     """
     分析博主视频内容并生成沟通脚本
@@ -86,142 +100,58 @@ def analyze(
         console.print("❌ 请只选择一种输入模式（URL或文件）", style="bold red")
         raise typer.Exit(1)
     
+    from src.ai_outreach.fetcher import parse_sections
+    
+    try:
+        download_sections = parse_sections(sections, config.URL_MAX_MINUTES if max_minutes is None else max_minutes)
+    except ValueError as e:
+        console.print(f"❌ 下载区间无效: {e}", style="bold red")
+        raise typer.Exit(1)
+    if file and download_sections:
+        console.print("⚠️ --max-minutes / --sections 仅对URL模式生效，本地文件将完整处理", style="yellow")
+    
     # 验证配置
     try:
         validate_config()
     except typer.Exit:
         return
     
-    # 临时文件列表，用于清理
-    temp_files = []
+    from src.ai_outreach.services import get_services
+    from src.ai_outreach.pipeline import analyze_source
+    from src.ai_outreach.analyzer import describe_usage
+    
+    services = get_services()
     
     try:
         with Progress(
-            SpinnerColumn(),
+            SpinnerColumn(finished_text="✅"),
             TextColumn("[progress.description]{task.description}"),
             console=console
         ) as progress:
-            
-            transcript_result = None
-            
-            if url:
-                # URL模式：优先尝试提取字幕
-                task1 = progress.add_task("📥 获取视频信息和字幕...", total=None)
-                fetcher = VideoFetcher()
-                video_info = fetcher.extract_subtitles(url)
-                input_mode = "URL"
-                
-                if video_info.subtitles:
-                    # 有字幕的情况下，直接使用字幕作为转录文本
-                    progress.update(task1, description="✅ 字幕提取完成")
-                    
-                    # 创建模拟的转录结果对象
-                    class SubtitleResult:
-                        def __init__(self, text):
-                            self.text = text
-                            self.confidence = 1.0
-                            self.words = []
-                    
-                    transcript_result = SubtitleResult(video_info.subtitles)
-                    console.print(f"📝 使用字幕内容，长度: {len(video_info.subtitles)}字符", style="dim")
-                    
-                else:
-                    # 没有字幕，回退到音频处理
-                    progress.update(task1, description="⚠️ 未找到字幕，回退到音频处理...")
-                    video_info = fetcher.download_and_extract_audio(url)
-                    temp_files.extend([video_info.video_path, video_info.audio_path])
-                    progress.update(task1, description="✅ 视频和音频处理完成")
-                
-            else:
-                # 文件模式：处理本地文件
-                task1 = progress.add_task("📥 处理本地文件...", total=None)
-                file_handler = FileHandler()
-                video_info = file_handler.process_file(file)
-                input_mode = "本地文件"
-                if video_info.audio_path != Path(file):
-                    temp_files.append(video_info.audio_path)
-                progress.update(task1, description="✅ 本地文件处理完成")
-            
-            # 步骤2: 音频转录（如果需要）
-            if transcript_result is None:
-                task2 = progress.add_task("🎤 转录音频内容...", total=None)
-                
-                transcriber = TencentASRTranscriber()
-                
-                # 根据音频时长选择转录方法
-                source_file = video_info.video_path if hasattr(video_info, 'video_path') and video_info.video_path else None
-                if video_info.duration <= 60:
-                    transcript_result = transcriber.transcribe_short_audio(video_info.audio_path, source_file)
-                else:
-                    transcript_result = transcriber.transcribe_file(video_info.audio_path, source_file)
-                
-                progress.update(task2, description="✅ 音频转录完成")
-                
-            else:
-                # 跳过转录步骤
-                task2 = progress.add_task("📝 使用字幕内容", total=None)
-                progress.update(task2, description="✅ 字幕内容准备完成")
-            
-            # 保存转录文本（辅助功能，不影响主流程）
-            try:
-                generator = ScriptGenerator()
-                video_info_dict = {
-                    'title': video_info.title,
-                    'author': video_info.author,
-                    'duration': video_info.duration,
-                    'input_type': input_mode
-                }
-                transcript_path = generator.save_transcript_text(transcript_result.text, video_info_dict)
-                if transcript_path:
-                    logger.debug(f"转录文本已保存到: {transcript_path}")
-            except Exception as e:
-                logger.warning(f"保存转录文本时出错，继续主流程: {e}")
-            
-            # 步骤3: 内容分析
-            task3 = progress.add_task("🧠 AI内容分析...", total=None)
-            
-            analyzer = ContentAnalyzer()
-            analysis_result = analyzer.analyze_content(
-                transcript_result.text,
-                title=video_info.title,
-                author=video_info.author
+            result = analyze_source(
+                url=url, file=file, services=services, quick=quick, sections=download_sections,
+                full_video=full_video, output=output, step=progress_steps(progress)
             )
-            
-            progress.update(task3, description="✅ 内容分析完成")
-            
-            # 步骤4: 生成脚本
-            task4 = progress.add_task("📝 生成沟通脚本...", total=None)
-            
-            generator = ScriptGenerator()
-            
-            video_info_dict = {
-                'title': video_info.title,
-                'author': video_info.author,
-                'duration': video_info.duration,
-                'input_type': input_mode
-            }
-            
-            script_result = generator.generate_scripts(analysis_result, video_info_dict)
-            
-            progress.update(task4, description="✅ 脚本生成完成")
-            
-            # 步骤5: 保存报告
-            task5 = progress.add_task("💾 保存分析报告...", total=None)
-            
-            if output:
-                output_path = Path(output)
-            else:
-                output_path = generator.save_markdown_report(script_result, video_info_dict)
-            
-            progress.update(task5, description="✅ 报告保存完成")
+            finish_steps(progress)
+        
+        video_info = result['video_info']
+        analysis_result = result['analysis']
+        if result['transcript_source'] == 'subtitles':
+            source = getattr(video_info, 'subtitle_source', None) or ''
+            console.print(f"📝 使用{source}字幕内容，长度: {len(video_info.subtitles)}字符", style="dim")
+        elif result['transcript_source'] == 'cache':
+            console.print("📝 使用缓存的转录结果，已跳过音频处理", style="dim")
+        if getattr(video_info, 'sections', None):
+            console.print(f"✂️ 只下载区间: {video_info.sections_label}", style="dim")
         
         # 显示结果
         console.print("\n🎉 分析完成!", style="bold green")
-        console.print(f"📁 报告已保存至: {output_path}", style="blue")
+        console.print(f"📁 报告已保存至: {result['report_path']}", style="blue")
         console.print(f"👤 博主: {video_info.author}", style="dim")
         console.print(f"📹 标题: {video_info.title}", style="dim")
         console.print(f"⏱️  时长: {video_info.duration:.1f}秒", style="dim")
-        console.print(f"📝 转录文本: {len(transcript_result.text)}字符", style="dim")
+        console.print(f"📝 转录文本: {result['text_length']}字符", style="dim")
+        console.print(f"🤖 {describe_usage(services.analyzer.usage_snapshot())}", style="dim")
         
         # 显示关键洞察
         console.print("\n🔍 关键洞察:", style="bold")
@@ -242,25 +172,21 @@ def analyze(
     except Exception as e:
         console.print(f"❌ 未知错误: {e}", style="bold red")
         logger.error(f"未知错误: {e}")
-        
-    finally:
-        # 清理临时文件
-        if temp_files:
-            console.print("🧹 清理临时文件...", style="dim")
-            cleanup_temp_files(*temp_files)
 
 @app.command()
 def batch(
     folder: str = typer.Argument(..., help="包含MP4视频文件的文件夹路径"),
     verbose: bool = typer.Option(False, "--verbose", "-v", help="启用详细输出"),
     max_files: Optional[int] = typer.Option(None, "--max", "-m", help="最大处理文件数量"),
-    skip_existing: bool = typer.Option(True, "--skip-existing", help="跳过已处理的文件")
+    skip_existing: bool = typer.Option(True, "--skip-existing", help="跳过已处理的文件"),
+    quick: bool = typer.Option(False, "--quick", help="快速扫描：只转录若干代表性片段并进行轻量分析（用于初筛）")
 ):
     """
     批量处理文件夹中的MP4视频文件
     
     示例：
     python main.py batch /path/to/videos --verbose --max 10
+    python main.py batch /path/to/videos --quick
     """
     
     # 设置日志级别
@@ -302,9 +228,7 @@ def batch(
         unprocessed_files = []
         for mp4_file in mp4_files:
             # 检查是否已存在对应的报告文件
-            file_stem = mp4_file.stem
-            existing_reports = list(config.OUTPUT_DIR.glob(f"*{file_stem}*.md"))
-            if existing_reports:
+            if list(config.OUTPUT_DIR.glob(f"*{mp4_file.stem}*.md")):
                 console.print(f"⏭️ 跳过已处理文件: {mp4_file.name}", style="dim")
             else:
                 unprocessed_files.append(mp4_file)
@@ -316,47 +240,38 @@ def batch(
     
     console.print(f"🚀 开始批量处理 {len(mp4_files)} 个文件", style="bold green")
     
-    # 统计信息
+    # 整个批次共享ASR/LLM客户端、缓存索引与模板环境
+    from src.ai_outreach.services import get_services
+    from src.ai_outreach.pipeline import analyze_source
+    services = get_services()
+    
     success_count = 0
-    error_count = 0
-    results = []
+    failures = []
     
-    # 逐个处理文件
-    for i, mp4_file in enumerate(mp4_files, 1):
+    # 音频提取在进程池中并行进行并领先于转录，文件按提取完成顺序进入单视频流程
+    prepared = services.file_handler.process_files(mp4_files, quick_scan=quick)
+    for i, (mp4_file, video_info, error) in enumerate(prepared, 1):
         console.print(f"\n{'='*60}")
         console.print(f"📋 处理进度: {i}/{len(mp4_files)} - {mp4_file.name}", style="bold blue")
         console.print(f"{'='*60}")
         
         try:
-            # 调用单文件处理逻辑
-            result = process_single_file(str(mp4_file), verbose)
-            if result:
-                success_count += 1
-                results.append({
-                    'file': mp4_file.name,
-                    'status': 'success',
-                    'report_path': result.get('report_path'),
-                    'transcript_path': result.get('transcript_path'),
-                    'duration': result.get('duration'),
-                    'text_length': result.get('text_length')
-                })
-                console.print("✅ 处理成功", style="bold green")
-            else:
-                error_count += 1
-                results.append({
-                    'file': mp4_file.name,
-                    'status': 'failed',
-                    'error': 'Unknown error'
-                })
-                console.print("❌ 处理失败", style="bold red")
-                
+            if error:
+                raise error
+            
+            with Progress(
+                SpinnerColumn(finished_text="✅"),
+                TextColumn("[progress.description]{task.description}"),
+                console=console
+            ) as progress:
+                analyze_source(file=str(mp4_file), services=services, quick=quick, video_info=video_info,
+                               step=progress_steps(progress))
+                finish_steps(progress)
+            success_count += 1
+            console.print("✅ 处理成功", style="bold green")
+            
         except Exception as e:
-            error_count += 1
-            results.append({
-                'file': mp4_file.name,
-                'status': 'failed',
-                'error': str(e)
-            })
+            failures.append((mp4_file.name, str(e)))
             console.print(f"❌ 处理失败: {e}", style="bold red")
             logger.error(f"批量处理文件 {mp4_file.name} 失败: {e}")
     
@@ -365,130 +280,24 @@ def batch(
     console.print("🎉 批量处理完成!", style="bold green")
     console.print(f"{'='*60}")
     console.print(f"✅ 成功处理: {success_count} 个文件")
-    console.print(f"❌ 处理失败: {error_count} 个文件")
+    console.print(f"❌ 处理失败: {len(failures)} 个文件")
     console.print(f"📊 总计: {len(mp4_files)} 个文件")
     
-    # 显示详细结果
     if success_count > 0:
         console.print(f"\n📁 输出目录:")
         console.print(f"  • 分析报告: {config.OUTPUT_DIR}")
         console.print(f"  • 转录文本: {config.TRANSCRIPTS_DIR}")
     
-    if error_count > 0:
+    if failures:
         console.print(f"\n❌ 失败文件列表:", style="red")
-        for result in results:
-            if result['status'] == 'failed':
-                console.print(f"  • {result['file']}: {result.get('error', 'Unknown error')}")
-
-def process_single_file(file_path: str, verbose: bool = False) -> Optional[dict]:
-    """
-    处理单个文件的核心逻辑（从analyze函数提取）
-    
-    Args:
-        file_path: 文件路径
-        verbose: 详细输出
-        
-    Returns:
-        处理结果字典，包含报告路径等信息
-    """
-    temp_files = []
-    
-    try:
-        with Progress(
-            SpinnerColumn(),
-            TextColumn("[progress.description]{task.description}"),
-            console=console
-        ) as progress:
-            
-            transcript_result = None
-            
-            # 本地文件模式处理
-            task1 = progress.add_task("📁 处理本地文件...", total=None)
-            file_handler = FileHandler()
-            video_info = file_handler.process_file(file_path)
-            temp_files.append(video_info.audio_path)
-            input_mode = "本地文件"
-            
-            progress.update(task1, description="✅ 本地文件处理完成")
-            
-            # 音频转录
-            task2 = progress.add_task("🎤 音频转录中...", total=None)
-            transcriber = TencentASRTranscriber()
-            
-            # 根据音频时长选择转录方法
-            source_file = video_info.video_path if hasattr(video_info, 'video_path') and video_info.video_path else Path(file_path)
-            if video_info.duration <= 60:
-                transcript_result = transcriber.transcribe_short_audio(video_info.audio_path, source_file)
-            else:
-                transcript_result = transcriber.transcribe_file(video_info.audio_path, source_file)
-            
-            progress.update(task2, description="✅ 音频转录完成")
-            
-            # 保存转录文本
-            try:
-                generator = ScriptGenerator()
-                video_info_dict = {
-                    'title': video_info.title,
-                    'author': video_info.author,
-                    'duration': video_info.duration,
-                    'input_type': input_mode
-                }
-                transcript_path = generator.save_transcript_text(transcript_result.text, video_info_dict)
-                if transcript_path:
-                    logger.debug(f"转录文本已保存到: {transcript_path}")
-            except Exception as e:
-                logger.warning(f"保存转录文本时出错，继续主流程: {e}")
-                transcript_path = None
-            
-            # 内容分析
-            task3 = progress.add_task("🧠 AI内容分析...", total=None)
-            
-            analyzer = ContentAnalyzer()
-            analysis_result = analyzer.analyze_content(
-                transcript_result.text,
-                title=video_info.title,
-                author=video_info.author
-            )
-            
-            progress.update(task3, description="✅ 内容分析完成")
-            
-            # 生成脚本
-            task4 = progress.add_task("📝 生成沟通脚本...", total=None)
-            
-            script_result = generator.generate_scripts(analysis_result, video_info_dict)
-            
-            progress.update(task4, description="✅ 脚本生成完成")
-            
-            # 保存报告
-            task5 = progress.add_task("💾 保存分析报告...", total=None)
-            
-            output_path = generator.save_markdown_report(script_result, video_info_dict)
-            
-            progress.update(task5, description="✅ 报告保存完成")
-        
-        # 返回处理结果
-        return {
-            'report_path': str(output_path),
-            'transcript_path': str(transcript_path) if transcript_path else None,
-            'duration': video_info.duration,
-            'text_length': len(transcript_result.text),
-            'author': video_info.author,
-            'title': video_info.title
-        }
-        
-    except Exception as e:
-        logger.error(f"处理文件 {file_path} 时出错: {e}")
-        return None
-        
-    finally:
-        # 清理临时文件
-        if temp_files:
-            cleanup_temp_files(*temp_files)
+        for name, error in failures:
+            console.print(f"  • {name}: {error}")
 
 @app.command()
 def blogger_analysis(
     folder: str = typer.Argument(..., help="博主文件夹路径（包含'人物 - 博主名.md'和视频文件）"),
-    verbose: bool = typer.Option(False, "--verbose", "-v", help="启用详细输出")
+    verbose: bool = typer.Option(False, "--verbose", "-v", help="启用详细输出"),
+    quick: bool = typer.Option(False, "--quick", help="快速扫描：只转录若干代表性片段并进行轻量分析（用于初筛）")
 ):
     """
     博主综合分析：整合基础信息和多个视频内容
@@ -519,6 +328,12 @@ def blogger_analysis(
         console.print(f"❌ 路径不是文件夹: {folder}", style="bold red")
         raise typer.Exit(1)
     
+    from src.ai_outreach.services import get_services
+    from src.ai_outreach.blogger_analyzer import BloggerAnalyzer
+    from src.ai_outreach.analyzer import describe_usage
+    
+    services = get_services()
+    
     try:
         with Progress(
             SpinnerColumn(),
@@ -528,17 +343,17 @@ def blogger_analysis(
             
             # 步骤1: 初始化分析器
             task1 = progress.add_task("🔍 初始化博主分析器...", total=None)
-            blogger_analyzer = BloggerAnalyzer()
+            blogger_analyzer = BloggerAnalyzer(services=services)
             progress.update(task1, description="✅ 分析器初始化完成")
             
             # 步骤2: 分析博主文件夹
             task2 = progress.add_task("📁 解析博主文件夹...", total=None)
-            analysis_result = blogger_analyzer.analyze_blogger_folder(folder_path)
+            analysis_result = blogger_analyzer.analyze_blogger_folder(folder_path, quick_scan=quick)
             progress.update(task2, description="✅ 文件夹分析完成")
             
             # 步骤3: 生成综合报告
             task3 = progress.add_task("📊 生成综合分析报告...", total=None)
-            generator = ScriptGenerator()
+            generator = services.generator
             report_path = generator.generate_blogger_comprehensive_report(analysis_result)
             progress.update(task3, description="✅ 报告生成完成")
         
@@ -551,6 +366,12 @@ def blogger_analysis(
         console.print(f"🎬 分析视频: {analysis_result['total_videos']}个", style="dim")
         console.print(f"⏱️  总时长: {analysis_result['total_duration']:.1f}秒", style="dim")
         console.print(f"📝 文本总量: {analysis_result['all_transcripts_length']}字符", style="dim")
+        map_reduce = analysis_result.get('map_reduce')
+        if map_reduce:
+            console.print(f"🌲 分层汇总: {map_reduce['groups']}组 / {map_reduce['levels']}层"
+                          + (f"（{map_reduce['failed_groups']}组失败已跳过）" if map_reduce['failed_groups'] else ""),
+                          style="dim")
+        console.print(f"🤖 {describe_usage(services.analyzer.usage_snapshot())}", style="dim")
         
         # 显示关键洞察
         comprehensive = analysis_result['comprehensive_analysis']
@@ -570,6 +391,286 @@ def blogger_analysis(
         console.print(f"❌ 未知错误: {e}", style="bold red")
         logger.error(f"博主分析未知错误: {e}")
 
+@app.command()
+def ingest_channel(
+    url: str = typer.Argument(..., help="创作者频道或播放列表URL"),
+    output_dir: str = typer.Option(".", "--output-dir", "-o", help="博主文件夹的根目录"),
+    top: int = typer.Option(5, "--top", "-n", help="下载排名前N的视频音频"),
+    scan: int = typer.Option(30, "--scan", help="参与排序的最大条目数量"),
+    workers: int = typer.Option(8, "--workers", help="并行补全元数据的线程数"),
+    max_downloads: int = typer.Option(3, "--max-downloads", help="同时下载的最大数量"),
+    verbose: bool = typer.Option(False, "--verbose", "-v", help="启用详细输出")
+):
+    """
+    导入创作者频道：按播放量与新近度挑选视频，只下载音频并生成博主文件夹
+
+    示例：
+    python main.py ingest-channel "https://space.bilibili.com/12345/video" --top 5
+    python main.py blogger-analysis "./01-博主-某博主"
+    """
+
+    # 设置日志级别
+    if verbose:
+        logger.setLevel("DEBUG")
+
+    print_banner()
+
+    from src.ai_outreach.channel_ingest import ChannelIngestor
+    from src.ai_outreach.fetcher import VideoFetcher
+
+    ingestor = ChannelIngestor(
+        fetcher=VideoFetcher(audio_only=True),
+        metadata_workers=workers,
+        max_concurrent_downloads=max_downloads
+    )
+
+    try:
+        with Progress(
+            SpinnerColumn(),
+            TextColumn("[progress.description]{task.description}"),
+            console=console
+        ) as progress:
+            task = progress.add_task("📡 导入频道...", total=None)
+            result = ingestor.ingest(url, Path(output_dir), top_n=top, scan_limit=scan)
+            progress.update(task, description="✅ 频道导入完成")
+
+        console.print(f"\n🎉 已导入博主: {result.channel_name}", style="bold green")
+        console.print(f"📁 博主文件夹: {result.blogger_dir}", style="blue")
+        console.print(f"📄 信息文件: {result.info_file}", style="dim")
+        console.print(f"🎵 下载音频: {len(result.downloaded_files)}个 / 扫描条目: {len(result.ranked_entries)}个", style="dim")
+
+        for entry in result.ranked_entries[:top]:
+            views = entry.view_count if entry.view_count is not None else '-'
+            console.print(f"  • [{entry.score:.2f}] {entry.title} (播放 {views})", style="dim")
+
+        if result.failed_entries:
+            console.print(f"⚠️  下载失败: {len(result.failed_entries)}个", style="yellow")
+
+        console.print(f"\n下一步: python main.py blogger-analysis \"{result.blogger_dir}\"", style="cyan")
+
+    except KeyboardInterrupt:
+        console.print("\n❌ 用户中断操作", style="yellow")
+
+    except NetworkError as e:
+        console.print(f"❌ 导入失败: {e}", style="bold red")
+        logger.error(f"频道导入失败: {e}")
+        raise typer.Exit(1)
+
+@app.command()
+def enqueue(
+    paths: Optional[List[str]] = typer.Argument(None, help="博主目录、视频文件，或包含多个博主目录的根目录"),
+    kind: Optional[str] = typer.Option(None, "--kind", help="任务类型 blogger / video（默认按路径判断）"),
+    priority: int = typer.Option(0, "--priority", "-p", help="优先级（越大越先执行）"),
+    quick: bool = typer.Option(False, "--quick", help="快速扫描：只转录若干代表性片段并进行轻量分析（用于初筛）"),
+    force: bool = typer.Option(False, "--force", help="已完成或已进入死信的任务重新入队"),
+    retry_dead: bool = typer.Option(False, "--retry-dead", help="所有死信任务重新入队"),
+    queue_path: Optional[str] = typer.Option(None, "--queue", help="队列数据库路径（默认读取 QUEUE_DB_PATH）")
+):
+    """
+    把博主目录或视频文件加入本地任务队列（由 worker 命令执行）
+    
+    示例：
+    python main.py enqueue "/path/to/博主视频"
+    python main.py enqueue "/path/to/11-博主-名称" --priority 10
+    python main.py enqueue --retry-dead
+    """
+    from src.ai_outreach.job_queue import JobQueue
+    from src.ai_outreach.blogger_analyzer import BLOGGER_MEDIA_EXTENSIONS, list_blogger_media
+    
+    queue = JobQueue(Path(queue_path) if queue_path else None)
+    
+    if retry_dead:
+        console.print(f"🔁 死信任务重新入队: {queue.requeue_dead()} 个", style="green")
+    
+    # 按路径展开任务：博主目录 / 根目录下的博主目录 / 视频文件
+    tasks = []
+    for raw in paths or []:
+        path = Path(raw)
+        if not path.exists():
+            console.print(f"❌ 路径不存在: {raw}", style="bold red")
+            raise typer.Exit(1)
+        if path.is_file():
+            tasks.append((kind or 'video', path))
+        elif kind == 'video':
+            tasks.extend(('video', media) for media in list_blogger_media(path))
+        elif list(path.glob("人物 - *.md")):
+            tasks.append(('blogger', path))
+        else:
+            blogger_dirs = sorted(d for d in path.iterdir() if d.is_dir() and list(d.glob("人物 - *.md")))
+            if blogger_dirs:
+                tasks.extend(('blogger', d) for d in blogger_dirs)
+            else:
+                tasks.extend(('video', f) for f in sorted(path.iterdir())
+                             if f.suffix.lower() in BLOGGER_MEDIA_EXTENSIONS)
+    
+    added = 0
+    for task_kind, path in tasks:
+        try:
+            job_id = queue.enqueue(task_kind, path, priority=priority, quick_scan=quick, force=force)
+        except ValueError as e:
+            console.print(f"❌ {e}", style="bold red")
+            raise typer.Exit(1)
+        if job_id is not None:
+            added += 1
+    if tasks:
+        console.print(f"📥 新增 {added} 个任务，已存在 {len(tasks) - added} 个", style="green")
+    
+    # 显示队列状态
+    console.print(f"\n📋 队列: {queue.db_path}", style="bold")
+    for task_kind, counts in queue.stats().items():
+        console.print(f"• {task_kind}: " + ", ".join(f"{status} {n}" for status, n in counts.items()))
+    for job in queue.dead_letters()[:10]:
+        console.print(f"  ☠️ #{job.id} {Path(job.path).name}: {job.last_error}", style="dim")
+    queue.close()
+
+@app.command()
+def worker(
+    concurrency: int = typer.Option(1, "--concurrency", "-c", help="worker 进程数"),
+    kind: Optional[str] = typer.Option(None, "--kind", help="只处理 blogger 或 video 任务（默认全部）"),
+    exit_when_idle: bool = typer.Option(False, "--exit-when-idle", help="队列中没有未完成的任务时退出"),
+    queue_path: Optional[str] = typer.Option(None, "--queue", help="队列数据库路径（默认读取 QUEUE_DB_PATH）"),
+    verbose: bool = typer.Option(False, "--verbose", "-v", help="启用详细输出")
+):
+    """
+    启动 worker 进程，从本地任务队列领取并执行任务（多台主机共享队列数据库时可在每台主机上运行）
+    
+    示例：
+    python main.py worker --concurrency 4
+    python main.py worker --kind video --exit-when-idle
+    """
+    if verbose:
+        logger.setLevel("DEBUG")
+    
+    print_banner()
+    
+    try:
+        validate_config()
+    except typer.Exit:
+        return
+    
+    from src.ai_outreach.job_queue import JOB_KINDS
+    from src.ai_outreach.worker import run_workers
+    
+    if kind and kind not in JOB_KINDS:
+        console.print(f"❌ 未知的任务类型: {kind}（可选: {', '.join(JOB_KINDS)}）", style="bold red")
+        raise typer.Exit(1)
+    
+    console.print(f"🚀 启动 {concurrency} 个 worker", style="bold green")
+    try:
+        run_workers(concurrency, Path(queue_path) if queue_path else None,
+                    kinds=[kind] if kind else None, exit_when_idle=exit_when_idle)
+    except KeyboardInterrupt:
+        console.print("\n⏹️  worker 已停止（未完成的任务在租约超时后重新可见）", style="yellow")
+
+@app.command()
+def serve(
+    host: Optional[str] = typer.Option(None, "--host", help="监听地址（默认读取 SERVE_HOST，仅本机）"),
+    port: Optional[int] = typer.Option(None, "--port", "-p", help="监听端口（默认读取 SERVE_PORT）"),
+    workers: Optional[int] = typer.Option(None, "--workers", "-w", help="同时执行的任务数（默认读取 SERVE_WORKERS）"),
+    verbose: bool = typer.Option(False, "--verbose", "-v", help="启用详细输出")
+):
+    """
+    启动常驻HTTP服务：流水线保持预热，通过本地接口提交分析任务、轮询状态并获取Markdown报告
+    
+    示例：
+    python main.py serve --port 8765
+    curl -X POST localhost:8765/jobs -d '{"file": "/path/to/video.mp4"}'
+    curl "localhost:8765/jobs/<id>?wait=30"
+    curl localhost:8765/jobs/<id>/report
+    """
+    if verbose:
+        logger.setLevel("DEBUG")
+    
+    print_banner()
+    
+    try:
+        validate_config()
+    except typer.Exit:
+        return
+    
+    from src.ai_outreach.server import serve as run_server
+    
+    console.print(f"🚀 启动分析服务: http://{host or config.SERVE_HOST}:{port or config.SERVE_PORT}", style="bold green")
+    try:
+        run_server(host=host, port=port, workers=workers)
+    except KeyboardInterrupt:
+        console.print("\n⏹️  服务已停止", style="yellow")
+    except OSError as e:
+        console.print(f"❌ 服务启动失败: {e}", style="bold red")
+        raise typer.Exit(1)
+
+@app.command()
+def rerender(
+    paths: Optional[List[str]] = typer.Argument(None, help="结构化分析结果文件（*.analysis.json）或所在目录（默认输出目录）"),
+    workers: Optional[int] = typer.Option(None, "--workers", "-w", help="并行渲染的进程数（默认CPU核数）"),
+    output_dir: Optional[str] = typer.Option(None, "--output-dir", "-o", help="重建报告的输出目录（默认覆盖原报告）"),
+    verbose: bool = typer.Option(False, "--verbose", "-v", help="启用详细输出")
+):
+    """
+    由报告旁保存的结构化分析结果重新渲染报告（修改模板后使用，不调用任何API）
+
+    示例：
+    python main.py rerender
+    python main.py rerender outputs/ --output-dir ./preview --workers 8
+    """
+    if verbose:
+        logger.setLevel("DEBUG")
+
+    print_banner()
+
+    from src.ai_outreach.rerender import find_analysis_files, rerender_reports
+
+    roots = [Path(p) for p in paths] if paths else [config.OUTPUT_DIR, Path("outputs")]
+    files = find_analysis_files(roots)
+    if not files:
+        console.print("⚠️ 未找到结构化分析结果（*.analysis.json），新生成的报告会自动保存", style="yellow")
+        return
+
+    console.print(f"🔁 重建 {len(files)} 个报告...", style="bold")
+    summary = rerender_reports(files, workers=workers, output_dir=Path(output_dir) if output_dir else None)
+
+    console.print(f"\n✅ 已重建 {summary.rendered}/{summary.total} 个报告，耗时 {summary.elapsed:.1f}秒", style="bold green")
+    for path, error in summary.failed[:10]:
+        console.print(f"  ❌ {Path(path).name}: {error}", style="red")
+    if summary.failed:
+        raise typer.Exit(1)
+
+@app.command()
+def export(
+    output_dir: Optional[str] = typer.Option(None, "--output-dir", "-o", help="导出目录（默认 outputs/exports）"),
+    formats: str = typer.Option("jsonl", "--format", "-f", help="导出格式，逗号分隔：jsonl,csv,parquet"),
+    full: bool = typer.Option(False, "--full", help="忽略上次导出的水位线，全量导出"),
+    verbose: bool = typer.Option(False, "--verbose", "-v", help="启用详细输出")
+):
+    """
+    导出分析结果、博主档案与转录元数据（JSONL / CSV / Parquet），默认只导出上次导出之后的新数据
+
+    示例：
+    python main.py export
+    python main.py export --format jsonl,csv,parquet --output-dir ./warehouse
+    """
+    if verbose:
+        logger.setLevel("DEBUG")
+
+    print_banner()
+
+    from src.ai_outreach.exporter import export_all
+
+    target = Path(output_dir) if output_dir else config.OUTPUT_DIR / "exports"
+    try:
+        summary = export_all(target, [fmt.strip() for fmt in formats.split(",") if fmt.strip()], full=full,
+                             analysis_roots=[config.OUTPUT_DIR, Path("outputs")])
+    except ConfigurationError as e:
+        console.print(f"❌ {e}", style="bold red")
+        raise typer.Exit(1)
+
+    mode = "全量" if not summary.since else "增量"
+    console.print(f"\n✅ {mode}导出完成，耗时 {summary.elapsed:.1f}秒", style="bold green")
+    for table, count in summary.rows.items():
+        console.print(f"• {table}: {count} 行", style="dim")
+    for path in summary.files:
+        console.print(f"  📄 {path}", style="dim")
+
 @app.command()
 def config_check():
     """检查配置是否正确"""
@@ -617,9 +718,10 @@ def cache_management(
     except typer.Exit:
         return
     
-    from src.ai_outreach.transcript_cache import TranscriptCache
+    from src.ai_outreach.services import get_services
     
-    cache = TranscriptCache()
+    services = get_services()
+    cache = services.transcript_cache
     
     if action == "stats":
         # 显示缓存统计
@@ -633,6 +735,12 @@ def cache_management(
         console.print(f"• 总大小: {stats['total_size_mb']} MB")
         console.print(f"• 缓存目录: {stats['cache_dir']}")
         
+        audio_stats = services.audio_cache.get_stats()
+        console.print("\n🎵 提取音频缓存:", style="bold blue")
+        console.print(f"• 缓存总数: {audio_stats['cache_count']}")
+        console.print(f"• 总大小: {audio_stats['total_size_mb']} / {audio_stats['max_size_mb']} MB")
+        console.print(f"• 缓存目录: {audio_stats['cache_dir']}")
+        
         if stats['audio_based_caches'] > stats['source_based_caches']:
             console.print("\n⚠️ 检测到较多音频文件缓存，建议运行清理操作", style="yellow")
             console.print("运行命令: python main.py cache-management cleanup", style="dim")
@@ -663,9 +771,11 @@ def cache_management(
         console.print("\n🗑️ 正在清空所有缓存...", style="yellow")
         
         cleared_count = cache.clear_cache()
+        cleared_audio = services.audio_cache.clear()
         
         console.print(f"\n✅ 缓存清空完成!", style="bold green")
         console.print(f"• 已删除 {cleared_count} 个缓存文件")
+        console.print(f"• 已删除 {cleared_audio} 个提取音频缓存")
         console.print("• 下次转录将重新调用ASR API", style="dim")
     
     else:
@@ -2,6 +2,8 @@
 
 """
 快速批量分析脚本 - 简化版
+
+用法: python quick_batch.py [日志路径]  传入已有的批量日志时只继续其中未完成的博主
 """
 
 import sys
@@ -9,7 +11,13 @@ import subprocess
 import time
 from pathlib import Path
 
+# 添加项目根目录到Python路径
+sys.path.insert(0, str(Path(__file__).parent))
+
 def main():
+    from src.ai_outreach.journal import BatchJournal
+    
+
     # 博主视频基础目录
     base_path = Path("/Users/liumingwei/个人文档同步/05-工作资料/02-P0博主视频")
     
@@ -26,6 +34,17 @@ def main():
     
     blogger_dirs.sort(key=lambda x: x.name)
     
+    # 每个博主的状态变化追加写入日志；超时或中断后传入日志路径即可续跑
+    if len(sys.argv) > 1:
+        journal = BatchJournal(Path(sys.argv[1]))
+        pending = set(journal.pending_jobs())
+        blogger_dirs = [d for d in blogger_dirs if str(d) in pending]
+    else:
+        journal = BatchJournal.create("quick_batch")
+        for blogger_dir in blogger_dirs:
+            journal.record(str(blogger_dir), 'queued')
+    print(f"🧾 运行日志: {journal.path}")
+    
     print(f"🎯 找到 {len(blogger_dirs)} 个博主目录")
     print("=" * 50)
     
@@ -36,6 +55,8 @@ def main():
         blogger_name = blogger_dir.name.split('-', 2)[-1] if '-' in blogger_dir.name else blogger_dir.name
         
         print(f"📊 [{i}/{len(blogger_dirs)}] 正在分析: {blogger_name}")
+        job = str(blogger_dir)
+        journal.record(job, 'extracting')
         
         try:
             # 调用主程序进行分析
@@ -46,17 +67,21 @@ def main():
             
             if result.returncode == 0:
                 print(f"✅ {blogger_name} - 分析成功")
+                journal.record(job, 'rendered', blogger_name=blogger_name)
                 success_count += 1
             else:
                 print(f"❌ {blogger_name} - 分析失败")
                 print(f"   错误输出: {result.stderr[:200]}...")
+                journal.record(job, 'failed', blogger_name=blogger_name, error=result.stderr[-500:])
                 failed_count += 1
                 
         except subprocess.TimeoutExpired:
             print(f"⏰ {blogger_name} - 分析超时")
+            journal.record(job, 'failed', blogger_name=blogger_name, error="分析超时")
             failed_count += 1
         except Exception as e:
             print(f"💥 {blogger_name} - 异常: {e}")
+            journal.record(job, 'failed', blogger_name=blogger_name, error=str(e))
             failed_count += 1
         
         # 每次分析后等待5秒，避免API限制
@@ -69,7 +94,12 @@ def main():
     print("🏁 批量分析完成!")
     print(f"✅ 成功: {success_count}")
     print(f"❌ 失败: {failed_count}")
-    print(f"📈 成功率: {success_count/(success_count+failed_count)*100:.1f}%")
+    if success_count + failed_count:
+        print(f"📈 成功率: {success_count/(success_count+failed_count)*100:.1f}%")
+    
+    # 日志折叠出的整体统计（续跑时包含之前运行的结果）
+    summary = journal.summary()
+    print(f"🧾 日志统计: 成功 {summary['success']}, 失败 {summary['failed']}, 未完成 {summary['pending']} / 共 {summary['total']}")
 
 if __name__ == "__main__":
     try:
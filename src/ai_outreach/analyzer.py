@@ -5,15 +5,97 @@ AI分析模块
 
 import json
 import re
-from typing import Dict, Any, List, Optional
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, Any, List, Optional, Tuple, Type
 from openai import OpenAI
+from pydantic import BaseModel
 from .utils.logger import logger
 from .utils.exceptions import AnalysisError, ConfigurationError, TemplateError
-from .utils.config import config
+from .utils.config import LLM_STAGES, config
+from .llm_router import LLMRouter, ProviderEndpoint
+from .schemas import STAGE_SCHEMAS, ContentAnalysis, describe_fields, field_kinds, placeholder_values, validate_output
+
+# 各类分析调用的输出上限（tokens），成本预估与实际调用共用
+CONTENT_MAX_TOKENS = 2000
+QUICK_SCAN_MAX_TOKENS = 800
+COMPREHENSIVE_MAX_TOKENS = 4000
+DIGEST_MAX_TOKENS = 500
+GROUP_DIGEST_MAX_TOKENS = 1000
+
+# 字段补充请求：Prompt模板与每个字段的输出上限（tokens）
+REPAIR_PROMPT = "repair_fields_v1"
+REPAIR_TOKENS_PER_FIELD = 300
+
+@dataclass
+class StageSettings:
+    """一个分析阶段的Prompt模板、模型与采样参数"""
+    prompt: str
+    max_tokens: int
+    temperature: float = 0.3
+    models: Dict[str, str] = field(default_factory=dict)  # 提供商 → 模型（未列出的提供商使用其默认模型）
+
+# 各阶段的内置默认值（可被 LLM_MODEL_* / LLM_TEMPERATURE_* / LLM_MAX_TOKENS_* 覆盖）
+STAGE_DEFAULTS = {
+    'content': StageSettings("analyze_blogger_content_v3", CONTENT_MAX_TOKENS),
+    'quick': StageSettings("quick_scan_v1", QUICK_SCAN_MAX_TOKENS),
+    'digest': StageSettings("video_digest_v1", DIGEST_MAX_TOKENS, temperature=0.2),
+    'comprehensive': StageSettings("analyze_blogger_comprehensive_v3", COMPREHENSIVE_MAX_TOKENS),
+    'map': StageSettings("map_video_group_v1", GROUP_DIGEST_MAX_TOKENS, temperature=0.2),
+    'reduce': StageSettings("reduce_digests_v1", GROUP_DIGEST_MAX_TOKENS, temperature=0.2),
+}
+
+def stage_settings(stage: str) -> StageSettings:
+    """合并配置后的阶段设置（成本预估与实际调用共用）"""
+    if stage not in LLM_STAGES:
+        raise ValueError(f"未知的分析阶段: {stage}")
+    default = STAGE_DEFAULTS[stage]
+    return StageSettings(
+        prompt=default.prompt,
+        max_tokens=config.LLM_STAGE_MAX_TOKENS.get(stage, default.max_tokens),
+        temperature=config.LLM_STAGE_TEMPERATURES.get(stage, default.temperature),
+        models=config.LLM_STAGE_MODELS.get(stage, {}),
+    )
+
+# 累计用量的字段：调用次数、输入/输出token、输入中命中/未命中提供商前缀缓存的token
+USAGE_KEYS = ('calls', 'prompt_tokens', 'completion_tokens', 'cache_hit_tokens', 'cache_miss_tokens')
+
+def cache_token_counts(usage: Any) -> Tuple[Optional[int], Optional[int]]:
+    """
+    响应用量中命中/未命中前缀缓存的输入token数
+
+    DeepSeek 返回 prompt_cache_hit_tokens / prompt_cache_miss_tokens，
+    OpenAI 返回 prompt_tokens_details.cached_tokens；都没有时返回 (None, None)
+    """
+    hit = getattr(usage, 'prompt_cache_hit_tokens', None)
+    miss = getattr(usage, 'prompt_cache_miss_tokens', None)
+    if isinstance(hit, int) and isinstance(miss, int):
+        return hit, miss
+    cached = getattr(getattr(usage, 'prompt_tokens_details', None), 'cached_tokens', None)
+    prompt_tokens = getattr(usage, 'prompt_tokens', None)
+    if isinstance(cached, int) and isinstance(prompt_tokens, int):
+        return cached, prompt_tokens - cached
+    return None, None
+
+def usage_delta(before: Dict[str, int], after: Dict[str, int]) -> Dict[str, int]:
+    """两次用量快照之间的增量"""
+    return {key: after.get(key, 0) - before.get(key, 0) for key in USAGE_KEYS}
+
+def describe_usage(usage: Dict[str, int]) -> str:
+    """用量的单行描述（含前缀缓存命中率）"""
+    text = (f"LLM调用 {usage.get('calls', 0)} 次，输入 {usage.get('prompt_tokens', 0)} tokens，"
+            f"输出 {usage.get('completion_tokens', 0)} tokens")
+    cached = usage.get('cache_hit_tokens', 0) + usage.get('cache_miss_tokens', 0)
+    if cached:
+        text += f"，缓存命中 {usage['cache_hit_tokens']} tokens（{usage['cache_hit_tokens'] / cached:.0%}）"
+    return text
 
 class AnalysisResult:
     """AI分析结果类"""
     def __init__(self, data: Dict[str, Any]):
+        # 原始分析数据（用于持久化与重建）
+        self.data = dict(data)
+        
         # 基础分析字段
         self.content_style = data.get('content_style', '')
         self.core_values = data.get('core_values', [])  # 核心价值观
@@ -42,39 +124,125 @@ class AnalysisResult:
         self.golden_sentences = self.blogger_golden_quotes or self.golden_sentences
         
         self.prompt_version = data.get('prompt_version', 'v3.0')
+        
+        # 快速扫描：轻量分析（采样转录），结论仅供初筛
+        self.quick_scan = data.get('quick_scan', False)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """导出为可JSON序列化的字典（可由构造函数还原）"""
+        return dict(self.data)
 
 class ContentAnalyzer:
     """内容分析器"""
     
-    def __init__(self):
-        # 初始化AI客户端
-        self.ai_client = self._init_ai_client()
+    def __init__(self, ai_client: Optional[OpenAI] = None, http_client: Optional[Any] = None):
+        """
+        Args:
+            ai_client: 已初始化的AI客户端（可选，用于进程内复用）
+            http_client: 共享的httpx.Client（可选，提供连接池与keep-alive）
+        """
+        # 累计token用量（批量运行时用于预算控制）
+        self._usage_lock = threading.Lock()
+        self.usage = {key: 0 for key in USAGE_KEYS}
+        
+        # 初始化AI客户端（配置多个提供商时按权重路由，慢请求对冲到其他提供商）
+        if ai_client is not None:
+            self.router = self._build_router([ProviderEndpoint(config.DEFAULT_AI_PROVIDER, ai_client, config.DEFAULT_MODEL)])
+        else:
+            self.router = self._init_router(http_client)
+        self.ai_client = self.router.primary.client
+        
+        # 已加载的Prompt模板（按修改时间失效，常驻服务中编辑模板后无需重启）
+        self._prompt_cache: Dict[str, Tuple[Any, str]] = {}
         
         # 确保Prompt目录存在
         config.ensure_directories()
     
-    def _init_ai_client(self) -> OpenAI:
+    def _build_router(self, endpoints: List[ProviderEndpoint]) -> LLMRouter:
+        return LLMRouter(
+            endpoints,
+            hedge_percentile=config.LLM_HEDGE_PERCENTILE,
+            hedge_min_seconds=config.LLM_HEDGE_MIN_SECONDS,
+            hedge_min_samples=config.LLM_HEDGE_MIN_SAMPLES,
+            failure_threshold=config.LLM_FAILURE_THRESHOLD,
+            cooldown=config.LLM_FAILURE_COOLDOWN,
+            on_response=self._record_usage,
+        )
+    
+    def _init_router(self, http_client: Optional[Any] = None) -> LLMRouter:
+        """按配置创建参与路由的提供商（默认提供商排在首位并使用 DEFAULT_MODEL）"""
+        names = [config.DEFAULT_AI_PROVIDER]
+        names += [name for name in config.LLM_PROVIDERS if name != config.DEFAULT_AI_PROVIDER]
+        
+        endpoints = []
+        for name in names:
+            model = config.DEFAULT_MODEL if name == config.DEFAULT_AI_PROVIDER else self._provider_model(name)
+            weight = config.LLM_PROVIDER_WEIGHTS.get(name, 1.0) if len(names) > 1 else 1.0
+            endpoints.append(ProviderEndpoint(name, self._init_ai_client(http_client, name), model, weight))
+        
+        if len(endpoints) > 1:
+            logger.info("LLM多提供商路由: " + ", ".join(f"{e.name}({e.model}, 权重{e.weight:g})" for e in endpoints))
+        return self._build_router(endpoints)
+    
+    @staticmethod
+    def _provider_model(provider: str) -> str:
+        if provider == "deepseek":
+            return config.DEEPSEEK_MODEL
+        if provider == "openai":
+            return config.OPENAI_MODEL
+        raise ConfigurationError(f"不支持的AI提供商: {provider}")
+    
+    def _init_ai_client(self, http_client: Optional[Any] = None, provider: Optional[str] = None) -> OpenAI:
         """初始化AI客户端"""
-        if config.DEFAULT_AI_PROVIDER == "deepseek":
+        provider = provider or config.DEFAULT_AI_PROVIDER
+        # 仅在提供共享连接池时传入，保持OpenAI SDK默认行为
+        client_kwargs = {'http_client': http_client} if http_client is not None else {}
+        
+        if provider == "deepseek":
             if not config.DEEPSEEK_API_KEY:
                 raise ConfigurationError("DeepSeek API密钥未配置")
             
             return OpenAI(
                 api_key=config.DEEPSEEK_API_KEY,
-                base_url=config.DEEPSEEK_BASE_URL
+                base_url=config.DEEPSEEK_BASE_URL,
+                **client_kwargs
             )
         
-        elif config.DEFAULT_AI_PROVIDER == "openai":
+        elif provider == "openai":
             if not config.OPENAI_API_KEY:
                 raise ConfigurationError("OpenAI API密钥未配置")
             
             return OpenAI(
                 api_key=config.OPENAI_API_KEY,
-                base_url=config.OPENAI_BASE_URL
+                base_url=config.OPENAI_BASE_URL,
+                **client_kwargs
             )
         
         else:
-            raise ConfigurationError(f"不支持的AI提供商: {config.DEFAULT_AI_PROVIDER}")
+            raise ConfigurationError(f"不支持的AI提供商: {provider}")
+    
+    def _record_usage(self, response: Any):
+        """累计一次调用的token用量与前缀缓存命中情况（响应不含用量信息时只计调用次数）"""
+        usage = getattr(response, 'usage', None)
+        hit, miss = cache_token_counts(usage)
+        with self._usage_lock:
+            self.usage['calls'] += 1
+            for key in ('prompt_tokens', 'completion_tokens'):
+                value = getattr(usage, key, None)
+                if isinstance(value, int):
+                    self.usage[key] += value
+            if hit is not None:
+                self.usage['cache_hit_tokens'] += hit
+                self.usage['cache_miss_tokens'] += miss
+    
+    def close(self):
+        """释放路由器的对冲线程池（客户端连接由共享连接池管理）"""
+        self.router.close()
+    
+    def usage_snapshot(self) -> Dict[str, int]:
+        """当前累计的token用量"""
+        with self._usage_lock:
+            return dict(self.usage)
     
     def load_prompt_template(self, template_name: str) -> str:
         """
@@ -92,8 +260,14 @@ class ContentAnalyzer:
             raise TemplateError(f"Prompt模板不存在: {template_path}")
         
         try:
+            mtime = template_path.stat().st_mtime_ns
+            cached = self._prompt_cache.get(template_name)
+            if cached and cached[0] == mtime:
+                return cached[1]
             with open(template_path, 'r', encoding='utf-8') as f:
-                return f.read().strip()
+                content = f.read().strip()
+            self._prompt_cache[template_name] = (mtime, content)
+            return content
         except Exception as e:
             raise TemplateError(f"读取Prompt模板失败: {e}")
     
@@ -111,121 +285,16 @@ class ContentAnalyzer:
         logger.info(f"开始博主综合分析: {blogger_name}")
         
         try:
-            # 加载博主综合分析专用prompt
-            prompt_template = self.load_prompt_template("analyze_blogger_comprehensive_v3")
+            # 加载博主综合分析专用prompt（综合分析阶段默认使用 DEFAULT_MODEL）
+            settings = stage_settings('comprehensive')
+            prompt_template = self.load_prompt_template(settings.prompt)
             prompt = prompt_template.format(content=content)
             
-            # 调用AI API
-            response = self.ai_client.chat.completions.create(
-                model=config.DEFAULT_MODEL,
-                messages=[
-                    {"role": "system", "content": "你是专业的博主内容战略分析师，擅长深度洞察和策略生成。"},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.3,
-                max_tokens=4000
-            )
-            
-            analysis_text = response.choices[0].message.content
-            logger.debug(f"博主综合分析AI响应长度: {len(analysis_text)}")
-            logger.debug(f"博主综合分析AI响应前200字符: {repr(analysis_text[:200])}")
-            
-            # 尝试解析JSON（复用现有逻辑）
-            try:
-                # 清理响应文本
-                clean_text = analysis_text.strip()
-                logger.debug(f"清理后的响应文本: {clean_text[:500]}...")
-                
-                # 查找JSON代码块
-                if "```json" in clean_text:
-                    json_start = clean_text.find("```json") + 7
-                    json_end = clean_text.find("```", json_start)
-                    if json_end == -1:
-                        json_end = len(clean_text)
-                    json_text = clean_text[json_start:json_end].strip()
-                elif "```" in clean_text and "{" in clean_text:
-                    # 处理没有json标识但有代码块的情况
-                    json_start = clean_text.find("```") + 3
-                    json_end = clean_text.find("```", json_start)
-                    if json_end == -1:
-                        json_end = len(clean_text)
-                    potential_json = clean_text[json_start:json_end].strip()
-                    # 找到JSON部分
-                    bracket_start = potential_json.find('{')
-                    bracket_end = potential_json.rfind('}') + 1
-                    if bracket_start != -1 and bracket_end != 0:
-                        json_text = potential_json[bracket_start:bracket_end]
-                    else:
-                        json_text = potential_json
-                else:
-                    # 提取JSON部分（可能包含其他文本）
-                    json_start = clean_text.find('{')
-                    json_end = clean_text.rfind('}') + 1
-                    
-                    if json_start == -1 or json_end == 0:
-                        raise ValueError("响应中未找到JSON格式数据")
-                    
-                    json_text = clean_text[json_start:json_end]
-                
-                # 进一步清理JSON文本
-                json_text = json_text.strip()
-                # 移除可能的多余换行和空格
-                json_text = re.sub(r'\n\s*', '\n', json_text)
-                
-                logger.debug(f"提取的JSON文本: {json_text[:300]}...")
-                
-                # 尝试解析JSON
-                try:
-                    analysis_data = json.loads(json_text)
-                except json.JSONDecodeError as json_error:
-                    # 如果JSON解析失败，尝试修复常见问题
-                    logger.warning(f"初次JSON解析失败: {json_error}，尝试修复")
-                    
-                    # 常见修复：移除多余的引号、逗号等
-                    fixed_json = json_text
-                    
-                    # 修复可能的问题：多余的换行符在字符串中
-                    fixed_json = re.sub(r'"\s*\n\s*"', '", "', fixed_json)
-                    
-                    # 修复可能的问题：数组末尾多余的逗号
-                    fixed_json = re.sub(r',(\s*[}\]])', r'\1', fixed_json)
-                    
-                    # 修复可能的问题：对象末尾多余的逗号
-                    fixed_json = re.sub(r',(\s*})', r'\1', fixed_json)
-                    
-                    try:
-                        analysis_data = json.loads(fixed_json)
-                        logger.info("JSON修复成功")
-                    except json.JSONDecodeError:
-                        logger.warning("JSON修复失败，使用默认结构")
-                        raise ValueError(f"无法解析JSON: {json_error}")
-                        
-            except (json.JSONDecodeError, ValueError) as e:
-                logger.warning(f"博主综合分析JSON解析失败: {e}")
-                # 使用默认结构
-                analysis_data = {
-                    "optimal_outreach_script": "脚本生成失败，请重试",
-                    "core_insight": "洞察生成失败，请重试", 
-                    "methodology_mapping": {
-                        "trust_hook": "分析失败",
-                        "empathy_anchor": "分析失败",
-                        "value_map": "分析失败"
-                    },
-                    "blogger_golden_quotes": ["金句提取失败"],
-                    "core_values": ["价值观分析失败"],
-                    "content_style": "风格分析失败",
-                    "tone": "语调分析失败",
-                    "target_audience": "受众分析失败",
-                    "main_topics": ["主题分析失败"],
-                    "pain_points": ["痛点分析失败"],
-                    "value_propositions": ["价值主张分析失败"],
-                    "blogger_characteristics": {
-                        "expertise": "专业领域分析失败",
-                        "style": "风格分析失败",
-                        "personality": "个性分析失败",
-                        "experience_level": "经验分析失败"
-                    }
-                }
+            # 调用AI API（按综合分析模式校验，缺失或格式不正确的字段单独补充请求）
+            analysis_data, _ = self._complete_structured('comprehensive', settings, [
+                {"role": "system", "content": "你是专业的博主内容战略分析师，擅长深度洞察和策略生成。请只返回规范的JSON格式结果。"},
+                {"role": "user", "content": prompt}
+            ], label="博主综合分析")
             
             # 标记为博主综合分析
             analysis_data['prompt_version'] = 'v3.0_comprehensive'
@@ -253,7 +322,8 @@ class ContentAnalyzer:
             logger.error(f"博主综合分析失败: {e}")
             raise AnalysisError(f"博主综合分析失败: {e}")
     
-    def analyze_content(self, transcript: str, title: str = "", author: str = "") -> AnalysisResult:
+    def analyze_content(self, transcript: str, title: str = "", author: str = "", quick: bool = False,
+                        stage: Optional[str] = None) -> AnalysisResult:
         """
         分析转录内容
         
@@ -261,6 +331,9 @@ class ContentAnalyzer:
             transcript: 转录文本
             title: 视频标题（可选）
             author: 作者名称（可选）
+            quick: 快速扫描（使用精简Prompt与更小的输出上限，只输出初筛所需字段）
+            stage: 分析阶段（可选，默认按 quick 选择 quick / content；
+                   digest 只提取博主综合分析所需字段，使用轻量模型）
             
         Returns:
             分析结果对象
@@ -271,8 +344,10 @@ class ContentAnalyzer:
         logger.info(f"开始分析内容，文本长度: {len(transcript)}字符")
         
         try:
-            # 加载V3.0洞察即脚本Prompt模板
-            prompt_template = self.load_prompt_template("analyze_blogger_content_v3")
+            # 加载阶段对应的Prompt模板（V3.0洞察即脚本 / 快速扫描 / 单视频摘要）
+            stage_name = stage or ('quick' if quick else 'content')
+            settings = stage_settings(stage_name)
+            prompt_template = self.load_prompt_template(settings.prompt)
             
             # 构建分析提示词
             analysis_prompt = prompt_template.format(
@@ -281,146 +356,22 @@ class ContentAnalyzer:
                 transcript=transcript
             )
             
-            # 调用AI分析
-            response = self.ai_client.chat.completions.create(
-                model=config.DEFAULT_MODEL,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "你是一个专业的内容分析师，擅长分析博主的内容特征和受众画像。请严格按照要求分析提供的内容，并只返回规范的JSON格式结果，不要添加任何其他解释性文字。确保JSON格式正确，所有字符串都用双引号包围，数组和对象格式标准。"
-                    },
-                    {
-                        "role": "user",
-                        "content": analysis_prompt
-                    }
-                ],
-                temperature=0.3,
-                max_tokens=2000
-            )
-            
-            # 解析响应
-            analysis_text = response.choices[0].message.content
-            logger.debug(f"AI分析原始响应长度: {len(analysis_text)}")
-            logger.debug(f"AI分析原始响应前200字符: {repr(analysis_text[:200])}")
-            logger.debug(f"AI分析原始响应后200字符: {repr(analysis_text[-200:])}")
-            
-            # 尝试解析JSON
-            try:
-                # 清理响应文本
-                clean_text = analysis_text.strip()
-                logger.debug(f"清理后的响应文本: {clean_text[:500]}...")
-                
-                # 查找JSON代码块
-                if "```json" in clean_text:
-                    json_start = clean_text.find("```json") + 7
-                    json_end = clean_text.find("```", json_start)
-                    if json_end == -1:
-                        json_end = len(clean_text)
-                    json_text = clean_text[json_start:json_end].strip()
-                elif "```" in clean_text and "{" in clean_text:
-                    # 处理没有json标识但有代码块的情况
-                    json_start = clean_text.find("```") + 3
-                    json_end = clean_text.find("```", json_start)
-                    if json_end == -1:
-                        json_end = len(clean_text)
-                    potential_json = clean_text[json_start:json_end].strip()
-                    # 找到JSON部分
-                    bracket_start = potential_json.find('{')
-                    bracket_end = potential_json.rfind('}') + 1
-                    if bracket_start != -1 and bracket_end != 0:
-                        json_text = potential_json[bracket_start:bracket_end]
-                    else:
-                        json_text = potential_json
-                else:
-                    # 提取JSON部分（可能包含其他文本）
-                    json_start = clean_text.find('{')
-                    json_end = clean_text.rfind('}') + 1
-                    
-                    if json_start == -1 or json_end == 0:
-                        raise ValueError("响应中未找到JSON格式数据")
-                    
-                    json_text = clean_text[json_start:json_end]
-                
-                # 进一步清理JSON文本
-                json_text = json_text.strip()
-                # 移除可能的多余换行和空格
-                json_text = re.sub(r'\n\s*', '\n', json_text)
-                
-                logger.debug(f"提取的JSON文本: {json_text[:300]}...")
-                
-                # 尝试解析JSON
-                try:
-                    analysis_data = json.loads(json_text)
-                except json.JSONDecodeError as json_error:
-                    # 如果JSON解析失败，尝试修复常见问题
-                    logger.warning(f"初次JSON解析失败: {json_error}，尝试修复")
-                    
-                    # 常见修复：移除多余的引号、逗号等
-                    fixed_json = json_text
-                    
-                    # 修复可能的问题：多余的换行符在字符串中
-                    fixed_json = re.sub(r'"\s*\n\s*"', '", "', fixed_json)
-                    
-                    # 修复可能的问题：数组末尾多余的逗号
-                    fixed_json = re.sub(r',(\s*[}\]])', r'\1', fixed_json)
-                    
-                    # 修复可能的问题：对象末尾多余的逗号
-                    fixed_json = re.sub(r',(\s*})', r'\1', fixed_json)
-                    
-                    try:
-                        analysis_data = json.loads(fixed_json)
-                        logger.info("JSON修复成功")
-                    except json.JSONDecodeError:
-                        logger.warning("JSON修复失败，尝试更激进的修复")
-                        # 更激进的修复：重新构建基本结构
-                        raise ValueError(f"无法解析JSON: {json_error}")
-                
-            except (json.JSONDecodeError, ValueError) as e:
-                logger.warning(f"解析AI响应JSON失败: {e}，原始响应长度: {len(analysis_text)}")
-                logger.warning(f"JSON解析错误详情: {str(e)}")
-                logger.warning(f"完整AI响应内容: {repr(analysis_text)}")  # 添加完整响应内容
-                
-                # 尝试从原始响应中提取关键信息
-                fallback_data = self._extract_fallback_data(analysis_text)
-                if fallback_data:
-                    logger.info("使用回退数据提取成功")
-                    analysis_data = fallback_data
-                else:
-                    logger.warning("回退数据提取失败，使用默认结构")
-                # 创建默认结构（包含新字段）
-                analysis_data = {
-                    "content_style": "未能分析",
-                    "core_values": ["价值观分析失败"],
-                    "golden_sentences": ["金句提取失败"],
-                    "main_topics": ["内容分析失败"],
-                    "pain_points": ["无法识别"],
-                    "value_propositions": ["需要重新分析"],
-                    "tone": "未知",
-                    "target_audience": "未知",
-                    "blogger_characteristics": {
-                        "style": "未知",
-                        "expertise": "未知",
-                        "personality": "未知",
-                        "experience_level": "未知"
-                    },
-                    "core_insights": ["洞察分析失败"],  # 兼容
-                    "core_insight": "一体化洞察分析失败",
-                    "unique_approach": "切入角度分析失败",
-                    "personalized_strategy": {
-                        "opening_line": "开场策略分析失败",
-                        "resonance_building": "共鸣建立策略失败",
-                        "value_demonstration": "价值展示策略失败",
-                        "follow_up_approach": "后续沟通策略失败"
-                    },
-                    "methodology_mapping": {
-                        "trust_hook": "信任之钩分析失败",
-                        "empathy_anchor": "共情之锚分析失败",
-                        "value_map": "价值图谱分析失败"
-                    },
-                    "optimal_outreach_script": "最优破冰脚本生成失败",
-                    "raw_response": analysis_text
+            # 调用AI分析（按阶段模式校验，缺失或格式不正确的字段单独补充请求）
+            analysis_data, _ = self._complete_structured(stage_name, settings, [
+                {
+                    "role": "system",
+                    "content": "你是一个专业的内容分析师，擅长分析博主的内容特征和受众画像。请严格按照要求分析提供的内容，并只返回规范的JSON格式结果，不要添加任何其他解释性文字。确保JSON格式正确，所有字符串都用双引号包围，数组和对象格式标准。"
+                },
+                {
+                    "role": "user",
+                    "content": analysis_prompt
                 }
+            ], label="内容分析")
             
+            if quick:
+                analysis_data['quick_scan'] = True
+            if quick or stage:
+                analysis_data.setdefault('prompt_version', settings.prompt)
             result = AnalysisResult(analysis_data)
             logger.info("内容分析完成")
             
@@ -433,104 +384,147 @@ class ContentAnalyzer:
             logger.error(error_msg)
             raise AnalysisError(error_msg)
     
-    def _extract_fallback_data(self, response_text: str) -> Optional[Dict[str, Any]]:
+    def summarize_for_synthesis(self, content: str, stage: str = 'map') -> Dict[str, Any]:
+        """
+        分层汇总的一次调用：把一组视频转录（map）或若干摘要（reduce）压缩为结构化摘要
+
+        Args:
+            content: 视频转录文本或摘要JSON文本
+            stage: map（视频分组摘要）或 reduce（摘要合并）
+
+        Returns:
+            摘要字典（字段见 prompts/map_video_group_v1.txt）
+        """
+        settings = stage_settings(stage)
+        prompt = self.load_prompt_template(settings.prompt).format(content=content)
+
+        try:
+            data, failed = self._complete_structured(stage, settings, [
+                {"role": "system", "content": "你是专业的博主内容分析师，擅长提炼要点。请只返回规范的JSON格式结果。"},
+                {"role": "user", "content": prompt}
+            ], label=f"摘要生成（{stage}）", fill_failed=False)
+        except Exception as e:
+            raise AnalysisError(f"摘要生成失败（{stage}）: {e}")
+        if len(failed) == len(STAGE_SCHEMAS[stage].model_fields):
+            # 整体失败时交给分层汇总的兜底逻辑（跳过该组 / 本地合并）
+            raise AnalysisError(f"摘要生成失败（{stage}）: 响应中没有可用字段")
+        return data
+
+    def _complete_structured(self, stage: str, settings: StageSettings, messages: List[Dict[str, str]],
+                             label: str = "分析", fill_failed: bool = True) -> Tuple[Dict[str, Any], List[str]]:
+        """
+        调用模型并按阶段的输出模式校验结果
+
+        响应不是合法JSON时先从文本中逐字段抽取；缺失或格式不正确的字段在原对话后追加一条简短的
+        补充请求（只要求返回这些字段，原Prompt前缀可命中提供商缓存），最多 LLM_REPAIR_ATTEMPTS 次
+
+        Args:
+            stage: 分析阶段（决定输出模式）
+            settings: 阶段设置
+            messages: 对话消息
+            label: 日志中的调用名称
+            fill_failed: 仍未取得的字段是否填入占位值（并记录 failed_fields 与原始响应）
+
+        Returns:
+            (结果数据, 仍未取得的字段名列表)
+        """
+        schema = STAGE_SCHEMAS[stage]
+        options: Dict[str, Any] = {'temperature': settings.temperature, 'models': settings.models}
+        if config.LLM_JSON_MODE:
+            options['response_format'] = {'type': 'json_object'}
+
+        response = self.router.complete(messages=messages, max_tokens=settings.max_tokens, **options)
+        analysis_text = response.choices[0].message.content or ""
+        logger.debug(f"{label}AI响应长度: {len(analysis_text)}")
+        logger.debug(f"{label}AI响应前200字符: {repr(analysis_text[:200])}")
+
+        try:
+            raw_data = self._parse_json_object(analysis_text)
+        except (json.JSONDecodeError, ValueError) as e:
+            logger.warning(f"{label}JSON解析失败: {e}，尝试从响应文本中逐字段提取")
+            raw_data = self._extract_fallback_data(analysis_text, schema)
+        data, failed = validate_output(schema, raw_data)
+
+        for attempt in range(1, int(config.LLM_REPAIR_ATTEMPTS) + 1):
+            if not failed:
+                break
+            logger.info(f"{label}缺少或格式不正确的字段: {', '.join(failed)}，补充请求（第{attempt}次）")
+            try:
+                repair_prompt = self.load_prompt_template(REPAIR_PROMPT).format(fields=describe_fields(schema, failed))
+                repair = self.router.complete(
+                    messages=messages + [
+                        {"role": "assistant", "content": analysis_text},
+                        {"role": "user", "content": repair_prompt}
+                    ],
+                    max_tokens=min(settings.max_tokens, REPAIR_TOKENS_PER_FIELD * len(failed)),
+                    **options
+                )
+                repaired = self._parse_json_object(repair.choices[0].message.content or "")
+            except Exception as e:
+                logger.warning(f"{label}补充请求失败: {e}")
+                break
+            patch, failed = validate_output(schema, {**data, **{name: repaired[name] for name in failed if name in repaired}})
+            data.update(patch)
+
+        if failed and fill_failed:
+            logger.warning(f"{label}以下字段未能取得，使用占位值: {', '.join(failed)}")
+            data.update(placeholder_values(schema, failed))
+            data['failed_fields'] = failed
+            data['raw_response'] = analysis_text
+        return data, failed
+
+    @staticmethod
+    def _parse_json_object(text: str) -> Dict[str, Any]:
+        """从模型响应中提取JSON对象（兼容代码块包裹与末尾多余逗号）"""
+        start, end = text.find('{'), text.rfind('}') + 1
+        if start == -1 or end == 0:
+            raise ValueError("响应中未找到JSON格式数据")
+        json_text = text[start:end]
+        try:
+            data = json.loads(json_text)
+        except json.JSONDecodeError:
+            # 常见修复：数组元素间缺少逗号（换行分隔）、末尾多余的逗号
+            fixed_json = re.sub(r'"\s*\n\s*"', '", "', json_text)
+            data = json.loads(re.sub(r',(\s*[}\]])', r'\1', fixed_json))
+        if not isinstance(data, dict):
+            raise ValueError("响应JSON不是对象")
+        return data
+
+    def _extract_fallback_data(self, response_text: str, schema: Type[BaseModel] = ContentAnalysis) -> Dict[str, Any]:
         """
         从响应文本中提取回退数据
-        当JSON解析失败时，尝试从原始文本中提取关键信息
+        当JSON解析失败时（如输出被截断），按输出模式逐字段从原始文本中提取能识别的内容
         
         Args:
             response_text: AI响应的原始文本
+            schema: 输出模式
             
         Returns:
-            提取到的数据字典，如果提取失败则返回None
+            提取到的字段（只包含识别成功的字段，其余字段由补充请求获取）
         """
-        try:
-            fallback_data = {
-                "content_style": "未能完整分析",
-                "core_values": [],
-                "golden_sentences": [],
-                "main_topics": [],
-                "pain_points": [],
-                "value_propositions": [],
-                "tone": "未知",
-                "target_audience": "未知",
-                "blogger_characteristics": {
-                    "expertise": "未知",
-                    "style": "未知", 
-                    "personality": "未知",
-                    "experience_level": "未知"
-                },
-                "core_insights": [],  # 兼容
-                "core_insight": "未能分析",
-                "unique_approach": "未能分析",
-                "personalized_strategy": {
-                    "opening_line": "未能分析",
-                    "resonance_building": "未能分析",
-                    "value_demonstration": "未能分析",
-                    "follow_up_approach": "未能分析"
-                },
-                "methodology_mapping": {
-                    "trust_hook": "未能分析",
-                    "empathy_anchor": "未能分析",
-                    "value_map": "未能分析"
-                },
-                "optimal_outreach_script": "未能分析"
-            }
-            
-            # 尝试提取具体字段的内容
-            patterns = {
-                "content_style": r'"content_style":\s*"([^"]+)"',
-                "tone": r'"tone":\s*"([^"]+)"',
-                "target_audience": r'"target_audience":\s*"([^"]+)"',
-                "unique_approach": r'"unique_approach":\s*"([^"]+)"'
-            }
-            
-            for field, pattern in patterns.items():
-                match = re.search(pattern, response_text)
+        extracted: Dict[str, Any] = {}
+        for name, kind in field_kinds(schema).items():
+            key = re.escape(name)
+            if kind == 'text':
+                match = re.search(rf'"{key}":\s*"([^"]+)"', response_text)
                 if match:
-                    fallback_data[field] = match.group(1)
-            
-            # 尝试提取数组字段
-            array_patterns = {
-                "core_values": r'"core_values":\s*\[([^\]]+)\]',
-                "golden_sentences": r'"golden_sentences":\s*\[([^\]]+)\]',
-                "main_topics": r'"main_topics":\s*\[([^\]]+)\]',
-                "pain_points": r'"pain_points":\s*\[([^\]]+)\]',
-                "value_propositions": r'"value_propositions":\s*\[([^\]]+)\]',
-                "core_insights": r'"core_insights":\s*\[([^\]]+)\]'
-            }
-            
-            for field, pattern in array_patterns.items():
-                match = re.search(pattern, response_text)
-                if match:
-                    # 简单的数组元素提取
-                    array_content = match.group(1)
-                    # 提取引号内的内容
-                    items = re.findall(r'"([^"]+)"', array_content)
-                    if items:
-                        fallback_data[field] = items
-            
-            # 检查是否提取到了有意义的数据
-            meaningful_fields = 0
-            for field in ["content_style", "tone", "target_audience", "unique_approach"]:
-                if fallback_data[field] != "未知" and fallback_data[field] != "未能完整分析" and fallback_data[field] != "未能分析":
-                    meaningful_fields += 1
-            
-            for field in ["core_values", "golden_sentences", "main_topics", "pain_points", "value_propositions", "core_insights"]:
-                if fallback_data[field]:
-                    meaningful_fields += 1
-            
-            # 如果提取到了至少3个有意义的字段，则认为回退提取成功
-            if meaningful_fields >= 3:
-                logger.info(f"回退提取成功，提取到{meaningful_fields}个有效字段")
-                return fallback_data
+                    extracted[name] = match.group(1)
+            elif kind == 'list':
+                match = re.search(rf'"{key}":\s*\[([^\]]+)\]', response_text)
+                items = re.findall(r'"([^"]+)"', match.group(1)) if match else []
+                if items:
+                    extracted[name] = items
             else:
-                logger.warning(f"回退提取数据不足，仅提取到{meaningful_fields}个有效字段")
-                return None
-                
-        except Exception as e:
-            logger.warning(f"回退数据提取失败: {e}")
-            return None
+                match = re.search(rf'"{key}":\s*\{{([^}}]+)\}}', response_text)
+                pairs = re.findall(r'"(\w+)":\s*"([^"]+)"', match.group(1)) if match else []
+                if pairs:
+                    extracted[name] = dict(pairs)
+        
+        if extracted:
+            logger.info(f"回退提取到{len(extracted)}个字段: {', '.join(extracted)}")
+        else:
+            logger.warning("回退提取未识别到任何字段")
+        return extracted
     
     def _sanitize_outreach_script(self, data: Dict[str, Any], blogger_name: str = "") -> str:
         """
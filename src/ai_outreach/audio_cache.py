@@ -0,0 +1,215 @@
+"""
+音频产物缓存模块
+缓存从源视频提取的标准化音频（16kHz单声道），按源文件指纹索引，
+总大小超过上限时按最近使用时间淘汰，避免重复解码大视频
+"""
+
+import hashlib
+import os
+import shutil
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from .utils.logger import logger
+from .utils.config import config
+from .utils.shared_index import load_index, merge_and_save
+
+
+class AudioCache:
+    """提取音频的磁盘缓存（LRU，按总大小限制）"""
+
+    def __init__(self, cache_dir: Optional[Path] = None, max_bytes: Optional[int] = None):
+        """
+        Args:
+            cache_dir: 缓存目录（默认 OUTPUT_DIR/cache/audio）
+            max_bytes: 缓存总大小上限（默认读取 AUDIO_CACHE_MAX_MB，0 表示关闭缓存）
+        """
+        self.cache_dir = cache_dir or (config.OUTPUT_DIR / "cache" / "audio")
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = config.AUDIO_CACHE_MAX_MB * 1024 * 1024 if max_bytes is None else max_bytes
+
+        self._lock = threading.RLock()
+        # 索引文件由多个worker进程共享，保存时只合并本进程的改动
+        self.index_file = self.cache_dir / "index.json"
+        self.index = self._load_index()
+        self._changed = set()
+        self._removed = set()
+        self._reset = False
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def _load_index(self) -> Dict[str, Any]:
+        """加载缓存索引"""
+        return load_index(self.index_file)
+
+    def _save_index(self):
+        """保存缓存索引（进程间文件锁内与磁盘索引合并后原子替换）"""
+        try:
+            with self._lock:
+                self.index = merge_and_save(self.index_file, self.index, self._changed,
+                                            self._removed, reset=self._reset)
+                self._changed.clear()
+                self._removed.clear()
+                self._reset = False
+        except Exception as e:
+            logger.error(f"保存音频缓存索引失败: {e}")
+
+    def _get_key(self, source_file: Path) -> str:
+        """源文件指纹（与转录缓存一致使用绝对路径+文件大小）加上音频参数"""
+        stat = source_file.stat()
+        content = (f"{source_file.resolve()}_{stat.st_size}_"
+                   f"{config.AUDIO_SAMPLE_RATE}_{config.AUDIO_CHANNELS}_{config.AUDIO_OUTPUT_FORMAT}")
+        return hashlib.md5(content.encode()).hexdigest()
+
+    def _cache_file(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.{config.AUDIO_OUTPUT_FORMAT}"
+
+    @staticmethod
+    def _link_or_copy(src: Path, dest: Path):
+        """硬链接到目标位置（同一文件系统时不复制数据），失败时复制"""
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        if dest.exists():
+            dest.unlink()
+        try:
+            os.link(src, dest)
+        except OSError:
+            shutil.copy2(src, dest)
+
+    def get(self, source_file: Path, dest: Path) -> Optional[Dict[str, Any]]:
+        """
+        查找源文件对应的缓存音频，命中时链接到 dest（任务工作区内），淘汰不会影响进行中的任务
+
+        Args:
+            source_file: 源视频文件
+            dest: 音频的目标路径
+
+        Returns:
+            缓存条目信息（含 duration），未命中返回None
+        """
+        if not self.enabled:
+            return None
+
+        try:
+            key = self._get_key(source_file)
+        except OSError:
+            return None
+
+        with self._lock:
+            entry = self.index.get(key)
+            cache_file = self._cache_file(key)
+            if not entry or not cache_file.exists():
+                if entry:
+                    self._remove(key)
+                return None
+
+            try:
+                self._link_or_copy(cache_file, dest)
+            except OSError as e:
+                logger.warning(f"读取音频缓存失败: {e}")
+                return None
+
+            entry['last_used'] = time.time()
+            self._changed.add(key)
+            self._save_index()
+
+        logger.info(f"使用缓存音频，跳过解码: {source_file.name}")
+        return dict(entry)
+
+    def put(self, source_file: Path, audio_file: Path, duration: float = 0.0):
+        """
+        将提取的音频加入缓存，必要时淘汰最久未使用的条目
+
+        Args:
+            source_file: 源视频文件
+            audio_file: 提取的音频文件
+            duration: 音频时长（秒）
+        """
+        if not self.enabled:
+            return
+
+        try:
+            key = self._get_key(source_file)
+            size = audio_file.stat().st_size
+        except OSError as e:
+            logger.warning(f"写入音频缓存失败: {e}")
+            return
+
+        if size > self.max_bytes:
+            logger.debug(f"音频超过缓存上限，不缓存: {audio_file.name}")
+            return
+
+        with self._lock:
+            try:
+                self._link_or_copy(audio_file, self._cache_file(key))
+            except OSError as e:
+                logger.warning(f"写入音频缓存失败: {e}")
+                return
+
+            self.index[key] = {
+                'source_file': str(source_file),
+                'size': size,
+                'duration': duration,
+                'created_at': time.time(),
+                'last_used': time.time(),
+            }
+            self._changed.add(key)
+            self._removed.discard(key)
+            # 先合并其他进程写入的条目，再按全部条目的总大小淘汰
+            self._save_index()
+            self._evict()
+            if self._removed:
+                self._save_index()
+
+        logger.debug(f"音频已缓存: {source_file.name} ({size / 1024 / 1024:.1f}MB)")
+
+    def _remove(self, key: str):
+        """移除缓存条目（调用方持有锁）"""
+        self.index.pop(key, None)
+        self._changed.discard(key)
+        self._removed.add(key)
+        cache_file = self._cache_file(key)
+        if cache_file.exists():
+            try:
+                cache_file.unlink()
+            except OSError as e:
+                logger.warning(f"删除音频缓存失败: {cache_file}, 错误: {e}")
+
+    def _evict(self):
+        """按最近使用时间淘汰，直到总大小不超过上限（调用方持有锁）"""
+        total = sum(entry.get('size', 0) for entry in self.index.values())
+        if total <= self.max_bytes:
+            return
+
+        for key, entry in sorted(self.index.items(), key=lambda item: item[1].get('last_used', 0)):
+            if total <= self.max_bytes:
+                break
+            total -= entry.get('size', 0)
+            self._remove(key)
+            logger.debug(f"淘汰音频缓存: {entry.get('source_file')}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """缓存统计信息"""
+        with self._lock:
+            total = sum(entry.get('size', 0) for entry in self.index.values())
+            return {
+                'cache_count': len(self.index),
+                'total_size_mb': round(total / 1024 / 1024, 2),
+                'max_size_mb': round(self.max_bytes / 1024 / 1024, 2),
+                'cache_dir': str(self.cache_dir),
+            }
+
+    def clear(self) -> int:
+        """清空缓存，返回清理的条目数量"""
+        with self._lock:
+            # 先合并其他进程写入的条目，一并删除其音频文件
+            self._save_index()
+            keys = list(self.index)
+            for key in keys:
+                self._remove(key)
+            self._reset = True
+            self._save_index()
+        return len(keys)
@@ -5,14 +5,32 @@
 
 import re
 from pathlib import Path
-from typing import List, Dict, Any, Optional, Tuple
+from typing import Callable, List, Dict, Any, Optional, Tuple
 from dataclasses import dataclass
 
 from .utils.logger import logger
 from .utils.exceptions import AnalysisError, FileProcessingError
-from .file_handler import FileHandler
-from .transcriber import TencentASRTranscriber
-from .analyzer import ContentAnalyzer
+from .services import ServiceContainer, get_services
+from .map_reduce import MapReduceSummarizer, render_digests, use_map_reduce
+
+# 博主文件夹中参与分析的媒体文件扩展名（含 ingest-channel 下载的纯音频）
+BLOGGER_MEDIA_EXTENSIONS = ['.mp4', '.avi', '.mkv', '.mov', '.webm', '.m4a', '.mp3']
+
+# 进度回调：progress(state, **fields)，state 为 extracting / transcribing / analyzing / analyzed / failed，
+# 视频级事件带 video 字段（批量日志据此记录状态变化）
+ProgressCallback = Callable[..., None]
+
+
+def _no_progress(state: str, **fields):
+    pass
+
+
+def list_blogger_media(folder_path: Path) -> List[Path]:
+    """列出博主文件夹中参与分析的媒体文件"""
+    media_files = []
+    for ext in BLOGGER_MEDIA_EXTENSIONS:
+        media_files.extend(folder_path.glob(f"*{ext}"))
+    return media_files
 
 
 @dataclass
@@ -44,15 +62,45 @@ class VideoAnalysis:
     duration: float
     transcript_text: str
     analysis_result: Any  # ContentAnalyzer的分析结果
+    sampled: bool = False  # 快速扫描：只转录了采样片段
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """导出为可JSON序列化的字典（批量日志中用于断点续跑）"""
+        return {
+            'filename': self.filename,
+            'title': self.title,
+            'duration': self.duration,
+            'transcript_text': self.transcript_text,
+            'analysis': self.analysis_result.to_dict(),
+            'sampled': self.sampled,
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "VideoAnalysis":
+        """由 to_dict 的结果还原"""
+        from .analyzer import AnalysisResult
+        return cls(
+            filename=data['filename'],
+            title=data.get('title', ''),
+            duration=data.get('duration', 0.0),
+            transcript_text=data.get('transcript_text', ''),
+            analysis_result=AnalysisResult(data.get('analysis') or {}),
+            sampled=data.get('sampled', False),
+        )
 
 
 class BloggerAnalyzer:
     """博主综合分析器"""
     
-    def __init__(self):
-        self.file_handler = FileHandler()
-        self.transcriber = TencentASRTranscriber()
-        self.content_analyzer = ContentAnalyzer()
+    def __init__(self, services: Optional[ServiceContainer] = None):
+        """
+        Args:
+            services: 服务容器（可选，默认使用进程级共享容器）
+        """
+        self.services = services or get_services()
+        self.file_handler = self.services.file_handler
+        self.transcriber = self.services.transcriber
+        self.content_analyzer = self.services.analyzer
     
     def parse_blogger_info_file(self, info_file_path: Path) -> BloggerInfo:
         """
@@ -179,36 +227,64 @@ class BloggerAnalyzer:
         
         return strengths, risks
     
-    def analyze_videos(self, video_files: List[Path]) -> List[VideoAnalysis]:
+    def analyze_videos(self, video_files: List[Path], quick_scan: bool = False,
+                       progress: Optional[ProgressCallback] = None,
+                       completed: Optional[Dict[str, VideoAnalysis]] = None) -> List[VideoAnalysis]:
         """
         分析多个视频文件
         
         Args:
             video_files: 视频文件路径列表
+            quick_scan: 快速扫描（只转录采样片段并进行轻量分析）
+            progress: 进度回调（可选）
+            completed: 已完成的视频分析（按文件名，断点续跑时跳过这些视频）
             
         Returns:
             视频分析结果列表
         """
-        video_analyses = []
-        
-        for video_file in video_files:
-            logger.info(f"分析视频: {video_file.name}")
+        progress = progress or _no_progress
+        completed = completed or {}
+        video_analyses = [completed[f.name] for f in video_files if f.name in completed]
+        pending = [f for f in video_files if f.name not in completed]
+        if video_analyses:
+            logger.info(f"复用已完成的视频分析: {len(video_analyses)} 个，待分析: {len(pending)} 个")
+        
+        progress('extracting')
+        transcribing = False
+        
+        # 音频提取在进程池中并行进行，并领先于转录与分析（每个视频使用独立的工作区）
+        for video_file, video_info, error in self.file_handler.process_files(pending, quick_scan=quick_scan):
+            if error:
+                logger.error(f"分析视频失败: {video_file.name}, 错误: {error}")
+                progress('failed', video=video_file.name, error=str(error))
+                continue
+            
+            if not transcribing:
+                progress('transcribing')
+                transcribing = True
             
+            logger.info(f"分析视频: {video_file.name}")
+            workspace = video_info.workspace
             try:
-                # 处理视频文件
-                video_info = self.file_handler.process_file(str(video_file))
-                
-                # 转录音频（传递源文件以启用缓存）
-                if video_info.duration <= 60:
-                    transcript_result = self.transcriber.transcribe_short_audio(video_info.audio_path, video_file)
+                # 转录音频（有内嵌或同名字幕时直接使用字幕；传递源文件以启用缓存）
+                progress('transcribing', video=video_file.name)
+                if video_info.subtitles:
+                    from .transcriber import TranscriptResult
+                    transcript_result = TranscriptResult.from_subtitles(video_info.subtitles, video_info.subtitle_cues)
+                elif video_info.cached_transcript:
+                    from .transcriber import TranscriptResult
+                    transcript_result = TranscriptResult(video_info.cached_transcript, 1.0)
                 else:
-                    transcript_result = self.transcriber.transcribe_file(video_info.audio_path, video_file)
+                    transcript_result = self.transcriber.transcribe_video(video_info, video_file, workspace=workspace)
                 
-                # 分析内容
+                # 提取单视频摘要（综合分析只使用话题、风格与语调，使用精简Prompt与轻量模型）
+                progress('analyzing', video=video_file.name)
                 analysis_result = self.content_analyzer.analyze_content(
                     transcript_result.text,
                     title=video_info.title,
-                    author=video_info.author
+                    author=video_info.author,
+                    quick=quick_scan,
+                    stage='digest'
                 )
                 
                 # 创建视频分析结果
@@ -217,25 +293,35 @@ class BloggerAnalyzer:
                     title=video_info.title,
                     duration=video_info.duration,
                     transcript_text=transcript_result.text,
-                    analysis_result=analysis_result
+                    analysis_result=analysis_result,
+                    sampled=transcript_result.sampled
                 )
                 
                 video_analyses.append(video_analysis)
+                progress('analyzed', video=video_file.name, result=video_analysis.to_dict())
                 logger.info(f"视频分析完成: {video_file.name}")
                 
             except Exception as e:
                 logger.error(f"分析视频失败: {video_file.name}, 错误: {e}")
+                progress('failed', video=video_file.name, error=str(e))
                 continue
+            finally:
+                workspace.cleanup()
         
+        # 结果按提取完成顺序产生，恢复为输入顺序以保持报告稳定
+        order = {video_file.name: i for i, video_file in enumerate(video_files)}
+        video_analyses.sort(key=lambda v: order.get(v.filename, len(order)))
         return video_analyses
     
-    def generate_comprehensive_analysis(self, blogger_info: BloggerInfo, video_analyses: List[VideoAnalysis]) -> Dict[str, Any]:
+    def generate_comprehensive_analysis(self, blogger_info: BloggerInfo, video_analyses: List[VideoAnalysis],
+                                        quick_scan: bool = False) -> Dict[str, Any]:
         """
         生成博主综合分析
         
         Args:
             blogger_info: 博主基础信息
             video_analyses: 视频分析结果列表
+            quick_scan: 快速扫描（在报告中标注为采样分析）
             
         Returns:
             综合分析结果
@@ -257,8 +343,8 @@ class BloggerAnalyzer:
                 'tone': video.analysis_result.tone
             })
         
-        # 构建综合分析的输入文本
-        combined_text = f"""
+        # 构建综合分析的输入文本（转录较长时先分层汇总为结构化摘要，避免单次超长调用）
+        header = f"""
 博主基础信息：
 - 姓名：{blogger_info.name}
 - 平台：{blogger_info.platform}
@@ -266,10 +352,26 @@ class BloggerAnalyzer:
 - 粉丝数：{blogger_info.follower_count}
 - 个人简介：{blogger_info.slogan}
 - 核心价值：{blogger_info.one_liner}
+        """.strip()
+        
+        transcripts_text = chr(10).join(all_transcripts)
+        map_reduce = None
+        if use_map_reduce(len(transcripts_text)):
+            summarizer = MapReduceSummarizer(self.content_analyzer)
+            digests, map_reduce = summarizer.summarize([(v.title, v.transcript_text) for v in video_analyses])
+            combined_text = f"""
+{header}
+
+视频内容摘要（{len(video_analyses)}个视频分组汇总而成，金句为博主原话）：
+{render_digests(digests)}
+            """.strip()
+        else:
+            combined_text = f"""
+{header}
 
 视频内容分析：
-{chr(10).join(all_transcripts)}
-        """.strip()
+{transcripts_text}
+            """.strip()
         
         # 使用AI进行综合分析（使用博主综合分析专用方法）
         try:
@@ -284,19 +386,27 @@ class BloggerAnalyzer:
                 'comprehensive_analysis': comprehensive_analysis,
                 'total_videos': len(video_analyses),
                 'total_duration': sum(v.duration for v in video_analyses),
-                'all_transcripts_length': len(combined_text)
+                'all_transcripts_length': len(transcripts_text),
+                'map_reduce': map_reduce,
+                'quick_scan': quick_scan,
+                'sampled_videos': sum(1 for v in video_analyses if v.sampled)
             }
             
         except Exception as e:
             logger.error(f"综合分析失败: {e}")
             raise AnalysisError(f"博主综合分析失败: {e}")
     
-    def analyze_blogger_folder(self, folder_path: Path) -> Dict[str, Any]:
+    def analyze_blogger_folder(self, folder_path: Path, quick_scan: bool = False,
+                               progress: Optional[ProgressCallback] = None,
+                               completed: Optional[Dict[str, VideoAnalysis]] = None) -> Dict[str, Any]:
         """
         分析博主文件夹（包括基础信息和视频文件）
         
         Args:
             folder_path: 博主文件夹路径
+            quick_scan: 快速扫描（只转录采样片段并进行轻量分析）
+            progress: 进度回调（可选）
+            completed: 已完成的视频分析（按文件名，断点续跑时复用）
             
         Returns:
             综合分析结果
@@ -314,9 +424,7 @@ class BloggerAnalyzer:
         blogger_info = self.parse_blogger_info_file(info_files[0])
         
         # 查找视频文件
-        video_files = []
-        for ext in ['.mp4', '.avi', '.mkv', '.mov']:
-            video_files.extend(folder_path.glob(f"*{ext}"))
+        video_files = list_blogger_media(folder_path)
         
         if not video_files:
             raise FileProcessingError(f"未找到视频文件: {folder_path}")
@@ -324,10 +432,11 @@ class BloggerAnalyzer:
         logger.info(f"找到 {len(video_files)} 个视频文件")
         
         # 分析视频
-        video_analyses = self.analyze_videos(video_files)
+        video_analyses = self.analyze_videos(video_files, quick_scan=quick_scan, progress=progress, completed=completed)
         
         if not video_analyses:
             raise AnalysisError("所有视频分析均失败")
         
         # 生成综合分析
-        return self.generate_comprehensive_analysis(blogger_info, video_analyses)
\ No newline at end of file
+        (progress or _no_progress)('analyzing')
+        return self.generate_comprehensive_analysis(blogger_info, video_analyses, quick_scan=quick_scan)
\ No newline at end of file
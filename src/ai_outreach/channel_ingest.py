@@ -0,0 +1,295 @@
+"""
+频道/播放列表导入模块
+平铺获取创作者频道的视频列表，并行补全元数据，按播放量与新近度排序，
+只下载前N个视频的音频流，并生成 BloggerAnalyzer 可直接分析的博主文件夹
+"""
+
+import math
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from .utils.logger import logger
+from .utils.exceptions import NetworkError
+from .fetcher import VideoFetcher
+
+
+@dataclass
+class ChannelEntry:
+    """频道中的单个视频条目"""
+    url: str
+    video_id: str
+    title: str
+    view_count: Optional[int] = None
+    timestamp: Optional[float] = None
+    duration: Optional[float] = None
+    score: float = 0.0
+
+    @property
+    def needs_metadata(self) -> bool:
+        """平铺结果缺少排序所需字段时需要补全元数据"""
+        return self.view_count is None or self.timestamp is None
+
+
+@dataclass
+class IngestResult:
+    """频道导入结果"""
+    blogger_dir: Path
+    info_file: Path
+    channel_name: str
+    ranked_entries: List[ChannelEntry] = field(default_factory=list)
+    downloaded_files: List[Path] = field(default_factory=list)
+    failed_entries: List[Tuple[ChannelEntry, str]] = field(default_factory=list)
+
+
+def _entry_timestamp(info: Dict[str, Any]) -> Optional[float]:
+    """从info中解析发布时间（优先timestamp，其次upload_date）"""
+    if info.get('timestamp'):
+        return float(info['timestamp'])
+    upload_date = info.get('upload_date')
+    if upload_date:
+        try:
+            return datetime.strptime(str(upload_date), '%Y%m%d').timestamp()
+        except ValueError:
+            return None
+    return None
+
+
+def _safe_name(name: str) -> str:
+    """转换为可用作目录名的博主名称（去除路径分隔符与'-'，避免破坏目录命名约定）"""
+    name = re.sub(r'[\\/:*?"<>|\s-]+', '_', name).strip('_')
+    return name or "Unknown"
+
+
+class ChannelIngestor:
+    """频道导入器"""
+
+    def __init__(self, fetcher: Optional[VideoFetcher] = None, metadata_workers: int = 8,
+                 max_concurrent_downloads: int = 3, view_weight: float = 0.6,
+                 recency_weight: float = 0.4, recency_half_life_days: float = 90.0):
+        """
+        Args:
+            fetcher: 视频抓取器（可注入自定义提取器用于测试）
+            metadata_workers: 并行补全元数据的线程数
+            max_concurrent_downloads: 同时下载的最大数量（限流器）
+            view_weight: 播放量在排序分数中的权重
+            recency_weight: 新近度在排序分数中的权重
+            recency_half_life_days: 新近度半衰期（天）
+        """
+        self.fetcher = fetcher or VideoFetcher(audio_only=True)
+        self.metadata_workers = max(1, metadata_workers)
+        self.max_concurrent_downloads = max(1, max_concurrent_downloads)
+        self.view_weight = view_weight
+        self.recency_weight = recency_weight
+        self.recency_half_life_days = recency_half_life_days
+        self._download_limiter = threading.BoundedSemaphore(self.max_concurrent_downloads)
+
+    def list_entries(self, channel_url: str, scan_limit: Optional[int] = None) -> Tuple[Dict[str, Any], List[ChannelEntry]]:
+        """
+        平铺获取频道条目
+
+        Args:
+            channel_url: 频道或播放列表URL
+            scan_limit: 最多扫描的条目数量
+
+        Returns:
+            (频道info, 条目列表)
+        """
+        playlist = self.fetcher.fetch_playlist_entries(channel_url, limit=scan_limit)
+
+        entries = []
+        for raw in playlist['entries']:
+            url = raw.get('webpage_url') or raw.get('url')
+            if not url:
+                continue
+            entries.append(ChannelEntry(
+                url=url,
+                video_id=str(raw.get('id') or url),
+                title=raw.get('title') or 'Unknown',
+                view_count=raw.get('view_count'),
+                timestamp=_entry_timestamp(raw),
+                duration=raw.get('duration')
+            ))
+
+        logger.info(f"频道共获取 {len(entries)} 个条目")
+        return playlist, entries
+
+    def enrich_metadata(self, entries: List[ChannelEntry]) -> List[ChannelEntry]:
+        """
+        并行补全缺少播放量/发布时间的条目（复用抓取器的元数据缓存）
+
+        Args:
+            entries: 条目列表
+
+        Returns:
+            补全后的条目列表（补全失败的条目保留原值）
+        """
+        missing = [entry for entry in entries if entry.needs_metadata]
+        if not missing:
+            return entries
+
+        def enrich(entry: ChannelEntry):
+            try:
+                info = self.fetcher.get_info(entry.url)
+            except NetworkError as e:
+                logger.warning(f"补全元数据失败: {entry.url}, 错误: {e}")
+                return
+            if entry.view_count is None:
+                entry.view_count = info.get('view_count')
+            if entry.timestamp is None:
+                entry.timestamp = _entry_timestamp(info)
+            entry.duration = entry.duration or info.get('duration')
+            entry.title = info.get('title') or entry.title
+
+        logger.info(f"并行补全 {len(missing)} 个条目的元数据（{self.metadata_workers} 线程）")
+        with ThreadPoolExecutor(max_workers=self.metadata_workers) as executor:
+            list(executor.map(enrich, missing))
+
+        return entries
+
+    def rank_entries(self, entries: List[ChannelEntry], now: Optional[float] = None) -> List[ChannelEntry]:
+        """
+        按播放量与新近度综合打分排序
+
+        播放量取对数后按本频道最大值归一化；新近度按半衰期指数衰减。
+
+        Args:
+            entries: 条目列表
+            now: 当前时间戳（可选，便于测试）
+
+        Returns:
+            按分数从高到低排序的条目列表
+        """
+        now = now or time.time()
+        max_views = max((math.log10(1 + (e.view_count or 0)) for e in entries), default=0.0) or 1.0
+
+        for entry in entries:
+            views_score = math.log10(1 + (entry.view_count or 0)) / max_views
+            if entry.timestamp:
+                age_days = max(0.0, (now - entry.timestamp) / 86400)
+                recency_score = 0.5 ** (age_days / self.recency_half_life_days)
+            else:
+                recency_score = 0.0
+            entry.score = self.view_weight * views_score + self.recency_weight * recency_score
+
+        return sorted(entries, key=lambda e: e.score, reverse=True)
+
+    def prepare_blogger_dir(self, base_dir: Path, channel: Dict[str, Any], channel_url: str) -> Tuple[Path, Path]:
+        """
+        创建（或复用）博主文件夹与 `人物 - 博主名.md` 信息文件
+
+        目录命名遵循 "数字-博主-博主名称" 约定，以便从路径中识别博主。
+
+        Returns:
+            (博主目录, 信息文件路径)
+        """
+        name = _safe_name(channel.get('uploader') or channel.get('channel') or channel.get('title') or 'Unknown')
+        base_dir.mkdir(parents=True, exist_ok=True)
+
+        existing = [d for d in base_dir.iterdir() if d.is_dir() and re.match(rf'^\d+-博主-{re.escape(name)}$', d.name)]
+        if existing:
+            blogger_dir = existing[0]
+        else:
+            numbers = [int(m.group(1)) for d in base_dir.iterdir()
+                       if d.is_dir() and (m := re.match(r'^(\d+)-博主-', d.name))]
+            blogger_dir = base_dir / f"{max(numbers, default=0) + 1:02d}-博主-{name}"
+            blogger_dir.mkdir()
+
+        info_file = blogger_dir / f"人物 - {name}.md"
+        if not info_file.exists():
+            follower_count = channel.get('channel_follower_count')
+            description = (channel.get('description') or '').strip().splitlines()
+            info_file.write_text(f"""---
+platform: "{channel.get('extractor_key') or channel.get('extractor') or ''}"
+niche: ""
+follower_count: "{follower_count if follower_count is not None else ''}"
+status: "待评估"
+profile_url: "{channel.get('webpage_url') or channel_url}"
+---
+
+# 人物 - {name}
+
+| 字段 | 内容 |
+| --- | --- |
+| **slogan** | {description[0] if description else ''} |
+| **粉丝数** | {follower_count if follower_count is not None else ''} |
+
+*由 ingest-channel 自动导入于 {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}*
+""", encoding='utf-8')
+            logger.info(f"已创建博主信息文件: {info_file}")
+
+        return blogger_dir, info_file
+
+    def download_entries(self, entries: List[ChannelEntry], blogger_dir: Path) -> Tuple[List[Path], List[Tuple[ChannelEntry, str]]]:
+        """
+        并发下载条目音频（同时下载数量受限流器约束，已下载的条目直接复用）
+
+        Returns:
+            (下载的文件列表, 失败的条目及原因)
+        """
+        downloaded: List[Path] = []
+        failed: List[Tuple[ChannelEntry, str]] = []
+
+        def download(entry: ChannelEntry) -> Tuple[ChannelEntry, Optional[Path], Optional[str]]:
+            marker = f"[{entry.video_id}]"
+            for existing in blogger_dir.iterdir():
+                if marker in existing.name and not existing.name.endswith('.part'):
+                    logger.info(f"⏭️ 已存在，跳过下载: {existing.name}")
+                    return entry, existing, None
+
+            with self._download_limiter:
+                try:
+                    return entry, self.fetcher.download_audio(entry.url, blogger_dir), None
+                except Exception as e:
+                    return entry, None, str(e)
+
+        with ThreadPoolExecutor(max_workers=self.metadata_workers) as executor:
+            for entry, path, error in executor.map(download, entries):
+                if path:
+                    downloaded.append(path)
+                else:
+                    logger.error(f"下载失败: {entry.title}, 错误: {error}")
+                    failed.append((entry, error))
+
+        return downloaded, failed
+
+    def ingest(self, channel_url: str, base_dir: Path, top_n: int = 5,
+               scan_limit: Optional[int] = 30, now: Optional[float] = None) -> IngestResult:
+        """
+        导入频道：平铺获取 -> 并行补全元数据 -> 排序 -> 下载前N个音频到博主文件夹
+
+        Args:
+            channel_url: 频道或播放列表URL
+            base_dir: 博主根目录
+            top_n: 下载的视频数量
+            scan_limit: 参与排序的最大条目数量
+            now: 排序使用的当前时间戳（可选，便于测试）
+
+        Returns:
+            导入结果
+        """
+        channel, entries = self.list_entries(channel_url, scan_limit=scan_limit)
+        if not entries:
+            raise NetworkError(f"频道中未找到任何视频: {channel_url}")
+
+        ranked = self.rank_entries(self.enrich_metadata(entries), now=now)
+        selected = ranked[:top_n]
+
+        blogger_dir, info_file = self.prepare_blogger_dir(base_dir, channel, channel_url)
+        logger.info(f"下载前 {len(selected)} 个视频音频到: {blogger_dir}")
+
+        downloaded, failed = self.download_entries(selected, blogger_dir)
+
+        return IngestResult(
+            blogger_dir=blogger_dir,
+            info_file=info_file,
+            channel_name=blogger_dir.name.split('-博主-', 1)[-1],
+            ranked_entries=ranked,
+            downloaded_files=downloaded,
+            failed_entries=failed
+        )
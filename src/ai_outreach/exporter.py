@@ -0,0 +1,319 @@
+"""
+数据导出模块
+把报告旁保存的结构化分析结果（*.analysis.json）、博主档案与转录文本元数据逐行流式导出为
+JSONL / CSV / Parquet，供表格或BI工具使用；按文件修改时间记录水位线，增量导出只处理上次之后的新文件
+"""
+
+import csv
+import json
+import re
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from .analyzer import AnalysisResult
+from .generator import ANALYSIS_SUFFIX, report_path_for
+from .utils.config import config
+from .utils.exceptions import ConfigurationError
+from .utils.logger import logger
+
+EXPORT_FORMATS = ('jsonl', 'csv', 'parquet')
+
+# 水位线文件（位于导出目录，记录上次导出覆盖到的文件修改时间）
+WATERMARK_FILE = "_watermark.json"
+
+# Parquet每个行组缓冲的行数（内存占用与行数无关）
+PARQUET_BATCH_ROWS = 5000
+
+# 各表的列与类型：str / float / int / bool / json（数组与对象在JSONL中保持原样，CSV与Parquet中写为JSON文本）
+ANALYSIS_FIELDS = [
+    ('content_style', 'str'), ('tone', 'str'), ('target_audience', 'str'), ('core_insight', 'str'),
+    ('optimal_outreach_script', 'str'), ('main_topics', 'json'), ('core_values', 'json'),
+    ('golden_sentences', 'json'), ('pain_points', 'json'), ('value_propositions', 'json'),
+    ('blogger_characteristics', 'json'), ('methodology_mapping', 'json'),
+    ('prompt_version', 'str'), ('quick_scan', 'bool'), ('failed_fields', 'json'),
+]
+TABLE_COLUMNS: Dict[str, List[Tuple[str, str]]] = {
+    'analyses': [
+        ('source', 'str'), ('kind', 'str'), ('report', 'str'), ('analyzed_at', 'str'),
+        ('author', 'str'), ('title', 'str'), ('duration', 'float'), ('input_type', 'str'),
+    ] + ANALYSIS_FIELDS,
+    'bloggers': [
+        ('source', 'str'), ('name', 'str'), ('platform', 'str'), ('niche', 'str'), ('follower_count', 'str'),
+        ('status', 'str'), ('profile_url', 'str'), ('slogan', 'str'), ('one_liner', 'str'),
+        ('strengths', 'json'), ('risks', 'json'), ('analyzed_at', 'str'), ('total_videos', 'int'),
+        ('total_duration', 'float'), ('soft_indicator_summary', 'str'),
+    ],
+    'transcripts': [
+        ('source', 'str'), ('author', 'str'), ('title', 'str'), ('duration', 'float'),
+        ('input_type', 'str'), ('transcribed_at', 'str'), ('chars', 'int'),
+    ],
+}
+
+# 转录文本文件头部的基本信息行，如“- **时长**: 12.3秒”
+_HEADER_LINE = re.compile(r'^- \*\*(.+?)\*\*: (.*)$')
+
+
+@dataclass
+class ExportSummary:
+    """导出结果统计"""
+    rows: Dict[str, int] = field(default_factory=dict)
+    files: List[str] = field(default_factory=list)
+    since: float = 0.0  # 本次导出的水位线下界（0 表示全量）
+    watermark: float = 0.0
+    elapsed: float = 0.0
+
+
+class _JsonlWriter:
+    def __init__(self, path: Path, columns: List[Tuple[str, str]]):
+        self._file = open(path, 'w', encoding='utf-8')
+
+    def write(self, row: Dict[str, Any]):
+        self._file.write(json.dumps(row, ensure_ascii=False, default=str) + "\n")
+
+    def close(self):
+        self._file.close()
+
+
+class _CsvWriter:
+    def __init__(self, path: Path, columns: List[Tuple[str, str]]):
+        # utf-8-sig 便于Excel直接识别中文
+        self._file = open(path, 'w', encoding='utf-8-sig', newline='')
+        self._writer = csv.DictWriter(self._file, fieldnames=[name for name, _ in columns])
+        self._writer.writeheader()
+
+    def write(self, row: Dict[str, Any]):
+        self._writer.writerow(_flatten(row))
+
+    def close(self):
+        self._file.close()
+
+
+class _ParquetWriter:
+    def __init__(self, path: Path, columns: List[Tuple[str, str]]):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ConfigurationError("导出Parquet需要安装 pyarrow: pip install pyarrow")
+        types = {'str': pa.string(), 'json': pa.string(), 'float': pa.float64(),
+                 'int': pa.int64(), 'bool': pa.bool_()}
+        self._pa = pa
+        self._schema = pa.schema([(name, types[kind]) for name, kind in columns])
+        self._writer = pq.ParquetWriter(str(path), self._schema)
+        self._buffer: List[Dict[str, Any]] = []
+
+    def write(self, row: Dict[str, Any]):
+        self._buffer.append(_flatten(row))
+        if len(self._buffer) >= PARQUET_BATCH_ROWS:
+            self._flush()
+
+    def _flush(self):
+        if self._buffer:
+            self._writer.write_table(self._pa.Table.from_pylist(self._buffer, schema=self._schema))
+            self._buffer = []
+
+    def close(self):
+        self._flush()
+        self._writer.close()
+
+
+_WRITERS = {'jsonl': _JsonlWriter, 'csv': _CsvWriter, 'parquet': _ParquetWriter}
+
+
+def _flatten(row: Dict[str, Any]) -> Dict[str, Any]:
+    """数组与对象写为JSON文本（CSV / Parquet 使用扁平列）"""
+    return {key: json.dumps(value, ensure_ascii=False) if isinstance(value, (list, dict)) else value
+            for key, value in row.items()}
+
+
+def _coerce(value: Any, kind: str) -> Any:
+    """按列类型规范化取值（缺失或无法转换时为空）"""
+    if value is None or value == '':
+        return None
+    try:
+        if kind == 'float':
+            return float(value)
+        if kind == 'int':
+            return int(value)
+        if kind == 'bool':
+            return bool(value)
+        if kind == 'str':
+            return str(value)
+    except (TypeError, ValueError):
+        return None
+    return value
+
+
+def _row(table: str, values: Dict[str, Any]) -> Dict[str, Any]:
+    return {name: _coerce(values.get(name), kind) for name, kind in TABLE_COLUMNS[table]}
+
+
+def iter_files(roots: List[Path], pattern: str, since: float, until: float) -> Iterator[Path]:
+    """按修改时间顺序列出 since < mtime <= until 的文件（多个根目录重叠时去重）"""
+    seen = set()
+    found = []
+    for root in roots:
+        if not root.is_dir():
+            continue
+        for path in root.rglob(pattern):
+            resolved = path.resolve()
+            if resolved in seen:
+                continue
+            seen.add(resolved)
+            mtime = path.stat().st_mtime
+            if since < mtime <= until:
+                found.append((mtime, resolved))
+    for _, path in sorted(found):
+        yield path
+
+
+def analysis_rows(path: Path) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """一个结构化分析结果文件 → (表名, 行)"""
+    with open(path, 'r', encoding='utf-8') as f:
+        record = json.load(f)
+
+    kind = record.get('kind')
+    report = str(report_path_for(path))
+    if kind == 'video':
+        info = record.get('video_info') or {}
+        analysis = AnalysisResult(record.get('analysis') or {})
+        yield 'analyses', _row('analyses', {
+            **{name: getattr(analysis, name, analysis.data.get(name)) for name, _ in ANALYSIS_FIELDS},
+            'source': str(path), 'kind': kind, 'report': report, 'analyzed_at': record.get('timestamp'),
+            'author': info.get('author'), 'title': info.get('title'),
+            'duration': info.get('duration'), 'input_type': info.get('input_type'),
+        })
+    elif kind == 'blogger':
+        blogger = record.get('blogger_info') or {}
+        analysis = AnalysisResult(record.get('comprehensive_analysis') or {})
+        analyzed_at = record.get('current_time')
+        yield 'analyses', _row('analyses', {
+            **{name: getattr(analysis, name, analysis.data.get(name)) for name, _ in ANALYSIS_FIELDS},
+            'source': str(path), 'kind': kind, 'report': report, 'analyzed_at': analyzed_at,
+            'author': blogger.get('name'), 'duration': record.get('total_duration'),
+            'quick_scan': record.get('quick_scan'),
+        })
+        yield 'bloggers', _row('bloggers', {
+            **blogger, 'source': str(path), 'analyzed_at': analyzed_at,
+            'total_videos': record.get('total_videos'), 'total_duration': record.get('total_duration'),
+            'soft_indicator_summary': analysis.data.get('soft_indicator_summary'),
+        })
+    else:
+        logger.warning(f"跳过未知类型的分析结果: {path}")
+
+
+def transcript_row(path: Path) -> Dict[str, Any]:
+    """转录文本文件 → 元数据行（只读取文件头部的基本信息）"""
+    fields: Dict[str, str] = {}
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if line.startswith('## 转录内容'):
+                break
+            match = _HEADER_LINE.match(line.strip())
+            if match:
+                fields[match.group(1)] = match.group(2)
+    return _row('transcripts', {
+        'source': str(path),
+        'author': fields.get('博主'),
+        'title': fields.get('标题'),
+        'duration': fields.get('时长', '').rstrip('秒'),
+        'input_type': fields.get('来源'),
+        'transcribed_at': fields.get('转录时间'),
+        'chars': fields.get('字符数'),
+    })
+
+
+def load_watermark(output_dir: Path) -> float:
+    """上次导出的水位线（未导出过时为 0）"""
+    path = output_dir / WATERMARK_FILE
+    if not path.exists():
+        return 0.0
+    try:
+        return float(json.loads(path.read_text(encoding='utf-8')).get('watermark', 0.0))
+    except (ValueError, OSError) as e:
+        logger.warning(f"读取导出水位线失败，按全量导出: {e}")
+        return 0.0
+
+
+def _save_watermark(output_dir: Path, summary: ExportSummary):
+    path = output_dir / WATERMARK_FILE
+    tmp = path.with_suffix('.tmp')
+    tmp.write_text(json.dumps({
+        'watermark': summary.watermark,
+        'exported_at': datetime.now().isoformat(),
+        'rows': summary.rows,
+        'files': summary.files,
+    }, ensure_ascii=False, indent=2), encoding='utf-8')
+    tmp.replace(path)
+
+
+def export_all(output_dir: Path, formats: List[str], full: bool = False,
+               analysis_roots: Optional[List[Path]] = None,
+               transcripts_dir: Optional[Path] = None) -> ExportSummary:
+    """
+    导出分析结果、博主档案与转录元数据
+
+    每次运行为每张有新数据的表写入一个分片文件（<导出目录>/<表名>/<表名>-<时间>.<格式>），
+    逐行写出，内存占用与数据量无关；成功后更新水位线
+
+    Args:
+        output_dir: 导出目录
+        formats: 导出格式（jsonl / csv / parquet）
+        full: 忽略水位线全量导出
+        analysis_roots: 查找 *.analysis.json 的目录（默认输出目录）
+        transcripts_dir: 转录文本目录（默认 TRANSCRIPTS_DIR）
+
+    Returns:
+        导出结果统计
+    """
+    unknown = [fmt for fmt in formats if fmt not in EXPORT_FORMATS]
+    if unknown or not formats:
+        raise ConfigurationError(f"不支持的导出格式: {', '.join(unknown) or '(空)'}（可选: {', '.join(EXPORT_FORMATS)}）")
+
+    started = time.time()
+    output_dir.mkdir(parents=True, exist_ok=True)
+    summary = ExportSummary(since=0.0 if full else load_watermark(output_dir), watermark=started)
+    summary.rows = {table: 0 for table in TABLE_COLUMNS}
+    run_id = datetime.fromtimestamp(started).strftime('%Y%m%d_%H%M%S')
+
+    writers: Dict[str, list] = {}
+
+    def emit(table: str, row: Dict[str, Any]):
+        # 表有数据时才创建分片文件
+        if table not in writers:
+            (output_dir / table).mkdir(exist_ok=True)
+            writers[table] = []
+            for fmt in formats:
+                path = output_dir / table / f"{table}-{run_id}.{fmt}"
+                writers[table].append(_WRITERS[fmt](path, TABLE_COLUMNS[table]))
+                summary.files.append(str(path))
+        for writer in writers[table]:
+            writer.write(row)
+        summary.rows[table] += 1
+
+    roots = analysis_roots or [config.OUTPUT_DIR]
+    try:
+        for path in iter_files(roots, f"*{ANALYSIS_SUFFIX}", summary.since, started):
+            try:
+                for table, row in analysis_rows(path):
+                    emit(table, row)
+            except (OSError, ValueError) as e:
+                logger.warning(f"跳过无法读取的分析结果: {path.name}, 错误: {e}")
+        for path in iter_files([transcripts_dir or config.TRANSCRIPTS_DIR], "*.txt", summary.since, started):
+            try:
+                emit('transcripts', transcript_row(path))
+            except (OSError, UnicodeDecodeError) as e:
+                logger.warning(f"跳过无法读取的转录文本: {path.name}, 错误: {e}")
+    finally:
+        for table_writers in writers.values():
+            for writer in table_writers:
+                writer.close()
+
+    _save_watermark(output_dir, summary)
+    summary.elapsed = time.time() - started
+    logger.info(f"导出完成: " + ", ".join(f"{table} {count}行" for table, count in summary.rows.items())
+                + f", 耗时 {summary.elapsed:.1f}秒")
+    return summary
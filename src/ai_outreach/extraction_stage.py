@@ -0,0 +1,192 @@
+"""
+音频提取阶段模块
+在独立的进程池中并行运行ffmpeg（提取、压缩、采样片段），按CPU核数确定并发度；
+已完成但尚未被消费的结果数量有上限，提取可以领先于ASR运行但不会占满磁盘
+"""
+
+import multiprocessing
+import queue
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from functools import partial
+from pathlib import Path
+from typing import Any, Iterable, Iterator, List, Optional, Tuple
+
+from .utils.logger import logger
+from .utils.config import config
+from .utils.exceptions import AudioProcessingError
+from .utils.audio_utils import compress_audio, extract_audio_from_video, extract_audio_windows
+
+
+@dataclass
+class ExtractionJob:
+    """单个ffmpeg任务"""
+    source: Path
+    output: Path
+    kind: str = 'extract'  # extract：从视频提取音频；compress：压缩音频以满足ASR大小限制；sample：提取采样窗口
+    duration: float = 0.0  # 处理的媒体时长（秒），用于计算解码速度
+    windows: List[Tuple[float, float]] = field(default_factory=list)  # sample 任务的 (起始秒, 时长秒)
+
+
+@dataclass
+class ExtractionResult:
+    """ffmpeg任务结果"""
+    job: ExtractionJob
+    elapsed: float = 0.0
+    error: Optional[Exception] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    @property
+    def speed(self) -> Optional[float]:
+        """解码速度（×实时），时长未知时返回None"""
+        if self.job.duration > 0 and self.elapsed > 0:
+            return self.job.duration / self.elapsed
+        return None
+
+
+def _run_job(job: ExtractionJob, threads: Optional[int]) -> float:
+    """在工作进程中执行ffmpeg任务，返回耗时（秒）"""
+    start = time.monotonic()
+    if job.kind == 'compress':
+        compress_audio(job.source, job.output, threads=threads)
+    elif job.kind == 'sample':
+        extract_audio_windows(job.source, job.windows, job.output, threads=threads)
+    else:
+        extract_audio_from_video(job.source, job.output, threads=threads)
+    return time.monotonic() - start
+
+
+class _Submitted:
+    """生产者结束标记，携带已提交的任务数"""
+
+    def __init__(self, count: int):
+        self.count = count
+
+
+class ExtractionStage:
+    """ffmpeg进程池（线程安全，可在多个批次间复用）"""
+
+    def __init__(self, workers: Optional[int] = None, threads: Optional[int] = None,
+                 queue_size: Optional[int] = None):
+        """
+        Args:
+            workers: 并行的ffmpeg进程数（默认读取 EXTRACT_WORKERS，即CPU核数）
+            threads: 每个ffmpeg任务的线程数（默认读取 FFMPEG_THREADS）
+            queue_size: 已完成但未被消费的结果上限（默认读取 EXTRACT_QUEUE_SIZE）
+        """
+        self.workers = max(1, workers or config.EXTRACT_WORKERS)
+        self.threads = config.FFMPEG_THREADS if threads is None else threads
+        self.queue_size = max(0, config.EXTRACT_QUEUE_SIZE if queue_size is None else queue_size)
+
+        self._lock = threading.Lock()
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """按需创建进程池（使用spawn，避免在持有线程的进程中fork）"""
+        with self._lock:
+            if self._executor is None:
+                logger.debug(f"启动音频提取进程池: {self.workers} 个进程, 每个ffmpeg {self.threads} 线程")
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context('spawn')
+                )
+            return self._executor
+
+    def _to_result(self, job: ExtractionJob, future: Future) -> ExtractionResult:
+        """将完成的future转换为结果并记录解码速度"""
+        error = future.exception()
+        if error is not None:
+            if not isinstance(error, AudioProcessingError):
+                error = AudioProcessingError(f"ffmpeg任务失败: {job.source.name}, 错误: {error}")
+            logger.error(f"ffmpeg任务失败: {job.source.name}, 错误: {error}")
+            return ExtractionResult(job, error=error)
+
+        result = ExtractionResult(job, elapsed=future.result())
+        speed = f", 速度: {result.speed:.1f}×实时" if result.speed else ""
+        logger.info(f"ffmpeg任务完成({job.kind}): {job.source.name}, 耗时: {result.elapsed:.1f}秒{speed}")
+        return result
+
+    def run_one(self, job: ExtractionJob) -> ExtractionResult:
+        """
+        执行单个任务并等待完成（与批量任务共享进程池，整体并发不超过进程数）
+
+        Raises:
+            AudioProcessingError: ffmpeg执行失败
+        """
+        future = self._get_executor().submit(_run_job, job, self.threads)
+        future.exception()  # 等待完成
+        result = self._to_result(job, future)
+        if result.error:
+            raise result.error
+        return result
+
+    def run(self, jobs: Iterable[ExtractionJob]) -> Iterator[ExtractionResult]:
+        """
+        并行执行一批任务，按完成顺序返回结果
+
+        调用后立即在后台开始提交；已提交但未被消费的任务不超过 workers + queue_size 个，
+        消费方处理较慢时（如等待ASR）提取会自动暂停，失败的任务以 error 字段返回而不抛出
+
+        Args:
+            jobs: 任务序列（可以是惰性生成器）
+
+        Returns:
+            结果迭代器
+        """
+        executor = self._get_executor()
+        results: "queue.Queue[Any]" = queue.Queue()
+        slots = threading.Semaphore(self.workers + self.queue_size)
+        stop = threading.Event()
+
+        def collect(job: ExtractionJob, future: Future):
+            results.put(self._to_result(job, future))
+
+        def produce():
+            submitted = 0
+            try:
+                for job in jobs:
+                    # 背压：等待消费方取走结果后再提交新任务
+                    while not slots.acquire(timeout=0.2):
+                        if stop.is_set():
+                            return
+                    if stop.is_set():
+                        return
+                    job.output.parent.mkdir(parents=True, exist_ok=True)
+                    executor.submit(_run_job, job, self.threads).add_done_callback(partial(collect, job))
+                    submitted += 1
+            except Exception as e:
+                logger.error(f"提交ffmpeg任务失败: {e}")
+            finally:
+                results.put(_Submitted(submitted))
+
+        threading.Thread(target=produce, name="extraction-producer", daemon=True).start()
+        return self._drain(results, slots, stop)
+
+    @staticmethod
+    def _drain(results: "queue.Queue[Any]", slots: threading.Semaphore,
+               stop: threading.Event) -> Iterator[ExtractionResult]:
+        """消费结果队列，直到所有已提交任务都返回"""
+        total = None
+        received = 0
+        try:
+            while total is None or received < total:
+                item = results.get()
+                if isinstance(item, _Submitted):
+                    total = item.count
+                    continue
+                received += 1
+                slots.release()
+                yield item
+        finally:
+            stop.set()
+
+    def close(self):
+        """关闭进程池"""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True, cancel_futures=True)
+                self._executor = None
@@ -3,13 +3,97 @@
 使用yt-dlp从各大平台下载视频并提取音频
 """
 
+import copy
+import hashlib
+import io
+import json
+import threading
+import time
 import yt_dlp
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Tuple
 from .utils.logger import logger
 from .utils.exceptions import NetworkError, AudioProcessingError
 from .utils.config import config
-from .utils.audio_utils import extract_audio_from_video
+from .utils.audio_utils import concat_audio, extract_audio_from_video
+from .utils.workspace import JobWorkspace, get_workspace_manager
+from .subtitles import Cue, SUPPORTED_FORMATS, parse_subtitles, cues_to_text
+from .sampling import SampleWindow, format_timestamp
+
+
+def parse_timecode(value: str) -> float:
+    """
+    解析时间点：秒数（90）、MM:SS（1:30）或 H:MM:SS（1:02:03）
+    
+    Raises:
+        ValueError: 格式不合法
+    """
+    parts = value.strip().split(':')
+    if not parts[0] or len(parts) > 3:
+        raise ValueError(f"无法解析的时间: {value}")
+    seconds = 0.0
+    for part in parts:
+        seconds = seconds * 60 + float(part)
+    if seconds < 0:
+        raise ValueError(f"无法解析的时间: {value}")
+    return seconds
+
+
+def parse_sections(spec: Optional[str] = None, max_minutes: Optional[float] = None) -> List[Tuple[float, float]]:
+    """
+    解析要下载的时间区间
+    
+    Args:
+        spec: 逗号分隔的区间，如 "0-5:00,12:00-15:30"（结束时间省略表示到结尾）
+        max_minutes: 只下载开头的分钟数（与 spec 同时提供时以 spec 为准）
+        
+    Returns:
+        按起始时间排序并合并重叠后的 (起始秒, 结束秒) 列表，结束秒为 inf 表示到结尾；
+        空列表表示下载完整视频
+        
+    Raises:
+        ValueError: 区间格式不合法
+    """
+    ranges = []
+    if spec:
+        for item in spec.split(','):
+            if not item.strip():
+                continue
+            start, sep, end = item.partition('-')
+            if not sep:
+                raise ValueError(f"区间缺少 '-': {item}")
+            start_s = parse_timecode(start)
+            end_s = parse_timecode(end) if end.strip() else float('inf')
+            if end_s <= start_s:
+                raise ValueError(f"区间结束时间必须晚于开始时间: {item}")
+            ranges.append((start_s, end_s))
+    elif max_minutes:
+        if max_minutes < 0:
+            raise ValueError(f"分钟数必须为正数: {max_minutes}")
+        ranges.append((0.0, max_minutes * 60))
+    
+    merged: List[Tuple[float, float]] = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def clip_sections(sections: List[Tuple[float, float]], duration: float) -> List[Tuple[float, float]]:
+    """
+    将区间裁剪到视频时长内（时长未知时保持不变）
+    
+    Returns:
+        裁剪后的区间；覆盖整个视频时返回空列表（直接完整下载）
+    """
+    if not sections or duration <= 0:
+        return list(sections)
+    clipped = [(start, min(end, duration)) for start, end in sections if start < duration]
+    if len(clipped) == 1 and clipped[0][0] <= 0 and clipped[0][1] >= duration:
+        return []
+    return clipped
 
 class VideoInfo:
     """视频信息类"""
@@ -21,102 +105,396 @@ class VideoInfo:
         self.video_path = video_path
         self.audio_path: Optional[Path] = None
         self.subtitles: Optional[str] = None  # 添加字幕字段
+        self.subtitle_cues: List[Cue] = []  # 去重后带时间戳的字幕
+        self.media_type = "video"  # 下载的媒体类型：video（音视频合流）或 audio（仅音频流）
+        self.workspace: Optional[JobWorkspace] = None  # 下载与转码产物所在的任务工作区
+        self.sample_windows: List[SampleWindow] = []  # 快速扫描的采样窗口
+        self.sample_paths: List[Path] = []  # 各采样窗口的音频文件
+        self.sections: List[Tuple[float, float]] = []  # 分段下载的时间区间（空表示完整下载）
         self.input_type = "url"
+    
+    @property
+    def audio_duration(self) -> float:
+        """实际下载并转码的音频时长（分段下载时为各区间之和，duration 仍为完整时长）"""
+        if not self.sections:
+            return self.duration
+        return sum(end - start for start, end in self.sections)
+    
+    @property
+    def sections_label(self) -> str:
+        """区间的可读形式，如 00:00-05:00, 12:00-15:30"""
+        return ", ".join(f"{format_timestamp(start)}-{format_timestamp(end)}" for start, end in self.sections)
 
 class VideoFetcher:
     """视频抓取器"""
     
-    def __init__(self):
+    # 字幕语言偏好（按顺序选择）
+    SUBTITLE_LANGS = ['zh', 'zh-CN', 'zh-Hans', 'en']
+    
+    # 音视频合流格式（B站常用格式ID，兜底取最差画质）
+    VIDEO_FORMAT = '100046+30216/30011+30216/worst'
+    
+    # 下载产物可能的扩展名
+    MEDIA_SUFFIXES = ['.mp4', '.mkv', '.webm', '.avi', '.m4a', '.mp3', '.opus', '.ogg', '.aac', '.flac']
+    
+    def __init__(self, info_cache_dir: Optional[Path] = None, audio_only: Optional[bool] = None,
+                 extractors: Optional[List[type]] = None, ydl_params: Optional[Dict[str, Any]] = None):
+        """
+        Args:
+            info_cache_dir: 视频元数据磁盘缓存目录（可选）
+            audio_only: 是否只下载音频流（默认读取 URL_AUDIO_ONLY 配置）
+            extractors: 额外注册的yt-dlp InfoExtractor类（优先于内置提取器，用于本地夹具测试）
+            ydl_params: 合并进每个yt-dlp实例的额外参数
+        """
+        self.extractors = list(extractors or [])
+        self.ydl_params = dict(ydl_params or {})
+
         # 确保临时目录存在
         config.ensure_directories()
         
-        # yt-dlp配置
+        # 视频元数据缓存：每个URL只调用一次 extract_info，字幕选择与媒体下载都基于缓存的info
+        self.info_cache_dir = info_cache_dir or (config.OUTPUT_DIR / "cache" / "video_info")
+        self.info_cache_dir.mkdir(parents=True, exist_ok=True)
+        self.info_cache_ttl = config.VIDEO_INFO_CACHE_TTL
+        self._info_cache: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+        self._info_lock = threading.Lock()
+        
+        self.audio_only = config.URL_AUDIO_ONLY if audio_only is None else audio_only
+        
+        # yt-dlp配置（outtmpl 在下载时指向任务工作区）
         self.ydl_opts = {
-            'outtmpl': str(config.TEMP_DIR / '%(title)s.%(ext)s'),
-            'format': '100046+30216/30011+30216/worst',  # 视频+音频组合格式
+            'format': self._build_format_selector(),
             'noplaylist': True,
             'quiet': True,
             'no_warnings': True,
             'extractaudio': False,  # 我们手动用ffmpeg处理
         }
+
+    
+    def _build_format_selector(self) -> str:
+        """
+        构建yt-dlp格式选择表达式
         
-        # 字幕提取配置
-        self.subtitle_opts = {
-            'writesubtitles': True,
-            'writeautomaticsub': True,
-            'subtitleslangs': ['zh', 'zh-CN', 'zh-Hans', 'en'],
-            'quiet': True,
-            'no_warnings': True,
-            'skip_download': True,  # 只下载字幕，不下载视频
-            'outtmpl': str(config.TEMP_DIR / '%(title)s.%(ext)s'),
-        }
+        仅音频模式：选择码率不超过上限的最佳音频流（码率未知也接受），
+        否则取最小的音频流，都不可用时才回退到音视频合流格式。
+        音频流无需合流，下载后直接交给ffmpeg转码为ASR所需格式。
+        """
+        if not self.audio_only:
+            return self.VIDEO_FORMAT
+        
+        max_abr = config.URL_AUDIO_MAX_ABR
+        return f"bestaudio[abr<=?{max_abr}]/worstaudio/{self.VIDEO_FORMAT}"
     
-    def fetch_video_info(self, url: str) -> VideoInfo:
+    def _create_ydl(self, opts: Dict[str, Any]) -> yt_dlp.YoutubeDL:
+        """创建yt-dlp实例，自定义提取器注册在内置提取器之前"""
+        params = dict(opts, **self.ydl_params)
+        if not self.extractors:
+            return yt_dlp.YoutubeDL(params)
+        
+        ydl = yt_dlp.YoutubeDL(params, auto_init=False)
+        for extractor in self.extractors:
+            ydl.add_info_extractor(extractor())
+        ydl.add_default_info_extractors()
+        return ydl
+    
+    def _info_cache_file(self, url: str) -> Path:
+        """元数据缓存文件路径"""
+        return self.info_cache_dir / f"{hashlib.md5(url.encode()).hexdigest()}.json"
+    
+    def _load_cached_info(self, url: str) -> Optional[Dict[str, Any]]:
+        """从内存或磁盘读取未过期的视频元数据"""
+        now = time.time()
+        
+        with self._info_lock:
+            cached = self._info_cache.get(url)
+        if cached and now - cached[0] < self.info_cache_ttl:
+            return cached[1]
+        
+        cache_file = self._info_cache_file(url)
+        if cache_file.exists():
+            try:
+                with open(cache_file, 'r', encoding='utf-8') as f:
+                    entry = json.load(f)
+                if now - entry.get('fetched_at', 0) < self.info_cache_ttl:
+                    with self._info_lock:
+                        self._info_cache[url] = (entry['fetched_at'], entry['info'])
+                    logger.debug(f"使用磁盘缓存的视频元数据: {url}")
+                    return entry['info']
+            except Exception as e:
+                logger.warning(f"读取视频元数据缓存失败: {e}")
+        
+        return None
+    
+    def _store_info(self, url: str, info: Dict[str, Any]):
+        """写入内存与磁盘缓存"""
+        fetched_at = time.time()
+        with self._info_lock:
+            self._info_cache[url] = (fetched_at, info)
+        
+        try:
+            cache_file = self._info_cache_file(url)
+            tmp_file = cache_file.with_suffix('.tmp')
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump({'url': url, 'fetched_at': fetched_at, 'info': info}, f, ensure_ascii=False)
+            tmp_file.replace(cache_file)
+        except Exception as e:
+            logger.warning(f"保存视频元数据缓存失败: {e}")
+    
+    def invalidate_info(self, url: str):
+        """使指定URL的元数据缓存失效（如媒体地址过期）"""
+        with self._info_lock:
+            self._info_cache.pop(url, None)
+        cache_file = self._info_cache_file(url)
+        if cache_file.exists():
+            cache_file.unlink()
+    
+    def get_info(self, url: str, refresh: bool = False) -> Dict[str, Any]:
         """
-        获取视频基本信息（不下载）
+        获取视频元数据（每个URL只调用一次 extract_info，结果带TTL缓存在内存和磁盘）
         
         Args:
             url: 视频URL
+            refresh: 是否强制重新提取
             
         Returns:
-            视频信息对象
+            yt-dlp info字典（已清理为可JSON序列化）
         """
+        if not refresh:
+            info = self._load_cached_info(url)
+            if info is not None:
+                return info
+        
         try:
             logger.info(f"获取视频信息: {url}")
             
-            with yt_dlp.YoutubeDL({'quiet': True}) as ydl:
+            with self._create_ydl({'quiet': True, 'no_warnings': True, 'noplaylist': True}) as ydl:
                 info = ydl.extract_info(url, download=False)
-                
-                return VideoInfo(
-                    url=url,
-                    title=info.get('title', 'Unknown'),
-                    author=info.get('uploader', 'Unknown'),
-                    duration=info.get('duration', 0)
-                )
-                
+                info = ydl.sanitize_info(info, remove_private_keys=True)
+            
         except Exception as e:
             error_msg = f"获取视频信息失败: {e}"
             logger.error(error_msg)
             raise NetworkError(error_msg)
+        
+        self._store_info(url, info)
+        return info
+    
+    def _build_video_info(self, url: str, info: Dict[str, Any]) -> VideoInfo:
+        """根据info字典构建视频信息对象"""
+        return VideoInfo(
+            url=url,
+            title=info.get('title', 'Unknown'),
+            author=info.get('uploader', 'Unknown'),
+            duration=info.get('duration') or 0
+        )
     
-    def download_and_extract_audio(self, url: str) -> VideoInfo:
+    def fetch_video_info(self, url: str) -> VideoInfo:
+        """
+        获取视频基本信息（不下载）
+        
+        Args:
+            url: 视频URL
+            
+        Returns:
+            视频信息对象
+        """
+        return self._build_video_info(url, self.get_info(url))
+    
+    def _select_subtitle_lang(self, info: Dict[str, Any]) -> Optional[str]:
+        """
+        从info中选择字幕语言：优先人工字幕，其次自动字幕
+        
+        Returns:
+            语言代码，没有可用字幕时返回None
+        """
+        for source in ('subtitles', 'automatic_captions'):
+            tracks = info.get(source) or {}
+            for lang in self.SUBTITLE_LANGS:
+                if tracks.get(lang):
+                    return lang
+        return None
+    
+    def _select_subtitle_track(self, info: Dict[str, Any]) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """
+        选择字幕轨：语言按 _select_subtitle_lang，格式按 SUPPORTED_FORMATS 顺序
+        
+        Returns:
+            (语言代码, 字幕轨字典)，没有可解析的字幕轨时返回None
+        """
+        lang = self._select_subtitle_lang(info)
+        if not lang:
+            return None
+        
+        tracks = (info.get('subtitles') or {}).get(lang) or (info.get('automatic_captions') or {}).get(lang)
+        for ext in SUPPORTED_FORMATS:
+            for track in tracks:
+                if track.get('ext') == ext and (track.get('data') is not None or track.get('url')):
+                    return lang, track
+        return None
+    
+    def _read_subtitle_track(self, track: Dict[str, Any]) -> List[Cue]:
+        """
+        在内存中读取并解析字幕轨（内嵌数据直接解析，远程字幕逐行流式解析）
+        
+        Returns:
+            去重后的字幕列表
+        """
+        ext = track['ext']
+        if track.get('data') is not None:
+            return parse_subtitles(track['data'], ext)
+        
+        from yt_dlp.networking import Request
+        
+        with self._create_ydl({'quiet': True, 'no_warnings': True}) as ydl:
+            with ydl.urlopen(Request(track['url'], headers=track.get('http_headers') or {})) as response:
+                return parse_subtitles(io.TextIOWrapper(response, encoding='utf-8-sig'), ext)
+    
+    def _process_cached_info(self, url: str, opts: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        基于缓存的info执行下载（不再重复extract），媒体地址过期时刷新一次元数据后重试
+        
+        Returns:
+            处理后的info字典（包含 requested_downloads / requested_subtitles 的文件路径）
+        """
+        for attempt in range(2):
+            info = copy.deepcopy(self.get_info(url, refresh=attempt > 0))
+            try:
+                with self._create_ydl(opts) as ydl:
+                    return ydl.process_ie_result(info, download=True)
+            except yt_dlp.utils.DownloadError as e:
+                if attempt == 0:
+                    logger.warning(f"使用缓存元数据下载失败，刷新后重试: {e}")
+                    self.invalidate_info(url)
+                    continue
+                raise
+    
+    def fetch_playlist_entries(self, url: str, limit: Optional[int] = None) -> Dict[str, Any]:
+        """
+        平铺获取频道/播放列表的条目（不解析每个视频）
+        
+        Args:
+            url: 频道或播放列表URL
+            limit: 最多获取的条目数量（可选）
+            
+        Returns:
+            播放列表info字典，entries 为平铺的条目列表
+        """
+        opts = {
+            'quiet': True,
+            'no_warnings': True,
+            'extract_flat': 'in_playlist',
+        }
+        if limit:
+            opts['playlistend'] = limit
+        
+        try:
+            logger.info(f"获取频道/播放列表条目: {url}")
+            with self._create_ydl(opts) as ydl:
+                raw = ydl.extract_info(url, download=False)
+                # remove_private_keys 会移除 entries，条目需单独清理
+                entries = [ydl.sanitize_info(entry, remove_private_keys=True)
+                           for entry in raw.get('entries') or [] if entry]
+                info = ydl.sanitize_info(raw, remove_private_keys=True)
+        except Exception as e:
+            error_msg = f"获取播放列表失败: {e}"
+            logger.error(error_msg)
+            raise NetworkError(error_msg)
+        
+        info['entries'] = entries
+        return info
+    
+    def download_audio(self, url: str, output_dir: Path) -> Path:
+        """
+        只下载音频流到指定目录（不转码），文件名包含视频ID以便去重
+        
+        Args:
+            url: 视频URL
+            output_dir: 输出目录
+            
+        Returns:
+            下载的音频文件路径
+        """
+        output_dir.mkdir(parents=True, exist_ok=True)
+        opts = dict(
+            self.ydl_opts,
+            outtmpl=str(output_dir / '%(title).80s [%(id)s].%(ext)s'),
+            format=f"bestaudio[abr<=?{config.URL_AUDIO_MAX_ABR}]/worstaudio/{self.VIDEO_FORMAT}",
+        )
+        
+        try:
+            processed = self._process_cached_info(url, opts) or {}
+        except Exception as e:
+            error_msg = f"下载音频失败: {e}"
+            logger.error(error_msg)
+            raise NetworkError(error_msg)
+        
+        files = [Path(d['filepath']) for d in processed.get('requested_downloads') or []
+                 if d.get('filepath') and Path(d['filepath']).exists()]
+        if not files:
+            raise AudioProcessingError(f"未找到下载的音频文件: {url}")
+        
+        logger.info(f"音频下载完成: {files[0]}")
+        return files[0]
+    
+    def download_and_extract_audio(self, url: str, workspace: Optional[JobWorkspace] = None,
+                                   sections: Optional[List[Tuple[float, float]]] = None) -> VideoInfo:
         """
         下载视频并提取音频
         
         Args:
             url: 视频URL
+            workspace: 任务工作区（可选，未提供时新建，调用方负责通过 video_info.workspace 清理）
+            sections: 只下载的时间区间（parse_sections 的结果，可选）；
+                      带宽与转码、ASR的开销与区间长度成正比，video_info.duration 仍为完整时长
             
         Returns:
             包含音频路径的视频信息对象
         """
         try:
-            # 先获取视频信息
+            # 先获取视频信息（命中缓存时不产生网络请求）
             video_info = self.fetch_video_info(url)
-            logger.info(f"开始下载视频: {video_info.title}")
+            video_info.workspace = workspace or get_workspace_manager().create("url")
+            video_info.sections = clip_sections(sections or [], video_info.duration)
+            # 时长未知时无法得到区间的实际长度，以完整下载处理
+            if any(end == float('inf') for _, end in video_info.sections):
+                video_info.sections = []
             
-            # 下载视频
-            with yt_dlp.YoutubeDL(self.ydl_opts) as ydl:
-                ydl.download([url])
+            # 基于缓存的info下载媒体，产物写入任务工作区，文件名由视频ID确定
+            opts = dict(self.ydl_opts, outtmpl=str(video_info.workspace.artifact('%(id)s.%(ext)s')))
+            if video_info.sections:
+                logger.info(f"开始分段下载{'音频流' if self.audio_only else '视频'}: {video_info.title} [{video_info.sections_label}]")
+                # yt-dlp 按区间分别下载，每个区间一个文件
+                opts['download_ranges'] = yt_dlp.utils.download_range_func(None, video_info.sections)
+                opts['outtmpl'] = str(video_info.workspace.artifact('%(id)s.%(section_start)s.%(ext)s'))
+            else:
+                logger.info(f"开始下载{'音频流' if self.audio_only else '视频'}: {video_info.title}")
+            processed = self._process_cached_info(url, opts) or {}
             
-            # 查找下载的视频文件
-            video_files = list(config.TEMP_DIR.glob(f"{video_info.title}*"))
+            # 优先使用yt-dlp返回的实际文件路径，其次查找工作区内的媒体文件
+            video_files = [Path(d['filepath']) for d in processed.get('requested_downloads') or []
+                           if d.get('filepath') and Path(d['filepath']).exists()]
             if not video_files:
-                # 如果标题匹配不到，尝试查找最新的视频文件
-                video_files = [f for f in config.TEMP_DIR.iterdir() 
-                             if f.suffix.lower() in ['.mp4', '.mkv', '.webm', '.avi']]
-                video_files.sort(key=lambda x: x.stat().st_mtime)
+                video_files = sorted(f for f in video_info.workspace.path.iterdir()
+                                     if f.suffix.lower() in self.MEDIA_SUFFIXES)
             
             if not video_files:
                 raise AudioProcessingError("未找到下载的视频文件")
             
-            video_path = video_files[-1]  # 取最新的文件
+            video_path = video_files[0]
             video_info.video_path = video_path
+            # 选中的格式没有视频轨时即为纯音频下载
+            has_video = processed.get('vcodec') not in (None, 'none')
+            video_info.media_type = "video" if has_video else "audio"
             
-            logger.info(f"视频下载完成: {video_path}")
+            size_mb = sum(f.stat().st_size for f in video_files) / 1024 / 1024
+            logger.info(f"媒体下载完成: {video_path} ({video_info.media_type}, {len(video_files)} 个文件, {size_mb:.1f}MB)")
             
-            # 提取音频
-            audio_path = extract_audio_from_video(video_path)
-            video_info.audio_path = audio_path
+            # 转码为ASR所需的音频格式（纯音频输入无需解码视频轨，多个区间按顺序拼接）
+            audio_path = video_info.workspace.artifact(f"{video_path.stem}_audio.{config.AUDIO_OUTPUT_FORMAT}")
+            if len(video_files) > 1:
+                video_info.audio_path = concat_audio(video_files, audio_path)
+            else:
+                video_info.audio_path = extract_audio_from_video(video_path, audio_path)
             
             return video_info
             
@@ -129,7 +507,7 @@ class VideoFetcher:
     
     def extract_subtitles(self, url: str) -> VideoInfo:
         """
-        直接提取视频字幕（不下载视频）
+        直接提取视频字幕（不下载视频，字幕在内存中解析，不写临时文件）
         
         Args:
             url: 视频URL
@@ -139,41 +517,28 @@ class VideoFetcher:
         """
         try:
             # 先获取视频信息
-            video_info = self.fetch_video_info(url)
+            info = self.get_info(url)
+            video_info = self._build_video_info(url, info)
             logger.info(f"开始提取字幕: {video_info.title}")
             
-            # 提取字幕
-            with yt_dlp.YoutubeDL(self.subtitle_opts) as ydl:
-                ydl.download([url])
-            
-            # 查找下载的字幕文件
-            subtitle_files = list(config.TEMP_DIR.glob(f"*{video_info.title}*.vtt")) + \
-                           list(config.TEMP_DIR.glob(f"*{video_info.title}*.srt"))
-            
-            if not subtitle_files:
-                # 如果按标题找不到，尝试查找最新的字幕文件
-                subtitle_files = [f for f in config.TEMP_DIR.iterdir() 
-                                if f.suffix.lower() in ['.vtt', '.srt']]
-                subtitle_files.sort(key=lambda x: x.stat().st_mtime)
-            
-            if subtitle_files:
-                subtitle_file = subtitle_files[-1]  # 取最新的文件
-                logger.info(f"找到字幕文件: {subtitle_file}")
-                
-                # 读取字幕内容
-                with open(subtitle_file, 'r', encoding='utf-8') as f:
-                    subtitle_content = f.read()
-                
-                # 简单清理字幕格式（移除时间戳和WebVTT标记）
-                video_info.subtitles = self._clean_subtitle_content(subtitle_content)
-                logger.info(f"字幕提取完成，内容长度: {len(video_info.subtitles)}字符")
-                
-                # 清理字幕文件
-                subtitle_file.unlink()
-                
-            else:
+            # 直接从info判断是否有可用字幕，没有则无需任何额外请求
+            selected = self._select_subtitle_track(info)
+            if not selected:
                 logger.warning("未找到字幕文件，可能该视频没有可用字幕")
                 video_info.subtitles = None
+                return video_info
+            
+            lang, track = selected
+            logger.info(f"解析字幕: 语言={lang}, 格式={track['ext']}")
+            cues = self._read_subtitle_track(track)
+            
+            if cues:
+                video_info.subtitle_cues = cues
+                video_info.subtitles = cues_to_text(cues)
+                logger.info(f"字幕提取完成，共{len(cues)}条，内容长度: {len(video_info.subtitles)}字符")
+            else:
+                logger.warning("字幕内容为空")
+                video_info.subtitles = None
             
             return video_info
             
@@ -183,37 +548,3 @@ class VideoFetcher:
             error_msg = f"提取字幕失败: {e}"
             logger.error(error_msg)
             raise NetworkError(error_msg)
-    
-    def _clean_subtitle_content(self, content: str) -> str:
-        """
-        清理字幕内容，移除时间戳和格式标记
-        
-        Args:
-            content: 原始字幕内容
-            
-        Returns:
-            清理后的纯文本
-        """
-        lines = content.split('\n')
-        cleaned_lines = []
-        
-        for line in lines:
-            line = line.strip()
-            
-            # 跳过空行、WebVTT标记、时间戳等
-            if (not line or 
-                line.startswith('WEBVTT') or 
-                line.startswith('NOTE') or 
-                '-->' in line or 
-                line.isdigit() or
-                line.startswith('<') and line.endswith('>')):
-                continue
-            
-            # 移除HTML标签（如果有）
-            import re
-            line = re.sub(r'<[^>]+>', '', line)
-            
-            if line:
-                cleaned_lines.append(line)
-        
-        return ' '.join(cleaned_lines)
\ No newline at end of file
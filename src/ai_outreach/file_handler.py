@@ -4,11 +4,22 @@
 """
 
 from pathlib import Path
-from typing import Optional
+from typing import Dict, Iterator, List, Optional, Tuple
 from .utils.logger import logger
 from .utils.exceptions import AudioProcessingError
 from .utils.config import config
-from .utils.audio_utils import extract_audio_from_video, get_audio_info, extract_blogger_info_from_path
+from .utils.audio_utils import (
+    extract_audio_from_video,
+    extract_audio_windows,
+    extract_blogger_info_from_path,
+    extract_subtitle_stream,
+    window_output_paths,
+)
+from .media_probe import MediaProbe
+from .extraction_stage import ExtractionJob, ExtractionStage
+from .sampling import SampleWindow, plan_windows, sampled_seconds
+from .subtitles import Cue, SIDECAR_EXTENSIONS, parse_subtitles, cues_to_text
+from .utils.workspace import JobWorkspace, get_workspace_manager
 
 class LocalVideoInfo:
     """本地视频信息类"""
@@ -19,12 +30,35 @@ class LocalVideoInfo:
         self.duration = 0.0
         self.video_path = file_path
         self.audio_path: Optional[Path] = None
+        self.workspace: Optional[JobWorkspace] = None  # 提取音频所在的任务工作区
+        self.subtitles: Optional[str] = None  # 内嵌或同名字幕文本（存在时无需ASR）
+        self.subtitle_cues: List[Cue] = []
+        self.subtitle_source: Optional[str] = None  # 字幕来源：sidecar / embedded
+        self.cached_transcript: Optional[str] = None  # 命中转录缓存时的文本（已跳过音频提取）
+        self.sample_windows: List[SampleWindow] = []  # 快速扫描的采样窗口（非空时只转录这些片段）
+        self.sample_paths: List[Path] = []  # 各采样窗口的音频文件
         self.input_type = "file"
 
 class FileHandler:
     """文件处理器"""
     
-    def __init__(self):
+    # 字幕语言偏好（匹配语言标签前缀，按顺序选择）
+    SUBTITLE_LANG_PREFIXES = ['zh', 'chi', 'zho', 'en', 'eng']
+    
+    def __init__(self, transcript_cache=None, audio_cache=None, media_probe: Optional[MediaProbe] = None,
+                 extraction_stage: Optional[ExtractionStage] = None):
+        """
+        Args:
+            transcript_cache: 转录缓存（可选，命中时跳过音频提取）
+            audio_cache: 提取音频缓存（可选，命中时跳过解码）
+            media_probe: 媒体元数据探测器（默认使用持久化缓存的探测器）
+            extraction_stage: 音频提取进程池（可选，批量处理时并行提取）
+        """
+        self.transcript_cache = transcript_cache
+        self.audio_cache = audio_cache
+        self.media_probe = media_probe or MediaProbe()
+        self.extraction_stage = extraction_stage
+        
         # 支持的视频格式
         self.supported_video_formats = {'.mp4', '.avi', '.mkv', '.mov', '.wmv', '.flv', '.webm'}
         # 支持的音频格式
@@ -33,18 +67,105 @@ class FileHandler:
         # 确保目录存在
         config.ensure_directories()
     
-    def process_file(self, file_path: str) -> LocalVideoInfo:
+    def process_file(self, file_path: str, workspace: Optional[JobWorkspace] = None,
+                     quick_scan: bool = False) -> LocalVideoInfo:
         """
         处理本地文件
         
         Args:
             file_path: 文件路径字符串
+            workspace: 任务工作区（可选，视频文件未提供时新建，调用方负责通过 video_info.workspace 清理）
+            quick_scan: 快速扫描模式（长音频只提取采样窗口，写入 video_info.sample_paths）
             
         Returns:
             包含音频路径的视频信息对象
         """
-        file_path = Path(file_path)
+        video_info, needs_extraction = self._prepare(Path(file_path), workspace, quick_scan)
+        
+        if needs_extraction:
+            if video_info.sample_windows:
+                windows = [(w.start, w.duration) for w in video_info.sample_windows]
+                extract_audio_windows(video_info.video_path, windows, video_info.audio_path)
+            else:
+                extract_audio_from_video(video_info.video_path, video_info.audio_path)
+            self._finish_extraction(video_info)
+        
+        return video_info
+    
+    def process_files(self, file_paths: List[Path],
+                      quick_scan: bool = False) -> Iterator[Tuple[Path, Optional[LocalVideoInfo], Optional[Exception]]]:
+        """
+        批量处理本地文件：需要提取音频的文件交给提取阶段并行处理，提取在后台领先于调用方的转录进行
+        
+        每个文件使用独立的任务工作区，调用方处理完成后负责清理 video_info.workspace。
+        
+        Args:
+            file_paths: 文件路径列表
+            quick_scan: 快速扫描模式（长音频只提取采样窗口）
+            
+        Returns:
+            (文件路径, 视频信息, 错误) 迭代器：无需提取的文件最先返回，其余按提取完成顺序返回；
+            处理失败时视频信息为None（工作区已清理）
+        """
+        if self.extraction_stage is None:
+            yield from self._process_files_serially(file_paths, quick_scan)
+            return
+        
+        manager = get_workspace_manager()
+        ready = []
+        pending: Dict[Path, LocalVideoInfo] = {}
+        jobs = []
+        
+        # 先完成廉价的检查（缓存、字幕、媒体元数据），再批量提交提取任务
+        for file_path in file_paths:
+            workspace = manager.create(file_path.stem)
+            try:
+                video_info, needs_extraction = self._prepare(file_path, workspace, quick_scan)
+            except Exception as e:
+                workspace.cleanup()
+                ready.append((file_path, None, e))
+                continue
+            
+            if needs_extraction:
+                pending[video_info.audio_path] = video_info
+                jobs.append(self._extraction_job(video_info))
+            else:
+                ready.append((file_path, video_info, None))
+        
+        results = self.extraction_stage.run(jobs)
+        yield from ready
+        
+        for result in results:
+            video_info = pending.pop(result.job.output)
+            if result.error:
+                video_info.workspace.cleanup()
+                yield video_info.video_path, None, result.error
+                continue
+            self._finish_extraction(video_info)
+            yield video_info.video_path, video_info, None
+    
+    def _process_files_serially(self, file_paths: List[Path],
+                                quick_scan: bool = False) -> Iterator[Tuple[Path, Optional[LocalVideoInfo], Optional[Exception]]]:
+        """逐个处理文件（未配置提取阶段时使用）"""
+        manager = get_workspace_manager()
+        for file_path in file_paths:
+            workspace = manager.create(file_path.stem)
+            try:
+                yield file_path, self.process_file(str(file_path), workspace=workspace, quick_scan=quick_scan), None
+            except Exception as e:
+                workspace.cleanup()
+                yield file_path, None, e
+    
+    def _prepare(self, file_path: Path, workspace: Optional[JobWorkspace],
+                 quick_scan: bool = False) -> Tuple[LocalVideoInfo, bool]:
+        """
+        检查文件并填充可直接获得的信息（转录缓存、字幕、音频缓存、时长）
         
+        快速扫描模式下，已有的完整转录与字幕仍优先使用（无需ASR）；否则长音频只规划采样窗口。
+        
+        Returns:
+            (视频信息, 是否仍需提取音频到 video_info.audio_path，或提取采样窗口)
+        """
         if not file_path.exists():
             raise AudioProcessingError(f"文件不存在: {file_path}")
         
@@ -52,36 +173,50 @@ class FileHandler:
         
         # 创建视频信息对象
         video_info = LocalVideoInfo(file_path)
+        video_info.workspace = workspace
         
         # 检查文件格式
         suffix = file_path.suffix.lower()
         
+        # 已转录过的文件无需提取音频
+        if suffix in self.supported_video_formats and self._load_cached_transcript(video_info):
+            logger.info(f"文件处理完成（使用缓存转录）: {video_info.title}, 时长: {video_info.duration:.1f}秒")
+            return video_info, False
+        
+        # 有可用字幕时直接使用字幕，跳过音频提取与ASR
+        if suffix in self.supported_video_formats and config.LOCAL_SUBTITLES and self._load_subtitles(video_info):
+            logger.info(f"文件处理完成（使用{video_info.subtitle_source}字幕）: {video_info.title}, 时长: {video_info.duration:.1f}秒")
+            return video_info, False
+        
+        if quick_scan and suffix in (self.supported_audio_formats | self.supported_video_formats):
+            video_info.duration = self._probe_duration(file_path)
+            windows = plan_windows(file_path, video_info.duration)
+            if windows:
+                video_info.workspace = workspace or get_workspace_manager().create(file_path.stem)
+                video_info.sample_windows = windows
+                video_info.audio_path = video_info.workspace.artifact(f"{file_path.stem}_sample.wav")
+                return video_info, True
+        
         if suffix in self.supported_audio_formats:
             # 直接使用音频文件
             video_info.audio_path = file_path
             logger.info("检测到音频文件，直接使用")
             
-            # 获取音频信息
-            try:
-                audio_info = get_audio_info(file_path)
-                video_info.duration = audio_info['duration']
-            except Exception as e:
-                logger.warning(f"获取音频信息失败: {e}")
-                video_info.duration = 0.0
+            video_info.duration = self._probe_duration(file_path)
                 
         elif suffix in self.supported_video_formats:
             # 从视频文件提取音频
             logger.info("检测到视频文件，开始提取音频")
-            audio_path = extract_audio_from_video(file_path)
+            video_info.workspace = workspace or get_workspace_manager().create(file_path.stem)
+            audio_path = video_info.workspace.artifact(f"{file_path.stem}_audio.{config.AUDIO_OUTPUT_FORMAT}")
             video_info.audio_path = audio_path
             
-            # 获取音频信息
-            try:
-                audio_info = get_audio_info(audio_path)
-                video_info.duration = audio_info['duration']
-            except Exception as e:
-                logger.warning(f"获取音频信息失败: {e}")
-                video_info.duration = 0.0
+            # 时长取自源文件的元数据（已缓存），提取后无需再探测一次
+            video_info.duration = self._probe_duration(file_path)
+            
+            cached = self.audio_cache.get(file_path, audio_path) if self.audio_cache else None
+            if not cached:
+                return video_info, True
         
         else:
             raise AudioProcessingError(
@@ -91,4 +226,136 @@ class FileHandler:
             )
         
         logger.info(f"文件处理完成: {video_info.title}, 时长: {video_info.duration:.1f}秒")
-        return video_info
\ No newline at end of file
+        return video_info, False
+    
+    def _extraction_job(self, video_info: LocalVideoInfo) -> ExtractionJob:
+        """构造提取阶段的任务（完整提取或采样窗口）"""
+        if video_info.sample_windows:
+            return ExtractionJob(
+                video_info.video_path, video_info.audio_path, kind='sample',
+                duration=sampled_seconds(video_info.sample_windows),
+                windows=[(w.start, w.duration) for w in video_info.sample_windows]
+            )
+        return ExtractionJob(video_info.video_path, video_info.audio_path, duration=video_info.duration)
+    
+    def _finish_extraction(self, video_info: LocalVideoInfo):
+        """音频提取完成后写入音频缓存（采样片段不缓存）"""
+        if video_info.sample_windows:
+            video_info.sample_paths = window_output_paths(video_info.audio_path, len(video_info.sample_windows))
+            logger.info(f"文件处理完成（快速扫描）: {video_info.title}, 采样 {sampled_seconds(video_info.sample_windows):.0f}秒 / 时长 {video_info.duration:.1f}秒")
+            return
+        if self.audio_cache:
+            self.audio_cache.put(video_info.video_path, video_info.audio_path, duration=video_info.duration)
+        logger.info(f"文件处理完成: {video_info.title}, 时长: {video_info.duration:.1f}秒")
+    
+    def _lang_rank(self, language: str) -> int:
+        """语言标签的偏好排名（越小越优先）"""
+        language = (language or '').lower()
+        for rank, prefix in enumerate(self.SUBTITLE_LANG_PREFIXES):
+            if language.startswith(prefix):
+                return rank
+        return len(self.SUBTITLE_LANG_PREFIXES)
+    
+    def find_sidecar_subtitles(self, file_path: Path) -> List[Path]:
+        """
+        查找与视频同名的字幕文件（如 video.srt、video.zh-Hans.vtt）
+        
+        Args:
+            file_path: 视频文件路径
+            
+        Returns:
+            按偏好排序的字幕文件列表（无语言标签的优先，其次按语言偏好与格式顺序）
+        """
+        prefix = f"{file_path.stem}."
+        candidates = [
+            p for p in file_path.parent.glob(f"{file_path.stem}.*")
+            if p.is_file() and p.suffix.lower() in SIDECAR_EXTENSIONS and p.name.startswith(prefix)
+        ]
+        
+        def sort_key(path: Path):
+            language = path.name[len(prefix):-len(path.suffix)]
+            lang_rank = -1 if not language else self._lang_rank(language)
+            return lang_rank, SIDECAR_EXTENSIONS.index(path.suffix.lower()), path.name
+        
+        return sorted(candidates, key=sort_key)
+    
+    def detect_subtitles(self, file_path: Path) -> Optional[Tuple[str, List[Cue]]]:
+        """
+        检测本地视频的字幕：优先同名字幕文件，其次内嵌文本字幕轨
+        
+        Args:
+            file_path: 视频文件路径
+            
+        Returns:
+            (来源, 去重后的字幕列表)，没有可用字幕时返回None
+        """
+        for sidecar in self.find_sidecar_subtitles(file_path):
+            try:
+                with open(sidecar, 'r', encoding='utf-8-sig', errors='replace') as f:
+                    cues = parse_subtitles(f, sidecar.suffix.lstrip('.'))
+            except OSError as e:
+                logger.warning(f"读取字幕文件失败: {sidecar}, 错误: {e}")
+                continue
+            if cues:
+                logger.info(f"找到同名字幕文件: {sidecar.name}")
+                return 'sidecar', cues
+        
+        try:
+            subtitle_streams = self.media_probe.probe(file_path).subtitle_streams
+        except AudioProcessingError as e:
+            logger.debug(f"探测字幕轨失败: {e}")
+            subtitle_streams = []
+        
+        streams = sorted(subtitle_streams, key=lambda s: self._lang_rank(s['language']))
+        for stream in streams:
+            try:
+                cues = parse_subtitles(extract_subtitle_stream(file_path, stream['index']), 'srt')
+            except AudioProcessingError as e:
+                logger.warning(f"内嵌字幕轨提取失败: #{stream['index']}, 错误: {e}")
+                continue
+            if cues:
+                logger.info(f"找到内嵌字幕轨: #{stream['index']} ({stream['codec']}, {stream['language'] or '未知语言'})")
+                return 'embedded', cues
+        
+        return None
+    
+    def _load_cached_transcript(self, video_info: LocalVideoInfo) -> bool:
+        """查询转录缓存（在任何ffmpeg/ffprobe调用之前），返回是否命中"""
+        if not self.transcript_cache:
+            return False
+        
+        cached_text = self.transcript_cache.get_cached_transcript_by_source(video_info.video_path)
+        if not cached_text:
+            return False
+        
+        video_info.cached_transcript = cached_text
+        cache_info = self.transcript_cache.get_cache_info_by_source(video_info.video_path) or {}
+        # 早期缓存条目未记录时长，从媒体元数据获取（无需解码）
+        video_info.duration = cache_info.get('duration') or self._probe_duration(video_info.video_path)
+        return True
+    
+    def _probe_duration(self, file_path: Path) -> float:
+        """从媒体元数据获取时长，失败时返回0"""
+        try:
+            return self.media_probe.probe(file_path).duration
+        except AudioProcessingError as e:
+            logger.warning(f"获取音频信息失败: {e}")
+            return 0.0
+    
+    def _load_subtitles(self, video_info: LocalVideoInfo) -> bool:
+        """检测并填充字幕，返回是否找到可用字幕"""
+        detected = self.detect_subtitles(video_info.video_path)
+        if not detected:
+            return False
+        
+        video_info.subtitle_source, cues = detected
+        video_info.subtitle_cues = cues
+        video_info.subtitles = cues_to_text(cues)
+        # 时长优先取媒体元数据缓存（检测内嵌字幕轨时已探测过）；尚未探测时以最后一条字幕的结束时间估算，
+        # 不为此额外运行ffprobe（字幕常在片尾前结束，估算值偏短）
+        media_info = self.media_probe.get_cached(video_info.video_path)
+        if media_info is not None and media_info.duration > 0:
+            video_info.duration = media_info.duration
+        else:
+            video_info.duration = max(cue.end for cue in cues)
+        return True
@@ -4,24 +4,39 @@
 """
 
 import json
+from dataclasses import asdict
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from jinja2 import Environment, FileSystemLoader, TemplateError
 from .utils.logger import logger
 from .utils.exceptions import TemplateError as CustomTemplateError
 from .utils.config import config
 from .analyzer import AnalysisResult
 
+# 结构化分析结果与报告同名保存（X.md → X.analysis.json），修改模板后可由 rerender 离线重建报告
+ANALYSIS_SUFFIX = ".analysis.json"
+ANALYSIS_FORMAT_VERSION = 1
+
+def analysis_path(report_path: Path) -> Path:
+    """报告对应的结构化分析结果文件路径"""
+    return report_path.with_name(report_path.stem + ANALYSIS_SUFFIX)
+
+def report_path_for(analysis_file: Path) -> Path:
+    """结构化分析结果文件对应的报告路径"""
+    return analysis_file.with_name(analysis_file.name[:-len(ANALYSIS_SUFFIX)] + ".md")
+
 class ScriptResult:
     """脚本生成结果类"""
     def __init__(self, new_blogger_script: str, known_blogger_script: str, 
-                 analysis_summary: str, timestamp: str, input_source: str):
+                 analysis_summary: str, timestamp: str, input_source: str,
+                 analysis_result: Optional[AnalysisResult] = None):
         self.new_blogger_script = new_blogger_script
         self.known_blogger_script = known_blogger_script
         self.analysis_summary = analysis_summary
         self.timestamp = timestamp
         self.input_source = input_source
+        self.analysis_result = analysis_result  # 保存报告时一并持久化，供重建报告使用
 
 class ScriptGenerator:
     """脚本生成器"""
@@ -36,18 +51,21 @@ class ScriptGenerator:
         # 确保目录存在
         config.ensure_directories()
     
-    def generate_scripts(self, analysis_result: AnalysisResult, video_info: Dict[str, Any]) -> ScriptResult:
+    def generate_scripts(self, analysis_result: AnalysisResult, video_info: Dict[str, Any],
+                         timestamp: Optional[str] = None) -> ScriptResult:
         """
         生成沟通脚本
         
         Args:
             analysis_result: AI分析结果
             video_info: 视频信息字典
+            timestamp: 分析时间（ISO格式，可选，重建报告时沿用原分析时间）
             
         Returns:
             脚本生成结果
         """
         logger.info("开始生成沟通脚本")
+        timestamp = timestamp or datetime.now().isoformat()
         
         try:
             # 准备模板变量（V3.0一体化字段）
@@ -82,15 +100,16 @@ class ScriptGenerator:
             known_blogger_script = known_blogger_template.render(**template_vars)
             
             # 生成分析摘要
-            analysis_summary = self._generate_analysis_summary(analysis_result, video_info)
+            analysis_summary = self._generate_analysis_summary(analysis_result, video_info, timestamp)
             
             # 创建结果对象
             result = ScriptResult(
                 new_blogger_script=new_blogger_script,
                 known_blogger_script=known_blogger_script,
                 analysis_summary=analysis_summary,
-                timestamp=datetime.now().isoformat(),
-                input_source=video_info.get('input_type', 'unknown')
+                timestamp=timestamp,
+                input_source=video_info.get('input_type', 'unknown'),
+                analysis_result=analysis_result
             )
             
             logger.info("沟通脚本生成完成")
@@ -105,21 +124,24 @@ class ScriptGenerator:
             logger.error(error_msg)
             raise CustomTemplateError(error_msg)
     
-    def _generate_analysis_summary(self, analysis_result: AnalysisResult, video_info: Dict[str, Any]) -> str:
+    def _generate_analysis_summary(self, analysis_result: AnalysisResult, video_info: Dict[str, Any],
+                                   timestamp: Optional[str] = None) -> str:
         """
         生成分析摘要
         
         Args:
             analysis_result: 分析结果
             video_info: 视频信息
+            timestamp: 分析时间（ISO格式，可选，默认当前时间）
             
         Returns:
             分析摘要文本
         """
         blogger_chars = analysis_result.blogger_characteristics
+        analyzed_at = datetime.fromisoformat(timestamp) if timestamp else datetime.now()
         
         summary = f"""# 博主分析报告 (V3.0)
-
+{self._sections_note(video_info)}{self._quick_scan_note(video_info)}
 ## 🎯 最优破冰脚本 (基于深度洞察一体化生成)
 
 {analysis_result.optimal_outreach_script}
@@ -148,7 +170,7 @@ class ScriptGenerator:
 ## 基本信息
 - **博主**: {video_info.get('author', 'Unknown')}
 - **内容标题**: {video_info.get('title', 'Unknown')}
-- **分析时间**: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+- **分析时间**: {analyzed_at.strftime('%Y-%m-%d %H:%M:%S')}
 
 ## 内容特征分析
 - **内容风格**: {analysis_result.content_style}
@@ -178,6 +200,32 @@ class ScriptGenerator:
 """
         return summary
     
+    def render_blogger_comprehensive_report(self, analysis_result: Dict[str, Any]) -> str:
+        """
+        渲染博主综合分析报告内容（不写文件）
+        
+        Args:
+            analysis_result: 博主综合分析结果（含 current_time 时沿用，否则取当前时间）
+            
+        Returns:
+            报告Markdown文本
+        """
+        # 使用Jinja2模板生成报告（V2简化版）
+        template_name = 'blogger_comprehensive_template_V2.md'
+        logger.debug(f"加载模板: {template_name}")
+        
+        # 重新初始化模板环境以避免缓存问题
+        fresh_env = Environment(
+            loader=FileSystemLoader(str(config.TEMPLATES_DIR)),
+            autoescape=False  # 对于Markdown文件不需要HTML转义
+        )
+        template = fresh_env.get_template(template_name)
+        
+        # 添加当前时间
+        analysis_result.setdefault('current_time', datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
+        
+        return template.render(**analysis_result)
+    
     def generate_blogger_comprehensive_report(self, analysis_result: Dict[str, Any]) -> Path:
         """
         生成博主综合分析报告（V3.0）
@@ -191,22 +239,8 @@ class ScriptGenerator:
         logger.info("开始生成博主综合分析报告")
         
         try:
-            # 使用Jinja2模板生成报告（V2简化版）
-            template_name = 'blogger_comprehensive_template_V2.md'
-            logger.info(f"加载模板: {template_name}")
-            
-            # 重新初始化模板环境以避免缓存问题
-            fresh_env = Environment(
-                loader=FileSystemLoader(str(config.TEMPLATES_DIR)),
-                autoescape=False  # 对于Markdown文件不需要HTML转义
-            )
-            template = fresh_env.get_template(template_name)
-            
-            # 添加当前时间
-            analysis_result['current_time'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            
             # 渲染报告
-            report_content = template.render(**analysis_result)
+            report_content = self.render_blogger_comprehensive_report(analysis_result)
             
             # 保存报告
             blogger_name = analysis_result['blogger_info'].name
@@ -222,33 +256,127 @@ class ScriptGenerator:
                 f.write(report_content)
             
             logger.info(f"博主综合分析报告已保存: {report_path}")
+            self.save_analysis(report_path, self.blogger_analysis_record(analysis_result))
             return report_path
             
         except Exception as e:
             logger.error(f"生成博主综合分析报告失败: {e}")
             raise CustomTemplateError(f"生成博主综合分析报告失败: {e}")
     
-    def save_markdown_report(self, script_result: ScriptResult, video_info: Dict[str, Any]) -> Path:
+    @staticmethod
+    def blogger_analysis_record(analysis_result: Dict[str, Any]) -> Dict[str, Any]:
+        """博主综合分析结果 → 可JSON序列化的持久化记录"""
+        record = {key: value for key, value in analysis_result.items()
+                  if key not in ('blogger_info', 'comprehensive_analysis')}
+        record.update({
+            'kind': 'blogger',
+            'version': ANALYSIS_FORMAT_VERSION,
+            'blogger_info': asdict(analysis_result['blogger_info']),
+            'comprehensive_analysis': analysis_result['comprehensive_analysis'].to_dict(),
+        })
+        return record
+    
+    @staticmethod
+    def video_analysis_record(script_result: ScriptResult, video_info: Dict[str, Any]) -> Dict[str, Any]:
+        """单视频分析结果 → 可JSON序列化的持久化记录"""
+        return {
+            'kind': 'video',
+            'version': ANALYSIS_FORMAT_VERSION,
+            'timestamp': script_result.timestamp,
+            'video_info': video_info,
+            'analysis': script_result.analysis_result.to_dict(),
+        }
+    
+    def save_analysis(self, report_path: Path, record: Dict[str, Any]) -> Optional[Path]:
         """
-        保存Markdown格式的分析报告
+        在报告旁保存结构化分析结果（辅助功能，失败不影响主流程）
         
         Args:
-            script_result: 脚本生成结果
-            video_info: 视频信息
+            report_path: 报告文件路径
+            record: 持久化记录
             
         Returns:
-            保存的文件路径
+            保存的文件路径，失败时返回None
         """
-        # 生成文件名
-        author = video_info.get('author', 'Unknown').replace('/', '_').replace('\\', '_')
-        title = video_info.get('title', 'Unknown').replace('/', '_').replace('\\', '_')
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        path = analysis_path(report_path)
+        try:
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(record, f, ensure_ascii=False, indent=2, default=str)
+            logger.debug(f"结构化分析结果已保存: {path}")
+            return path
+        except Exception as e:
+            logger.warning(f"保存结构化分析结果失败，继续处理主流程: {e}")
+            return None
+    
+    def rerender_report(self, analysis_file: Path, output_dir: Optional[Path] = None) -> Path:
+        """
+        由结构化分析结果重新渲染报告（不调用任何API，沿用原分析时间）
         
-        filename = f"{author}-{title}-{timestamp}.md"
-        output_path = config.OUTPUT_DIR / filename
+        Args:
+            analysis_file: 结构化分析结果文件（*.analysis.json）
+            output_dir: 报告输出目录（可选，默认覆盖原报告）
+            
+        Returns:
+            重建的报告路径
+        """
+        with open(analysis_file, 'r', encoding='utf-8') as f:
+            record = json.load(f)
         
-        # 构建完整报告
-        full_report = f"""# AI外联军师分析报告
+        kind = record.get('kind')
+        if kind == 'video':
+            video_info = record.get('video_info') or {}
+            script_result = self.generate_scripts(AnalysisResult(record.get('analysis') or {}), video_info,
+                                                  timestamp=record.get('timestamp'))
+            content = self.render_markdown_report(script_result, video_info)
+        elif kind == 'blogger':
+            from .blogger_analyzer import BloggerInfo
+            analysis_result = {key: value for key, value in record.items() if key not in ('kind', 'version')}
+            analysis_result['blogger_info'] = BloggerInfo(**record['blogger_info'])
+            analysis_result['comprehensive_analysis'] = AnalysisResult(record['comprehensive_analysis'])
+            content = self.render_blogger_comprehensive_report(analysis_result)
+        else:
+            raise CustomTemplateError(f"未知的分析结果类型: {kind}（{analysis_file}）")
+        
+        report_path = report_path_for(analysis_file)
+        if output_dir is not None:
+            report_path = output_dir / report_path.name
+        with open(report_path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        return report_path
+    
+    @staticmethod
+    def _sections_note(video_info: Dict[str, Any]) -> str:
+        """URL分段下载报告的提示（完整下载时为空）"""
+        if not video_info.get('sections'):
+            return ""
+        return (f"\n> ✂️ **分段下载**: 仅转录了 {video_info['sections']}"
+                f"（共 {video_info.get('sections_seconds', 0):.0f}秒 / 全长 {video_info.get('duration', 0):.0f}秒）\n")
+    
+    @staticmethod
+    def _quick_scan_note(video_info: Dict[str, Any]) -> str:
+        """快速扫描报告的提示（非快速扫描时为空行）"""
+        if not video_info.get('quick_scan'):
+            return ""
+        
+        sampled = video_info.get('sampled_seconds') or 0
+        if sampled:
+            coverage = f"仅转录了 {video_info.get('sample_count', 0)} 个采样片段（共 {sampled:.0f}秒 / 全长 {video_info.get('duration', 0):.0f}秒）"
+        else:
+            coverage = "使用已有的完整文本"
+        return f"\n> ⚡ **快速扫描**: {coverage}，采用轻量分析，结论仅供初筛\n"
+    
+    def render_markdown_report(self, script_result: ScriptResult, video_info: Dict[str, Any]) -> str:
+        """
+        渲染单视频分析报告内容（不写文件）
+        
+        Args:
+            script_result: 脚本生成结果
+            video_info: 视频信息
+            
+        Returns:
+            报告Markdown文本
+        """
+        return f"""# AI外联军师分析报告
 
 {script_result.analysis_summary}
 
@@ -269,6 +397,28 @@ class ScriptGenerator:
 *报告生成时间: {script_result.timestamp}*  
 *数据来源: {script_result.input_source}*
 """
+    
+    def save_markdown_report(self, script_result: ScriptResult, video_info: Dict[str, Any]) -> Path:
+        """
+        保存Markdown格式的分析报告（附带结构化分析结果时一并保存，供重建报告使用）
+        
+        Args:
+            script_result: 脚本生成结果
+            video_info: 视频信息
+            
+        Returns:
+            保存的文件路径
+        """
+        # 生成文件名
+        author = video_info.get('author', 'Unknown').replace('/', '_').replace('\\', '_')
+        title = video_info.get('title', 'Unknown').replace('/', '_').replace('\\', '_')
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        
+        filename = f"{author}-{title}-{timestamp}.md"
+        output_path = config.OUTPUT_DIR / filename
+        
+        # 构建完整报告
+        full_report = self.render_markdown_report(script_result, video_info)
         
         try:
             # 保存文件
@@ -276,6 +426,8 @@ class ScriptGenerator:
                 f.write(full_report)
             
             logger.info(f"报告已保存: {output_path}")
+            if script_result.analysis_result is not None:
+                self.save_analysis(output_path, self.video_analysis_record(script_result, video_info))
             return output_path
             
         except Exception as e:
@@ -310,7 +462,7 @@ class ScriptGenerator:
 - **博主**: {video_info.get('author', 'Unknown')}
 - **标题**: {video_info.get('title', 'Unknown')}
 - **时长**: {video_info.get('duration', 0):.1f}秒
-- **来源**: {video_info.get('input_type', 'unknown')}
+- **来源**: {video_info.get('input_type', 'unknown')}{f"（分段下载 {video_info['sections']}）" if video_info.get('sections') else ""}{f"（快速扫描采样 {video_info['sampled_seconds']:.0f}秒）" if video_info.get('sampled_seconds') else ""}
 - **转录时间**: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
 - **字符数**: {len(transcript_text)}
 
@@ -0,0 +1,318 @@
+"""
+本地任务队列模块
+基于SQLite的工作队列：租约 + 可见性超时、重试计数与退避、死信，按任务键去重；
+多个 worker 进程（或共享文件系统的多台主机）直接竞争同一个数据库文件，无需外部消息中间件。
+数据库使用回滚日志模式（WAL 依赖共享内存，不适用于网络文件系统），租约在 BEGIN IMMEDIATE 事务中原子领取
+"""
+
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+from .utils.logger import logger
+from .utils.config import config
+
+# 任务类型：博主级（汇总视频结果并生成综合报告）与视频级（提取、转录、单视频分析）
+JOB_KINDS = ['blogger', 'video']
+
+# 任务状态：queued（可领取或等待退避）、leased（已被 worker 领取）、done、dead（超过最大尝试次数）
+JOB_STATUSES = ['queued', 'leased', 'done', 'dead']
+
+
+def default_queue_path() -> Path:
+    """队列数据库路径（QUEUE_DB_PATH 未设置时位于 OUTPUT_DIR/queue）"""
+    if config.QUEUE_DB_PATH:
+        return Path(config.QUEUE_DB_PATH)
+    return config.OUTPUT_DIR / "queue" / "jobs.sqlite3"
+
+
+def worker_id() -> str:
+    """当前进程的 worker 标识（主机名:进程号）"""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+@dataclass
+class QueueJob:
+    """队列中的一个任务"""
+    id: int
+    kind: str
+    path: str
+    status: str
+    attempts: int
+    max_attempts: int
+    priority: int = 0
+    parent_id: Optional[int] = None
+    lease_owner: Optional[str] = None
+    lease_expires: Optional[float] = None
+    quick_scan: bool = False
+    result: Optional[Dict[str, Any]] = None
+    last_error: Optional[str] = None
+
+    @classmethod
+    def from_row(cls, row: sqlite3.Row) -> "QueueJob":
+        return cls(
+            id=row['id'], kind=row['kind'], path=row['path'], status=row['status'],
+            attempts=row['attempts'], max_attempts=row['max_attempts'], priority=row['priority'],
+            parent_id=row['parent_id'], lease_owner=row['lease_owner'], lease_expires=row['lease_expires'],
+            quick_scan=bool(row['quick_scan']),
+            result=json.loads(row['result']) if row['result'] else None,
+            last_error=row['last_error'],
+        )
+
+
+class JobQueue:
+    """SQLite任务队列（每个进程各自打开一个实例）"""
+
+    def __init__(self, db_path: Optional[Path] = None, visibility_timeout: Optional[float] = None,
+                 max_attempts: Optional[int] = None, retry_backoff: Optional[float] = None):
+        """
+        Args:
+            db_path: 数据库路径（默认见 default_queue_path）
+            visibility_timeout: 租约时长（秒），worker 未续约且超时后任务重新可见
+            max_attempts: 最大尝试次数，超过后进入死信
+            retry_backoff: 重试退避基数（秒），第n次失败后等待 base * 2^(n-1)
+        """
+        self.db_path = Path(db_path) if db_path else default_queue_path()
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.visibility_timeout = visibility_timeout or config.QUEUE_VISIBILITY_TIMEOUT
+        self.max_attempts = max_attempts or config.QUEUE_MAX_ATTEMPTS
+        self.retry_backoff = config.QUEUE_RETRY_BACKOFF if retry_backoff is None else retry_backoff
+
+        # 自动提交模式，写操作显式使用 BEGIN IMMEDIATE 取得写锁；连接在进程内由锁保护（续约线程共用）
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(str(self.db_path), timeout=60, isolation_level=None, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=DELETE")
+        self._conn.execute("PRAGMA busy_timeout=60000")
+        with self._transaction():
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    kind TEXT NOT NULL,
+                    path TEXT NOT NULL,
+                    status TEXT NOT NULL DEFAULT 'queued',
+                    priority INTEGER NOT NULL DEFAULT 0,
+                    parent_id INTEGER,
+                    quick_scan INTEGER NOT NULL DEFAULT 0,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    max_attempts INTEGER NOT NULL,
+                    available_at REAL NOT NULL,
+                    lease_owner TEXT,
+                    lease_expires REAL,
+                    result TEXT,
+                    last_error TEXT,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL,
+                    UNIQUE (kind, path)
+                )
+            """)
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_ready ON jobs (status, available_at)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_parent ON jobs (parent_id)")
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """写事务（BEGIN IMMEDIATE：多个进程之间互斥地领取与更新任务）"""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._conn
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def _query(self, sql: str, params: tuple = ()) -> List[sqlite3.Row]:
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def enqueue(self, kind: str, path: Path, priority: int = 0, parent_id: Optional[int] = None,
+                quick_scan: bool = False, force: bool = False) -> Optional[int]:
+        """
+        添加任务（同一类型与路径的任务只保留一个）
+
+        Args:
+            kind: 任务类型 blogger / video
+            path: 博主目录或视频文件路径
+            priority: 优先级（越大越先领取）
+            parent_id: 所属博主任务（视频级任务）
+            quick_scan: 快速扫描
+            force: 已完成或已进入死信的任务重新入队
+
+        Returns:
+            任务ID；任务已存在且未重新入队时返回None
+        """
+        if kind not in JOB_KINDS:
+            raise ValueError(f"未知的任务类型: {kind}（可选: {', '.join(JOB_KINDS)}）")
+        path = str(Path(path).resolve())
+        now = time.time()
+        with self._transaction() as conn:
+            row = conn.execute("SELECT id, status FROM jobs WHERE kind = ? AND path = ?", (kind, path)).fetchone()
+            if row is None:
+                cursor = conn.execute(
+                    "INSERT INTO jobs (kind, path, priority, parent_id, quick_scan, max_attempts, available_at, "
+                    "created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (kind, path, priority, parent_id, int(quick_scan), self.max_attempts, now, now, now)
+                )
+                return cursor.lastrowid
+            if force and row['status'] in ('done', 'dead'):
+                conn.execute(
+                    "UPDATE jobs SET status = 'queued', attempts = 0, available_at = ?, result = NULL, "
+                    "last_error = NULL, priority = ?, quick_scan = ?, updated_at = ? WHERE id = ?",
+                    (now, priority, int(quick_scan), now, row['id'])
+                )
+                return row['id']
+            if parent_id is not None:
+                conn.execute("UPDATE jobs SET parent_id = ? WHERE id = ?", (parent_id, row['id']))
+            return None
+
+    def lease(self, owner: str, kinds: Optional[List[str]] = None) -> Optional[QueueJob]:
+        """
+        领取一个可执行的任务：排队中且已过退避时间，或租约已过期（worker 崩溃）；
+        同优先级下视频任务先于博主任务，博主任务等待其视频任务完成后再汇总
+
+        Args:
+            owner: worker 标识
+            kinds: 只领取这些类型的任务（默认全部）
+
+        Returns:
+            领取到的任务，没有可执行任务时返回None
+        """
+        now = time.time()
+        kinds = kinds or JOB_KINDS
+        placeholders = ",".join("?" for _ in kinds)
+        with self._transaction() as conn:
+            # 租约过期且已无重试次数的任务进入死信
+            conn.execute(
+                "UPDATE jobs SET status = 'dead', last_error = COALESCE(last_error, '租约超时'), lease_owner = NULL, "
+                "updated_at = ? WHERE status = 'leased' AND lease_expires < ? AND attempts >= max_attempts",
+                (now, now)
+            )
+            row = conn.execute(
+                f"SELECT * FROM jobs WHERE kind IN ({placeholders}) AND "
+                "((status = 'queued' AND available_at <= ?) OR (status = 'leased' AND lease_expires < ?)) "
+                "ORDER BY priority DESC, kind = 'video' DESC, id LIMIT 1",
+                (*kinds, now, now)
+            ).fetchone()
+            if row is None:
+                return None
+            if row['status'] == 'leased':
+                logger.warning(f"任务租约已过期，重新领取: #{row['id']} {row['path']} (原 worker: {row['lease_owner']})")
+            conn.execute(
+                "UPDATE jobs SET status = 'leased', lease_owner = ?, lease_expires = ?, attempts = attempts + 1, "
+                "updated_at = ? WHERE id = ?",
+                (owner, now + self.visibility_timeout, now, row['id'])
+            )
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (row['id'],)).fetchone()
+        return QueueJob.from_row(row)
+
+    def heartbeat(self, job_id: int, owner: str) -> bool:
+        """续约（长时间的ASR期间定期调用）；租约已被他人接管时返回False"""
+        now = time.time()
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET lease_expires = ?, updated_at = ? WHERE id = ? AND status = 'leased' AND lease_owner = ?",
+                (now + self.visibility_timeout, now, job_id, owner)
+            )
+        return cursor.rowcount == 1
+
+    def complete(self, job_id: int, owner: str, result: Optional[Dict[str, Any]] = None) -> bool:
+        """标记任务完成（只有持有租约的 worker 可以提交）"""
+        now = time.time()
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET status = 'done', result = ?, last_error = NULL, lease_owner = NULL, "
+                "lease_expires = NULL, updated_at = ? WHERE id = ? AND status = 'leased' AND lease_owner = ?",
+                (json.dumps(result, ensure_ascii=False, default=str) if result is not None else None,
+                 now, job_id, owner)
+            )
+        if cursor.rowcount != 1:
+            logger.warning(f"提交任务时租约已失效，结果丢弃: #{job_id}")
+        return cursor.rowcount == 1
+
+    def fail(self, job_id: int, owner: str, error: str) -> Optional[str]:
+        """
+        记录一次失败：未超过最大尝试次数时按指数退避重新排队，否则进入死信
+
+        Returns:
+            新状态（queued / dead），租约已失效时返回None
+        """
+        now = time.time()
+        with self._transaction() as conn:
+            row = conn.execute("SELECT attempts, max_attempts FROM jobs WHERE id = ? AND status = 'leased' "
+                               "AND lease_owner = ?", (job_id, owner)).fetchone()
+            if row is None:
+                return None
+            if row['attempts'] >= row['max_attempts']:
+                status, available_at = 'dead', now
+            else:
+                status, available_at = 'queued', now + self.retry_backoff * 2 ** (row['attempts'] - 1)
+            conn.execute(
+                "UPDATE jobs SET status = ?, available_at = ?, last_error = ?, lease_owner = NULL, "
+                "lease_expires = NULL, updated_at = ? WHERE id = ?",
+                (status, available_at, error, now, job_id)
+            )
+        if status == 'dead':
+            logger.error(f"任务超过最大尝试次数，进入死信: #{job_id}, 错误: {error}")
+        return status
+
+    def release(self, job_id: int, owner: str, delay: float = 0.0) -> bool:
+        """归还租约且不计入尝试次数（博主任务等待视频任务完成时使用）"""
+        now = time.time()
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET status = 'queued', attempts = MAX(attempts - 1, 0), available_at = ?, "
+                "lease_owner = NULL, lease_expires = NULL, updated_at = ? "
+                "WHERE id = ? AND status = 'leased' AND lease_owner = ?",
+                (now + delay, now, job_id, owner)
+            )
+        return cursor.rowcount == 1
+
+    def get(self, job_id: int) -> Optional[QueueJob]:
+        rows = self._query("SELECT * FROM jobs WHERE id = ?", (job_id,))
+        return QueueJob.from_row(rows[0]) if rows else None
+
+    def children(self, parent_id: int) -> List[QueueJob]:
+        """博主任务下的视频任务"""
+        rows = self._query("SELECT * FROM jobs WHERE parent_id = ? ORDER BY id", (parent_id,))
+        return [QueueJob.from_row(row) for row in rows]
+
+    def requeue_dead(self) -> int:
+        """死信任务重新入队（重置尝试次数）"""
+        now = time.time()
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET status = 'queued', attempts = 0, available_at = ?, updated_at = ? WHERE status = 'dead'",
+                (now, now)
+            )
+        return cursor.rowcount
+
+    def dead_letters(self) -> List[QueueJob]:
+        rows = self._query("SELECT * FROM jobs WHERE status = 'dead' ORDER BY id")
+        return [QueueJob.from_row(row) for row in rows]
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """
+        按类型与状态统计任务数
+
+        Returns:
+            {kind: {status: count}}
+        """
+        stats = {kind: {status: 0 for status in JOB_STATUSES} for kind in JOB_KINDS}
+        for row in self._query("SELECT kind, status, COUNT(*) AS n FROM jobs GROUP BY kind, status"):
+            stats.setdefault(row['kind'], {})[row['status']] = row['n']
+        return stats
+
+    def has_pending(self) -> bool:
+        """是否还有未完成（排队中或执行中）的任务"""
+        return bool(self._query("SELECT 1 FROM jobs WHERE status IN ('queued', 'leased') LIMIT 1"))
@@ -0,0 +1,285 @@
+"""
+批量运行日志模块
+以追加写入的JSONL记录每个博主任务的状态变化（queued → extracting → transcribing → analyzing → rendered / failed），
+每行写入后立即落盘；崩溃或中断后可按日志断点续跑，运行统计也由日志折叠得到
+"""
+
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+from .utils.logger import logger
+from .utils.config import config
+
+JOB_STATES = ['queued', 'extracting', 'transcribing', 'analyzing', 'rendered', 'failed', 'skipped']
+TERMINAL_STATES = {'rendered', 'skipped'}
+
+# 视频级检查点：单个视频的转录与分析已完成（续跑时直接复用）
+VIDEO_DONE = 'analyzed'
+
+# 运行参数记录使用的任务ID
+RUN_JOB = '__run__'
+
+
+@dataclass
+class JobRecord:
+    """由日志折叠得到的博主任务状态"""
+    job: str
+    state: str = 'queued'
+    blogger_name: str = ''
+    report_path: Optional[str] = None
+    error: Optional[str] = None
+    cost: Optional[float] = None
+    usage: Optional[Dict[str, int]] = None  # 最近一次完成时的LLM用量（含前缀缓存命中）
+    attempts: int = 0
+    started_at: Optional[float] = None
+    ended_at: Optional[float] = None
+    stage_seconds: Dict[str, float] = field(default_factory=dict)  # 最近一次尝试中各阶段耗时
+    videos: Dict[str, Dict[str, Any]] = field(default_factory=dict)  # 已完成的视频分析（按文件名）
+    video_errors: Dict[str, str] = field(default_factory=dict)
+    _state_at: Optional[float] = None
+
+    @property
+    def done(self) -> bool:
+        return self.state in TERMINAL_STATES
+
+    def apply(self, event: Dict[str, Any]):
+        """应用一条日志事件"""
+        state = event['state']
+        ts = event.get('ts', 0.0)
+        video = event.get('video')
+
+        if video:
+            if state == VIDEO_DONE and event.get('result'):
+                self.videos[video] = event['result']
+                self.video_errors.pop(video, None)
+            elif state == 'failed':
+                self.video_errors[video] = event.get('error', '')
+            return
+
+        # 记录上一阶段的耗时
+        if self._state_at is not None and self.state not in TERMINAL_STATES | {'failed', 'queued'}:
+            self.stage_seconds[self.state] = self.stage_seconds.get(self.state, 0.0) + ts - self._state_at
+
+        if state == 'extracting':
+            self.attempts += 1
+            self.started_at = ts
+            self.ended_at = None
+            self.error = None
+            self.stage_seconds = {}
+        elif state in ('rendered', 'failed', 'skipped'):
+            self.ended_at = ts
+            self.error = event.get('error') if state == 'failed' else None
+
+        for key in ('blogger_name', 'report_path', 'cost', 'usage'):
+            if event.get(key) is not None:
+                setattr(self, key, event[key])
+
+        self.state = state
+        self._state_at = ts
+
+    def to_result(self) -> Dict[str, Any]:
+        """转换为批量分析结果条目（与 analyze_single_blogger 的结果格式一致）"""
+        status = {'rendered': 'success', 'failed': 'failed', 'skipped': 'skipped'}.get(self.state, self.state)
+        return {
+            'directory': self.job,
+            'blogger_name': self.blogger_name,
+            'status': status,
+            'error': self.error,
+            'report_path': self.report_path,
+            'start_time': self.started_at,
+            'end_time': self.ended_at,
+            'duration': (self.ended_at - self.started_at) if self.started_at and self.ended_at else 0,
+            'attempts': self.attempts,
+            'stages': dict(self.stage_seconds),
+            'videos_done': len(self.videos),
+            'video_errors': dict(self.video_errors),
+            'cost': self.cost,
+            'usage': self.usage,
+        }
+
+
+class BatchJournal:
+    """追加写入的批量运行日志（线程安全，每条记录写入后 fsync）"""
+
+    def __init__(self, path: Path):
+        """
+        Args:
+            path: 日志文件路径（已存在时在末尾追加，用于续跑）
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._tail_checked = False
+
+    @classmethod
+    def create(cls, name: str = "batch") -> "BatchJournal":
+        """在 OUTPUT_DIR/journals 下新建日志"""
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        return cls(config.OUTPUT_DIR / "journals" / f"{name}_{timestamp}.jsonl")
+
+    def record(self, job: str, state: str, **fields):
+        """
+        追加一条状态变化
+
+        Args:
+            job: 任务ID（博主目录路径）
+            state: 新状态
+            **fields: 附加字段（video、error、report_path 等）
+        """
+        event = {'ts': time.time(), 'job': job, 'state': state, **fields}
+        line = json.dumps(event, ensure_ascii=False, default=str)
+        with self._lock:
+            # 崩溃时最后一行可能只写了一半，续跑时先换行，避免与新记录粘连
+            if not self._tail_checked:
+                self._tail_checked = True
+                if self.path.exists() and self.path.stat().st_size > 0:
+                    with open(self.path, 'rb') as f:
+                        f.seek(-1, os.SEEK_END)
+                        if f.read(1) != b"\n":
+                            line = "\n" + line
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(line + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+
+    def progress_for(self, job: str):
+        """返回绑定到某个任务的进度回调（供 BloggerAnalyzer 使用）"""
+        return lambda state, **fields: self.record(job, state, **fields)
+
+    def record_result(self, result: Dict[str, Any]):
+        """按 analyze_single_blogger 的结果记录任务的终态（rendered / failed）"""
+        state = 'rendered' if result['status'] == 'success' else 'failed'
+        fields = {k: result.get(k) for k in ('blogger_name', 'report_path', 'error', 'cost', 'usage')
+                  if result.get(k) is not None}
+        self.record(result['directory'], state, **fields)
+
+    def completed_videos(self, job: str, records: Optional[Dict[str, "JobRecord"]] = None) -> Dict[str, Any]:
+        """
+        某个任务中已完成转录与分析的视频（续跑时复用，不再调用ASR/LLM）
+
+        Returns:
+            文件名 -> VideoAnalysis
+        """
+        from .blogger_analyzer import VideoAnalysis
+        records = self.replay() if records is None else records
+        record = records.get(job)
+        if record is None:
+            return {}
+        return {name: VideoAnalysis.from_dict(data) for name, data in record.videos.items()}
+
+    def events(self) -> Iterator[Dict[str, Any]]:
+        """读取全部事件（跳过崩溃时写了一半的行）"""
+        if not self.path.exists():
+            return
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line_no, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    event = json.loads(line)
+                except json.JSONDecodeError:
+                    logger.warning(f"跳过无法解析的日志行: {self.path.name}:{line_no}")
+                    continue
+                if isinstance(event, dict) and 'job' in event and 'state' in event:
+                    yield event
+
+    def pending_jobs(self, records: Optional[Dict[str, JobRecord]] = None) -> List[str]:
+        """未完成的任务（按入队顺序；失败的任务续跑时重试）"""
+        records = self.replay() if records is None else records
+        return [job for job, record in records.items() if not record.done]
+
+    def run_config(self) -> Dict[str, Any]:
+        """最近一次记录的运行参数"""
+        run = {}
+        for event in self.events():
+            if event['job'] == RUN_JOB:
+                run = {k: v for k, v in event.items() if k not in ('ts', 'job', 'state')}
+        return run
+
+    def spent(self) -> float:
+        """日志中记录的累计花费（元，含失败后重试的每一次尝试）"""
+        return sum(event['cost'] for event in self.events()
+                   if event['job'] != RUN_JOB and isinstance(event.get('cost'), (int, float)))
+
+    def elapsed(self) -> float:
+        """
+        日志中记录的累计运行秒数（每个博主每一次尝试从开始提取到终态的耗时之和）
+
+        中断时未到达终态的尝试计到该博主最后一条记录为止
+        """
+        total = 0.0
+        started: Dict[str, float] = {}
+        last_at: Dict[str, float] = {}
+        for event in self.events():
+            job = event['job']
+            if job == RUN_JOB or event.get('video'):
+                continue
+            ts = event.get('ts', 0.0)
+            state = event['state']
+            if state == 'extracting':
+                if job in started:
+                    total += last_at[job] - started[job]
+                started[job] = ts
+            elif state in ('rendered', 'failed', 'skipped') and job in started:
+                total += ts - started.pop(job)
+            last_at[job] = ts
+        for job, ts in started.items():
+            total += last_at[job] - ts
+        return total
+
+    def replay(self) -> Dict[str, JobRecord]:
+        """
+        折叠日志得到每个任务的最新状态（按首次入队顺序）
+
+        Returns:
+            任务ID -> 任务状态
+        """
+        records: Dict[str, JobRecord] = {}
+        for event in self.events():
+            job = event['job']
+            if job == RUN_JOB:
+                continue
+            if job not in records:
+                records[job] = JobRecord(job=job)
+            records[job].apply(event)
+        return records
+
+    def summary(self, records: Optional[Dict[str, JobRecord]] = None) -> Dict[str, Any]:
+        """
+        由日志折叠出运行统计
+
+        Returns:
+            与 batch_analyze 返回格式一致的统计字典
+        """
+        records = self.replay() if records is None else records
+        results = [r.to_result() for r in records.values()]
+        by_status: Dict[str, List[Dict[str, Any]]] = {}
+        for result in results:
+            by_status.setdefault(result['status'], []).append(result)
+
+        processed = [r for r in results if r['status'] in ('success', 'failed')]
+        costs = [r['cost'] for r in results if r['cost'] is not None]
+        usage: Dict[str, int] = {}
+        for result in results:
+            for key, value in (result['usage'] or {}).items():
+                usage[key] = usage.get(key, 0) + value
+        return {
+            'journal': str(self.path),
+            'total': len(results),
+            'processed': len(processed),
+            'success': len(by_status.get('success', [])),
+            'failed': len(by_status.get('failed', [])),
+            'skipped': len(by_status.get('skipped', [])),
+            'pending': len(results) - len(processed) - len(by_status.get('skipped', [])),
+            'results': processed,
+            'failed_analyses': by_status.get('failed', []),
+            'spent': sum(costs) if costs else None,
+            'usage': usage,
+        }
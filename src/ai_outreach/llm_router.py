@@ -0,0 +1,301 @@
+"""
+LLM多提供商路由模块
+按权重在健康的提供商之间分配请求；主请求耗时超过该提供商历史延迟的分位数时，
+向另一个提供商发送对冲（hedged）副本，取最先返回且有效的响应；
+连续失败的提供商进入冷却期，期间只作为最后的兜底
+"""
+
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .utils.logger import logger
+
+# 延迟直方图的桶上界（秒），大致按1.5倍递增，覆盖短输出到长综合分析
+LATENCY_BUCKETS = [0.5, 1, 2, 3, 5, 8, 12, 18, 27, 40, 60, 90, 135, 200, 300]
+
+
+def has_content(response: Any) -> bool:
+    """默认的响应校验：首个候选包含非空文本"""
+    try:
+        content = response.choices[0].message.content
+    except (AttributeError, IndexError, TypeError):
+        return False
+    return isinstance(content, str) and bool(content.strip())
+
+
+class LatencyHistogram:
+    """固定分桶的延迟直方图（只计成功响应）"""
+
+    def __init__(self, buckets: Optional[List[float]] = None):
+        self.buckets = list(buckets or LATENCY_BUCKETS)
+        # 最后一个计数对应超过最大桶上界的样本
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+
+    def record(self, seconds: float):
+        index = len(self.buckets)
+        for i, bound in enumerate(self.buckets):
+            if seconds <= bound:
+                index = i
+                break
+        self.counts[index] += 1
+        self.count += 1
+        self.total += seconds
+
+    def percentile(self, p: float) -> Optional[float]:
+        """第p百分位所在桶的上界（无样本时返回None，超出最大桶时返回最大上界）"""
+        if not self.count:
+            return None
+        target = self.count * p / 100
+        cumulative = 0
+        for i, count in enumerate(self.counts):
+            cumulative += count
+            if cumulative >= target and count:
+                return self.buckets[min(i, len(self.buckets) - 1)]
+        return self.buckets[-1]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'count': self.count,
+            'mean': round(self.total / self.count, 3) if self.count else None,
+            'p50': self.percentile(50),
+            'p95': self.percentile(95),
+            'buckets': {str(bound): count for bound, count in zip(self.buckets + ['inf'], self.counts) if count},
+        }
+
+
+@dataclass
+class ProviderEndpoint:
+    """一个LLM提供商：OpenAI兼容客户端、模型名与路由权重，以及运行统计"""
+    name: str
+    client: Any
+    model: str
+    weight: float = 1.0
+    # 按输出上限（max_tokens）分别统计延迟，短输出与长输出的耗时不可比
+    histograms: Dict[int, LatencyHistogram] = field(default_factory=dict)
+    requests: int = 0
+    failures: int = 0
+    consecutive_failures: int = 0
+    unhealthy_until: float = 0.0
+    hedges: int = 0  # 作为对冲请求被发出的次数
+    hedge_wins: int = 0  # 对冲请求先于主请求返回的次数
+
+    def histogram(self, max_tokens: int) -> LatencyHistogram:
+        if max_tokens not in self.histograms:
+            self.histograms[max_tokens] = LatencyHistogram()
+        return self.histograms[max_tokens]
+
+    def healthy(self, now: Optional[float] = None) -> bool:
+        return (now if now is not None else time.time()) >= self.unhealthy_until
+
+
+class LLMRouter:
+    """
+    多提供商请求路由
+
+    用法与 client.chat.completions.create 相同（model 由各提供商自行填入，可按提供商覆盖）：
+        response = router.complete(messages=[...], temperature=0.3, max_tokens=2000,
+                                   models={'openai': 'gpt-4o-mini'})
+    """
+
+    def __init__(self, endpoints: List[ProviderEndpoint], hedge_percentile: float = 95,
+                 hedge_min_seconds: float = 10, hedge_min_samples: int = 20,
+                 failure_threshold: int = 3, cooldown: float = 60,
+                 validate: Callable[[Any], bool] = has_content,
+                 on_response: Optional[Callable[[Any], None]] = None,
+                 rng: Optional[random.Random] = None):
+        """
+        Args:
+            endpoints: 提供商列表（至少一个）
+            hedge_percentile: 触发对冲的延迟分位数（0 表示关闭对冲）
+            hedge_min_seconds: 对冲等待时间下限（秒）
+            hedge_min_samples: 延迟样本数达到该值后才启用对冲
+            failure_threshold: 连续失败多少次后进入冷却
+            cooldown: 冷却时长（秒）
+            validate: 响应校验函数，无效响应视为失败
+            on_response: 每个成功响应的回调（包括对冲中落败的响应，用于准确累计token用量）
+            rng: 随机数生成器（测试时可固定种子）
+        """
+        if not endpoints:
+            raise ValueError("至少需要一个LLM提供商")
+        self.endpoints = list(endpoints)
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_seconds = hedge_min_seconds
+        self.hedge_min_samples = hedge_min_samples
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.validate = validate
+        self.on_response = on_response
+        self._rng = rng or random.Random()
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    @property
+    def primary(self) -> ProviderEndpoint:
+        return self.endpoints[0]
+
+    def _pool(self) -> ThreadPoolExecutor:
+        # 只有多个提供商时才需要线程池；落败的对冲请求在后台跑完，因此预留足够线程
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=8 * len(self.endpoints),
+                                                    thread_name_prefix="llm-router")
+            return self._executor
+
+    def candidates(self) -> List[ProviderEndpoint]:
+        """本次请求的提供商顺序：按权重随机选出首选，其余健康的按权重降序，冷却中的排在最后"""
+        now = time.time()
+        with self._lock:
+            healthy = [e for e in self.endpoints if e.healthy(now) and e.weight > 0]
+            cooling = [e for e in self.endpoints if e not in healthy]
+        if not healthy:
+            return sorted(cooling, key=lambda e: e.unhealthy_until)
+
+        first = self._rng.choices(healthy, weights=[e.weight for e in healthy])[0]
+        rest = sorted((e for e in healthy if e is not first), key=lambda e: -e.weight)
+        return [first] + rest + sorted(cooling, key=lambda e: e.unhealthy_until)
+
+    def hedge_delay(self, endpoint: ProviderEndpoint, max_tokens: int) -> Optional[float]:
+        """主请求等待多久后发出对冲请求（样本不足或关闭对冲时返回None）"""
+        if self.hedge_percentile <= 0:
+            return None
+        with self._lock:
+            histogram = endpoint.histograms.get(max_tokens)
+            if histogram is None or histogram.count < self.hedge_min_samples:
+                return None
+            return max(self.hedge_min_seconds, histogram.percentile(self.hedge_percentile))
+
+    def _attempt(self, endpoint: ProviderEndpoint, kwargs: Dict[str, Any],
+                 models: Optional[Dict[str, str]] = None) -> Tuple[Any, bool]:
+        """向单个提供商发送请求，记录延迟与健康状态，返回 (响应, 是否有效)"""
+        model = models.get(endpoint.name, endpoint.model) if models else endpoint.model
+        started = time.time()
+        with self._lock:
+            endpoint.requests += 1
+        try:
+            response = endpoint.client.chat.completions.create(model=model, **kwargs)
+        except Exception:
+            self._mark_failure(endpoint)
+            raise
+
+        if self.on_response is not None:
+            self.on_response(response)
+        valid = self.validate(response)
+        with self._lock:
+            endpoint.histogram(kwargs.get('max_tokens', 0)).record(time.time() - started)
+            if valid:
+                endpoint.consecutive_failures = 0
+                endpoint.unhealthy_until = 0.0
+        if not valid:
+            self._mark_failure(endpoint)
+        return response, valid
+
+    def _mark_failure(self, endpoint: ProviderEndpoint):
+        with self._lock:
+            endpoint.failures += 1
+            endpoint.consecutive_failures += 1
+            if endpoint.consecutive_failures >= self.failure_threshold:
+                endpoint.unhealthy_until = time.time() + self.cooldown
+                logger.warning(f"LLM提供商 {endpoint.name} 连续失败 {endpoint.consecutive_failures} 次，"
+                               f"冷却 {self.cooldown:.0f} 秒")
+
+    def complete(self, models: Optional[Dict[str, str]] = None, **kwargs) -> Any:
+        """
+        发送一次对话请求
+
+        Args:
+            models: 按提供商覆盖模型名（可选，未列出的提供商使用其默认模型）
+            **kwargs: 透传给 chat.completions.create 的参数（messages、temperature、max_tokens 等）
+
+        Returns:
+            最先返回且通过校验的响应；所有提供商都无有效响应时返回首个无效响应
+
+        Raises:
+            所有提供商都调用失败时抛出最后一个异常
+        """
+        order = self.candidates()
+        if len(order) == 1:
+            return self._attempt(order[0], kwargs, models)[0]
+
+        max_tokens = kwargs.get('max_tokens', 0)
+        pool = self._pool()
+        remaining = list(order)
+        pending: Dict[Any, ProviderEndpoint] = {}
+        hedged = False
+        fallback = None
+        last_error: Optional[Exception] = None
+
+        def launch():
+            endpoint = remaining.pop(0)
+            pending[pool.submit(self._attempt, endpoint, kwargs, models)] = endpoint
+            return endpoint
+
+        # 当前等待的请求（故障转移后为替代的提供商），对冲延迟按其延迟分布计算
+        current = launch()
+        while pending:
+            delay = None
+            if not hedged and remaining and len(pending) == 1:
+                delay = self.hedge_delay(current, max_tokens)
+            done, _ = wait(list(pending), timeout=delay, return_when=FIRST_COMPLETED)
+
+            if not done:
+                # 主请求超过延迟分位数仍未返回：向下一个提供商发送对冲副本
+                hedged = True
+                endpoint = launch()
+                with self._lock:
+                    endpoint.hedges += 1
+                logger.info(f"LLM请求超过 {delay:.1f}s 未返回（{current.name}），对冲至 {endpoint.name}")
+                continue
+
+            for future in done:
+                endpoint = pending.pop(future)
+                try:
+                    response, valid = future.result()
+                except Exception as e:
+                    last_error = e
+                    logger.warning(f"LLM提供商 {endpoint.name} 调用失败: {e}")
+                    continue
+                if valid:
+                    if hedged and endpoint is not current:
+                        with self._lock:
+                            endpoint.hedge_wins += 1
+                    return response
+                logger.warning(f"LLM提供商 {endpoint.name} 返回无效响应")
+                if fallback is None:
+                    fallback = response
+
+            if not pending and remaining:
+                # 已发出的请求都失败：故障转移到下一个提供商
+                current = launch()
+                logger.info(f"LLM请求故障转移至 {current.name}")
+
+        if fallback is not None:
+            return fallback
+        raise last_error
+
+    def stats(self) -> List[Dict[str, Any]]:
+        """各提供商的请求数、失败数、对冲次数与延迟分布"""
+        now = time.time()
+        with self._lock:
+            return [{
+                'name': e.name,
+                'model': e.model,
+                'weight': e.weight,
+                'healthy': e.healthy(now),
+                'requests': e.requests,
+                'failures': e.failures,
+                'hedges': e.hedges,
+                'hedge_wins': e.hedge_wins,
+                'latency': {str(tokens): h.to_dict() for tokens, h in sorted(e.histograms.items())},
+            } for e in self.endpoints]
+
+    def close(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False)
@@ -0,0 +1,163 @@
+"""
+博主综合分析的分层汇总（map-reduce）模块
+视频较多时不再把全部转录拼接为一次超长调用：先把视频分组并行压缩为结构化摘要（map），
+再逐层合并摘要（reduce）直到数量不超过合并宽度，最终摘要作为综合分析的输入；
+总耗时取决于汇总树的深度，而不是转录总长度
+"""
+
+import json
+import math
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+from .utils.config import config
+from .utils.exceptions import AnalysisError
+from .utils.logger import logger
+
+# 摘要中的列表字段（本地合并时取并集）与文本字段（本地合并时取首个非空值）
+DIGEST_LIST_FIELDS = ['main_topics', 'core_values', 'golden_quotes', 'pain_points', 'value_propositions',
+                      'trust_hooks', 'empathy_anchors', 'value_map', 'soft_signals']
+DIGEST_TEXT_FIELDS = ['content_style', 'tone', 'target_audience']
+DIGEST_LIST_LIMIT = 8
+
+
+def use_map_reduce(total_chars: float) -> bool:
+    """按 COMPREHENSIVE_MODE 与转录总字符数决定是否分层汇总"""
+    mode = config.COMPREHENSIVE_MODE
+    if mode == 'mapreduce':
+        return True
+    if mode == 'auto':
+        return total_chars > config.MAPREDUCE_THRESHOLD_CHARS
+    return False
+
+
+def group_by_size(sizes: List[float], max_chars: float, max_items: int) -> List[List[int]]:
+    """
+    按原顺序把条目分组，每组字符数不超过 max_chars、条目数不超过 max_items（单个超长条目独占一组）
+
+    Returns:
+        每组条目的下标列表
+    """
+    groups: List[List[int]] = []
+    current: List[int] = []
+    current_chars = 0.0
+    for i, size in enumerate(sizes):
+        if current and (current_chars + size > max_chars or len(current) >= max_items):
+            groups.append(current)
+            current, current_chars = [], 0.0
+        current.append(i)
+        current_chars += size
+    if current:
+        groups.append(current)
+    return groups
+
+
+def reduce_calls(count: int, fan_in: int) -> List[int]:
+    """从 count 个摘要合并到不超过 fan_in 个时，每一层的合并调用数"""
+    levels = []
+    fan_in = max(2, fan_in)
+    while count > fan_in:
+        count = math.ceil(count / fan_in)
+        levels.append(count)
+    return levels
+
+
+def merge_locally(digests: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """不调用模型的摘要合并（合并调用失败时兜底，保证汇总树总能收敛）"""
+    merged: Dict[str, Any] = {}
+    for field in DIGEST_LIST_FIELDS:
+        items = []
+        for digest in digests:
+            for item in digest.get(field) or []:
+                if item not in items:
+                    items.append(item)
+        merged[field] = items[:DIGEST_LIST_LIMIT]
+    for field in DIGEST_TEXT_FIELDS:
+        merged[field] = next((d[field] for d in digests if d.get(field)), '')
+    merged['video_count'] = sum(d.get('video_count', 0) for d in digests)
+    return merged
+
+
+def render_digests(digests: List[Dict[str, Any]]) -> str:
+    """摘要列表渲染为模型输入"""
+    return "\n\n".join(
+        f"【摘要{i}（{digest.get('video_count', 0)}个视频）】\n{json.dumps(digest, ensure_ascii=False)}"
+        for i, digest in enumerate(digests, 1)
+    )
+
+
+class MapReduceSummarizer:
+    """分层汇总执行器"""
+
+    def __init__(self, analyzer, group_chars: Optional[int] = None, group_size: Optional[int] = None,
+                 fan_in: Optional[int] = None, workers: Optional[int] = None):
+        """
+        Args:
+            analyzer: ContentAnalyzer（提供 summarize_for_synthesis）
+            group_chars: 每组视频的转录字符上限（默认读取配置）
+            group_size: 每组视频数上限
+            fan_in: 每次合并的摘要数
+            workers: 并行调用数
+        """
+        self.analyzer = analyzer
+        self.group_chars = group_chars or config.MAPREDUCE_GROUP_CHARS
+        self.group_size = group_size or config.MAPREDUCE_GROUP_SIZE
+        self.fan_in = max(2, fan_in or config.MAPREDUCE_FAN_IN)
+        self.workers = max(1, workers or config.MAPREDUCE_WORKERS)
+
+    def summarize(self, sections: List[Tuple[str, str]]) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+        """
+        汇总多个视频
+
+        Args:
+            sections: (视频标题, 转录文本) 列表
+
+        Returns:
+            (不超过 fan_in 个的最终摘要, 统计信息：分组数、层数、失败的分组数)
+
+        Raises:
+            AnalysisError: 所有分组摘要都失败
+        """
+        groups = group_by_size([len(text) for _, text in sections], self.group_chars, self.group_size)
+        logger.info(f"分层汇总: {len(sections)} 个视频分为 {len(groups)} 组")
+
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="map-reduce") as pool:
+            inputs = ["\n\n".join(f"【{sections[i][0]}】{sections[i][1]}" for i in group) for group in groups]
+            results = list(pool.map(self._map_one, inputs))
+
+            digests = []
+            for group, digest in zip(groups, results):
+                if digest is not None:
+                    digest['video_count'] = len(group)
+                    digests.append(digest)
+            failed = len(groups) - len(digests)
+            if not digests:
+                raise AnalysisError("所有视频分组摘要均失败")
+
+            levels = 1
+            while len(digests) > self.fan_in:
+                batches = [digests[i:i + self.fan_in] for i in range(0, len(digests), self.fan_in)]
+                digests = list(pool.map(self._reduce_one, batches))
+                levels += 1
+                logger.info(f"分层汇总第 {levels} 层: 合并为 {len(digests)} 份摘要")
+
+        return digests, {'groups': len(groups), 'levels': levels, 'failed_groups': failed}
+
+    def _map_one(self, content: str) -> Optional[Dict[str, Any]]:
+        # 单组失败不影响其他分组，综合分析基于其余视频进行
+        try:
+            return self.analyzer.summarize_for_synthesis(content, stage='map')
+        except Exception as e:
+            logger.error(f"视频分组摘要失败，跳过该组: {e}")
+            return None
+
+    def _reduce_one(self, batch: List[Dict[str, Any]]) -> Dict[str, Any]:
+        if len(batch) == 1:
+            return batch[0]
+        try:
+            merged = self.analyzer.summarize_for_synthesis(render_digests(batch), stage='reduce')
+        except Exception as e:
+            logger.warning(f"摘要合并失败，改为本地合并: {e}")
+            return merge_locally(batch)
+        merged['video_count'] = sum(d.get('video_count', 0) for d in batch)
+        return merged
@@ -0,0 +1,140 @@
+"""
+媒体元数据模块
+每个源文件只运行一次ffprobe，结果按 (路径, 大小, 修改时间) 持久化到SQLite，
+供时长路由（短/长音频ASR）、任务调度和成本估算复用
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from .utils.logger import logger
+from .utils.config import config
+from .utils.audio_utils import probe_media, text_subtitle_streams
+
+
+@dataclass
+class MediaInfo:
+    """媒体文件元数据"""
+    path: str
+    size: int
+    mtime_ns: int
+    duration: float = 0.0
+    format_name: str = ""
+    bit_rate: int = 0
+    has_video: bool = False
+    has_audio: bool = False
+    audio_codec: Optional[str] = None
+    sample_rate: int = 0
+    channels: int = 0
+    subtitle_streams: List[Dict[str, Any]] = field(default_factory=list)
+
+    @classmethod
+    def from_ffprobe(cls, key: Tuple[str, int, int], data: Dict[str, Any]) -> "MediaInfo":
+        """由ffprobe输出构造"""
+        fmt = data.get('format') or {}
+        streams = data.get('streams') or []
+        audio = next((s for s in streams if s.get('codec_type') == 'audio'), {})
+
+        duration = float(fmt.get('duration') or audio.get('duration') or 0.0)
+        return cls(
+            path=key[0],
+            size=key[1],
+            mtime_ns=key[2],
+            duration=duration,
+            format_name=fmt.get('format_name', ''),
+            bit_rate=int(fmt.get('bit_rate') or 0),
+            has_video=any(s.get('codec_type') == 'video' and not (s.get('disposition') or {}).get('attached_pic')
+                          for s in streams),
+            has_audio=bool(audio),
+            audio_codec=audio.get('codec_name'),
+            sample_rate=int(audio.get('sample_rate') or 0),
+            channels=int(audio.get('channels') or 0),
+            subtitle_streams=text_subtitle_streams(streams),
+        )
+
+
+class MediaProbe:
+    """带持久化缓存的媒体探测器（线程安全）"""
+
+    def __init__(self, db_path: Optional[Path] = None):
+        """
+        Args:
+            db_path: SQLite数据库路径（默认 OUTPUT_DIR/cache/media_probe.sqlite3）
+        """
+        self.db_path = db_path or (config.OUTPUT_DIR / "cache" / "media_probe.sqlite3")
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False, timeout=30)
+        with self._lock, self._conn:
+            # 回滚日志模式：缓存可放在多台主机共享的目录中（WAL 依赖共享内存，不适用于网络文件系统）
+            self._conn.execute("PRAGMA journal_mode=DELETE")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS media_info (
+                    path TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    mtime_ns INTEGER NOT NULL,
+                    data TEXT NOT NULL,
+                    probed_at REAL NOT NULL,
+                    PRIMARY KEY (path, size, mtime_ns)
+                )
+            """)
+
+    @staticmethod
+    def _key(media_path: Path) -> Tuple[str, int, int]:
+        """缓存键：绝对路径、大小、修改时间（文件被替换或修改后自动失效）"""
+        stat = media_path.stat()
+        return str(media_path.resolve()), stat.st_size, stat.st_mtime_ns
+
+    def get_cached(self, media_path: Path) -> Optional[MediaInfo]:
+        """
+        只查询缓存，不运行ffprobe（用于即时的预检规划）
+
+        Returns:
+            缓存的媒体信息，未缓存或文件已变化时返回None
+        """
+        try:
+            key = self._key(media_path)
+        except OSError:
+            return None
+
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data FROM media_info WHERE path = ? AND size = ? AND mtime_ns = ?", key
+            ).fetchone()
+        return MediaInfo(**json.loads(row[0])) if row else None
+
+    def probe(self, media_path: Path) -> MediaInfo:
+        """
+        获取媒体信息：优先读取缓存，未命中时运行一次ffprobe并写入缓存
+
+        Raises:
+            AudioProcessingError: 探测失败
+        """
+        cached = self.get_cached(media_path)
+        if cached:
+            return cached
+
+        key = self._key(media_path)
+        info = MediaInfo.from_ffprobe(key, probe_media(media_path))
+
+        with self._lock, self._conn:
+            # 同一路径的旧版本条目已失效，一并清理
+            self._conn.execute("DELETE FROM media_info WHERE path = ?", (key[0],))
+            self._conn.execute(
+                "INSERT OR REPLACE INTO media_info (path, size, mtime_ns, data, probed_at) VALUES (?, ?, ?, ?, ?)",
+                (*key, json.dumps(asdict(info), ensure_ascii=False), time.time())
+            )
+
+        logger.debug(f"媒体探测完成: {media_path.name}, 时长: {info.duration:.1f}秒")
+        return info
+
+    def close(self):
+        """关闭数据库连接"""
+        with self._lock:
+            self._conn.close()
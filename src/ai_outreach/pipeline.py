@@ -0,0 +1,185 @@
+"""
+单视频分析流程模块
+URL或本地文件 → 字幕/缓存/ASR获取文本 → 内容分析 → 生成沟通脚本 → 保存报告；
+CLI（analyze / batch）与HTTP服务共用同一流程，进度通过步骤回调报告
+"""
+
+import shutil
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .utils.logger import logger
+from .services import ServiceContainer, get_services
+
+# 步骤回调：step(description)，每个阶段开始时调用一次
+StepCallback = Callable[[str], None]
+
+
+def _no_step(description: str):
+    pass
+
+
+def report_video_info(video_info, input_mode: str, transcript_result=None, quick: bool = False) -> dict:
+    """构造报告与转录文件使用的视频信息（分段下载或快速扫描时附带转录覆盖情况）"""
+    info = {
+        'title': video_info.title,
+        'author': video_info.author,
+        'duration': video_info.duration,
+        'input_type': input_mode
+    }
+    if getattr(video_info, 'sections', None):
+        info.update({
+            'sections': video_info.sections_label,
+            'sections_seconds': video_info.audio_duration,
+        })
+    if quick:
+        sampled = transcript_result is not None and transcript_result.sampled
+        windows = getattr(video_info, 'sample_windows', [])
+        info.update({
+            'quick_scan': True,
+            'sample_count': len(windows) if sampled else 0,
+            'sampled_seconds': sum(w.duration for w in windows) if sampled else 0.0,
+        })
+    return info
+
+
+def analyze_source(url: Optional[str] = None, file: Optional[str] = None,
+                   services: Optional[ServiceContainer] = None, quick: bool = False,
+                   sections: Optional[List[Tuple[float, float]]] = None, full_video: bool = False,
+                   output: Optional[str] = None, video_info=None,
+                   step: Optional[StepCallback] = None) -> Dict[str, Any]:
+    """
+    分析单个视频（URL或本地文件）并保存报告
+
+    Args:
+        url: 视频URL（与 file 二选一）
+        file: 本地视频/音频文件路径
+        services: 服务容器（可选，默认使用进程级共享容器）
+        quick: 快速扫描（只转录采样片段并进行轻量分析）
+        sections: URL模式只下载的区间（parse_sections 的结果）
+        full_video: URL模式下载完整音视频
+        output: 报告的额外输出路径（可选）
+        video_info: 已完成音频提取的文件信息（批量处理时由提取阶段提供，处理后清理其工作区）
+        step: 步骤回调（可选）
+
+    Returns:
+        处理结果：report_path、transcript_path、transcript_source、analysis、video_info 等
+    """
+    from .transcriber import TranscriptResult
+
+    if bool(url) == bool(file):
+        raise ValueError("请提供视频URL或本地文件路径之一")
+
+    services = services or get_services()
+    step = step or _no_step
+    # 本次任务独立的工作区，下载与转码产物都写入其中，结束时整体清理
+    if video_info is not None:
+        workspace = video_info.workspace
+    else:
+        workspace = services.workspaces.create("analyze" if url else Path(file).stem)
+
+    try:
+        transcript_result = None
+        transcript_source = 'asr'
+
+        if url:
+            # URL模式：优先尝试提取字幕
+            step("📥 获取视频信息和字幕...")
+            if full_video:
+                from .fetcher import VideoFetcher
+                fetcher = VideoFetcher(audio_only=False)
+            else:
+                fetcher = services.fetcher
+            video_info = fetcher.extract_subtitles(url)
+            input_mode = "URL"
+
+            if video_info.subtitles:
+                # 字幕作为转录结果，保留每条字幕的时间戳
+                transcript_result = TranscriptResult.from_subtitles(video_info.subtitles, video_info.subtitle_cues)
+                transcript_source = 'subtitles'
+            else:
+                cached_text = services.transcript_cache.get_cached_transcript_by_url(url)
+                if cached_text:
+                    # 该URL已转录过，无需下载
+                    transcript_result = TranscriptResult(cached_text, 1.0)
+                    transcript_source = 'cache'
+                else:
+                    # 没有字幕，回退到音频处理
+                    step("📥 未找到字幕，下载音频...")
+                    video_info = fetcher.download_and_extract_audio(url, workspace=workspace, sections=sections)
+                    if quick:
+                        # 快速扫描：从下载的音频中只截取采样片段送ASR
+                        from .sampling import extract_samples
+                        video_info.sample_windows, video_info.sample_paths = extract_samples(
+                            video_info.audio_path, video_info.audio_duration, workspace.artifact("url_sample.wav")
+                        )
+        else:
+            input_mode = "本地文件"
+            if video_info is None:
+                step("📁 处理本地文件...")
+                video_info = services.file_handler.process_file(file, workspace=workspace, quick_scan=quick)
+            if video_info.subtitles:
+                # 内嵌或同名字幕与URL字幕走同一路径，跳过ASR
+                transcript_result = TranscriptResult.from_subtitles(video_info.subtitles, video_info.subtitle_cues)
+                transcript_source = 'subtitles'
+            elif video_info.cached_transcript:
+                transcript_result = TranscriptResult(video_info.cached_transcript, 1.0)
+                transcript_source = 'cache'
+
+        if transcript_result is None:
+            step("🎤 转录音频内容...")
+            # 根据音频时长选择转录方法（快速扫描时只转录采样片段）
+            source_file = getattr(video_info, 'video_path', None) or (Path(file) if file else None)
+            transcript_result = services.transcriber.transcribe_video(video_info, source_file, workspace=workspace)
+
+            # 采样或分段下载的转录不能作为该URL的完整转录缓存
+            if url and not transcript_result.sampled and not video_info.sections:
+                services.transcript_cache.save_transcript_cache_by_url(
+                    url, transcript_result.text, duration=video_info.duration, confidence=transcript_result.confidence
+                )
+
+        # 保存转录文本（辅助功能，不影响主流程）
+        generator = services.generator
+        video_info_dict = report_video_info(video_info, input_mode, transcript_result, quick)
+        transcript_path = None
+        try:
+            transcript_path = generator.save_transcript_text(transcript_result.text, video_info_dict)
+            if transcript_path:
+                logger.debug(f"转录文本已保存到: {transcript_path}")
+        except Exception as e:
+            logger.warning(f"保存转录文本时出错，继续主流程: {e}")
+
+        step("🧠 AI内容分析...")
+        analysis_result = services.analyzer.analyze_content(
+            transcript_result.text,
+            title=video_info.title,
+            author=video_info.author,
+            quick=quick
+        )
+
+        step("📝 生成沟通脚本...")
+        script_result = generator.generate_scripts(analysis_result, video_info_dict)
+
+        step("💾 保存分析报告...")
+        report_path = generator.save_markdown_report(script_result, video_info_dict)
+        if output:
+            Path(output).parent.mkdir(parents=True, exist_ok=True)
+            shutil.copyfile(report_path, output)
+            report_path = Path(output)
+
+        return {
+            'report_path': str(report_path),
+            'transcript_path': str(transcript_path) if transcript_path else None,
+            'transcript_source': transcript_source,
+            'input_mode': input_mode,
+            'duration': video_info.duration,
+            'text_length': len(transcript_result.text),
+            'author': video_info.author,
+            'title': video_info.title,
+            'analysis': analysis_result,
+            'video_info': video_info,
+        }
+
+    finally:
+        # 清理任务工作区
+        workspace.cleanup()
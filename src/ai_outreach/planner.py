@@ -0,0 +1,310 @@
+"""
+批量运行预检规划模块
+在任何付费调用之前，按博主估算未缓存的ASR时长、LLM输入/输出token、预计耗时与费用，
+按预算（金额或小时数）截取可执行的博主，并在运行时持续检查预算
+"""
+
+import math
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from .utils.logger import logger
+from .utils.config import config
+from .analyzer import stage_settings
+from .map_reduce import group_by_size, reduce_calls, use_map_reduce
+from .scheduler import BloggerJob
+
+# 综合分析输入中博主基础信息等固定部分的字符数，以及每个视频的标题标记
+COMPREHENSIVE_OVERHEAD_CHARS = 300
+PER_VIDEO_OVERHEAD_CHARS = 40
+# 系统提示词的字符数（近似值）
+SYSTEM_PROMPT_CHARS = 120
+
+
+@dataclass
+class CostRates:
+    """单价与吞吐量（默认读取配置）"""
+    asr_per_hour: float = field(default_factory=lambda: config.PRICE_ASR_PER_HOUR)
+    llm_input_per_m: float = field(default_factory=lambda: config.PRICE_LLM_INPUT_PER_M)
+    llm_output_per_m: float = field(default_factory=lambda: config.PRICE_LLM_OUTPUT_PER_M)
+    llm_cached_input_per_m: float = field(default_factory=lambda: config.PRICE_LLM_CACHED_INPUT_PER_M)
+
+    def asr_cost(self, seconds: float) -> float:
+        """ASR费用（元）"""
+        return seconds / 3600 * self.asr_per_hour
+
+    def llm_cost(self, input_tokens: float, output_tokens: float, cached_tokens: float = 0) -> float:
+        """LLM费用（元），cached_tokens 为输入中命中前缀缓存的部分（预估时按未命中计算）"""
+        return ((input_tokens - cached_tokens) * self.llm_input_per_m + cached_tokens * self.llm_cached_input_per_m
+                + output_tokens * self.llm_output_per_m) / 1_000_000
+
+
+@dataclass
+class BloggerPlan:
+    """单个博主的预估"""
+    job: BloggerJob
+    asr_seconds: float = 0.0  # 需要ASR的音频时长
+    cache_hits: int = 0
+    input_tokens: int = 0
+    output_tokens: int = 0
+    wall_seconds: float = 0.0
+    asr_cost: float = 0.0
+    llm_cost: float = 0.0
+    within_budget: bool = True
+
+    @property
+    def cost(self) -> float:
+        """预估总费用（元）"""
+        return self.asr_cost + self.llm_cost
+
+
+@dataclass
+class RunPlan:
+    """整个批次的预估"""
+    plans: List[BloggerPlan]
+    budget_yuan: Optional[float] = None
+    budget_hours: Optional[float] = None
+
+    @property
+    def selected(self) -> List[BloggerPlan]:
+        """预算内可执行的博主"""
+        return [p for p in self.plans if p.within_budget]
+
+    def totals(self, plans: Optional[List[BloggerPlan]] = None) -> Dict[str, float]:
+        """汇总（默认汇总预算内的博主）"""
+        plans = self.selected if plans is None else plans
+        return {
+            'bloggers': len(plans),
+            'videos': sum(len(p.job.media) for p in plans),
+            'cache_hits': sum(p.cache_hits for p in plans),
+            'asr_minutes': sum(p.asr_seconds for p in plans) / 60,
+            'input_tokens': sum(p.input_tokens for p in plans),
+            'output_tokens': sum(p.output_tokens for p in plans),
+            'wall_hours': sum(p.wall_seconds for p in plans) / 3600,
+            'cost': sum(p.cost for p in plans),
+        }
+
+
+class BatchPlanner:
+    """批量运行预检规划器"""
+
+    def __init__(self, rates: Optional[CostRates] = None, quick_scan: bool = False, delay_seconds: float = 0.0):
+        """
+        Args:
+            rates: 单价（默认读取 PRICE_* 配置）
+            quick_scan: 是否为快速扫描（只转录采样片段、使用精简Prompt）
+            delay_seconds: 博主之间的等待时间（计入预计耗时）
+        """
+        self.rates = rates or CostRates()
+        self.quick_scan = quick_scan
+        self.delay_seconds = delay_seconds
+        self._template_chars: Dict[str, int] = {}
+
+    def _prompt_chars(self, template_name: str) -> int:
+        """Prompt模板（不含填充内容）的字符数，模板缺失时按0计算"""
+        if template_name not in self._template_chars:
+            try:
+                text = (config.PROMPTS_DIR / f"{template_name}.txt").read_text(encoding='utf-8')
+            except OSError as e:
+                logger.warning(f"读取Prompt模板失败，按0字符估算: {template_name}, 错误: {e}")
+                text = ""
+            self._template_chars[template_name] = len(text)
+        return self._template_chars[template_name]
+
+    @staticmethod
+    def _tokens(chars: float) -> int:
+        return int(chars * config.PLAN_TOKENS_PER_CHAR)
+
+    def _transcribed_seconds(self, duration: float) -> float:
+        """一个视频实际送ASR的时长（快速扫描时只有采样窗口）"""
+        if not self.quick_scan:
+            return duration
+        sampled = config.QUICK_SCAN_WINDOWS * min(config.QUICK_SCAN_WINDOW_SECONDS, 60.0)
+        return duration if duration <= sampled else sampled
+
+    def estimate(self, job: BloggerJob) -> BloggerPlan:
+        """
+        估算单个博主：缓存命中的视频使用缓存文本的实际长度，未命中的按时长与语速估算文本长度
+
+        Args:
+            job: 调度器的博主调度信息
+
+        Returns:
+            博主预估
+        """
+        plan = BloggerPlan(job=job)
+        digest = stage_settings('digest')
+        comprehensive = stage_settings('comprehensive')
+        output_ratio = config.PLAN_OUTPUT_RATIO
+
+        transcript_chars = 0.0
+        video_chars = []
+        extract_seconds = 0.0
+        for media in job.media:
+            if media.cached:
+                plan.cache_hits += 1
+                chars = media.transcript_chars or media.duration * config.PLAN_CHARS_PER_SECOND
+            else:
+                seconds = self._transcribed_seconds(media.duration)
+                plan.asr_seconds += seconds
+                extract_seconds += seconds / config.PLAN_EXTRACT_SPEED
+                chars = seconds * config.PLAN_CHARS_PER_SECOND
+            transcript_chars += chars
+            video_chars.append(chars)
+            # 每个视频一次摘要提取
+            plan.input_tokens += self._tokens(self._prompt_chars(digest.prompt) + SYSTEM_PROMPT_CHARS + chars)
+            plan.output_tokens += int(digest.max_tokens * output_ratio)
+
+        # 单视频摘要按视频顺序调用
+        llm_seconds = plan.output_tokens / config.PLAN_LLM_TOKENS_PER_SECOND
+
+        # 每个博主一次综合分析，输入为全部转录文本（转录较长时为分层汇总后的摘要）
+        if job.media:
+            synthesis_chars = transcript_chars + PER_VIDEO_OVERHEAD_CHARS * len(job.media)
+            if use_map_reduce(synthesis_chars):
+                synthesis_chars, llm_seconds_tree = self._estimate_map_reduce(plan, video_chars)
+                llm_seconds += llm_seconds_tree
+            plan.input_tokens += self._tokens(
+                self._prompt_chars(comprehensive.prompt) + SYSTEM_PROMPT_CHARS
+                + COMPREHENSIVE_OVERHEAD_CHARS + synthesis_chars
+            )
+            output = int(comprehensive.max_tokens * output_ratio)
+            plan.output_tokens += output
+            llm_seconds += output / config.PLAN_LLM_TOKENS_PER_SECOND
+
+        # 提取在进程池中并行，ASR与LLM调用按视频顺序进行（分层汇总的同层调用并行）
+        workers = max(1, min(config.EXTRACT_WORKERS, len(job.media) or 1))
+        plan.wall_seconds = (
+            extract_seconds / workers
+            + plan.asr_seconds / config.PLAN_ASR_SPEED
+            + llm_seconds
+        )
+        plan.asr_cost = self.rates.asr_cost(plan.asr_seconds)
+        plan.llm_cost = self.rates.llm_cost(plan.input_tokens, plan.output_tokens)
+        return plan
+
+    def _estimate_map_reduce(self, plan: BloggerPlan, video_chars: List[float]) -> Tuple[float, float]:
+        """
+        累加分层汇总（分组摘要与逐层合并）的token预估
+
+        Returns:
+            (最终摘要的字符数, 汇总树的预计耗时（秒，同层调用按并行数分批）)
+        """
+        map_stage, reduce_stage = stage_settings('map'), stage_settings('reduce')
+        output_ratio = config.PLAN_OUTPUT_RATIO
+        workers = max(1, config.MAPREDUCE_WORKERS)
+        digest_output = int(map_stage.max_tokens * output_ratio)
+        digest_chars = digest_output / config.PLAN_TOKENS_PER_CHAR
+
+        sizes = [chars + PER_VIDEO_OVERHEAD_CHARS for chars in video_chars]
+        groups = len(group_by_size(sizes, config.MAPREDUCE_GROUP_CHARS, config.MAPREDUCE_GROUP_SIZE))
+        plan.input_tokens += self._tokens(groups * (self._prompt_chars(map_stage.prompt) + SYSTEM_PROMPT_CHARS)
+                                          + sum(sizes))
+        plan.output_tokens += groups * digest_output
+        seconds = math.ceil(groups / workers) * digest_output / config.PLAN_LLM_TOKENS_PER_SECOND
+
+        count = groups
+        for calls in reduce_calls(groups, config.MAPREDUCE_FAN_IN):
+            output = int(reduce_stage.max_tokens * output_ratio)
+            plan.input_tokens += self._tokens(calls * (self._prompt_chars(reduce_stage.prompt) + SYSTEM_PROMPT_CHARS)
+                                              + count * digest_chars)
+            plan.output_tokens += calls * output
+            seconds += math.ceil(calls / workers) * output / config.PLAN_LLM_TOKENS_PER_SECOND
+            count = calls
+        return count * digest_chars, seconds
+
+    def plan(self, jobs: List[BloggerJob], budget_yuan: Optional[float] = None,
+             budget_hours: Optional[float] = None, spent: float = 0.0, elapsed: float = 0.0) -> RunPlan:
+        """
+        估算整个批次，并按调度顺序截取预算内的博主（第一个超出预算的博主及其后的都不执行）
+
+        Args:
+            jobs: 已排序的博主调度信息
+            budget_yuan: 金额预算（元，可选）
+            budget_hours: 耗时预算（小时，可选）
+            spent: 已花费的金额（元，续跑时为日志中记录的花费）
+            elapsed: 已运行的秒数（续跑时为日志中记录的耗时）
+
+        Returns:
+            批次预估
+        """
+        plans = [self.estimate(job) for job in jobs]
+        exhausted = False
+        for i, plan in enumerate(plans):
+            wall = plan.wall_seconds + (self.delay_seconds if i else 0.0)
+            over_cost = budget_yuan is not None and spent + plan.cost > budget_yuan
+            over_time = budget_hours is not None and elapsed + wall > budget_hours * 3600
+            exhausted = exhausted or over_cost or over_time
+            plan.within_budget = not exhausted
+            if plan.within_budget:
+                spent += plan.cost
+                elapsed += wall
+
+        run_plan = RunPlan(plans, budget_yuan=budget_yuan, budget_hours=budget_hours)
+        totals = run_plan.totals()
+        logger.info(f"预检规划: {totals['bloggers']}/{len(plans)} 个博主在预算内, "
+                    f"ASR {totals['asr_minutes']:.1f}分钟, 预计 ¥{totals['cost']:.2f}, {totals['wall_hours']:.2f}小时")
+        return run_plan
+
+
+class BudgetGuard:
+    """运行时预算检查：LLM费用按实际token用量计，ASR费用按预估的未缓存时长计"""
+
+    def __init__(self, budget_yuan: Optional[float] = None, budget_hours: Optional[float] = None,
+                 rates: Optional[CostRates] = None, spent: float = 0.0, elapsed: float = 0.0):
+        """
+        Args:
+            budget_yuan: 金额预算（元，可选）
+            budget_hours: 耗时预算（小时，可选）
+            rates: 计费单价
+            spent: 已花费的金额（元，续跑时计入日志中记录的花费，避免重新花掉整份预算）
+            elapsed: 已运行的秒数（续跑时计入日志中记录的耗时）
+        """
+        self.budget_yuan = budget_yuan
+        self.budget_hours = budget_hours
+        self.rates = rates or CostRates()
+        self.spent = spent
+        self.started_at = time.monotonic() - elapsed
+
+    @property
+    def elapsed(self) -> float:
+        """已运行秒数"""
+        return time.monotonic() - self.started_at
+
+    def allow(self, plan: BloggerPlan) -> bool:
+        """按已花费与下一个博主的预估判断是否继续"""
+        if self.budget_yuan is not None and self.spent + plan.cost > self.budget_yuan:
+            logger.warning(f"预算不足，停止: 已花费 ¥{self.spent:.2f} + 预估 ¥{plan.cost:.2f} > ¥{self.budget_yuan:.2f}")
+            return False
+        if self.budget_hours is not None and self.elapsed + plan.wall_seconds > self.budget_hours * 3600:
+            logger.warning(f"时间预算不足，停止: 已运行 {self.elapsed / 3600:.2f}小时")
+            return False
+        return True
+
+    def record(self, plan: BloggerPlan, usage_before: Optional[Dict[str, int]] = None,
+               usage_after: Optional[Dict[str, int]] = None) -> float:
+        """
+        记录一个博主的实际花费
+
+        Args:
+            plan: 该博主的预估
+            usage_before: 运行前的累计token用量（ContentAnalyzer.usage_snapshot）
+            usage_after: 运行后的累计token用量
+
+        Returns:
+            本次花费（元）
+        """
+        # 响应不含用量信息时（部分兼容接口）退回预估值
+        if usage_before is not None and usage_after is not None \
+                and usage_after['prompt_tokens'] > usage_before['prompt_tokens']:
+            llm_cost = self.rates.llm_cost(
+                usage_after['prompt_tokens'] - usage_before['prompt_tokens'],
+                usage_after['completion_tokens'] - usage_before['completion_tokens'],
+                usage_after.get('cache_hit_tokens', 0) - usage_before.get('cache_hit_tokens', 0)
+            )
+        else:
+            llm_cost = plan.llm_cost
+        cost = plan.asr_cost + llm_cost
+        self.spent += cost
+        return cost
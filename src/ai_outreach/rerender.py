@@ -0,0 +1,95 @@
+"""
+报告重建模块
+由报告旁保存的结构化分析结果（*.analysis.json）重新渲染报告：修改模板后无需重新分析、不调用任何API，
+大量报告按进程池并行渲染
+"""
+
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from functools import partial
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from .generator import ANALYSIS_SUFFIX, ScriptGenerator
+from .utils.logger import logger
+
+# 少于该数量时在当前进程内渲染（进程池的启动开销大于收益）
+SERIAL_THRESHOLD = 16
+
+# 每个渲染进程复用一个生成器（模板环境只创建一次）
+_generator: Optional[ScriptGenerator] = None
+
+
+@dataclass
+class RerenderSummary:
+    """重建结果统计"""
+    total: int = 0
+    rendered: int = 0
+    failed: List[Tuple[str, str]] = field(default_factory=list)  # (分析结果文件, 错误)
+    elapsed: float = 0.0
+
+
+def find_analysis_files(paths: List[Path]) -> List[Path]:
+    """收集结构化分析结果文件（目录递归查找，文件直接使用），按路径去重排序"""
+    found = set()
+    for path in paths:
+        if path.is_dir():
+            found.update(p.resolve() for p in path.rglob(f"*{ANALYSIS_SUFFIX}"))
+        elif path.name.endswith(ANALYSIS_SUFFIX) and path.exists():
+            found.add(path.resolve())
+    return sorted(found)
+
+
+def _rerender_one(analysis_file: Path, output_dir: Optional[Path] = None) -> Tuple[Path, Optional[str]]:
+    """渲染单个报告，返回 (分析结果文件, 错误信息)"""
+    global _generator
+    try:
+        if _generator is None:
+            _generator = ScriptGenerator()
+        _generator.rerender_report(analysis_file, output_dir)
+        return analysis_file, None
+    except Exception as e:
+        return analysis_file, str(e)
+
+
+def rerender_reports(files: List[Path], workers: Optional[int] = None,
+                     output_dir: Optional[Path] = None) -> RerenderSummary:
+    """
+    批量重建报告
+
+    Args:
+        files: 结构化分析结果文件列表
+        workers: 并行进程数（默认CPU核数）
+        output_dir: 报告输出目录（可选，默认覆盖原报告）
+
+    Returns:
+        重建结果统计
+    """
+    started = time.time()
+    workers = max(1, workers or os.cpu_count() or 1)
+    if output_dir is not None:
+        output_dir.mkdir(parents=True, exist_ok=True)
+    render = partial(_rerender_one, output_dir=output_dir)
+
+    if workers == 1 or len(files) < SERIAL_THRESHOLD:
+        results = [render(path) for path in files]
+    else:
+        logger.info(f"启动报告渲染进程池: {workers} 个进程, {len(files)} 个报告")
+        # 分块提交，减少大批量小任务的进程间通信
+        chunksize = max(1, len(files) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn')) as executor:
+            results = list(executor.map(render, files, chunksize=chunksize))
+
+    summary = RerenderSummary(total=len(files))
+    for path, error in results:
+        if error is None:
+            summary.rendered += 1
+        else:
+            logger.error(f"重建报告失败: {path.name}, 错误: {error}")
+            summary.failed.append((str(path), error))
+    summary.elapsed = time.time() - started
+    logger.info(f"报告重建完成: {summary.rendered}/{summary.total}, 耗时 {summary.elapsed:.1f}秒")
+    return summary
@@ -0,0 +1,150 @@
+"""
+快速扫描采样模块
+为长视频选择K个代表性时间窗口（均匀分布或语音最密集），
+只提取并转录这些片段，用于大批量候选博主的初筛
+"""
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from .utils.logger import logger
+from .utils.config import config
+from .utils.exceptions import AudioProcessingError
+from .utils.audio_utils import extract_audio_windows, measure_speech_ratio
+
+SAMPLING_STRATEGIES = ['even', 'speech']
+
+# 短音频识别接口的时长上限（秒），每个窗口单独走短音频识别
+MAX_WINDOW_SECONDS = 60.0
+
+# speech 策略：候选窗口数量为K的倍数，每个候选只解码中间的一小段估算语音占比
+SPEECH_CANDIDATE_FACTOR = 3
+SPEECH_PROBE_SECONDS = 8.0
+
+
+@dataclass
+class SampleWindow:
+    """采样时间窗口"""
+    start: float
+    duration: float
+
+    @property
+    def end(self) -> float:
+        return self.start + self.duration
+
+
+def plan_even_windows(total_duration: float, count: int, window_seconds: float) -> List[SampleWindow]:
+    """
+    将时长等分为 count 段，在每段中心取一个窗口
+
+    Returns:
+        窗口列表；视频不长于采样总时长时返回空列表（直接完整转录更划算）
+    """
+    if count <= 0 or window_seconds <= 0 or total_duration <= count * window_seconds:
+        return []
+
+    segment = total_duration / count
+    return [
+        SampleWindow(round(segment * i + (segment - window_seconds) / 2, 3), window_seconds)
+        for i in range(count)
+    ]
+
+
+def plan_speech_windows(media_path: Path, total_duration: float, count: int,
+                        window_seconds: float) -> List[SampleWindow]:
+    """
+    从均匀分布的候选窗口中选出语音占比最高的 count 个（按时间顺序返回）
+
+    每个候选窗口只定位解码中间 SPEECH_PROBE_SECONDS 秒，整个文件不会被完整解码；
+    检测失败时回退为均匀分布
+    """
+    candidates = plan_even_windows(total_duration, count * SPEECH_CANDIDATE_FACTOR, window_seconds)
+    if len(candidates) <= count:
+        return plan_even_windows(total_duration, count, window_seconds)
+
+    probe = min(SPEECH_PROBE_SECONDS, window_seconds)
+    scored = []
+    for window in candidates:
+        try:
+            ratio = measure_speech_ratio(media_path, window.start + (window.duration - probe) / 2, probe)
+        except AudioProcessingError as e:
+            logger.warning(f"语音密度检测失败，改用均匀采样: {e}")
+            return plan_even_windows(total_duration, count, window_seconds)
+        scored.append((ratio, window))
+
+    # 同等语音占比时优先靠前的窗口（开头通常包含自我介绍）
+    best = sorted(scored, key=lambda item: (-item[0], item[1].start))[:count]
+    return sorted((window for _, window in best), key=lambda w: w.start)
+
+
+def plan_windows(media_path: Path, total_duration: float, count: Optional[int] = None,
+                 window_seconds: Optional[float] = None, strategy: Optional[str] = None) -> List[SampleWindow]:
+    """
+    按配置选择采样窗口
+
+    Args:
+        media_path: 媒体文件路径
+        total_duration: 媒体总时长（秒）
+        count: 窗口数量（默认读取 QUICK_SCAN_WINDOWS）
+        window_seconds: 窗口时长（默认读取 QUICK_SCAN_WINDOW_SECONDS，不超过60秒）
+        strategy: even / speech（默认读取 QUICK_SCAN_STRATEGY）
+
+    Returns:
+        窗口列表，空列表表示无需采样
+    """
+    count = config.QUICK_SCAN_WINDOWS if count is None else count
+    window_seconds = min(window_seconds or config.QUICK_SCAN_WINDOW_SECONDS, MAX_WINDOW_SECONDS)
+    strategy = strategy or config.QUICK_SCAN_STRATEGY
+
+    if strategy not in SAMPLING_STRATEGIES:
+        logger.warning(f"未知的采样策略: {strategy}，使用 even")
+        strategy = 'even'
+
+    if strategy == 'speech':
+        windows = plan_speech_windows(media_path, total_duration, count, window_seconds)
+    else:
+        windows = plan_even_windows(total_duration, count, window_seconds)
+
+    if windows:
+        logger.info(f"快速扫描采样: {media_path.name}, {len(windows)} 个窗口 × {window_seconds:.0f}秒 ({strategy})")
+    return windows
+
+
+def extract_samples(media_path: Path, total_duration: float, output_path: Path) -> Tuple[List[SampleWindow], List[Path]]:
+    """
+    规划并提取采样窗口（用于已在本地的媒体，如URL模式下载的音频）
+
+    Args:
+        media_path: 媒体文件路径
+        total_duration: 媒体总时长（秒）
+        output_path: 输出路径模板（各窗口写入 {stem}_00{suffix}...）
+
+    Returns:
+        (窗口列表, 各窗口音频路径)；无需采样时均为空列表
+    """
+    windows = plan_windows(media_path, total_duration)
+    if not windows:
+        return [], []
+    return windows, extract_audio_windows(media_path, [(w.start, w.duration) for w in windows], output_path)
+
+
+def sampled_seconds(windows: List[SampleWindow]) -> float:
+    """采样覆盖的总时长"""
+    return sum(w.duration for w in windows)
+
+
+def format_timestamp(seconds: float) -> str:
+    """秒数格式化为 MM:SS（超过1小时为 H:MM:SS）"""
+    seconds = int(seconds)
+    hours, rest = divmod(seconds, 3600)
+    minutes, secs = divmod(rest, 60)
+    return f"{hours}:{minutes:02d}:{secs:02d}" if hours else f"{minutes:02d}:{secs:02d}"
+
+
+def format_sampled_transcript(windows: List[SampleWindow], texts: List[str]) -> str:
+    """将各窗口的转录文本按时间拼接，每段标注起始时间"""
+    return "\n".join(
+        f"[{format_timestamp(window.start)}] {text.strip()}"
+        for window, text in zip(windows, texts) if text and text.strip()
+    )
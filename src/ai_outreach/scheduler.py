@@ -0,0 +1,227 @@
+"""
+博主批量调度模块
+在批量分析前为每个博主目录估算工作量（视频总时长、未缓存时长、缓存命中率），
+并按策略排序：priority（状态与粉丝数）、sjf（最短作业优先）、fair（按分组公平轮转）
+"""
+
+import re
+from collections import defaultdict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from .utils.logger import logger
+from .utils.config import config
+from .utils.exceptions import AudioProcessingError
+from .blogger_analyzer import BloggerInfo, list_blogger_media
+
+SCHEDULE_POLICIES = ['name', 'priority', 'sjf', 'fair']
+
+# 各策略对应的排序键（前缀 - 表示降序），可通过 order_by 覆盖
+POLICY_KEYS = {
+    'name': ['name'],
+    'priority': ['status', '-followers', 'remaining'],
+    'sjf': ['remaining', '-warmth', 'duration'],
+    'fair': ['remaining', '-warmth', 'duration'],  # 组内顺序
+}
+
+FOLLOWER_UNITS = {'k': 1e3, 'w': 1e4, '万': 1e4, 'm': 1e6, '亿': 1e8}
+
+
+def parse_follower_count(value: str) -> int:
+    """
+    解析粉丝数：支持 12000、12,000、1.2万、3w、5k、10万+ 等写法
+
+    Returns:
+        粉丝数，无法解析时返回0
+    """
+    match = re.search(r'(\d+(?:\.\d+)?)\s*([kKwWmM万亿]?)', (value or '').replace(',', ''))
+    if not match:
+        return 0
+    return int(float(match.group(1)) * FOLLOWER_UNITS.get(match.group(2).lower(), 1))
+
+
+@dataclass
+class MediaEstimate:
+    """单个媒体文件的工作量估算"""
+    path: Path
+    duration: float = 0.0
+    cached: bool = False  # 已有完整转录缓存（无需提取与ASR）
+    transcript_chars: int = 0  # 缓存转录的字符数（未缓存时为0）
+
+
+@dataclass
+class BloggerJob:
+    """一个博主目录的调度信息"""
+    directory: Path
+    name: str
+    status: str = ""
+    platform: str = ""
+    follower_count: int = 0
+    media: List[MediaEstimate] = field(default_factory=list)
+
+    @property
+    def duration(self) -> float:
+        """全部视频总时长（秒）"""
+        return sum(m.duration for m in self.media)
+
+    @property
+    def remaining(self) -> float:
+        """未缓存的视频时长（秒），即需要提取与ASR的工作量"""
+        return sum(m.duration for m in self.media if not m.cached)
+
+    @property
+    def warmth(self) -> float:
+        """缓存命中率（0~1）"""
+        return sum(1 for m in self.media if m.cached) / len(self.media) if self.media else 0.0
+
+
+class BloggerScheduler:
+    """博主目录调度器"""
+
+    def __init__(self, info_parser: Callable[[Path], BloggerInfo], transcript_cache=None, media_probe=None,
+                 status_priority: Optional[List[str]] = None):
+        """
+        Args:
+            info_parser: 博主信息文件解析函数（BloggerAnalyzer.parse_blogger_info_file）
+            transcript_cache: 转录缓存（可选，用于判断缓存命中）
+            media_probe: 媒体探测器（可选，用于获取视频时长）
+            status_priority: 状态优先级，靠前的优先（默认读取 SCHEDULE_STATUS_PRIORITY）
+        """
+        self.info_parser = info_parser
+        self.transcript_cache = transcript_cache
+        self.media_probe = media_probe
+        self.status_priority = config.SCHEDULE_STATUS_PRIORITY if status_priority is None else status_priority
+
+    def _estimate_media(self, media_path: Path) -> MediaEstimate:
+        """估算单个媒体：优先读取转录缓存中的时长，其次媒体元数据缓存，最后运行一次ffprobe"""
+        estimate = MediaEstimate(media_path)
+
+        entry = self.transcript_cache.get_cache_info_by_source(media_path) if self.transcript_cache else None
+        if entry:
+            estimate.cached = True
+            estimate.duration = float(entry.get('duration') or 0.0)
+            estimate.transcript_chars = int(entry.get('text_length') or 0)
+            if estimate.duration:
+                return estimate
+
+        if self.media_probe is not None:
+            try:
+                info = self.media_probe.get_cached(media_path) or self.media_probe.probe(media_path)
+                estimate.duration = info.duration
+            except AudioProcessingError as e:
+                logger.warning(f"获取媒体时长失败，按0计算: {media_path.name}, 错误: {e}")
+        return estimate
+
+    def survey(self, directory: Path) -> BloggerJob:
+        """
+        读取博主目录的调度信息（不产生任何付费调用）
+
+        Args:
+            directory: 博主目录
+
+        Returns:
+            调度信息
+        """
+        info_files = list(directory.glob("人物 - *.md"))
+        job = BloggerJob(directory=directory, name=directory.name)
+        if info_files:
+            try:
+                info = self.info_parser(info_files[0])
+                job.name = info.name
+                job.status = info.status
+                job.platform = info.platform
+                job.follower_count = parse_follower_count(info.follower_count)
+            except Exception as e:
+                logger.warning(f"解析博主信息失败: {directory.name}, 错误: {e}")
+
+        job.media = [self._estimate_media(path) for path in list_blogger_media(directory)]
+        return job
+
+    def _status_rank(self, status: str) -> int:
+        """状态在优先级列表中的位置，未列出的状态排在最后"""
+        status = (status or "").strip()
+        return self.status_priority.index(status) if status in self.status_priority else len(self.status_priority)
+
+    def _sort_value(self, job: BloggerJob, key: str):
+        """单个排序键的取值"""
+        if key == 'name':
+            return job.directory.name
+        if key == 'status':
+            return self._status_rank(job.status)
+        if key == 'followers':
+            return job.follower_count
+        if key in ('duration', 'remaining', 'warmth'):
+            return getattr(job, key)
+        raise ValueError(f"未知的排序键: {key}（可选: name, status, followers, duration, remaining, warmth）")
+
+    def sort(self, jobs: List[BloggerJob], keys: List[str]) -> List[BloggerJob]:
+        """
+        按排序键排序（稳定排序，前缀 - 表示降序，最后以目录名兜底）
+
+        Raises:
+            ValueError: 未知的排序键
+        """
+        ordered = sorted(jobs, key=lambda j: j.directory.name)
+        for key in reversed(keys):
+            descending = key.startswith('-')
+            name = key.lstrip('-')
+            ordered.sort(key=lambda j: self._sort_value(j, name), reverse=descending)
+        return ordered
+
+    def fair_share(self, jobs: List[BloggerJob], keys: List[str], group_by: str = 'platform') -> List[BloggerJob]:
+        """
+        公平轮转：每次从已分配工作量（未缓存时长）最少的分组中取下一个任务，
+        组内按排序键排序，避免某个分组的大量长视频阻塞其他分组
+
+        Args:
+            jobs: 调度信息列表
+            keys: 组内排序键
+            group_by: 分组字段（platform / status）
+        """
+        groups: Dict[str, List[BloggerJob]] = defaultdict(list)
+        for job in self.sort(jobs, keys):
+            groups[getattr(job, group_by, "") or "未知"].append(job)
+
+        allocated = {group: 0.0 for group in groups}
+        ordered = []
+        while groups:
+            group = min(groups, key=lambda g: (allocated[g], g))
+            job = groups[group].pop(0)
+            ordered.append(job)
+            # 已缓存的任务也计入少量工作量，保证轮转前进
+            allocated[group] += max(job.remaining, 1.0)
+            if not groups[group]:
+                del groups[group]
+        return ordered
+
+    def schedule(self, directories: List[Path], policy: Optional[str] = None, order_by: Optional[List[str]] = None,
+                 group_by: Optional[str] = None) -> List[BloggerJob]:
+        """
+        估算并排序博主目录
+
+        Args:
+            directories: 博主目录列表
+            policy: 调度策略 name / priority / sjf / fair（默认读取 SCHEDULE_POLICY）
+            order_by: 自定义排序键（可选，覆盖策略的默认排序键）
+            group_by: fair 策略的分组字段（默认读取 SCHEDULE_FAIR_KEY）
+
+        Returns:
+            排序后的调度信息
+
+        Raises:
+            ValueError: 未知的策略或排序键
+        """
+        policy = policy or config.SCHEDULE_POLICY
+        if policy not in SCHEDULE_POLICIES:
+            raise ValueError(f"未知的调度策略: {policy}（可选: {', '.join(SCHEDULE_POLICIES)}）")
+        keys = order_by or POLICY_KEYS[policy]
+
+        jobs = [self.survey(directory) for directory in directories]
+        if policy == 'fair':
+            ordered = self.fair_share(jobs, keys, group_by or config.SCHEDULE_FAIR_KEY)
+        else:
+            ordered = self.sort(jobs, keys)
+
+        logger.info(f"调度策略: {policy}（排序键: {', '.join(keys)}），共 {len(ordered)} 个博主目录")
+        return ordered
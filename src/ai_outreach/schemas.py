@@ -0,0 +1,186 @@
+"""
+结构化输出模式模块
+用Pydantic模型描述各分析阶段要求模型返回的JSON字段，校验模型输出并定位缺失或格式不正确的字段，
+供分析器只针对这些字段补充请求，而不是整体丢弃响应
+"""
+
+from typing import Annotated, Any, Dict, List, Tuple, Type, get_origin
+
+from pydantic import BaseModel, BeforeValidator, ConfigDict, Field, ValidationError
+
+# 补充请求仍未得到的字段使用的占位值
+FAILED_TEXT = "未能分析"
+
+
+def _as_list(value: Any) -> Any:
+    """单个字符串视为只有一项的数组（模型偶尔把单元素数组写成字符串）"""
+    if isinstance(value, str):
+        return [value] if value.strip() else []
+    return value
+
+
+StrList = Annotated[List[str], BeforeValidator(_as_list)]
+
+
+class StructuredOutput(BaseModel):
+    """模型输出的基类：保留模式之外的字段（如综合分析的软性指标），便于Prompt迭代"""
+    model_config = ConfigDict(extra='allow')
+
+
+class BloggerCharacteristics(StructuredOutput):
+    expertise: str = Field(description="专业领域")
+    style: str = Field(description="个人风格")
+    personality: str = Field(description="性格特点")
+    experience_level: str = Field(description="经验水平")
+
+
+class MethodologyMapping(StructuredOutput):
+    trust_hook: str = Field(description="信任之钩：博主建立信任的具体手法")
+    empathy_anchor: str = Field(description="共情之锚：博主建立情感连接的具体表现")
+    value_map: str = Field(description="价值图谱：博主组织和呈现核心价值的做法")
+
+
+class VideoDigest(StructuredOutput):
+    """单视频摘要（prompts/video_digest_v1.txt）"""
+    main_topics: StrList = Field(description="1-3个核心话题")
+    content_style: str = Field(description="一句话概括表达方式与内容呈现风格")
+    tone: str = Field(description="一个短语概括沟通语调")
+
+
+class QuickScanAnalysis(StructuredOutput):
+    """快速扫描（prompts/quick_scan_v1.txt）"""
+    content_style: str = Field(description="一句话概括表达方式与内容呈现风格")
+    core_values: StrList = Field(description="底层价值观或信念")
+    golden_sentences: StrList = Field(description="博主原话金句")
+    pain_points: StrList = Field(description="受众的困难、挑战或需求")
+    tone: str = Field(description="沟通语调")
+    target_audience: str = Field(description="主要受众群体")
+    main_topics: StrList = Field(description="核心话题")
+    core_insight: str = Field(description="一句话概括博主的IP内核")
+    optimal_outreach_script: str = Field(description="以\"我叫LMW\"开头、引用一句金句的破冰脚本")
+
+
+class ContentAnalysis(QuickScanAnalysis):
+    """单视频完整分析（prompts/analyze_blogger_content_v3.txt）"""
+    value_propositions: StrList = Field(description="博主为受众提供的核心价值")
+    blogger_characteristics: BloggerCharacteristics = Field(description="博主特征")
+    methodology_mapping: MethodologyMapping = Field(description="方法论映射")
+
+
+class GroupDigest(StructuredOutput):
+    """视频分组摘要与摘要合并（prompts/map_video_group_v1.txt、prompts/reduce_digests_v1.txt）"""
+    main_topics: StrList = Field(description="核心话题")
+    content_style: str = Field(description="一句话概括表达方式与内容呈现风格")
+    tone: str = Field(description="一个短语概括沟通语调")
+    target_audience: str = Field(description="主要受众群体")
+    core_values: StrList = Field(description="底层价值观或信念")
+    golden_quotes: StrList = Field(description="博主原话，必须逐字摘自原文")
+    pain_points: StrList = Field(description="受众的困难、挑战或需求")
+    value_propositions: StrList = Field(description="博主为受众提供的核心价值")
+    trust_hooks: StrList = Field(description="博主建立信任的具体手法")
+    empathy_anchors: StrList = Field(description="博主引发共鸣的具体表现")
+    value_map: StrList = Field(description="博主组织和呈现价值的具体做法")
+    soft_signals: StrList = Field(description="体现进化、工作流或求教欲望的短证据")
+
+
+class ComprehensiveAnalysis(StructuredOutput):
+    """博主综合分析（prompts/analyze_blogger_comprehensive_v3.txt）"""
+    optimal_outreach_script: str = Field(description="V5.0单点验证版破冰脚本，以\"我叫LMW\"自我介绍开头")
+    core_insight: str = Field(description="博主的IP内核定义和底层逻辑分析")
+    methodology_mapping: MethodologyMapping = Field(description="方法论映射")
+    blogger_golden_quotes: StrList = Field(description="博主的3-5个经典金句")
+    core_values: StrList = Field(description="博主展现的2-3个核心价值观")
+    content_style: str = Field(description="博主的整体内容风格描述")
+    tone: str = Field(description="博主的语调特点")
+    target_audience: str = Field(description="博主的目标受众画像")
+    main_topics: StrList = Field(description="博主的主要话题领域")
+    pain_points: StrList = Field(description="受众的核心痛点")
+    value_propositions: StrList = Field(description="博主提供的核心价值")
+    blogger_characteristics: BloggerCharacteristics = Field(description="博主特征")
+
+
+# 分析阶段 → 输出模式
+STAGE_SCHEMAS: Dict[str, Type[StructuredOutput]] = {
+    'content': ContentAnalysis,
+    'quick': QuickScanAnalysis,
+    'digest': VideoDigest,
+    'comprehensive': ComprehensiveAnalysis,
+    'map': GroupDigest,
+    'reduce': GroupDigest,
+}
+
+
+def _nested_model(schema: Type[BaseModel], name: str):
+    annotation = schema.model_fields[name].annotation
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return annotation
+    return None
+
+
+def _is_list(schema: Type[BaseModel], name: str) -> bool:
+    return get_origin(schema.model_fields[name].annotation) is list
+
+
+def validate_output(schema: Type[BaseModel], data: Dict[str, Any]) -> Tuple[Dict[str, Any], List[str]]:
+    """
+    按模式校验模型输出
+
+    Returns:
+        (规范化后的数据（不含无效字段）, 缺失或格式不正确的顶层字段名列表)
+    """
+    try:
+        return schema.model_validate(data).model_dump(), []
+    except ValidationError as e:
+        invalid = []
+        for error in e.errors():
+            name = str(error['loc'][0]) if error['loc'] else ''
+            if name in schema.model_fields and name not in invalid:
+                invalid.append(name)
+    valid = {key: value for key, value in data.items() if key not in invalid}
+    # 其余字段已通过校验，用占位值补齐无效字段后再校验一次以取得规范化结果
+    normalized = schema.model_validate({**valid, **placeholder_values(schema, invalid)}).model_dump()
+    return {key: value for key, value in normalized.items() if key not in invalid}, invalid
+
+
+def placeholder_values(schema: Type[BaseModel], names: List[str]) -> Dict[str, Any]:
+    """无法取得的字段的占位值（文本为“未能分析”，数组为空）"""
+    values: Dict[str, Any] = {}
+    for name in names:
+        nested = _nested_model(schema, name)
+        if nested is not None:
+            values[name] = {key: FAILED_TEXT for key in nested.model_fields}
+        elif _is_list(schema, name):
+            values[name] = []
+        else:
+            values[name] = FAILED_TEXT
+    return values
+
+
+def describe_fields(schema: Type[BaseModel], names: List[str]) -> str:
+    """字段说明（补充请求的Prompt中列出需要返回的字段）"""
+    lines = []
+    for name in names:
+        description = schema.model_fields[name].description or ""
+        nested = _nested_model(schema, name)
+        if nested is not None:
+            kind = "对象，包含 " + "、".join(
+                f"{key}（{info.description}）" for key, info in nested.model_fields.items())
+        elif _is_list(schema, name):
+            kind = "字符串数组"
+        else:
+            kind = "字符串"
+        lines.append(f"- {name}：{description}（{kind}）")
+    return "\n".join(lines)
+
+
+def field_kinds(schema: Type[BaseModel]) -> Dict[str, str]:
+    """各字段的类型：text / list / object（响应不是合法JSON时按类型逐字段抽取）"""
+    kinds = {}
+    for name in schema.model_fields:
+        if _nested_model(schema, name) is not None:
+            kinds[name] = 'object'
+        elif _is_list(schema, name):
+            kinds[name] = 'list'
+        else:
+            kinds[name] = 'text'
+    return kinds
@@ -0,0 +1,345 @@
+"""
+HTTP服务模块
+常驻进程保持分析流水线预热（Prompt与报告模板已加载、ASR/LLM连接池与缓存数据库已打开），
+通过本地HTTP接口异步提交本地文件、URL或博主文件夹的分析任务，轮询状态并获取生成的Markdown报告。
+仅使用标准库 http.server，默认只监听本机
+"""
+
+import json
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+from .utils.logger import logger
+from .utils.config import config
+from .services import ServiceContainer, get_services
+
+# 任务类型：本地文件 / 视频URL / 博主文件夹
+SERVICE_JOB_KINDS = ['file', 'url', 'folder']
+
+# 单视频流程使用的Prompt与报告模板（启动时预加载）
+WARM_PROMPTS = ['analyze_blogger_content_v3', 'quick_scan_v1', 'video_digest_v1', 'analyze_blogger_comprehensive_v3',
+                'map_video_group_v1', 'reduce_digests_v1', 'repair_fields_v1']
+WARM_TEMPLATES = ['new_blogger_template_v2.md', 'known_blogger_template_v2.md']
+
+# 轮询接口 ?wait= 的最长等待秒数
+MAX_WAIT_SECONDS = 60.0
+
+
+@dataclass
+class ServiceJob:
+    """服务中的一个分析任务"""
+    id: str
+    kind: str
+    target: str
+    options: Dict[str, Any] = field(default_factory=dict)
+    status: str = 'queued'  # queued / running / done / failed
+    step: str = ''
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    report_path: Optional[str] = None
+    error: Optional[str] = None
+    result: Dict[str, Any] = field(default_factory=dict)
+    finished: threading.Event = field(default_factory=threading.Event, repr=False)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'id': self.id,
+            'kind': self.kind,
+            'target': self.target,
+            'options': self.options,
+            'status': self.status,
+            'step': self.step,
+            'created_at': self.created_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+            'report_path': self.report_path,
+            'error': self.error,
+            'result': self.result,
+        }
+
+
+class AnalysisService:
+    """常驻分析服务：预热共享服务并在线程池中执行任务"""
+
+    def __init__(self, services: Optional[ServiceContainer] = None, workers: Optional[int] = None,
+                 max_jobs: Optional[int] = None):
+        """
+        Args:
+            services: 服务容器（可选，默认使用进程级共享容器）
+            workers: 同时执行的任务数
+            max_jobs: 内存中保留的任务数上限（超过时丢弃最早完成的任务）
+        """
+        self.services = services or get_services()
+        self.max_jobs = max_jobs or config.SERVE_MAX_JOBS
+        self.started_at = time.time()
+        self._jobs: Dict[str, ServiceJob] = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=workers or config.SERVE_WORKERS,
+                                            thread_name_prefix="serve-job")
+
+    def warm_up(self) -> Dict[str, float]:
+        """
+        预热：创建ASR/LLM客户端与连接池、打开缓存数据库、加载Prompt与报告模板
+
+        Returns:
+            各组件的初始化耗时（秒）
+        """
+        timings = {}
+
+        def warm(name, action):
+            started = time.perf_counter()
+            try:
+                action()
+            except Exception as e:
+                logger.warning(f"预热失败（首次使用时再初始化）: {name}, 错误: {e}")
+            timings[name] = time.perf_counter() - started
+
+        warm('transcript_cache', lambda: self.services.transcript_cache)
+        warm('media_probe', lambda: self.services.media_probe)
+        warm('file_handler', lambda: self.services.file_handler)
+        warm('transcriber', lambda: self.services.transcriber)
+        warm('analyzer', lambda: self.services.analyzer)
+        warm('fetcher', lambda: self.services.fetcher)
+        warm('prompts', lambda: [self.services.analyzer.load_prompt_template(name) for name in WARM_PROMPTS])
+        warm('templates', lambda: [self.services.generator.env.get_template(name) for name in WARM_TEMPLATES])
+        logger.info("服务预热完成: " + ", ".join(f"{name} {seconds:.2f}s" for name, seconds in timings.items()))
+        return timings
+
+    def submit(self, request: Dict[str, Any]) -> ServiceJob:
+        """
+        提交分析任务
+
+        Args:
+            request: {"file" | "url" | "folder": 目标, "quick": bool, "sections": str, "max_minutes": float}
+
+        Returns:
+            已入队的任务
+
+        Raises:
+            ValueError: 请求无效
+        """
+        targets = {kind: request.get(kind) for kind in SERVICE_JOB_KINDS if request.get(kind)}
+        if len(targets) != 1:
+            raise ValueError(f"请求需要且只能包含 {' / '.join(SERVICE_JOB_KINDS)} 之一")
+        kind, target = next(iter(targets.items()))
+        target = str(target)
+
+        options: Dict[str, Any] = {'quick': bool(request.get('quick', False))}
+        if kind == 'file' and not Path(target).is_file():
+            raise ValueError(f"文件不存在: {target}")
+        if kind == 'folder' and not Path(target).is_dir():
+            raise ValueError(f"文件夹不存在: {target}")
+        if kind == 'url':
+            from .fetcher import parse_sections
+            max_minutes = request.get('max_minutes')
+            options['sections'] = parse_sections(
+                request.get('sections'), config.URL_MAX_MINUTES if max_minutes is None else float(max_minutes)
+            )
+            options['full_video'] = bool(request.get('full_video', False))
+
+        job = ServiceJob(id=uuid.uuid4().hex[:12], kind=kind, target=target, options=options)
+        with self._lock:
+            self._jobs[job.id] = job
+            self._evict()
+        self._executor.submit(self._run, job)
+        logger.info(f"收到分析任务 {job.id}: {kind} {target}")
+        return job
+
+    def _evict(self):
+        """超过上限时丢弃最早完成的任务（调用方持有锁）"""
+        overflow = len(self._jobs) - self.max_jobs
+        if overflow <= 0:
+            return
+        finished = sorted((j for j in self._jobs.values() if j.finished.is_set()), key=lambda j: j.finished_at)
+        for job in finished[:overflow]:
+            del self._jobs[job.id]
+
+    def _run(self, job: ServiceJob):
+        """在线程池中执行任务"""
+        from .pipeline import analyze_source
+
+        job.status = 'running'
+        job.started_at = time.time()
+
+        def step(description: str):
+            job.step = description
+
+        try:
+            if job.kind == 'folder':
+                self._run_folder(job, step)
+            else:
+                result = analyze_source(
+                    url=job.target if job.kind == 'url' else None,
+                    file=job.target if job.kind == 'file' else None,
+                    services=self.services, quick=job.options['quick'],
+                    sections=job.options.get('sections'), full_video=job.options.get('full_video', False),
+                    step=step
+                )
+                job.report_path = result['report_path']
+                job.result = {key: result[key] for key in
+                              ('title', 'author', 'duration', 'text_length', 'transcript_source', 'transcript_path')}
+            job.status = 'done'
+        except Exception as e:
+            job.status = 'failed'
+            job.error = str(e)
+            logger.error(f"分析任务失败 {job.id}: {e}")
+        finally:
+            job.finished_at = time.time()
+            job.finished.set()
+
+    def _run_folder(self, job: ServiceJob, step):
+        """博主文件夹：综合分析并生成报告"""
+        from .blogger_analyzer import BloggerAnalyzer
+
+        states = {'extracting': "📁 提取音频...", 'transcribing': "🎤 转录音频内容...",
+                  'analyzing': "🧠 AI内容分析..."}
+
+        def progress(state, **fields):
+            if state in states and 'video' not in fields:
+                step(states[state])
+
+        analysis_result = BloggerAnalyzer(services=self.services).analyze_blogger_folder(
+            Path(job.target), quick_scan=job.options['quick'], progress=progress
+        )
+        step("💾 保存分析报告...")
+        report_path = self.services.generator.generate_blogger_comprehensive_report(analysis_result)
+        job.report_path = str(report_path)
+        job.result = {
+            'blogger_name': analysis_result['blogger_info'].name,
+            'total_videos': analysis_result['total_videos'],
+            'total_duration': analysis_result['total_duration'],
+        }
+
+    def get(self, job_id: str) -> Optional[ServiceJob]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def list_jobs(self) -> List[ServiceJob]:
+        with self._lock:
+            return sorted(self._jobs.values(), key=lambda j: j.created_at, reverse=True)
+
+    def health(self) -> Dict[str, Any]:
+        counts: Dict[str, int] = {}
+        for job in self.list_jobs():
+            counts[job.status] = counts.get(job.status, 0) + 1
+        health = {'status': 'ok', 'uptime': time.time() - self.started_at, 'jobs': counts}
+        analyzer = self.services.loaded('analyzer')
+        if analyzer is not None:
+            # 各LLM提供商的健康状态、对冲次数与延迟分布，以及累计用量（含前缀缓存命中）
+            health['llm'] = analyzer.router.stats()
+            health['llm_usage'] = analyzer.usage_snapshot()
+        return health
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+class ServiceRequestHandler(BaseHTTPRequestHandler):
+    """
+    接口：
+        GET  /health              服务状态
+        POST /jobs                提交任务（JSON），返回 202 与任务状态
+        GET  /jobs                任务列表
+        GET  /jobs/<id>[?wait=N]  任务状态（wait 为最长等待完成的秒数）
+        GET  /jobs/<id>/report    Markdown报告
+    """
+
+    service: AnalysisService = None
+    server_version = "creator-compass"
+
+    def log_message(self, format: str, *args):
+        logger.debug("HTTP " + format % args)
+
+    def _send_json(self, status: int, payload: Any):
+        body = json.dumps(payload, ensure_ascii=False, default=str).encode('utf-8')
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_error(self, status: int, message: str):
+        self._send_json(status, {'error': message})
+
+    def do_GET(self):
+        parsed = urlparse(self.path)
+        parts = [p for p in parsed.path.split('/') if p]
+
+        if parts == ['health']:
+            return self._send_json(200, self.service.health())
+        if parts == ['jobs']:
+            return self._send_json(200, [job.to_dict() for job in self.service.list_jobs()])
+        if len(parts) in (2, 3) and parts[0] == 'jobs':
+            job = self.service.get(parts[1])
+            if job is None:
+                return self._send_error(404, f"任务不存在: {parts[1]}")
+            if len(parts) == 2:
+                wait = parse_qs(parsed.query).get('wait')
+                if wait:
+                    try:
+                        job.finished.wait(min(float(wait[0]), MAX_WAIT_SECONDS))
+                    except ValueError:
+                        return self._send_error(400, f"wait 参数无效: {wait[0]}")
+                return self._send_json(200, job.to_dict())
+            if parts[2] == 'report':
+                return self._send_report(job)
+        return self._send_error(404, f"未知路径: {parsed.path}")
+
+    def _send_report(self, job: ServiceJob):
+        if job.status != 'done' or not job.report_path:
+            return self._send_error(409, f"任务尚未完成: {job.status}")
+        try:
+            body = Path(job.report_path).read_bytes()
+        except OSError as e:
+            return self._send_error(410, f"报告文件不可读: {e}")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/markdown; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        if urlparse(self.path).path.rstrip('/') != '/jobs':
+            return self._send_error(404, f"未知路径: {self.path}")
+        try:
+            length = int(self.headers.get('Content-Length') or 0)
+            request = json.loads(self.rfile.read(length) or b"{}")
+            if not isinstance(request, dict):
+                raise ValueError("请求体必须是JSON对象")
+            job = self.service.submit(request)
+        except (ValueError, json.JSONDecodeError) as e:
+            return self._send_error(400, str(e))
+        payload = job.to_dict()
+        payload['links'] = {'status': f"/jobs/{job.id}", 'report': f"/jobs/{job.id}/report"}
+        self._send_json(202, payload)
+
+
+def create_server(service: AnalysisService, host: Optional[str] = None,
+                  port: Optional[int] = None) -> ThreadingHTTPServer:
+    """创建绑定到分析服务的HTTP服务器（port 为0时随机分配）"""
+    handler = type('BoundServiceRequestHandler', (ServiceRequestHandler,), {'service': service})
+    server = ThreadingHTTPServer((host or config.SERVE_HOST, config.SERVE_PORT if port is None else port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def serve(host: Optional[str] = None, port: Optional[int] = None, workers: Optional[int] = None):
+    """预热并运行HTTP服务（阻塞直到中断）"""
+    service = AnalysisService(workers=workers)
+    service.warm_up()
+    server = create_server(service, host, port)
+    logger.info(f"分析服务已启动: http://{server.server_address[0]}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        service.shutdown()
+        service.services.close()
@@ -0,0 +1,139 @@
+"""
+服务容器模块
+在进程内持有长生命周期、线程安全的组件实例（ASR/LLM客户端、缓存、模板环境等），
+避免批量处理时每个文件都重新建立TLS连接、重新加载缓存索引
+"""
+
+import threading
+from typing import Any, Callable, Dict, Optional
+
+from .utils.config import config
+from .utils.logger import logger
+
+
+class ServiceContainer:
+    """进程级服务容器：按需创建组件并在后续调用中复用"""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._instances: Dict[str, Any] = {}
+
+    def _get(self, name: str, factory: Callable[[], Any]) -> Any:
+        """获取（必要时创建）命名实例，创建过程加锁保证只初始化一次"""
+        instance = self._instances.get(name)
+        if instance is not None:
+            return instance
+
+        with self._lock:
+            instance = self._instances.get(name)
+            if instance is None:
+                logger.debug(f"初始化共享服务: {name}")
+                instance = factory()
+                self._instances[name] = instance
+            return instance
+
+    def loaded(self, name: str) -> Optional[Any]:
+        """已创建的命名实例（未创建时返回None，不触发初始化）"""
+        return self._instances.get(name)
+
+    # 各服务的工厂方法在内部按需导入，保持CLI轻量命令的启动速度
+
+    @property
+    def transcript_cache(self):
+        from .transcript_cache import TranscriptCache
+        return self._get('transcript_cache', TranscriptCache)
+
+    @property
+    def audio_cache(self):
+        from .audio_cache import AudioCache
+        return self._get('audio_cache', AudioCache)
+    
+    @property
+    def media_probe(self):
+        from .media_probe import MediaProbe
+        return self._get('media_probe', MediaProbe)
+    
+    @property
+    def extraction_stage(self):
+        """ffmpeg进程池（音频提取与压缩共用，进程按需启动）"""
+        from .extraction_stage import ExtractionStage
+        return self._get('extraction_stage', ExtractionStage)
+    
+    @property
+    def file_handler(self):
+        from .file_handler import FileHandler
+        return self._get('file_handler', lambda: FileHandler(
+            transcript_cache=self.transcript_cache, audio_cache=self.audio_cache, media_probe=self.media_probe,
+            extraction_stage=self.extraction_stage
+        ))
+
+    @property
+    def workspaces(self):
+        """任务工作区管理器（首次获取时清理崩溃遗留的工作区）"""
+        from .utils.workspace import get_workspace_manager
+        return self._get('workspaces', get_workspace_manager)
+    
+    @property
+    def fetcher(self):
+        from .fetcher import VideoFetcher
+        return self._get('fetcher', VideoFetcher)
+
+    @property
+    def transcriber(self):
+        from .transcriber import TencentASRTranscriber
+        return self._get('transcriber', lambda: TencentASRTranscriber(
+            cache=self.transcript_cache, extraction_stage=self.extraction_stage
+        ))
+
+    @property
+    def llm_http_client(self):
+        """LLM请求共享的httpx连接池"""
+        return self._get('llm_http_client', _create_llm_http_client)
+
+    @property
+    def analyzer(self):
+        from .analyzer import ContentAnalyzer
+        return self._get('analyzer', lambda: ContentAnalyzer(http_client=self.llm_http_client))
+
+    @property
+    def generator(self):
+        from .generator import ScriptGenerator
+        return self._get('generator', ScriptGenerator)
+
+    def close(self):
+        """释放持有的网络连接与进程池"""
+        with self._lock:
+            for name in ('transcriber', 'analyzer', 'llm_http_client', 'media_probe', 'extraction_stage'):
+                instance = self._instances.pop(name, None)
+                if instance is None:
+                    continue
+                try:
+                    instance.close()
+                except Exception as e:
+                    logger.warning(f"关闭共享服务失败: {name}, 错误: {e}")
+
+
+def _create_llm_http_client():
+    """创建带连接池与keep-alive的httpx客户端"""
+    import httpx
+
+    limits = httpx.Limits(
+        max_connections=config.HTTP_POOL_SIZE,
+        max_keepalive_connections=config.HTTP_POOL_SIZE,
+        keepalive_expiry=config.HTTP_KEEPALIVE_EXPIRY
+    )
+    return httpx.Client(limits=limits, timeout=config.HTTP_TIMEOUT, follow_redirects=True)
+
+
+_services: Optional[ServiceContainer] = None
+_services_lock = threading.Lock()
+
+
+def get_services() -> ServiceContainer:
+    """获取进程级共享的服务容器"""
+    global _services
+    if _services is None:
+        with _services_lock:
+            if _services is None:
+                _services = ServiceContainer()
+    return _services
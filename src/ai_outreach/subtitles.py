@@ -0,0 +1,226 @@
+"""
+字幕解析模块
+流式解析 VTT / SRT / JSON3 字幕（直接处理内存中的字幕数据，不落盘），
+合并自动字幕中滚动重复的行，并保留每条字幕的时间戳
+"""
+
+import html
+import json
+import re
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, Iterable, Iterator, List, Optional, Union
+
+# 时间戳行：00:00:01.000 --> 00:00:03.500（SRT 使用逗号分隔毫秒，VTT 可省略小时）
+_TIMING_RE = re.compile(
+    r'(?P<start>(?:\d+:)?\d{1,2}:\d{2}[.,]\d{1,3})\s*-->\s*(?P<end>(?:\d+:)?\d{1,2}:\d{2}[.,]\d{1,3})'
+)
+_TAG_RE = re.compile(r'<[^>]*>')
+_ASS_OVERRIDE_RE = re.compile(r'\{[^}]*\}')
+_SPACE_RE = re.compile(r'\s+')
+
+# 支持解析的字幕格式（按优先顺序选择字幕轨）
+SUPPORTED_FORMATS = ['json3', 'vtt', 'srt']
+
+# 本地同名字幕文件扩展名（按优先顺序）
+SIDECAR_EXTENSIONS = ['.srt', '.vtt', '.ass', '.ssa']
+
+# 判定滚动重复时回看的最近行数
+ROLLING_WINDOW = 3
+
+
+@dataclass
+class Cue:
+    """单条字幕"""
+    start: float
+    end: float
+    text: str
+
+
+def _parse_timestamp(value: str) -> float:
+    """解析 [HH:]MM:SS.mmm / [HH:]MM:SS,mmm 格式的时间戳为秒"""
+    parts = value.replace(',', '.').split(':')
+    seconds = 0.0
+    for part in parts:
+        seconds = seconds * 60 + float(part)
+    return seconds
+
+
+def _clean_line(line: str) -> str:
+    """移除内联标签（<c>、<00:00:01.000>、<i> 等）与多余空白"""
+    return _SPACE_RE.sub(' ', html.unescape(_TAG_RE.sub('', line))).strip()
+
+
+def parse_timed_text(lines: Iterable[str]) -> Iterator[Cue]:
+    """
+    流式解析 VTT / SRT 字幕（两者都是"时间戳行 + 文本行 + 空行"结构）
+
+    Args:
+        lines: 逐行可迭代的字幕内容（可以是响应流）
+
+    Yields:
+        每条字幕，多行文本以换行符连接
+    """
+    start = end = None
+    text_lines: List[str] = []
+    in_block = False
+
+    for raw in lines:
+        line = raw.strip('\ufeff\r\n ')
+
+        timing = _TIMING_RE.search(line) if '-->' in line else None
+        if timing:
+            start = _parse_timestamp(timing.group('start'))
+            end = _parse_timestamp(timing.group('end'))
+            text_lines = []
+            in_block = True
+            continue
+
+        if not line:
+            if in_block and text_lines:
+                yield Cue(start, end, '\n'.join(text_lines))
+            in_block = False
+            text_lines = []
+            continue
+
+        # 时间戳行之外的内容（WEBVTT头、NOTE/STYLE块、SRT序号）都不是字幕文本
+        if in_block:
+            cleaned = _clean_line(line)
+            if cleaned:
+                text_lines.append(cleaned)
+
+    if in_block and text_lines:
+        yield Cue(start, end, '\n'.join(text_lines))
+
+
+def parse_json3(data: Union[str, bytes, Dict[str, Any]]) -> Iterator[Cue]:
+    """
+    解析 YouTube JSON3 字幕
+
+    Args:
+        data: JSON3 原始内容或已解析的字典
+
+    Yields:
+        每条字幕（跳过只包含换行的追加事件）
+    """
+    if not isinstance(data, dict):
+        data = json.loads(data)
+
+    for event in data.get('events') or []:
+        segs = event.get('segs')
+        if not segs:
+            continue
+        text = _clean_line(''.join(seg.get('utf8', '') for seg in segs))
+        if not text:
+            continue
+        start = event.get('tStartMs', 0) / 1000
+        yield Cue(start, start + event.get('dDurationMs', 0) / 1000, text)
+
+
+def parse_ass(lines: Iterable[str]) -> Iterator[Cue]:
+    """
+    流式解析 ASS/SSA 字幕（只读取 [Events] 段的 Dialogue 行）
+
+    Args:
+        lines: 逐行可迭代的字幕内容
+
+    Yields:
+        每条字幕（\\N 换行保留为换行符，样式覆盖标签被移除）
+    """
+    fields: List[str] = []
+    in_events = False
+
+    for raw in lines:
+        line = raw.strip('\ufeff\r\n ')
+        if line.startswith('['):
+            in_events = line.lower() == '[events]'
+            continue
+        if not in_events:
+            continue
+
+        key, _, value = line.partition(':')
+        if key == 'Format':
+            fields = [f.strip().lower() for f in value.split(',')]
+        elif key == 'Dialogue' and fields:
+            values = value.strip().split(',', len(fields) - 1)
+            if len(values) != len(fields):
+                continue
+            entry = dict(zip(fields, values))
+            text = _ASS_OVERRIDE_RE.sub('', entry.get('text', ''))
+            text = text.replace('\\N', '\n').replace('\\n', '\n').replace('\\h', ' ')
+            text = '\n'.join(filter(None, (_clean_line(part) for part in text.split('\n'))))
+            if text:
+                yield Cue(_parse_timestamp(entry['start'].strip()), _parse_timestamp(entry['end'].strip()), text)
+
+
+def dedupe_rolling(cues: Iterable[Cue], window: int = ROLLING_WINDOW) -> Iterator[Cue]:
+    """
+    合并滚动重复的字幕
+
+    自动字幕每条通常包含上一条的内容（整行重复或逐字增长），
+    这里按行比较最近输出的若干行：整行重复则只延长结束时间，
+    逐字增长则用更完整的行替换上一行。
+
+    Args:
+        cues: 原始字幕
+        window: 回看的最近行数
+
+    Yields:
+        去重后的字幕（每条对应一行文本）
+    """
+    recent: Deque[str] = deque(maxlen=window)
+    pending: Optional[Cue] = None
+
+    for cue in cues:
+        for line in cue.text.split('\n'):
+            line = line.strip()
+            if not line:
+                continue
+
+            if line in recent:
+                if pending and pending.text == line:
+                    pending.end = max(pending.end, cue.end)
+                continue
+
+            if pending and line.startswith(pending.text):
+                pending.text = line
+                pending.end = max(pending.end, cue.end)
+                recent[-1] = line
+                continue
+
+            if pending:
+                yield pending
+            pending = Cue(cue.start, cue.end, line)
+            recent.append(line)
+
+    if pending:
+        yield pending
+
+
+def parse_subtitles(content: Union[str, Iterable[str]], ext: str) -> List[Cue]:
+    """
+    按格式解析字幕并合并滚动重复
+
+    Args:
+        content: 字幕内容（字符串或逐行可迭代对象）
+        ext: 字幕格式（json3 / vtt / srt / ass / ssa）
+
+    Returns:
+        去重后的字幕列表
+    """
+    ext = (ext or '').lower()
+    if ext == 'json3':
+        if not isinstance(content, str):
+            content = ''.join(content)
+        cues = parse_json3(content)
+    elif ext in ('ass', 'ssa'):
+        cues = parse_ass(content.splitlines() if isinstance(content, str) else content)
+    else:
+        lines = content.splitlines() if isinstance(content, str) else content
+        cues = parse_timed_text(lines)
+    return list(dedupe_rolling(cues))
+
+
+def cues_to_text(cues: Iterable[Cue]) -> str:
+    """将字幕拼接为纯文本"""
+    return ' '.join(cue.text for cue in cues)
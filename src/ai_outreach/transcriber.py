@@ -6,15 +6,22 @@ ASR转录模块
 import json
 import base64
 from pathlib import Path
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
+import requests
+from requests.adapters import HTTPAdapter
 from tencentcloud.common import credential
+from tencentcloud.common.http.request import ProxyConnection
 from tencentcloud.common.profile.client_profile import ClientProfile
 from tencentcloud.common.profile.http_profile import HttpProfile
 from tencentcloud.asr.v20190614 import asr_client, models
 from .utils.logger import logger
-from .utils.exceptions import TranscriptionError, ConfigurationError
+from .utils.exceptions import TranscriptionError, ConfigurationError, AudioProcessingError
+from .utils.audio_utils import compress_audio
 from .utils.config import config
 from .transcript_cache import TranscriptCache
+from .utils.workspace import JobWorkspace
+from .extraction_stage import ExtractionJob, ExtractionStage
+from .sampling import format_sampled_transcript, sampled_seconds
 
 class TranscriptResult:
     """转录结果类"""
@@ -22,13 +29,54 @@ class TranscriptResult:
         self.text = text
         self.confidence = confidence
         self.words = segments or []
+        self.sampled = False  # 快速扫描：只转录了采样片段
+    
+    @classmethod
+    def from_subtitles(cls, text: str, cues: List[Any]) -> "TranscriptResult":
+        """由字幕构造转录结果（URL字幕与本地字幕共用），保留每条字幕的时间戳"""
+        return cls(text, confidence=1.0, segments=[{'start': c.start, 'end': c.end, 'text': c.text} for c in cues])
+
+class PooledConnection(ProxyConnection):
+    """
+    基于 requests.Session 的腾讯云SDK连接
+    
+    SDK默认每次请求都调用 requests.request()，无法复用TCP/TLS连接；
+    替换为共享Session后，同一进程内的ASR请求可保持keep-alive并走连接池。
+    """
+    
+    def __init__(self, base: ProxyConnection, pool_size: int = 10):
+        self.__dict__.update(base.__dict__)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+    
+    def request(self, method, url, body=None, headers=None):
+        headers.setdefault("Host", self.request_host)
+        return self.session.request(method=method,
+                                    url=url,
+                                    data=body,
+                                    headers=headers,
+                                    proxies=self.proxy,
+                                    verify=self.certification,
+                                    timeout=self.timeout,
+                                    stream=True)
+    
+    def close(self):
+        self.session.close()
 
 class TencentASRTranscriber:
     """腾讯云ASR转录器"""
     
-    def __init__(self):
+    def __init__(self, cache: Optional[TranscriptCache] = None, extraction_stage: Optional[ExtractionStage] = None):
+        """
+        Args:
+            cache: 共享的转录缓存实例（可选，未提供时新建）
+            extraction_stage: 音频处理进程池（可选，未提供时在当前进程中直接压缩）
+        """
         # 初始化缓存
-        self.cache = TranscriptCache()
+        self.cache = cache if cache is not None else TranscriptCache()
+        self.extraction_stage = extraction_stage
         
         # 验证配置
         if not config.TENCENT_SECRET_ID or not config.TENCENT_SECRET_KEY:
@@ -38,19 +86,33 @@ class TencentASRTranscriber:
         cred = credential.Credential(config.TENCENT_SECRET_ID, config.TENCENT_SECRET_KEY)
         httpProfile = HttpProfile()
         httpProfile.endpoint = "asr.tencentcloudapi.com"
+        httpProfile.keepAlive = True
         
         clientProfile = ClientProfile()
         clientProfile.httpProfile = httpProfile
         
         self.client = asr_client.AsrClient(cred, config.TENCENT_REGION, clientProfile)
+        
+        # 使用连接池替换SDK默认的一次性连接
+        self._connection = PooledConnection(self.client.request.conn, pool_size=config.HTTP_POOL_SIZE)
+        self.client.request.conn = self._connection
     
-    def transcribe_short_audio(self, audio_path: Path, source_file: Path = None) -> TranscriptResult:
+    def close(self):
+        """释放HTTP连接池"""
+        self._connection.close()
+    
+    def transcribe_short_audio(self, audio_path: Path, source_file: Path = None,
+                               workspace: Optional[JobWorkspace] = None, duration: float = 0.0,
+                               use_cache: bool = True) -> TranscriptResult:
         """
         转录短音频（≤60秒）
         
         Args:
             audio_path: 音频文件路径
             source_file: 源视频文件路径（用于缓存）
+            workspace: 任务工作区（可选，压缩产物写入其中）
+            duration: 音频时长（写入缓存，命中缓存时无需再探测时长）
+            use_cache: 是否读写转录缓存（采样片段由调用方单独缓存）
             
         Returns:
             转录结果
@@ -58,14 +120,14 @@ class TencentASRTranscriber:
         logger.info(f"开始转录短音频: {audio_path}")
         
         # 检查缓存（强制优先使用源文件缓存）
-        if source_file and source_file.exists():
+        if use_cache and source_file and source_file.exists():
             cached_text = self.cache.get_cached_transcript_by_source(source_file)
             if cached_text:
                 logger.info(f"使用源文件缓存转录结果，跳过ASR调用: {source_file.name}")
                 return TranscriptResult(cached_text, 1.0)
         
         # 备用缓存检查（音频文件缓存）
-        cached_text = self.cache.get_cached_transcript(audio_path)
+        cached_text = self.cache.get_cached_transcript(audio_path) if use_cache else None
         if cached_text:
             logger.info(f"使用音频文件缓存转录结果，跳过ASR调用: {audio_path.name}")
             return TranscriptResult(cached_text, 1.0)
@@ -79,7 +141,7 @@ class TencentASRTranscriber:
             if len(audio_data) > 5 * 1024 * 1024:
                 logger.warning(f"音频文件过大: {len(audio_data)} bytes，开始压缩...")
                 # 压缩音频文件
-                compressed_path = self._compress_audio_file(audio_path)
+                compressed_path = self._compress_audio_file(audio_path, workspace.path if workspace else None, duration)
                 with open(compressed_path, 'rb') as f:
                     audio_data = f.read()
                     
@@ -113,12 +175,12 @@ class TencentASRTranscriber:
                 logger.debug(f"转录结果内容: '{resp.Result}'")
                 
                 # 保存到缓存（强制优先保存源文件缓存）
-                if source_file and source_file.exists():
+                if use_cache and source_file and source_file.exists():
                     logger.info(f"保存源文件缓存: {source_file.name}")
-                    self.cache.save_transcript_cache_by_source(source_file, resp.Result, confidence=1.0)
-                else:
+                    self.cache.save_transcript_cache_by_source(source_file, resp.Result, duration=duration, confidence=1.0)
+                elif use_cache:
                     logger.info(f"保存音频文件缓存: {audio_path.name}")
-                    self.cache.save_transcript_cache(audio_path, resp.Result, confidence=1.0)
+                    self.cache.save_transcript_cache(audio_path, resp.Result, duration=duration, confidence=1.0)
                 
                 return TranscriptResult(resp.Result, 1.0)
             else:
@@ -131,13 +193,93 @@ class TencentASRTranscriber:
             logger.error(error_msg)
             raise TranscriptionError(error_msg)
     
-    def transcribe_file(self, audio_path: Path, source_file: Path = None) -> TranscriptResult:
+    def transcribe_video(self, video_info: Any, source_file: Optional[Path] = None,
+                         workspace: Optional[JobWorkspace] = None) -> TranscriptResult:
+        """
+        转录视频信息对象中的音频：快速扫描时只转录采样片段，否则按时长选择短音频或录音文件识别
+        
+        Args:
+            video_info: 本地或URL视频信息（含 audio_path、duration，快速扫描时含 sample_windows / sample_paths，
+                        URL分段下载时含 audio_duration）
+            source_file: 源视频文件路径（用于缓存）
+            workspace: 任务工作区（可选，压缩产物写入其中）
+            
+        Returns:
+            转录结果
+        """
+        sample_paths = getattr(video_info, 'sample_paths', None)
+        if sample_paths:
+            return self.transcribe_samples(
+                video_info.sample_windows, sample_paths,
+                cache_source=getattr(video_info, 'url', None) or source_file,
+                duration=video_info.duration, workspace=workspace
+            )
+        
+        # URL分段下载时按实际音频时长选择识别接口
+        duration = getattr(video_info, 'audio_duration', video_info.duration)
+        if duration <= 60:
+            return self.transcribe_short_audio(video_info.audio_path, source_file, workspace=workspace, duration=duration)
+        return self.transcribe_file(video_info.audio_path, source_file, workspace=workspace, duration=duration)
+    
+    def transcribe_samples(self, windows: List[Any], sample_paths: List[Path], cache_source: Any = None,
+                           duration: float = 0.0, workspace: Optional[JobWorkspace] = None) -> TranscriptResult:
+        """
+        逐个转录快速扫描的采样片段（每个片段不超过60秒，走短音频识别），按时间拼接并标注起始时间
+        
+        Args:
+            windows: 采样窗口列表（SampleWindow）
+            sample_paths: 各窗口的音频文件
+            cache_source: 采样转录的缓存键（源文件路径或URL，可选）
+            duration: 完整时长（写入缓存）
+            workspace: 任务工作区（可选）
+            
+        Returns:
+            转录结果（sampled=True，segments 为各窗口的文本）
+        """
+        signature = ",".join(f"{w.start:.1f}+{w.duration:.1f}" for w in windows)
+        if cache_source:
+            cached_text = self.cache.get_cached_sample(cache_source, signature)
+            if cached_text:
+                result = TranscriptResult(cached_text, 1.0)
+                result.sampled = True
+                return result
+        
+        texts = []
+        segments = []
+        for window, sample_path in zip(windows, sample_paths):
+            try:
+                text = self.transcribe_short_audio(sample_path, workspace=workspace, duration=window.duration, use_cache=False).text
+            except TranscriptionError as e:
+                # 静音或纯音乐片段识别为空，跳过即可
+                logger.warning(f"采样片段转录失败，跳过: {sample_path.name}, 错误: {e}")
+                text = ""
+            texts.append(text)
+            if text:
+                segments.append({'start': window.start, 'end': window.end, 'text': text})
+        
+        if not segments:
+            raise TranscriptionError("所有采样片段均转录失败")
+        
+        transcript_text = format_sampled_transcript(windows, texts)
+        if cache_source:
+            self.cache.save_sample_cache(cache_source, signature, transcript_text,
+                                         duration=duration, sampled_seconds=sampled_seconds(windows))
+        
+        logger.info(f"采样转录完成: {len(segments)}/{len(windows)} 个片段，文本长度: {len(transcript_text)}字符")
+        result = TranscriptResult(transcript_text, 1.0, segments)
+        result.sampled = True
+        return result
+    
+    def transcribe_file(self, audio_path: Path, source_file: Path = None,
+                        workspace: Optional[JobWorkspace] = None, duration: float = 0.0) -> TranscriptResult:
         """
         转录长音频文件（使用录音文件识别）
         
         Args:
             audio_path: 音频文件路径
             source_file: 源视频文件路径（用于缓存）
+            workspace: 任务工作区（可选，压缩产物写入其中）
+            duration: 音频时长（写入缓存，命中缓存时无需再探测时长）
             
         Returns:
             转录结果
@@ -165,7 +307,7 @@ class TencentASRTranscriber:
             if file_size > 5 * 1024 * 1024:
                 logger.warning(f"音频文件过大: {file_size} bytes，开始压缩...")
                 # 压缩音频文件
-                compressed_path = self._compress_audio_file(audio_path)
+                compressed_path = self._compress_audio_file(audio_path, workspace.path if workspace else None, duration)
                 audio_path = compressed_path  # 使用压缩后的文件
                 file_size = audio_path.stat().st_size
                 
@@ -257,10 +399,10 @@ class TencentASRTranscriber:
                         # 保存到缓存（强制优先保存源文件缓存）
                         if source_file and source_file.exists():
                             logger.info(f"保存源文件缓存: {source_file.name}")
-                            self.cache.save_transcript_cache_by_source(source_file, full_text, confidence=1.0)
+                            self.cache.save_transcript_cache_by_source(source_file, full_text, duration=duration, confidence=1.0)
                         else:
                             logger.info(f"保存音频文件缓存: {audio_path.name}")
-                            self.cache.save_transcript_cache(audio_path, full_text, confidence=1.0)
+                            self.cache.save_transcript_cache(audio_path, full_text, duration=duration, confidence=1.0)
                         
                         return TranscriptResult(full_text, 1.0)
                     
@@ -296,46 +438,29 @@ class TencentASRTranscriber:
                 except Exception as e:
                     logger.warning(f"删除压缩文件失败: {e}")
     
-    def _compress_audio_file(self, audio_path: Path) -> Path:
+    def _compress_audio_file(self, audio_path: Path, output_dir: Optional[Path] = None, duration: float = 0.0) -> Path:
         """
         压缩音频文件以满足API大小限制
         
         Args:
             audio_path: 原始音频文件路径
+            output_dir: 输出目录（可选，默认与原始音频同目录）
+            duration: 音频时长（用于统计压缩速度）
             
         Returns:
             压缩后的音频文件路径
         """
-        import subprocess
-        
-        compressed_path = audio_path.parent / f"{audio_path.stem}_compressed.mp3"
-        
-        # 使用极低的采样率和比特率进行压缩
-        # 对于13分钟视频，需要更激进的压缩
-        cmd = [
-            'ffmpeg',
-            '-i', str(audio_path),
-            '-acodec', 'mp3',
-            '-b:a', '32k',  # 非常低的比特率
-            '-ar', '16000',  # 保持标准语音识别采样率
-            '-ac', '1',     # 单声道
-            '-af', 'volume=3.0',  # 增加音量以补偿质量损失
-            '-y',  # 覆盖输出文件
-            str(compressed_path)
-        ]
+        compressed_path = (output_dir or audio_path.parent) / f"{audio_path.stem}_compressed.mp3"
         
         try:
-            subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                check=True,
-                timeout=120
-            )
-            logger.info(f"音频压缩完成: {audio_path} -> {compressed_path}")
+            if self.extraction_stage is not None:
+                # 与音频提取共享进程池，并发的ffmpeg数量不超过配置的进程数
+                self.extraction_stage.run_one(ExtractionJob(audio_path, compressed_path, kind='compress', duration=duration))
+            else:
+                compress_audio(audio_path, compressed_path)
             return compressed_path
             
-        except subprocess.CalledProcessError as e:
-            error_msg = f"音频压缩失败: {e.stderr}"
+        except AudioProcessingError as e:
+            error_msg = f"音频压缩失败: {e}"
             logger.error(error_msg)
             raise TranscriptionError(error_msg)
\ No newline at end of file
@@ -4,13 +4,14 @@
 """
 
 import hashlib
-import json
+import threading
 from pathlib import Path
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Union
 from datetime import datetime
 
 from .utils.logger import logger
 from .utils.config import config
+from .utils.shared_index import load_index, merge_and_save
 
 
 class TranscriptCache:
@@ -21,25 +22,35 @@ class TranscriptCache:
         self.cache_dir = config.OUTPUT_DIR / "cache" / "transcripts"
         self.cache_dir.mkdir(parents=True, exist_ok=True)
         
-        # 缓存索引文件
+        # 索引读写锁（同一实例在进程内被多个线程共享）
+        self._lock = threading.RLock()
+        
+        # 缓存索引文件（多个worker进程共享，保存时合并本进程的改动）
         self.index_file = self.cache_dir / "index.json"
         self.index = self._load_index()
+        self._changed = set()
+        self._removed = set()
+        self._reset = False
     
     def _load_index(self) -> Dict[str, Any]:
         """加载缓存索引"""
-        if self.index_file.exists():
-            try:
-                with open(self.index_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            except Exception as e:
-                logger.warning(f"加载缓存索引失败: {e}")
-        return {}
+        return load_index(self.index_file)
+    
+    def _set_entry(self, key: str, entry: Dict[str, Any]):
+        """写入索引条目（调用方持有锁）"""
+        self.index[key] = entry
+        self._changed.add(key)
+        self._removed.discard(key)
     
     def _save_index(self):
-        """保存缓存索引"""
+        """保存缓存索引（进程间文件锁内与磁盘索引合并后原子替换，不会覆盖其他进程写入的条目）"""
         try:
-            with open(self.index_file, 'w', encoding='utf-8') as f:
-                json.dump(self.index, f, ensure_ascii=False, indent=2)
+            with self._lock:
+                self.index = merge_and_save(self.index_file, self.index, self._changed,
+                                            self._removed, reset=self._reset)
+                self._changed.clear()
+                self._removed.clear()
+                self._reset = False
         except Exception as e:
             logger.error(f"保存缓存索引失败: {e}")
     
@@ -99,6 +110,19 @@ class TranscriptCache:
         
         return None
     
+    def get_cache_info_by_source(self, source_file: Path) -> Optional[Dict[str, Any]]:
+        """
+        获取源文件缓存条目的元数据（时长、置信度等）
+
+        Args:
+            source_file: 源视频文件路径
+
+        Returns:
+            缓存条目信息，如果不存在则返回None
+        """
+        entry = self.index.get(self._get_file_hash(source_file))
+        return dict(entry) if entry else None
+
     def save_transcript_cache_by_source(self, source_file: Path, transcript_text: str, 
                                       duration: float = 0.0, confidence: float = 0.0) -> bool:
         """
@@ -122,17 +146,17 @@ class TranscriptCache:
                 f.write(transcript_text)
             
             # 更新索引
-            self.index[source_hash] = {
-                'source_file': str(source_file),
-                'source_name': source_file.name,
-                'duration': duration,
-                'confidence': confidence,
-                'text_length': len(transcript_text),
-                'created_at': datetime.now().isoformat(),
-                'cache_file': str(cache_file)
-            }
-            
-            self._save_index()
+            with self._lock:
+                self._set_entry(source_hash, {
+                    'source_file': str(source_file),
+                    'source_name': source_file.name,
+                    'duration': duration,
+                    'confidence': confidence,
+                    'text_length': len(transcript_text),
+                    'created_at': datetime.now().isoformat(),
+                    'cache_file': str(cache_file)
+                })
+                self._save_index()
             logger.info(f"转录缓存已保存: {source_file.name}")
             return True
             
@@ -140,6 +164,147 @@ class TranscriptCache:
             logger.error(f"保存转录缓存失败: {e}")
             return False
     
+    def _get_url_hash(self, url: str) -> str:
+        """计算URL的缓存键（下载产物位于每次不同的任务工作区，不能按路径缓存）"""
+        return hashlib.md5(f"url:{url}".encode()).hexdigest()
+
+    def get_cached_transcript_by_url(self, url: str) -> Optional[str]:
+        """
+        根据视频URL获取缓存的转录文本
+
+        Args:
+            url: 视频URL
+
+        Returns:
+            缓存的转录文本，如果不存在则返回None
+        """
+        url_hash = self._get_url_hash(url)
+        cache_file = self.cache_dir / f"{url_hash}.txt"
+
+        if url_hash not in self.index:
+            return None
+
+        if not cache_file.exists():
+            self._remove_cache(url_hash)
+            return None
+
+        try:
+            transcript_text = cache_file.read_text(encoding='utf-8')
+            logger.info(f"找到URL缓存转录: {url} (缓存时间: {self.index[url_hash]['created_at']})")
+            return transcript_text
+        except Exception as e:
+            logger.error(f"读取缓存文件失败: {e}")
+            self._remove_cache(url_hash)
+            return None
+
+    def save_transcript_cache_by_url(self, url: str, transcript_text: str,
+                                     duration: float = 0.0, confidence: float = 0.0) -> bool:
+        """
+        根据视频URL保存转录文本到缓存
+
+        Args:
+            url: 视频URL
+            transcript_text: 转录文本
+            duration: 音频时长
+            confidence: 转录置信度
+
+        Returns:
+            是否保存成功
+        """
+        try:
+            url_hash = self._get_url_hash(url)
+            cache_file = self.cache_dir / f"{url_hash}.txt"
+            cache_file.write_text(transcript_text, encoding='utf-8')
+
+            with self._lock:
+                self._set_entry(url_hash, {
+                    'source_file': url,
+                    'source_name': url,
+                    'source_url': url,
+                    'duration': duration,
+                    'confidence': confidence,
+                    'text_length': len(transcript_text),
+                    'created_at': datetime.now().isoformat(),
+                    'cache_file': str(cache_file)
+                })
+                self._save_index()
+            logger.info(f"URL转录缓存已保存: {url}")
+            return True
+
+        except Exception as e:
+            logger.error(f"保存转录缓存失败: {e}")
+            return False
+
+    def _get_sample_hash(self, source: Union[Path, str], signature: str) -> str:
+        """采样转录的缓存键：源文件（或URL）加采样窗口签名，与完整转录的缓存互不覆盖"""
+        source_key = self._get_file_hash(source) if isinstance(source, Path) else self._get_url_hash(source)
+        return hashlib.md5(f"sample:{source_key}:{signature}".encode()).hexdigest()
+
+    def get_cached_sample(self, source: Union[Path, str], signature: str) -> Optional[str]:
+        """
+        获取快速扫描的采样转录
+
+        Args:
+            source: 源文件路径或视频URL
+            signature: 采样窗口签名（窗口变化时缓存失效）
+
+        Returns:
+            缓存的采样转录文本，如果不存在则返回None
+        """
+        sample_hash = self._get_sample_hash(source, signature)
+        cache_file = self.cache_dir / f"{sample_hash}.txt"
+
+        if sample_hash not in self.index:
+            return None
+
+        if not cache_file.exists():
+            self._remove_cache(sample_hash)
+            return None
+
+        logger.info(f"找到采样转录缓存: {source}")
+        return cache_file.read_text(encoding='utf-8')
+
+    def save_sample_cache(self, source: Union[Path, str], signature: str, transcript_text: str,
+                          duration: float = 0.0, sampled_seconds: float = 0.0) -> bool:
+        """
+        保存快速扫描的采样转录
+
+        Args:
+            source: 源文件路径或视频URL
+            signature: 采样窗口签名
+            transcript_text: 采样转录文本
+            duration: 完整时长
+            sampled_seconds: 采样覆盖的时长
+
+        Returns:
+            是否保存成功
+        """
+        try:
+            sample_hash = self._get_sample_hash(source, signature)
+            cache_file = self.cache_dir / f"{sample_hash}.txt"
+            cache_file.write_text(transcript_text, encoding='utf-8')
+
+            source_name = source.name if isinstance(source, Path) else source
+            with self._lock:
+                self._set_entry(sample_hash, {
+                    'source_file': str(source),
+                    'source_name': source_name,
+                    'sampled': True,
+                    'sample_signature': signature,
+                    'duration': duration,
+                    'sampled_seconds': sampled_seconds,
+                    'text_length': len(transcript_text),
+                    'created_at': datetime.now().isoformat(),
+                    'cache_file': str(cache_file)
+                })
+                self._save_index()
+            logger.info(f"采样转录缓存已保存: {source_name}")
+            return True
+
+        except Exception as e:
+            logger.error(f"保存采样转录缓存失败: {e}")
+            return False
+
     def get_cached_transcript(self, file_path: Path) -> Optional[str]:
         """
         获取缓存的转录文本
@@ -197,17 +362,17 @@ class TranscriptCache:
                 f.write(transcript_text)
             
             # 更新索引
-            self.index[file_hash] = {
-                'file_name': file_path.name,
-                'file_path': str(file_path),
-                'duration': duration,
-                'confidence': confidence,
-                'text_length': len(transcript_text),
-                'created_at': datetime.now().isoformat(),
-                'cache_file': str(cache_file)
-            }
-            
-            self._save_index()
+            with self._lock:
+                self._set_entry(file_hash, {
+                    'file_name': file_path.name,
+                    'file_path': str(file_path),
+                    'duration': duration,
+                    'confidence': confidence,
+                    'text_length': len(transcript_text),
+                    'created_at': datetime.now().isoformat(),
+                    'cache_file': str(cache_file)
+                })
+                self._save_index()
             logger.info(f"转录缓存已保存: {file_path.name}")
             return True
             
@@ -224,9 +389,12 @@ class TranscriptCache:
                 cache_file.unlink()
             
             # 从索引中移除
-            if file_hash in self.index:
-                del self.index[file_hash]
-                self._save_index()
+            with self._lock:
+                if file_hash in self.index:
+                    del self.index[file_hash]
+                    self._changed.discard(file_hash)
+                    self._removed.add(file_hash)
+                    self._save_index()
                 
         except Exception as e:
             logger.error(f"移除缓存失败: {e}")
@@ -247,8 +415,12 @@ class TranscriptCache:
                 count += 1
             
             # 清空索引
-            self.index = {}
-            self._save_index()
+            with self._lock:
+                self.index = {}
+                self._changed.clear()
+                self._removed.clear()
+                self._reset = True
+                self._save_index()
             
             logger.info(f"已清理 {count} 个缓存文件")
             return count
@@ -271,7 +443,7 @@ class TranscriptCache:
             # 分析缓存类型
             source_based = 0
             audio_based = 0
-            for cache_info in self.index.values():
+            for cache_info in list(self.index.values()):
                 if 'source_file' in cache_info:
                     source_based += 1
                 else:
@@ -2,10 +2,11 @@
 FFmpeg音频处理工具函数
 """
 
+import json
 import subprocess
 import re
 from pathlib import Path
-from typing import Tuple, Optional
+from typing import List, Tuple, Optional
 from .logger import logger
 from .exceptions import AudioProcessingError
 from .config import config
@@ -13,7 +14,8 @@ from .config import config
 def extract_audio_from_video(
     video_path: Path,
     output_path: Optional[Path] = None,
-    max_size_mb: float = 4.5  # 留一些缓冲空间
+    max_size_mb: float = 4.5,  # 留一些缓冲空间
+    threads: Optional[int] = None
 ) -> Path:
     """
     使用FFmpeg从视频文件提取音频
@@ -21,6 +23,7 @@ def extract_audio_from_video(
     Args:
         video_path: 视频文件路径
         output_path: 输出音频文件路径（可选）
+        threads: 单个ffmpeg任务的线程数（可选，并行提取时限制每个任务占用的核数）
     
     Returns:
         提取的音频文件路径
@@ -42,6 +45,7 @@ def extract_audio_from_video(
         # 对于WAV，使用较低的比特率
         cmd = [
             'ffmpeg',
+            *_thread_args(threads),
             '-i', str(video_path),
             '-vn',  # 不处理视频
             '-acodec', 'pcm_s16le',
@@ -54,6 +58,7 @@ def extract_audio_from_video(
         # 使用MP3压缩
         cmd = [
             'ffmpeg',
+            *_thread_args(threads),
             '-i', str(video_path),
             '-vn',  # 不处理视频
             '-acodec', 'mp3',
@@ -89,6 +94,189 @@ def extract_audio_from_video(
         logger.error(error_msg)
         raise AudioProcessingError(error_msg)
 
+def compress_audio(audio_path: Path, output_path: Path, threads: Optional[int] = None) -> Path:
+    """
+    将音频压缩为低码率MP3以满足ASR接口的大小限制
+    
+    Args:
+        audio_path: 原始音频文件路径
+        output_path: 压缩后的音频文件路径
+        threads: 单个ffmpeg任务的线程数（可选）
+    
+    Returns:
+        压缩后的音频文件路径
+    
+    Raises:
+        AudioProcessingError: 压缩失败
+    """
+    # 使用极低的采样率和比特率进行压缩
+    # 对于13分钟视频，需要更激进的压缩
+    cmd = [
+        'ffmpeg',
+        *_thread_args(threads),
+        '-i', str(audio_path),
+        '-acodec', 'mp3',
+        '-b:a', '32k',  # 非常低的比特率
+        '-ar', '16000',  # 保持标准语音识别采样率
+        '-ac', '1',     # 单声道
+        '-af', 'volume=3.0',  # 增加音量以补偿质量损失
+        '-y',  # 覆盖输出文件
+        str(output_path)
+    ]
+    
+    try:
+        subprocess.run(cmd, capture_output=True, text=True, check=True, timeout=120)
+        logger.info(f"音频压缩完成: {audio_path} -> {output_path}")
+        return output_path
+    except subprocess.CalledProcessError as e:
+        raise AudioProcessingError(f"音频压缩失败: {e.stderr}")
+    except subprocess.TimeoutExpired:
+        raise AudioProcessingError("音频压缩超时")
+    except FileNotFoundError:
+        raise AudioProcessingError("FFmpeg未安装或不在PATH中")
+
+def concat_audio(
+    media_paths: List[Path],
+    output_path: Path,
+    threads: Optional[int] = None
+) -> Path:
+    """
+    将多个媒体文件的音频按顺序拼接并转码为ASR所需格式（用于分段下载的多个片段）
+    
+    Args:
+        media_paths: 媒体文件路径列表（按时间顺序）
+        output_path: 输出音频文件路径
+        threads: 单个ffmpeg任务的线程数（可选）
+    
+    Returns:
+        拼接后的音频文件路径
+    
+    Raises:
+        AudioProcessingError: 拼接失败
+    """
+    missing = [p for p in media_paths if not p.exists()]
+    if missing:
+        raise AudioProcessingError(f"媒体文件不存在: {missing[0]}")
+    
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    
+    cmd = ['ffmpeg', '-v', 'error', *_thread_args(threads)]
+    for path in media_paths:
+        cmd += ['-i', str(path)]
+    streams = "".join(f"[{i}:a:0]" for i in range(len(media_paths)))
+    cmd += [
+        '-filter_complex', f"{streams}concat=n={len(media_paths)}:v=0:a=1[a]",
+        '-map', '[a]',
+        *(['-acodec', 'pcm_s16le'] if config.AUDIO_OUTPUT_FORMAT == 'wav' else ['-acodec', 'mp3', '-b:a', '64k']),
+        '-ar', str(config.AUDIO_SAMPLE_RATE),
+        '-ac', str(config.AUDIO_CHANNELS),
+        '-y', str(output_path)
+    ]
+    
+    try:
+        logger.info(f"开始拼接音频: {len(media_paths)} 个片段 -> {output_path}")
+        subprocess.run(cmd, capture_output=True, text=True, check=True, timeout=300)
+        return output_path
+    except subprocess.CalledProcessError as e:
+        raise AudioProcessingError(f"音频拼接失败: {e.stderr}")
+    except subprocess.TimeoutExpired:
+        raise AudioProcessingError("音频拼接超时")
+    except FileNotFoundError:
+        raise AudioProcessingError("FFmpeg未安装或不在PATH中")
+
+def window_output_paths(output_path: Path, count: int) -> List[Path]:
+    """多片段提取时每个片段的输出路径（{stem}_00{suffix}、{stem}_01{suffix}...）"""
+    return [output_path.with_name(f"{output_path.stem}_{i:02d}{output_path.suffix}") for i in range(count)]
+
+def extract_audio_windows(
+    media_path: Path,
+    windows: List[Tuple[float, float]],
+    output_path: Path,
+    threads: Optional[int] = None
+) -> List[Path]:
+    """
+    使用一次FFmpeg调用提取多个时间窗口的音频（每个窗口在输入端 -ss 定位，不解码窗口之外的内容）
+    
+    Args:
+        media_path: 媒体文件路径
+        windows: (起始秒, 时长秒) 列表
+        output_path: 输出路径模板，每个窗口写入 window_output_paths 对应的文件
+        threads: 单个ffmpeg任务的线程数（可选）
+    
+    Returns:
+        各窗口的音频文件路径
+    
+    Raises:
+        AudioProcessingError: 提取失败
+    """
+    if not media_path.exists():
+        raise AudioProcessingError(f"媒体文件不存在: {media_path}")
+    
+    output_paths = window_output_paths(output_path, len(windows))
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    
+    cmd = ['ffmpeg', '-v', 'error', *_thread_args(threads)]
+    for start, duration in windows:
+        cmd += ['-ss', f"{start:.3f}", '-t', f"{duration:.3f}", '-i', str(media_path)]
+    for i, path in enumerate(output_paths):
+        cmd += [
+            '-map', f'{i}:a:0',
+            '-acodec', 'pcm_s16le',
+            '-ar', str(config.AUDIO_SAMPLE_RATE),
+            '-ac', str(config.AUDIO_CHANNELS),
+            '-y', str(path)
+        ]
+    
+    try:
+        logger.info(f"开始提取采样片段: {media_path.name}, {len(windows)} 个窗口")
+        subprocess.run(cmd, capture_output=True, text=True, check=True, timeout=300)
+        return output_paths
+    except subprocess.CalledProcessError as e:
+        raise AudioProcessingError(f"采样片段提取失败: {e.stderr}")
+    except subprocess.TimeoutExpired:
+        raise AudioProcessingError("采样片段提取超时")
+    except FileNotFoundError:
+        raise AudioProcessingError("FFmpeg未安装或不在PATH中")
+
+def measure_speech_ratio(media_path: Path, start: float, duration: float, noise_db: int = -30) -> float:
+    """
+    估算一个时间窗口内的语音占比（silencedetect 检测静音，只解码该窗口）
+    
+    Args:
+        media_path: 媒体文件路径
+        start: 窗口起始秒
+        duration: 窗口时长秒
+        noise_db: 静音阈值（dB）
+    
+    Returns:
+        非静音时长占比（0~1）
+    
+    Raises:
+        AudioProcessingError: 检测失败
+    """
+    cmd = [
+        'ffmpeg', '-hide_banner', '-nostats',
+        '-ss', f"{start:.3f}", '-t', f"{duration:.3f}", '-i', str(media_path),
+        '-vn', '-af', f'silencedetect=noise={noise_db}dB:d=0.5',
+        '-f', 'null', '-'
+    ]
+    
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True, check=True, timeout=60)
+    except subprocess.CalledProcessError as e:
+        raise AudioProcessingError(f"语音检测失败: {e.stderr}")
+    except subprocess.TimeoutExpired:
+        raise AudioProcessingError("语音检测超时")
+    except FileNotFoundError:
+        raise AudioProcessingError("FFmpeg未安装或不在PATH中")
+    
+    silence = sum(float(value) for value in re.findall(r'silence_duration:\s*([\d.]+)', result.stderr))
+    return max(0.0, 1.0 - silence / duration) if duration > 0 else 0.0
+
+def _thread_args(threads: Optional[int]) -> List[str]:
+    """ffmpeg 线程数参数（未指定时使用ffmpeg默认值）"""
+    return ['-threads', str(threads)] if threads is not None else []
+
 def get_audio_info(audio_path: Path) -> dict:
     """
     获取音频文件信息
@@ -134,6 +322,96 @@ def get_audio_info(audio_path: Path) -> dict:
         logger.error(f"获取音频信息失败: {e}")
         raise AudioProcessingError(f"获取音频信息失败: {e}")
 
+# ffmpeg 可转换为文本的字幕编码（位图字幕如 hdmv_pgs_subtitle / dvd_subtitle 无法直接转文本）
+TEXT_SUBTITLE_CODECS = {'subrip', 'srt', 'ass', 'ssa', 'mov_text', 'webvtt', 'text'}
+
+def probe_media(media_path: Path) -> dict:
+    """
+    使用一次ffprobe获取媒体文件的格式与全部流信息
+    
+    Args:
+        media_path: 媒体文件路径
+    
+    Returns:
+        ffprobe 输出的JSON（format / streams）
+    
+    Raises:
+        AudioProcessingError: 探测失败
+    """
+    cmd = [
+        'ffprobe',
+        '-v', 'quiet',
+        '-print_format', 'json',
+        '-show_format',
+        '-show_streams',
+        str(media_path)
+    ]
+    
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True, check=True, timeout=60)
+        return json.loads(result.stdout)
+    except (subprocess.CalledProcessError, json.JSONDecodeError) as e:
+        raise AudioProcessingError(f"媒体信息探测失败: {media_path}, 错误: {e}")
+    except subprocess.TimeoutExpired:
+        raise AudioProcessingError(f"ffprobe执行超时: {media_path}")
+    except FileNotFoundError:
+        raise AudioProcessingError("ffprobe未安装或不在PATH中")
+
+def text_subtitle_streams(streams: List[dict]) -> List[dict]:
+    """
+    从ffprobe流列表中筛选可转换为文本的字幕轨
+    
+    Args:
+        streams: ffprobe 输出的 streams 列表
+    
+    Returns:
+        字幕轨列表（index / codec / language）
+    """
+    return [
+        {
+            'index': stream['index'],
+            'codec': stream.get('codec_name'),
+            'language': (stream.get('tags') or {}).get('language', ''),
+        }
+        for stream in streams
+        if stream.get('codec_type') == 'subtitle' and stream.get('codec_name') in TEXT_SUBTITLE_CODECS
+    ]
+
+def extract_subtitle_stream(media_path: Path, stream_index: int) -> str:
+    """
+    使用FFmpeg将内嵌字幕轨转换为SRT文本（直接输出到内存，不写文件）
+    
+    Args:
+        media_path: 媒体文件路径
+        stream_index: 字幕轨的流索引
+    
+    Returns:
+        SRT格式的字幕内容
+    
+    Raises:
+        AudioProcessingError: 字幕提取失败
+    """
+    cmd = [
+        'ffmpeg',
+        '-v', 'error',
+        '-i', str(media_path),
+        '-map', f'0:{stream_index}',
+        '-f', 'srt',
+        '-'
+    ]
+    
+    try:
+        result = subprocess.run(cmd, capture_output=True, check=True, timeout=120)
+        return result.stdout.decode('utf-8', errors='replace')
+    except subprocess.CalledProcessError as e:
+        error_msg = f"字幕提取失败: {e.stderr.decode('utf-8', errors='replace')}"
+        logger.error(error_msg)
+        raise AudioProcessingError(error_msg)
+    except subprocess.TimeoutExpired:
+        raise AudioProcessingError("FFmpeg字幕提取超时")
+    except FileNotFoundError:
+        raise AudioProcessingError("FFmpeg未安装或不在PATH中")
+
 def extract_blogger_info_from_path(file_path: Path) -> Tuple[str, str]:
     """
     从文件路径中智能提取博主名称和标题
@@ -5,14 +5,27 @@
 
 import os
 from pathlib import Path
-from typing import List, Optional
-from dotenv import load_dotenv
+from typing import Dict, List, Optional
+
+# LLM调用阶段：content（单视频完整分析）、quick（快速扫描）、digest（博主综合分析前的单视频摘要）、
+# comprehensive（博主综合分析）、map / reduce（分层汇总：视频分组摘要 / 摘要合并）
+LLM_STAGES = ("content", "quick", "digest", "comprehensive", "map", "reduce")
+
+def _parse_pairs(value: str) -> Dict[str, str]:
+    """解析 "键:值,键:值" 形式的配置"""
+    pairs = {}
+    for item in value.split(","):
+        key, _, val = item.partition(":")
+        if key.strip() and val.strip():
+            pairs[key.strip()] = val.strip()
+    return pairs
 
 class Config:
     """配置管理类"""
     
     def __init__(self):
-        # 加载环境变量
+        # 加载环境变量（延迟导入dotenv，减少CLI冷启动的导入开销）
+        from dotenv import load_dotenv
         load_dotenv()
         
         # 项目根目录
@@ -35,6 +48,120 @@ class Config:
         self.DEFAULT_AI_PROVIDER = os.getenv("DEFAULT_AI_PROVIDER", "deepseek")
         self.DEFAULT_MODEL = os.getenv("DEFAULT_MODEL", "deepseek-chat")
         
+        # 多提供商路由：参与路由的提供商（逗号分隔，为空时只用默认提供商）、各提供商模型（默认提供商使用 DEFAULT_MODEL）、
+        # 路由权重（如 deepseek:3,openai:1）
+        self.LLM_PROVIDERS = [p.strip() for p in os.getenv("LLM_PROVIDERS", "").split(",") if p.strip()]
+        self.DEEPSEEK_MODEL = os.getenv("DEEPSEEK_MODEL", "deepseek-chat")
+        self.OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
+        self.LLM_PROVIDER_WEIGHTS = {
+            name: float(weight) for name, weight in _parse_pairs(os.getenv("LLM_PROVIDER_WEIGHTS", "")).items()
+        }
+        # 分阶段模型配置（LLM_MODEL_<阶段>，如 LLM_MODEL_DIGEST=deepseek:deepseek-chat,openai:gpt-4o-mini，
+        # 不带提供商前缀时作用于默认提供商；未配置的提供商使用其默认模型）；
+        # 单视频摘要与视频分组摘要默认使用各提供商的轻量模型（DEEPSEEK_MODEL / OPENAI_MODEL），其余阶段默认使用 DEFAULT_MODEL
+        self.LLM_STAGE_MODELS: Dict[str, Dict[str, str]] = {}
+        for stage in LLM_STAGES:
+            value = os.getenv(f"LLM_MODEL_{stage.upper()}", "")
+            if not value and stage in ("digest", "map"):
+                value = f"deepseek:{self.DEEPSEEK_MODEL},openai:{self.OPENAI_MODEL}"
+            self.LLM_STAGE_MODELS[stage] = self._parse_stage_models(value)
+        # 分阶段温度与输出上限（LLM_TEMPERATURE_<阶段> / LLM_MAX_TOKENS_<阶段>，为空时使用内置默认值）
+        self.LLM_STAGE_TEMPERATURES = {
+            stage: float(os.environ[f"LLM_TEMPERATURE_{stage.upper()}"])
+            for stage in LLM_STAGES if os.getenv(f"LLM_TEMPERATURE_{stage.upper()}")
+        }
+        self.LLM_STAGE_MAX_TOKENS = {
+            stage: int(os.environ[f"LLM_MAX_TOKENS_{stage.upper()}"])
+            for stage in LLM_STAGES if os.getenv(f"LLM_MAX_TOKENS_{stage.upper()}")
+        }
+        # 对冲请求：主请求超过该提供商历史延迟的分位数（0 表示关闭）后向另一提供商发送副本；
+        # 等待下限（秒）、启用对冲所需的最少延迟样本数
+        self.LLM_HEDGE_PERCENTILE = float(os.getenv("LLM_HEDGE_PERCENTILE", "95"))
+        self.LLM_HEDGE_MIN_SECONDS = float(os.getenv("LLM_HEDGE_MIN_SECONDS", "10"))
+        self.LLM_HEDGE_MIN_SAMPLES = int(os.getenv("LLM_HEDGE_MIN_SAMPLES", "20"))
+        # 健康检查：连续失败次数达到阈值后冷却（秒），冷却期间只作兜底
+        self.LLM_FAILURE_THRESHOLD = int(os.getenv("LLM_FAILURE_THRESHOLD", "3"))
+        self.LLM_FAILURE_COOLDOWN = float(os.getenv("LLM_FAILURE_COOLDOWN", "60"))
+        # 结构化输出：请求JSON模式（response_format=json_object，DeepSeek与OpenAI均支持）、
+        # 缺失或格式不正确的字段的补充请求次数（0 表示直接使用占位值）
+        self.LLM_JSON_MODE = os.getenv("LLM_JSON_MODE", "true").lower() in ("1", "true", "yes")
+        self.LLM_REPAIR_ATTEMPTS = int(os.getenv("LLM_REPAIR_ATTEMPTS", "1"))
+        
+        # HTTP连接池配置（ASR与LLM客户端在进程内复用，保持keep-alive）
+        self.HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "10"))
+        self.HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", "120"))
+        self.HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "60"))
+        
+        # 视频元数据缓存有效期（秒），媒体直链通常数小时后过期
+        self.VIDEO_INFO_CACHE_TTL = int(os.getenv("VIDEO_INFO_CACHE_TTL", "3600"))
+        
+        # URL模式只下载音频流（码率上限kbps），关闭后下载音视频合流
+        self.URL_AUDIO_ONLY = os.getenv("URL_AUDIO_ONLY", "true").lower() in ("1", "true", "yes")
+        self.URL_AUDIO_MAX_ABR = int(os.getenv("URL_AUDIO_MAX_ABR", "128"))
+        
+        # URL模式默认只下载开头的分钟数（0表示完整下载，可被 --max-minutes / --sections 覆盖）
+        self.URL_MAX_MINUTES = float(os.getenv("URL_MAX_MINUTES", "0"))
+        
+        # 本地文件优先使用内嵌字幕轨或同名字幕文件（.srt/.vtt/.ass），命中时跳过音频提取与ASR
+        self.LOCAL_SUBTITLES = os.getenv("LOCAL_SUBTITLES", "true").lower() in ("1", "true", "yes")
+        
+        # 提取音频的磁盘缓存上限（MB），超出时按最近使用淘汰，0 表示关闭
+        self.AUDIO_CACHE_MAX_MB = int(os.getenv("AUDIO_CACHE_MAX_MB", "2048"))
+        
+        # 音频提取阶段：ffmpeg进程池大小（默认CPU核数）、每个ffmpeg任务的线程数（0 表示由ffmpeg自动决定）、
+        # 已提取但尚未转录的音频数量上限（超过时暂停提取，避免占满磁盘）
+        self.EXTRACT_WORKERS = int(os.getenv("EXTRACT_WORKERS", str(os.cpu_count() or 1)))
+        self.FFMPEG_THREADS = int(os.getenv("FFMPEG_THREADS", "1"))
+        self.EXTRACT_QUEUE_SIZE = int(os.getenv("EXTRACT_QUEUE_SIZE", "4"))
+        
+        # 快速扫描（--quick）：只转录K个代表性片段；窗口策略 even（均匀分布）或 speech（语音密度最高）
+        self.QUICK_SCAN_WINDOWS = int(os.getenv("QUICK_SCAN_WINDOWS", "4"))
+        self.QUICK_SCAN_WINDOW_SECONDS = float(os.getenv("QUICK_SCAN_WINDOW_SECONDS", "45"))
+        self.QUICK_SCAN_STRATEGY = os.getenv("QUICK_SCAN_STRATEGY", "even")
+        
+        # 博主批量调度：策略 name / priority / sjf / fair、状态优先级（逗号分隔，靠前优先）、fair 策略的分组字段
+        self.SCHEDULE_POLICY = os.getenv("SCHEDULE_POLICY", "name")
+        self.SCHEDULE_STATUS_PRIORITY = [
+            s.strip() for s in os.getenv("SCHEDULE_STATUS_PRIORITY", "重点跟进,跟进中,待评估").split(",") if s.strip()
+        ]
+        self.SCHEDULE_FAIR_KEY = os.getenv("SCHEDULE_FAIR_KEY", "platform")
+        
+        # 批量预检规划：单价（元）与吞吐量估算参数
+        self.PRICE_ASR_PER_HOUR = float(os.getenv("PRICE_ASR_PER_HOUR", "1.75"))
+        self.PRICE_LLM_INPUT_PER_M = float(os.getenv("PRICE_LLM_INPUT_PER_M", "2"))
+        self.PRICE_LLM_OUTPUT_PER_M = float(os.getenv("PRICE_LLM_OUTPUT_PER_M", "8"))
+        self.PRICE_LLM_CACHED_INPUT_PER_M = float(os.getenv("PRICE_LLM_CACHED_INPUT_PER_M", "0.5"))  # 命中前缀缓存的输入
+        self.PLAN_CHARS_PER_SECOND = float(os.getenv("PLAN_CHARS_PER_SECOND", "4"))  # 语速（转录字符/秒）
+        self.PLAN_TOKENS_PER_CHAR = float(os.getenv("PLAN_TOKENS_PER_CHAR", "0.7"))
+        self.PLAN_OUTPUT_RATIO = float(os.getenv("PLAN_OUTPUT_RATIO", "0.6"))  # 实际输出约为输出上限的比例
+        self.PLAN_EXTRACT_SPEED = float(os.getenv("PLAN_EXTRACT_SPEED", "100"))  # 音频提取速度（×实时）
+        self.PLAN_ASR_SPEED = float(os.getenv("PLAN_ASR_SPEED", "10"))  # ASR处理速度（×实时）
+        self.PLAN_LLM_TOKENS_PER_SECOND = float(os.getenv("PLAN_LLM_TOKENS_PER_SECOND", "30"))
+        
+        # 博主综合分析模式：single（全部转录拼接为一次调用）、mapreduce（分组摘要→逐层合并→综合分析）、
+        # auto（转录总字符数超过阈值时使用 mapreduce）
+        self.COMPREHENSIVE_MODE = os.getenv("COMPREHENSIVE_MODE", "auto")
+        self.MAPREDUCE_THRESHOLD_CHARS = int(os.getenv("MAPREDUCE_THRESHOLD_CHARS", "40000"))
+        # 分层汇总：每组视频的转录字符上限与视频数上限、每次合并的摘要数、并行调用数
+        self.MAPREDUCE_GROUP_CHARS = int(os.getenv("MAPREDUCE_GROUP_CHARS", "15000"))
+        self.MAPREDUCE_GROUP_SIZE = int(os.getenv("MAPREDUCE_GROUP_SIZE", "8"))
+        self.MAPREDUCE_FAN_IN = int(os.getenv("MAPREDUCE_FAN_IN", "4"))
+        self.MAPREDUCE_WORKERS = int(os.getenv("MAPREDUCE_WORKERS", "4"))
+        
+        # 本地任务队列（SQLite）：数据库路径（多台主机共享时指向共享文件系统）、租约超时（秒）、
+        # 最大尝试次数（超过后进入死信）、重试退避基数（秒）、空闲时的轮询间隔（秒）
+        self.QUEUE_DB_PATH = os.getenv("QUEUE_DB_PATH", "")
+        self.QUEUE_VISIBILITY_TIMEOUT = float(os.getenv("QUEUE_VISIBILITY_TIMEOUT", "900"))
+        self.QUEUE_MAX_ATTEMPTS = int(os.getenv("QUEUE_MAX_ATTEMPTS", "3"))
+        self.QUEUE_RETRY_BACKOFF = float(os.getenv("QUEUE_RETRY_BACKOFF", "30"))
+        self.QUEUE_POLL_INTERVAL = float(os.getenv("QUEUE_POLL_INTERVAL", "5"))
+        
+        # HTTP服务（main.py serve）：监听地址与端口、同时执行的任务数、内存中保留的任务数
+        self.SERVE_HOST = os.getenv("SERVE_HOST", "127.0.0.1")
+        self.SERVE_PORT = int(os.getenv("SERVE_PORT", "8765"))
+        self.SERVE_WORKERS = int(os.getenv("SERVE_WORKERS", "2"))
+        self.SERVE_MAX_JOBS = int(os.getenv("SERVE_MAX_JOBS", "1000"))
+        
         # 音频处理配置
         self.AUDIO_OUTPUT_FORMAT = os.getenv("AUDIO_OUTPUT_FORMAT", "wav")
         self.AUDIO_SAMPLE_RATE = int(os.getenv("AUDIO_SAMPLE_RATE", "16000"))
@@ -47,6 +174,17 @@ class Config:
         self.PROMPTS_DIR = self.ROOT_DIR / "prompts"
         self.TEMPLATES_DIR = self.ROOT_DIR / "templates"
     
+    def _parse_stage_models(self, value: str) -> Dict[str, str]:
+        """解析阶段模型配置：提供商:模型 列表，或单个模型名（作用于默认提供商）"""
+        models = {}
+        for item in value.split(","):
+            provider, _, model = item.strip().partition(":")
+            if model and provider in ("deepseek", "openai"):
+                models[provider] = model.strip()
+            elif item.strip():
+                models[self.DEFAULT_AI_PROVIDER] = item.strip()
+        return models
+    
     def validate(self) -> List[str]:
         """
         验证配置是否完整
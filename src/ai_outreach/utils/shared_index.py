@@ -0,0 +1,74 @@
+"""
+多进程共享的JSON索引文件
+worker 进程各自持有缓存实例和内存索引；保存时在进程间文件锁内重新读取磁盘上的索引，
+只合并本进程新增/修改/删除的条目后原子替换，避免整体覆盖导致其他进程写入的条目丢失
+"""
+
+import json
+import os
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterable
+
+from .logger import logger
+
+try:
+    import fcntl
+except ImportError:  # Windows：没有 fcntl，退化为仅进程内加锁
+    fcntl = None
+
+
+@contextmanager
+def interprocess_lock(lock_file: Path):
+    """进程间互斥锁（flock 独占锁，文件关闭时自动释放，进程崩溃不会遗留锁）"""
+    if fcntl is None:
+        yield
+        return
+    with open(lock_file, 'a') as f:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+def load_index(index_file: Path) -> Dict[str, Any]:
+    """读取索引文件（不存在或损坏时返回空索引）"""
+    if index_file.exists():
+        try:
+            with open(index_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            logger.warning(f"加载缓存索引失败: {index_file}, 错误: {e}")
+    return {}
+
+
+def merge_and_save(index_file: Path, index: Dict[str, Any], changed: Iterable[str],
+                   removed: Iterable[str], reset: bool = False) -> Dict[str, Any]:
+    """
+    把本进程的改动合并进磁盘上的索引并保存
+
+    Args:
+        index_file: 索引文件路径
+        index: 本进程的内存索引
+        changed: 本进程新增或修改的键
+        removed: 本进程删除的键
+        reset: 本进程清空过索引（丢弃磁盘上的全部条目）
+
+    Returns:
+        合并后的索引（调用方用它替换内存索引，同时获得其他进程写入的条目）
+    """
+    with interprocess_lock(index_file.with_suffix('.lock')):
+        merged = {} if reset else load_index(index_file)
+        for key in removed:
+            merged.pop(key, None)
+        for key in changed:
+            if key in index:
+                merged[key] = index[key]
+
+        tmp_file = index_file.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(merged, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_file, index_file)
+    return merged
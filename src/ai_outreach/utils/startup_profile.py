@@ -0,0 +1,140 @@
+"""
+启动耗时分析工具
+基于 `python -X importtime` 输出生成导入耗时摘要，用于CLI冷启动基准检查
+"""
+
+import re
+import subprocess
+import sys
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import List, Optional
+
+# 轻量命令不应加载的重量级依赖（顶层包名）
+HEAVY_MODULES = ('yt_dlp', 'tencentcloud', 'openai', 'jinja2')
+
+# 轻量命令的默认启动预算（秒）
+DEFAULT_STARTUP_BUDGET = 1.0
+
+_IMPORTTIME_LINE = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)\s*$')
+
+
+@dataclass
+class ImportRecord:
+    """单个模块的导入耗时记录"""
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+    @property
+    def top_level(self) -> str:
+        return self.module.split('.', 1)[0]
+
+
+@dataclass
+class StartupProfile:
+    """一次命令启动的耗时分析结果"""
+    argv: List[str]
+    wall_time: float
+    returncode: int
+    records: List[ImportRecord] = field(default_factory=list)
+
+    @property
+    def imported_modules(self) -> List[str]:
+        return [record.module for record in self.records]
+
+    def heavy_imports(self) -> List[str]:
+        """返回本次启动中被加载的重量级依赖"""
+        loaded = {record.top_level for record in self.records}
+        return [name for name in HEAVY_MODULES if name in loaded]
+
+
+def parse_importtime(stderr: str) -> List[ImportRecord]:
+    """
+    解析 `-X importtime` 输出
+
+    Args:
+        stderr: 子进程的标准错误输出
+
+    Returns:
+        导入耗时记录列表（保持原始顺序）
+    """
+    records = []
+    for line in stderr.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, indent, module = match.groups()
+        records.append(ImportRecord(
+            module=module,
+            self_us=int(self_us),
+            cumulative_us=int(cumulative_us),
+            # importtime 每一级嵌套缩进两个空格，顶层为一个空格
+            depth=max(0, (len(indent) - 1) // 2)
+        ))
+    return records
+
+
+def profile_command(argv: List[str], script: Optional[Path] = None, timeout: int = 60) -> StartupProfile:
+    """
+    以 `-X importtime` 运行CLI命令并统计启动耗时
+
+    Args:
+        argv: 传给 main.py 的参数，如 ["config-check"]
+        script: 入口脚本路径（默认项目根目录的 main.py）
+        timeout: 子进程超时时间（秒）
+
+    Returns:
+        启动耗时分析结果
+    """
+    if script is None:
+        script = Path(__file__).resolve().parent.parent.parent.parent / "main.py"
+
+    cmd = [sys.executable, '-X', 'importtime', str(script), *argv]
+    started = time.perf_counter()
+    result = subprocess.run(
+        cmd,
+        capture_output=True,
+        text=True,
+        timeout=timeout,
+        cwd=str(script.parent)
+    )
+    wall_time = time.perf_counter() - started
+
+    return StartupProfile(
+        argv=list(argv),
+        wall_time=wall_time,
+        returncode=result.returncode,
+        records=parse_importtime(result.stderr)
+    )
+
+
+def format_digest(profile: StartupProfile, top: int = 15) -> str:
+    """
+    生成导入耗时摘要
+
+    Args:
+        profile: 启动耗时分析结果
+        top: 展示累计耗时最高的前N个顶层包
+
+    Returns:
+        摘要文本
+    """
+    # 只统计顶层导入（depth == 0），避免子模块重复计入累计耗时
+    roots = [record for record in profile.records if record.depth == 0]
+    roots.sort(key=lambda record: record.cumulative_us, reverse=True)
+    total_us = sum(record.cumulative_us for record in roots)
+
+    lines = [
+        f"命令: main.py {' '.join(profile.argv)}",
+        f"墙钟时间: {profile.wall_time:.3f}s, 导入总耗时: {total_us / 1000:.1f}ms, 模块数: {len(profile.records)}",
+    ]
+    for record in roots[:top]:
+        lines.append(f"  {record.cumulative_us / 1000:8.1f}ms  {record.module}")
+
+    heavy = profile.heavy_imports()
+    if heavy:
+        lines.append(f"⚠️ 加载了重量级依赖: {', '.join(heavy)}")
+    return '\n'.join(lines)
@@ -0,0 +1,155 @@
+"""
+任务工作区管理
+为每个任务分配独立的临时目录（TEMP_DIR/jobs/<任务ID>），任务内产物使用确定的文件名，
+任务结束时整体删除；进程崩溃遗留的目录在下次启动时按属主进程清理
+"""
+
+import json
+import os
+import re
+import shutil
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Optional
+
+from .logger import logger
+from .config import config
+
+# 工作区属主标记文件
+OWNER_MARKER = ".owner"
+
+# 没有属主标记的目录（刚创建或写入失败）超过该时长才视为遗留
+ORPHAN_GRACE_SECONDS = 3600
+
+
+def _pid_alive(pid: int) -> bool:
+    """判断进程是否仍在运行"""
+    if pid <= 0:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # 进程存在但属于其他用户
+        return True
+    except OSError:
+        return False
+    return True
+
+
+class JobWorkspace:
+    """单个任务的工作区"""
+
+    def __init__(self, path: Path, job_id: str):
+        self.path = path
+        self.job_id = job_id
+
+    def artifact(self, name: str) -> Path:
+        """
+        任务内产物的路径（同一任务内名称唯一即可，不同任务互不影响）
+
+        Args:
+            name: 产物文件名
+
+        Returns:
+            工作区内的文件路径
+        """
+        return self.path / name
+
+    def cleanup(self):
+        """删除整个工作区"""
+        if self.path.exists():
+            shutil.rmtree(self.path, ignore_errors=True)
+            logger.debug(f"已清理任务工作区: {self.path}")
+
+    def __enter__(self) -> "JobWorkspace":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.cleanup()
+
+
+class WorkspaceManager:
+    """任务工作区管理器"""
+
+    def __init__(self, root: Optional[Path] = None):
+        """
+        Args:
+            root: 工作区根目录（默认 TEMP_DIR/jobs）
+        """
+        self.root = root or (config.TEMP_DIR / "jobs")
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def create(self, label: str = "job") -> JobWorkspace:
+        """
+        创建新的任务工作区
+
+        Args:
+            label: 任务标签（用于目录名，便于排查）
+
+        Returns:
+            任务工作区
+        """
+        label = re.sub(r'[^\w-]+', '_', label).strip('_')[:40] or "job"
+        job_id = f"{label}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        path = self.root / job_id
+        path.mkdir(parents=True)
+
+        marker = {
+            'pid': os.getpid(),
+            'thread': threading.get_ident(),
+            'created_at': time.time(),
+        }
+        (path / OWNER_MARKER).write_text(json.dumps(marker), encoding='utf-8')
+
+        logger.debug(f"创建任务工作区: {path}")
+        return JobWorkspace(path, job_id)
+
+    def _is_stale(self, path: Path) -> bool:
+        """判断工作区是否为遗留目录（属主进程已退出）"""
+        marker = path / OWNER_MARKER
+        try:
+            owner = json.loads(marker.read_text(encoding='utf-8'))
+            return not _pid_alive(int(owner['pid']))
+        except (OSError, ValueError, KeyError, TypeError):
+            try:
+                return time.time() - path.stat().st_mtime > ORPHAN_GRACE_SECONDS
+            except OSError:
+                return False
+
+    def cleanup_stale(self) -> int:
+        """
+        清理崩溃遗留的工作区
+
+        Returns:
+            清理的工作区数量
+        """
+        removed = 0
+        for path in self.root.iterdir():
+            if not path.is_dir() or not self._is_stale(path):
+                continue
+            shutil.rmtree(path, ignore_errors=True)
+            removed += 1
+
+        if removed:
+            logger.info(f"已清理 {removed} 个遗留的任务工作区")
+        return removed
+
+
+_manager: Optional[WorkspaceManager] = None
+_manager_lock = threading.Lock()
+
+
+def get_workspace_manager() -> WorkspaceManager:
+    """获取进程级工作区管理器（首次获取时清理遗留工作区）"""
+    global _manager
+    if _manager is None:
+        with _manager_lock:
+            if _manager is None:
+                manager = WorkspaceManager()
+                manager.cleanup_stale()
+                _manager = manager
+    return _manager
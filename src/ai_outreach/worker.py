@@ -0,0 +1,214 @@
+"""
+队列 worker 模块
+从本地任务队列领取视频级与博主级任务并执行：视频任务完成提取、转录与单视频分析，
+博主任务把每个视频拆分为视频任务，待其全部结束后汇总生成综合报告。
+main.py worker --concurrency N 启动N个 worker 进程
+"""
+
+import multiprocessing
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from .utils.logger import logger
+from .utils.config import config
+from .utils.exceptions import AnalysisError, FileProcessingError
+from .job_queue import JobQueue, QueueJob, worker_id
+from .services import ServiceContainer, get_services
+
+
+class QueueWorker:
+    """单个 worker（一个进程内串行执行任务）"""
+
+    def __init__(self, queue: JobQueue, services: Optional[ServiceContainer] = None,
+                 owner: Optional[str] = None, kinds: Optional[List[str]] = None,
+                 poll_interval: Optional[float] = None):
+        """
+        Args:
+            queue: 任务队列
+            services: 服务容器（可选，默认使用进程级共享容器）
+            owner: worker 标识（默认 主机名:进程号）
+            kinds: 只处理这些类型的任务（默认全部）
+            poll_interval: 空闲时的轮询间隔（秒）
+        """
+        from .blogger_analyzer import BloggerAnalyzer
+
+        self.queue = queue
+        self.services = services or get_services()
+        self.blogger_analyzer = BloggerAnalyzer(services=self.services)
+        self.owner = owner or worker_id()
+        self.kinds = kinds
+        self.poll_interval = config.QUEUE_POLL_INTERVAL if poll_interval is None else poll_interval
+        self.processed = 0
+
+    def _heartbeat(self, job: QueueJob, stop: threading.Event):
+        """执行期间定期续约，避免长时间的ASR被误判为 worker 崩溃"""
+        interval = max(1.0, self.queue.visibility_timeout / 3)
+        while not stop.wait(interval):
+            if not self.queue.heartbeat(job.id, self.owner):
+                logger.warning(f"任务租约已被接管: #{job.id}")
+                return
+
+    def run_once(self) -> bool:
+        """
+        领取并执行一个任务
+
+        Returns:
+            是否领取到任务
+        """
+        job = self.queue.lease(self.owner, kinds=self.kinds)
+        if job is None:
+            return False
+
+        logger.info(f"[{self.owner}] 开始任务 #{job.id} ({job.kind}, 第{job.attempts}次): {job.path}")
+        stop = threading.Event()
+        heartbeat = threading.Thread(target=self._heartbeat, args=(job, stop), daemon=True)
+        heartbeat.start()
+        try:
+            if job.kind == 'video':
+                result = self.process_video(job)
+            else:
+                result = self.process_blogger(job)
+        except Exception as e:
+            status = self.queue.fail(job.id, self.owner, str(e))
+            logger.error(f"[{self.owner}] 任务失败 #{job.id}: {e}（{status}）")
+        else:
+            if result is not None:
+                self.queue.complete(job.id, self.owner, result)
+                logger.info(f"[{self.owner}] 任务完成 #{job.id}: {Path(job.path).name}")
+        finally:
+            stop.set()
+            heartbeat.join()
+        self.processed += 1
+        return True
+
+    def run(self, max_jobs: Optional[int] = None, exit_when_idle: bool = False):
+        """
+        循环领取任务
+
+        Args:
+            max_jobs: 最多执行的任务数（默认不限）
+            exit_when_idle: 队列中没有未完成的任务时退出
+        """
+        logger.info(f"worker 启动: {self.owner}, 队列: {self.queue.db_path}")
+        while max_jobs is None or self.processed < max_jobs:
+            if self.run_once():
+                continue
+            if exit_when_idle and not self.queue.has_pending():
+                break
+            time.sleep(self.poll_interval)
+        logger.info(f"worker 退出: {self.owner}, 共执行 {self.processed} 个任务")
+
+    def process_video(self, job: QueueJob) -> Dict[str, Any]:
+        """视频任务：提取、转录、单视频分析，结果为 VideoAnalysis.to_dict()"""
+        video_file = Path(job.path)
+        if not video_file.exists():
+            raise FileProcessingError(f"视频文件不存在: {video_file}")
+
+        errors = []
+
+        def progress(state, **fields):
+            if state == 'failed':
+                errors.append(fields.get('error', ''))
+
+        analyses = self.blogger_analyzer.analyze_videos([video_file], quick_scan=job.quick_scan, progress=progress)
+        if not analyses:
+            raise AnalysisError(errors[0] if errors else f"视频分析失败: {video_file.name}")
+        return analyses[0].to_dict()
+
+    def process_blogger(self, job: QueueJob) -> Optional[Dict[str, Any]]:
+        """
+        博主任务：为每个视频创建视频任务；视频任务全部结束后汇总生成综合报告
+
+        Returns:
+            任务结果；仍有视频任务未结束时归还租约并返回None
+        """
+        from .blogger_analyzer import VideoAnalysis, list_blogger_media
+
+        folder = Path(job.path)
+        info_files = list(folder.glob("人物 - *.md")) if folder.is_dir() else []
+        if not info_files:
+            raise FileProcessingError(f"未找到博主信息文件 (人物 - *.md): {folder}")
+        media = list_blogger_media(folder)
+        if not media:
+            raise FileProcessingError(f"未找到视频文件: {folder}")
+
+        for media_path in media:
+            self.queue.enqueue('video', media_path, priority=job.priority, parent_id=job.id,
+                               quick_scan=job.quick_scan)
+
+        media_paths = {str(p.resolve()) for p in media}
+        children = [c for c in self.queue.children(job.id) if c.path in media_paths]
+        waiting = [c for c in children if c.status in ('queued', 'leased')]
+        if waiting:
+            logger.info(f"博主任务 #{job.id} 等待 {len(waiting)}/{len(children)} 个视频任务")
+            self.queue.release(job.id, self.owner, delay=self.poll_interval)
+            return None
+
+        video_analyses = [VideoAnalysis.from_dict(c.result) for c in children if c.status == 'done' and c.result]
+        dead = [c for c in children if c.status == 'dead']
+        if not video_analyses:
+            raise AnalysisError("所有视频分析均失败")
+        if dead:
+            logger.warning(f"博主任务 #{job.id} 有 {len(dead)} 个视频进入死信，按其余 {len(video_analyses)} 个视频汇总")
+
+        blogger_info = self.blogger_analyzer.parse_blogger_info_file(info_files[0])
+        analysis_result = self.blogger_analyzer.generate_comprehensive_analysis(
+            blogger_info, video_analyses, quick_scan=job.quick_scan
+        )
+        report_path = self.services.generator.generate_blogger_comprehensive_report(analysis_result)
+        return {
+            'blogger_name': blogger_info.name,
+            'report_path': str(report_path),
+            'videos': len(video_analyses),
+            'dead_videos': [Path(c.path).name for c in dead],
+        }
+
+
+def _worker_main(db_path: str, kinds: Optional[List[str]], exit_when_idle: bool):
+    """worker 进程入口"""
+    queue = JobQueue(Path(db_path))
+    try:
+        QueueWorker(queue, kinds=kinds).run(exit_when_idle=exit_when_idle)
+    except KeyboardInterrupt:
+        # 未提交的任务在租约超时后由其他 worker 重新领取
+        pass
+    finally:
+        queue.close()
+
+
+def run_workers(concurrency: int, db_path: Optional[Path] = None, kinds: Optional[List[str]] = None,
+                exit_when_idle: bool = False):
+    """
+    启动N个 worker 进程并等待其退出
+
+    Args:
+        concurrency: worker 进程数
+        db_path: 队列数据库路径
+        kinds: 只处理这些类型的任务
+        exit_when_idle: 队列清空后退出
+    """
+    # 先在主进程中建表，再由各 worker 进程各自打开连接（SQLite连接不能跨 fork 共享）
+    queue = JobQueue(db_path)
+    db_path = str(queue.db_path)
+    queue.close()
+    if concurrency <= 1:
+        _worker_main(db_path, kinds, exit_when_idle)
+        return
+
+    processes = [
+        multiprocessing.Process(target=_worker_main, args=(db_path, kinds, exit_when_idle), name=f"worker-{i}")
+        for i in range(concurrency)
+    ]
+    for process in processes:
+        process.start()
+    try:
+        for process in processes:
+            process.join()
+    except KeyboardInterrupt:
+        logger.info("收到中断，等待 worker 退出...")
+        for process in processes:
+            process.join(timeout=10)
+            if process.is_alive():
+                process.terminate()
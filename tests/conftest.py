@@ -0,0 +1,19 @@
+"""
+测试公共夹具
+"""
+
+import pytest
+
+from src.ai_outreach.utils import workspace
+from src.ai_outreach.utils.config import config
+
+
+@pytest.fixture(autouse=True)
+def isolated_dirs(tmp_path, monkeypatch):
+    """输出与临时目录指向测试的临时目录，缓存、工作区等不写入仓库的 outputs/ 与 temp/"""
+    monkeypatch.setattr(config, 'OUTPUT_DIR', tmp_path / 'outputs')
+    monkeypatch.setattr(config, 'TRANSCRIPTS_DIR', tmp_path / 'outputs' / 'transcripts')
+    monkeypatch.setattr(config, 'TEMP_DIR', tmp_path / 'temp')
+    # 进程级工作区管理器按新的临时目录重新创建
+    monkeypatch.setattr(workspace, '_manager', None)
+    yield
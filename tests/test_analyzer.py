@@ -4,7 +4,8 @@ AI分析模块测试
 
 import pytest
 from unittest.mock import patch, MagicMock
-from src.ai_outreach.analyzer import ContentAnalyzer, AnalysisResult
+from types import SimpleNamespace
+from src.ai_outreach.analyzer import ContentAnalyzer, AnalysisResult, describe_usage, stage_settings
 from src.ai_outreach.utils.exceptions import AnalysisError, ConfigurationError
 
 class TestAnalysisResult:
@@ -118,4 +119,116 @@ class TestContentAnalyzer:
                 
                 assert isinstance(result, AnalysisResult)
                 assert result.content_style == "测试风格"
-                assert result.main_topics == ["测试话题"]
\ No newline at end of file
+                assert result.main_topics == ["测试话题"]
+
+class TestStageSettings:
+    """分阶段模型配置测试类"""
+    
+    def test_stage_overrides(self):
+        """测试阶段配置覆盖内置默认值"""
+        with patch.multiple('src.ai_outreach.analyzer.config', LLM_STAGE_MAX_TOKENS={'digest': 300},
+                            LLM_STAGE_TEMPERATURES={}, LLM_STAGE_MODELS={'digest': {'openai': 'gpt-4o-mini'}}):
+            settings = stage_settings('digest')
+        
+        assert (settings.prompt, settings.max_tokens, settings.temperature) == ('video_digest_v1', 300, 0.2)
+        assert settings.models == {'openai': 'gpt-4o-mini'}
+        with pytest.raises(ValueError):
+            stage_settings('unknown')
+    
+    def test_digest_stage_uses_stage_model(self):
+        """测试单视频摘要使用摘要Prompt与阶段模型"""
+        mock_response = MagicMock()
+        mock_response.choices[0].message.content = '{"main_topics": ["话题"], "content_style": "风格", "tone": "语调"}'
+        client = MagicMock()
+        client.chat.completions.create.return_value = mock_response
+        
+        with patch.multiple('src.ai_outreach.analyzer.config', DEFAULT_AI_PROVIDER='deepseek',
+                            LLM_STAGE_MAX_TOKENS={}, LLM_STAGE_TEMPERATURES={},
+                            LLM_STAGE_MODELS={'digest': {'deepseek': 'fast-model'}}):
+            analyzer = ContentAnalyzer(ai_client=client)
+            with patch.object(ContentAnalyzer, 'load_prompt_template', return_value='{title}{author}{transcript}') as load:
+                result = analyzer.analyze_content("文本", stage='digest')
+        
+        load.assert_called_once_with('video_digest_v1')
+        kwargs = client.chat.completions.create.call_args.kwargs
+        assert (kwargs['model'], kwargs['max_tokens']) == ('fast-model', 500)
+        assert (result.main_topics, result.tone, result.prompt_version) == (["话题"], "语调", 'video_digest_v1')
+
+
+class TestUsageAccounting:
+    """用量与前缀缓存统计测试类"""
+    
+    @pytest.mark.parametrize("usage", [
+        SimpleNamespace(prompt_tokens=1000, completion_tokens=200, prompt_cache_hit_tokens=800, prompt_cache_miss_tokens=200),
+        SimpleNamespace(prompt_tokens=1000, completion_tokens=200, prompt_tokens_details=SimpleNamespace(cached_tokens=800)),
+    ])
+    def test_records_cache_hits(self, usage):
+        """测试记录DeepSeek与OpenAI两种格式的缓存命中token"""
+        with patch.multiple('src.ai_outreach.analyzer.config', DEFAULT_AI_PROVIDER='deepseek'):
+            analyzer = ContentAnalyzer(ai_client=MagicMock())
+        
+        analyzer._record_usage(SimpleNamespace(usage=usage))
+        analyzer._record_usage(SimpleNamespace(usage=None))
+        
+        snapshot = analyzer.usage_snapshot()
+        assert snapshot == {'calls': 2, 'prompt_tokens': 1000, 'completion_tokens': 200,
+                            'cache_hit_tokens': 800, 'cache_miss_tokens': 200}
+        assert "缓存命中 800 tokens（80%）" in describe_usage(snapshot)
+
+
+class TestStructuredOutput:
+    """结构化输出校验与字段补充请求测试类"""
+    
+    @staticmethod
+    def _response(content):
+        response = MagicMock()
+        response.choices[0].message.content = content
+        return response
+    
+    def _analyze(self, *contents, repair_attempts=1):
+        client = MagicMock()
+        client.chat.completions.create.side_effect = [self._response(c) for c in contents]
+        templates = {'video_digest_v1': '{title}{author}{transcript}', 'repair_fields_v1': '补充字段：\n{fields}'}
+        with patch.multiple('src.ai_outreach.analyzer.config', DEFAULT_AI_PROVIDER='deepseek', LLM_JSON_MODE=True,
+                            LLM_REPAIR_ATTEMPTS=repair_attempts, LLM_STAGE_MAX_TOKENS={},
+                            LLM_STAGE_TEMPERATURES={}, LLM_STAGE_MODELS={}):
+            analyzer = ContentAnalyzer(ai_client=client)
+            with patch.object(ContentAnalyzer, 'load_prompt_template', side_effect=templates.get):
+                result = analyzer.analyze_content("文本", stage='digest')
+        return result, client.chat.completions.create.call_args_list
+    
+    def test_complete_response_single_call(self):
+        """测试输出完整时只调用一次，并请求JSON模式"""
+        result, calls = self._analyze('{"main_topics": ["话题"], "content_style": "风格", "tone": "语调"}')
+        
+        assert len(calls) == 1
+        assert calls[0].kwargs['response_format'] == {'type': 'json_object'}
+        assert 'failed_fields' not in result.data
+    
+    def test_repair_requests_only_missing_fields(self):
+        """测试只针对缺失字段补充请求，并保留首次结果"""
+        result, calls = self._analyze('{"main_topics": ["话题"], "content_style": "风格"}', '{"tone": "轻松"}')
+        
+        assert len(calls) == 2
+        repair_messages = calls[1].kwargs['messages']
+        assert repair_messages[-2]['role'] == 'assistant'
+        assert '- tone：' in repair_messages[-1]['content']
+        assert 'main_topics' not in repair_messages[-1]['content']
+        assert calls[1].kwargs['max_tokens'] == 300
+        assert (result.main_topics, result.content_style, result.tone) == (["话题"], "风格", "轻松")
+    
+    def test_truncated_response_keeps_extracted_fields(self):
+        """测试截断的响应保留可提取字段，补充失败的字段使用占位值"""
+        result, calls = self._analyze('{"main_topics": ["话题"], "content_style": "风格", "tone": "语',
+                                      '无法补充')
+        
+        assert len(calls) == 2
+        assert (result.main_topics, result.content_style, result.tone) == (["话题"], "风格", "未能分析")
+        assert result.data['failed_fields'] == ['tone']
+    
+    def test_repair_disabled(self):
+        """测试关闭补充请求时直接使用占位值"""
+        result, calls = self._analyze('{"main_topics": ["话题"]}', repair_attempts=0)
+        
+        assert len(calls) == 1
+        assert result.data['failed_fields'] == ['content_style', 'tone']
@@ -0,0 +1,117 @@
+"""
+提取音频缓存测试
+"""
+
+import os
+from src.ai_outreach.audio_cache import AudioCache
+
+def make_file(path, size):
+    path.write_bytes(b'\x00' * size)
+    return path
+
+class TestAudioCache:
+    """提取音频缓存测试类"""
+
+    def test_put_and_get_links_into_workspace(self, tmp_path):
+        """测试命中缓存时音频链接到任务工作区，并返回记录的时长"""
+        cache = AudioCache(tmp_path / 'cache', max_bytes=10_000)
+        source = make_file(tmp_path / 'video.mp4', 100)
+        audio = make_file(tmp_path / 'audio.wav', 1000)
+
+        cache.put(source, audio, duration=42.0)
+        dest = tmp_path / 'job' / 'video_audio.wav'
+        entry = cache.get(source, dest)
+
+        assert entry['duration'] == 42.0
+        assert dest.read_bytes() == audio.read_bytes()
+
+    def test_changed_source_misses(self, tmp_path):
+        """测试源文件大小变化后缓存失效"""
+        cache = AudioCache(tmp_path / 'cache', max_bytes=10_000)
+        source = make_file(tmp_path / 'video.mp4', 100)
+        cache.put(source, make_file(tmp_path / 'audio.wav', 1000))
+
+        make_file(source, 200)
+
+        assert cache.get(source, tmp_path / 'out.wav') is None
+
+    def test_lru_eviction_by_size(self, tmp_path):
+        """测试超过容量时淘汰最久未使用的条目"""
+        cache = AudioCache(tmp_path / 'cache', max_bytes=2500)
+        sources = [make_file(tmp_path / f'v{i}.mp4', 10 + i) for i in range(3)]
+        audio = make_file(tmp_path / 'audio.wav', 1000)
+
+        cache.put(sources[0], audio)
+        cache.put(sources[1], audio)
+        # 访问 v0 使其成为最近使用
+        assert cache.get(sources[0], tmp_path / 'out.wav')
+        cache.put(sources[2], audio)
+
+        assert cache.get(sources[1], tmp_path / 'out.wav') is None
+        assert cache.get(sources[0], tmp_path / 'out.wav')
+        assert cache.get(sources[2], tmp_path / 'out.wav')
+        assert cache.get_stats()['cache_count'] == 2
+
+    def test_evicted_file_stays_valid_for_running_job(self, tmp_path):
+        """测试淘汰缓存不影响已链接到工作区的音频"""
+        cache = AudioCache(tmp_path / 'cache', max_bytes=1500)
+        audio = make_file(tmp_path / 'audio.wav', 1000)
+        first = make_file(tmp_path / 'a.mp4', 10)
+        cache.put(first, audio)
+        linked = tmp_path / 'job' / 'a_audio.wav'
+        cache.get(first, linked)
+
+        cache.put(make_file(tmp_path / 'b.mp4', 20), audio)
+
+        assert cache.get(first, tmp_path / 'out.wav') is None
+        assert linked.stat().st_size == 1000
+
+    def test_disabled_when_zero(self, tmp_path):
+        """测试容量为0时关闭缓存"""
+        cache = AudioCache(tmp_path / 'cache', max_bytes=0)
+        source = make_file(tmp_path / 'video.mp4', 100)
+        cache.put(source, make_file(tmp_path / 'audio.wav', 10))
+
+        assert cache.get(source, tmp_path / 'out.wav') is None
+        assert not [f for f in os.listdir(tmp_path / 'cache') if f.endswith('.wav')]
+
+    def test_instances_in_different_processes_keep_each_others_entries(self, tmp_path):
+        """测试共享索引的多个缓存实例（各worker进程各一个）保存时不会覆盖彼此的条目"""
+        first = AudioCache(tmp_path / 'cache', max_bytes=10_000)
+        second = AudioCache(tmp_path / 'cache', max_bytes=10_000)
+        audio = make_file(tmp_path / 'audio.wav', 1000)
+        a = make_file(tmp_path / 'a.mp4', 10)
+        b = make_file(tmp_path / 'b.mp4', 20)
+
+        first.put(a, audio, duration=1.0)
+        second.put(b, audio, duration=2.0)
+
+        reloaded = AudioCache(tmp_path / 'cache', max_bytes=10_000)
+        assert reloaded.get_stats()['cache_count'] == 2
+        assert reloaded.get(a, tmp_path / 'a.wav')['duration'] == 1.0
+        assert reloaded.get(b, tmp_path / 'b.wav')['duration'] == 2.0
+
+    def test_eviction_counts_entries_from_other_instances(self, tmp_path):
+        """测试淘汰按合并后全部条目的总大小计算"""
+        first = AudioCache(tmp_path / 'cache', max_bytes=2500)
+        second = AudioCache(tmp_path / 'cache', max_bytes=2500)
+        audio = make_file(tmp_path / 'audio.wav', 1000)
+        sources = [make_file(tmp_path / f'v{i}.mp4', 10 + i) for i in range(3)]
+
+        first.put(sources[0], audio)
+        second.put(sources[1], audio)
+        first.put(sources[2], audio)
+
+        assert AudioCache(tmp_path / 'cache', max_bytes=2500).get_stats()['cache_count'] == 2
+
+    def test_clear_removes_entries_from_other_instances(self, tmp_path):
+        """测试清空缓存同时删除其他实例写入的条目和音频文件"""
+        first = AudioCache(tmp_path / 'cache', max_bytes=10_000)
+        second = AudioCache(tmp_path / 'cache', max_bytes=10_000)
+        audio = make_file(tmp_path / 'audio.wav', 1000)
+        first.put(make_file(tmp_path / 'a.mp4', 10), audio)
+        second.put(make_file(tmp_path / 'b.mp4', 20), audio)
+
+        assert first.clear() == 2
+        assert AudioCache(tmp_path / 'cache', max_bytes=10_000).get_stats()['cache_count'] == 0
+        assert not [f for f in os.listdir(tmp_path / 'cache') if f.endswith('.wav')]
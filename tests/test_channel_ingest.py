@@ -0,0 +1,143 @@
+"""
+频道导入模块测试
+使用本地夹具提取器（fixture://）替代真实平台，下载的是本地 file:// 音频文件
+"""
+
+import time
+import pytest
+from yt_dlp.extractor.common import InfoExtractor
+
+from src.ai_outreach.channel_ingest import ChannelEntry, ChannelIngestor
+from src.ai_outreach.fetcher import VideoFetcher
+
+NOW = time.time()
+DAY = 86400
+
+# 视频ID -> (播放量, 发布天数)
+FIXTURE_VIDEOS = {
+    'v1': (1000, 400),
+    'v2': (500000, 30),
+    'v3': (20, 2),
+    'v4': (80000, 5),
+}
+
+class FixtureChannelIE(InfoExtractor):
+    """夹具频道：平铺返回视频条目，不带播放量（需要补全元数据）"""
+    _VALID_URL = r'fixture://channel/(?P<id>\w+)'
+
+    def _real_extract(self, url):
+        channel_id = self._match_id(url)
+        entries = [self.url_result(f'fixture://video/{video_id}', FixtureVideoIE, video_id, f'视频 {video_id}')
+                   for video_id in FIXTURE_VIDEOS]
+        info = self.playlist_result(entries, channel_id, '测试频道')
+        info.update({'uploader': '测试 博主', 'channel_follower_count': 12000,
+                     'webpage_url': url, 'description': '专注测试的博主\n第二行'})
+        return info
+
+class FixtureVideoIE(InfoExtractor):
+    """夹具视频：音频流指向本地文件"""
+    _VALID_URL = r'fixture://video/(?P<id>\w+)'
+    media_dir = None
+
+    def _real_extract(self, url):
+        video_id = self._match_id(url)
+        view_count, age_days = FIXTURE_VIDEOS[video_id]
+        audio_file = self.media_dir / f'{video_id}.m4a'
+        return {
+            'id': video_id,
+            'title': f'视频 {video_id}',
+            'view_count': view_count,
+            'timestamp': int(NOW - age_days * DAY),
+            'duration': 60,
+            'formats': [{
+                'format_id': 'audio',
+                'url': audio_file.as_uri(),
+                'ext': 'm4a',
+                'vcodec': 'none',
+                'acodec': 'mp4a.40.2',
+                'abr': 64,
+            }],
+        }
+
+@pytest.fixture
+def ingestor(tmp_path):
+    """基于夹具提取器的频道导入器"""
+    media_dir = tmp_path / 'media'
+    media_dir.mkdir()
+    for video_id in FIXTURE_VIDEOS:
+        (media_dir / f'{video_id}.m4a').write_bytes(video_id.encode() * 256)
+    FixtureVideoIE.media_dir = media_dir
+
+    fetcher = VideoFetcher(
+        info_cache_dir=tmp_path / 'info_cache',
+        audio_only=True,
+        extractors=[FixtureChannelIE, FixtureVideoIE],
+        ydl_params={'enable_file_urls': True}
+    )
+    return ChannelIngestor(fetcher=fetcher, metadata_workers=4, max_concurrent_downloads=2)
+
+class TestChannelRanking:
+    """频道条目排序测试类"""
+
+    def test_rank_by_views_and_recency(self):
+        """测试播放量与新近度综合排序"""
+        ingestor = ChannelIngestor(fetcher=object())
+        entries = [
+            ChannelEntry(url='a', video_id='a', title='旧的爆款', view_count=1000000, timestamp=NOW - 720 * DAY),
+            ChannelEntry(url='b', video_id='b', title='新的爆款', view_count=1000000, timestamp=NOW - 1 * DAY),
+            ChannelEntry(url='c', video_id='c', title='新的冷门', view_count=10, timestamp=NOW - 1 * DAY),
+        ]
+
+        ranked = ingestor.rank_entries(entries, now=NOW)
+
+        assert [e.video_id for e in ranked] == ['b', 'a', 'c']
+        assert ranked[0].score > ranked[1].score > ranked[2].score
+
+    def test_missing_metadata_ranks_last(self):
+        """测试缺少播放量与发布时间的条目得分为0"""
+        ingestor = ChannelIngestor(fetcher=object())
+        entries = [
+            ChannelEntry(url='a', video_id='a', title='未知'),
+            ChannelEntry(url='b', video_id='b', title='有数据', view_count=100, timestamp=NOW),
+        ]
+
+        ranked = ingestor.rank_entries(entries, now=NOW)
+
+        assert ranked[-1].video_id == 'a'
+        assert ranked[-1].score == 0
+
+class TestChannelIngest:
+    """频道导入流程测试类"""
+
+    def test_ingest_downloads_top_entries_only(self, ingestor, tmp_path):
+        """测试只下载排名前N的视频音频"""
+        result = ingestor.ingest('fixture://channel/demo', tmp_path / 'bloggers', top_n=2, now=NOW)
+
+        assert len(result.ranked_entries) == 4
+        assert all(not e.needs_metadata for e in result.ranked_entries)
+        assert [e.video_id for e in result.ranked_entries[:2]] == ['v2', 'v4']
+        assert sorted(p.name for p in result.downloaded_files) == ['视频 v2 [v2].m4a', '视频 v4 [v4].m4a']
+        assert not result.failed_entries
+
+    def test_blogger_folder_layout(self, ingestor, tmp_path):
+        """测试生成符合 BloggerAnalyzer 约定的博主文件夹与信息文件"""
+        result = ingestor.ingest('fixture://channel/demo', tmp_path / 'bloggers', top_n=1, now=NOW)
+
+        assert result.blogger_dir.name == '01-博主-测试_博主'
+        assert result.info_file.name == '人物 - 测试_博主.md'
+        content = result.info_file.read_text(encoding='utf-8')
+        assert 'follower_count: "12000"' in content
+        assert 'status: "待评估"' in content
+        assert '专注测试的博主' in content
+
+    def test_reingest_reuses_folder_and_downloads(self, ingestor, tmp_path):
+        """测试重复导入复用已有文件夹且不重复下载"""
+        first = ingestor.ingest('fixture://channel/demo', tmp_path / 'bloggers', top_n=2, now=NOW)
+        downloaded = first.downloaded_files[0]
+        downloaded.write_bytes(b'already-here')
+
+        second = ingestor.ingest('fixture://channel/demo', tmp_path / 'bloggers', top_n=2, now=NOW)
+
+        assert second.blogger_dir == first.blogger_dir
+        assert downloaded.read_bytes() == b'already-here'
+        assert len(list((tmp_path / 'bloggers').iterdir())) == 1
@@ -0,0 +1,117 @@
+"""
+数据导出测试
+"""
+
+import csv
+import json
+import os
+import time
+
+import pytest
+
+from src.ai_outreach.exporter import export_all, load_watermark
+from src.ai_outreach.utils.exceptions import ConfigurationError
+
+VIDEO_RECORD = {
+    'kind': 'video', 'version': 1, 'timestamp': '2025-01-01T12:00:00',
+    'video_info': {'title': '剪辑入门', 'author': '小王', 'duration': 120.0, 'input_type': 'file'},
+    'analysis': {'content_style': '干货', 'main_topics': ['剪辑', '调色'], 'blogger_characteristics': {'expertise': '剪辑'}},
+}
+BLOGGER_RECORD = {
+    'kind': 'blogger', 'version': 1, 'current_time': '2025-01-02 08:00:00', 'total_videos': 3,
+    'total_duration': 600.0, 'quick_scan': False,
+    'blogger_info': {'name': '小王', 'platform': 'B站', 'strengths': ['稳定更新'], 'risks': []},
+    'comprehensive_analysis': {'blogger_golden_quotes': ['慢就是快'], 'soft_indicator_summary': '展现工作流'},
+}
+TRANSCRIPT = """# 音频转录文本
+
+## 基本信息
+- **博主**: 小王
+- **标题**: 剪辑入门
+- **时长**: 120.0秒
+- **来源**: file
+- **转录时间**: 2025-01-01 12:00:00
+- **字符数**: 42
+
+## 转录内容
+
+- **不是头部**: 正文内容
+"""
+
+
+@pytest.fixture
+def sources(tmp_path):
+    outputs = tmp_path / 'outputs'
+    transcripts = outputs / 'transcripts'
+    transcripts.mkdir(parents=True)
+    (outputs / 'a.analysis.json').write_text(json.dumps(VIDEO_RECORD, ensure_ascii=False), encoding='utf-8')
+    (outputs / 'b.analysis.json').write_text(json.dumps(BLOGGER_RECORD, ensure_ascii=False), encoding='utf-8')
+    (transcripts / 'a.txt').write_text(TRANSCRIPT, encoding='utf-8')
+    past = time.time() - 10
+    for path in [outputs / 'a.analysis.json', outputs / 'b.analysis.json', transcripts / 'a.txt']:
+        os.utime(path, (past, past))
+    return outputs, transcripts
+
+
+def _export(sources, target, formats, **kwargs):
+    outputs, transcripts = sources
+    return export_all(target, formats, analysis_roots=[outputs], transcripts_dir=transcripts, **kwargs)
+
+
+class TestExport:
+    """导出测试类"""
+    
+    def test_jsonl_and_csv(self, sources, tmp_path):
+        """测试导出三张表，JSONL保留数组，CSV写为JSON文本"""
+        target = tmp_path / 'exports'
+        summary = _export(sources, target, ['jsonl', 'csv'])
+        
+        assert summary.rows == {'analyses': 2, 'bloggers': 1, 'transcripts': 1}
+        assert len(summary.files) == 6
+        
+        jsonl = next((target / 'analyses').glob('*.jsonl'))
+        rows = [json.loads(line) for line in jsonl.read_text(encoding='utf-8').splitlines()]
+        assert rows[0]['main_topics'] == ['剪辑', '调色']
+        assert rows[1]['golden_sentences'] == ['慢就是快']
+        assert rows[1]['report'].endswith('b.md')
+        
+        with open(next((target / 'transcripts').glob('*.csv')), encoding='utf-8-sig') as f:
+            transcript = next(csv.DictReader(f))
+        assert (transcript['author'], transcript['duration'], transcript['chars']) == ('小王', '120.0', '42')
+        with open(next((target / 'bloggers').glob('*.csv')), encoding='utf-8-sig') as f:
+            blogger = next(csv.DictReader(f))
+        assert json.loads(blogger['strengths']) == ['稳定更新']
+    
+    def test_incremental_export(self, sources, tmp_path):
+        """测试增量导出只包含水位线之后的文件"""
+        outputs, _ = sources
+        target = tmp_path / 'exports'
+        first = _export(sources, target, ['jsonl'])
+        assert load_watermark(target) == first.watermark
+        
+        time.sleep(0.01)
+        (outputs / 'c.analysis.json').write_text(json.dumps(VIDEO_RECORD), encoding='utf-8')
+        second = _export(sources, target, ['jsonl'])
+        assert second.rows == {'analyses': 1, 'bloggers': 0, 'transcripts': 0}
+        
+        full = _export(sources, target, ['jsonl'], full=True)
+        assert full.rows['analyses'] == 3
+    
+    def test_unknown_format(self, sources, tmp_path):
+        """测试不支持的格式"""
+        with pytest.raises(ConfigurationError):
+            _export(sources, tmp_path / 'exports', ['xlsx'])
+    
+    def test_parquet(self, sources, tmp_path):
+        """测试导出Parquet（未安装 pyarrow 时给出安装提示）"""
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            with pytest.raises(ConfigurationError, match="pyarrow"):
+                _export(sources, tmp_path / 'exports', ['parquet'])
+            assert load_watermark(tmp_path / 'exports') == 0.0
+            return
+        
+        _export(sources, tmp_path / 'exports', ['parquet'])
+        table = pq.read_table(next((tmp_path / 'exports' / 'analyses').glob('*.parquet')))
+        assert table.num_rows == 2
@@ -0,0 +1,127 @@
+"""
+音频提取阶段模块测试
+"""
+
+import os
+import sys
+import time
+import pytest
+from unittest.mock import MagicMock
+from src.ai_outreach.extraction_stage import ExtractionJob, ExtractionStage
+from src.ai_outreach.file_handler import FileHandler
+from src.ai_outreach.utils.exceptions import AudioProcessingError
+
+# 模拟ffmpeg：把输入复制到输出，记录 -threads 参数；输入名包含 broken 时失败
+FAKE_FFMPEG = f"""#!{sys.executable}
+import shutil, sys
+args = sys.argv[1:]
+src = args[args.index('-i') + 1]
+if 'broken' in src:
+    sys.stderr.write('Invalid data found when processing input')
+    sys.exit(1)
+threads = args[args.index('-threads') + 1] if '-threads' in args else 'default'
+shutil.copyfile(src, args[-1])
+with open(args[-1], 'a') as f:
+    f.write('|threads=' + threads)
+"""
+
+@pytest.fixture
+def fake_ffmpeg(tmp_path, monkeypatch):
+    """在PATH中放置模拟的ffmpeg（工作进程继承环境变量）"""
+    bin_dir = tmp_path / 'bin'
+    bin_dir.mkdir()
+    ffmpeg = bin_dir / 'ffmpeg'
+    ffmpeg.write_text(FAKE_FFMPEG)
+    ffmpeg.chmod(0o755)
+    monkeypatch.setenv('PATH', f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+    return ffmpeg
+
+@pytest.fixture
+def stage():
+    stage = ExtractionStage(workers=2, threads=1, queue_size=1)
+    yield stage
+    stage.close()
+
+def make_sources(tmp_path, names):
+    sources = []
+    for name in names:
+        path = tmp_path / name
+        path.write_text(name)
+        sources.append(path)
+    return sources
+
+class TestExtractionStage:
+    """ffmpeg进程池测试类"""
+
+    def test_run_extracts_in_parallel_with_thread_limit(self, tmp_path, fake_ffmpeg, stage):
+        """测试批量任务全部完成，且每个ffmpeg任务带有线程数限制"""
+        sources = make_sources(tmp_path, [f'v{i}.mp4' for i in range(5)])
+        jobs = [ExtractionJob(s, tmp_path / 'out' / f'{s.stem}.wav', duration=60.0) for s in sources]
+
+        results = list(stage.run(jobs))
+
+        assert sorted(r.job.source.name for r in results) == [s.name for s in sources]
+        assert all(r.ok for r in results)
+        assert all(r.job.output.read_text().endswith('|threads=1') for r in results)
+        assert all(r.speed and r.speed > 0 for r in results)
+
+    def test_failed_job_reported_not_raised(self, tmp_path, fake_ffmpeg, stage):
+        """测试单个任务失败时以错误结果返回，不影响其他任务"""
+        sources = make_sources(tmp_path, ['ok.mp4', 'broken.mp4'])
+
+        results = {r.job.source.name: r for r in stage.run([ExtractionJob(s, tmp_path / f'{s.stem}.wav') for s in sources])}
+
+        assert results['ok.mp4'].ok
+        assert isinstance(results['broken.mp4'].error, AudioProcessingError)
+        assert results['broken.mp4'].speed is None
+
+    def test_backpressure_limits_outstanding_jobs(self, tmp_path, fake_ffmpeg, stage):
+        """测试消费方未取走结果时，提交的任务不超过 workers + queue_size"""
+        sources = make_sources(tmp_path, [f'v{i}.mp4' for i in range(8)])
+        out_dir = tmp_path / 'out'
+        submitted = []
+
+        def jobs():
+            for s in sources:
+                submitted.append(s)
+                yield ExtractionJob(s, out_dir / f'{s.stem}.wav')
+
+        results = stage.run(jobs())
+        first = next(results)
+        time.sleep(0.5)  # 给生产者时间尝试继续提交
+
+        # 已取走1个结果，只释放1个名额（另有1个任务已从生成器取出、等待名额）
+        assert first.ok
+        assert len(submitted) <= stage.workers + stage.queue_size + 2
+        assert len(list(results)) == len(sources) - 1
+
+    def test_run_one_raises_on_failure(self, tmp_path, fake_ffmpeg, stage):
+        """测试单任务模式失败时抛出异常"""
+        source, = make_sources(tmp_path, ['broken.wav'])
+
+        with pytest.raises(AudioProcessingError):
+            stage.run_one(ExtractionJob(source, tmp_path / 'c.mp3', kind='compress'))
+
+class TestBatchFileProcessing:
+    """批量文件处理测试类"""
+
+    def test_process_files_uses_stage(self, tmp_path, fake_ffmpeg, stage):
+        """测试批量处理时需要提取的文件交给进程池，结果写入各自的工作区"""
+        media_probe = MagicMock()
+        media_probe.probe.return_value.duration = 30.0
+        media_probe.probe.return_value.subtitle_streams = []
+        sources = make_sources(tmp_path, ['a.mp4', 'b.mp4', 'missing.txt'])
+        sources[2].unlink()
+
+        handler = FileHandler(media_probe=media_probe, extraction_stage=stage)
+        results = list(handler.process_files(sources))
+
+        errors = [path.name for path, info, error in results if error]
+        infos = {path.name: info for path, info, error in results if info}
+        assert errors == ['missing.txt']
+        assert set(infos) == {'a.mp4', 'b.mp4'}
+        for info in infos.values():
+            assert info.audio_path.parent == info.workspace.path
+            assert info.audio_path.read_text().startswith(info.video_path.name)
+            assert info.duration == 30.0
+            info.workspace.cleanup()
@@ -0,0 +1,201 @@
+"""
+在线视频抓取模块测试
+"""
+
+import json
+import pytest
+from unittest.mock import patch, MagicMock
+from src.ai_outreach.fetcher import VideoFetcher, clip_sections, parse_sections
+from src.ai_outreach.utils.workspace import WorkspaceManager
+
+URL = "https://www.bilibili.com/video/BV1test"
+
+SAMPLE_INFO = {
+    'id': 'BV1test',
+    'title': '测试视频',
+    'uploader': '测试博主',
+    'duration': 125,
+    'subtitles': {},
+    'automatic_captions': {},
+}
+
+@pytest.fixture
+def mock_ydl():
+    """模拟yt-dlp，记录extract_info调用次数"""
+    with patch('src.ai_outreach.fetcher.yt_dlp.YoutubeDL') as mock_cls:
+        ydl = MagicMock()
+        ydl.extract_info.return_value = dict(SAMPLE_INFO)
+        ydl.sanitize_info.side_effect = lambda info, **kwargs: info
+        mock_cls.return_value.__enter__.return_value = ydl
+        ydl.cls = mock_cls
+        yield ydl
+
+class TestVideoInfoCache:
+    """视频元数据缓存测试类"""
+
+    def test_single_extraction_per_url(self, mock_ydl, tmp_path):
+        """测试同一URL只调用一次extract_info"""
+        fetcher = VideoFetcher(info_cache_dir=tmp_path)
+
+        info = fetcher.fetch_video_info(URL)
+        video_info = fetcher.extract_subtitles(URL)
+
+        assert info.title == '测试视频'
+        assert video_info.subtitles is None
+        assert mock_ydl.extract_info.call_count == 1
+        # 无字幕时不应发起任何下载
+        mock_ydl.process_ie_result.assert_not_called()
+
+    def test_disk_cache_shared_across_instances(self, mock_ydl, tmp_path):
+        """测试磁盘缓存在不同实例间复用"""
+        VideoFetcher(info_cache_dir=tmp_path).fetch_video_info(URL)
+        info = VideoFetcher(info_cache_dir=tmp_path).fetch_video_info(URL)
+
+        assert info.author == '测试博主'
+        assert mock_ydl.extract_info.call_count == 1
+
+    def test_expired_cache_is_refreshed(self, mock_ydl, tmp_path):
+        """测试过期缓存会重新提取"""
+        fetcher = VideoFetcher(info_cache_dir=tmp_path)
+        fetcher.fetch_video_info(URL)
+
+        cache_file = fetcher._info_cache_file(URL)
+        entry = json.loads(cache_file.read_text(encoding='utf-8'))
+        entry['fetched_at'] -= fetcher.info_cache_ttl + 1
+        cache_file.write_text(json.dumps(entry), encoding='utf-8')
+
+        VideoFetcher(info_cache_dir=tmp_path).fetch_video_info(URL)
+
+        assert mock_ydl.extract_info.call_count == 2
+
+    def test_subtitle_language_preference(self, tmp_path):
+        """测试优先选择人工字幕，其次自动字幕"""
+        fetcher = VideoFetcher(info_cache_dir=tmp_path)
+
+        assert fetcher._select_subtitle_lang({'subtitles': {'en': [{}]}, 'automatic_captions': {'zh': [{}]}}) == 'en'
+        assert fetcher._select_subtitle_lang({'automatic_captions': {'zh-Hans': [{}]}}) == 'zh-Hans'
+        assert fetcher._select_subtitle_lang({'subtitles': {'ja': [{}]}}) is None
+
+class TestInMemorySubtitles:
+    """内存字幕解析测试类"""
+
+    def test_embedded_subtitle_parsed_without_download(self, mock_ydl, tmp_path):
+        """测试内嵌字幕数据直接解析，不下载任何文件"""
+        srt = "1\n00:00:00,000 --> 00:00:01,000\n你好\n\n2\n00:00:01,000 --> 00:00:02,000\n你好\n世界\n"
+        mock_ydl.extract_info.return_value = dict(SAMPLE_INFO, subtitles={'zh': [{'ext': 'srt', 'data': srt}]})
+        fetcher = VideoFetcher(info_cache_dir=tmp_path)
+
+        video_info = fetcher.extract_subtitles(URL)
+
+        assert video_info.subtitles == '你好 世界'
+        assert [(c.start, c.text) for c in video_info.subtitle_cues] == [(0.0, '你好'), (1.0, '世界')]
+        mock_ydl.process_ie_result.assert_not_called()
+        mock_ydl.urlopen.assert_not_called()
+
+    def test_remote_track_prefers_json3(self, mock_ydl, tmp_path):
+        """测试远程字幕优先选择JSON3格式并在内存中读取"""
+        import io
+        json3 = json.dumps({'events': [{'tStartMs': 0, 'dDurationMs': 1000, 'segs': [{'utf8': 'hi'}]}]})
+        mock_ydl.extract_info.return_value = dict(SAMPLE_INFO, automatic_captions={'en': [
+            {'ext': 'vtt', 'url': 'https://example.com/sub.vtt'},
+            {'ext': 'json3', 'url': 'https://example.com/sub.json3'},
+        ]})
+        mock_ydl.urlopen.return_value = io.BytesIO(json3.encode('utf-8'))
+        fetcher = VideoFetcher(info_cache_dir=tmp_path)
+
+        video_info = fetcher.extract_subtitles(URL)
+
+        assert mock_ydl.urlopen.call_args[0][0].url == 'https://example.com/sub.json3'
+        assert video_info.subtitles == 'hi'
+
+class TestAudioOnlyDownload:
+    """仅音频下载模式测试类"""
+
+    def test_audio_only_format_selector(self, tmp_path):
+        """测试仅音频模式选择有码率上限的音频流"""
+        with patch('src.ai_outreach.fetcher.config.URL_AUDIO_MAX_ABR', 96):
+            fetcher = VideoFetcher(info_cache_dir=tmp_path, audio_only=True)
+
+        selector = fetcher.ydl_opts['format']
+        assert selector.startswith('bestaudio[abr<=?96]/worstaudio')
+        # 音频流不可用时才回退到合流格式
+        assert selector.endswith(VideoFetcher.VIDEO_FORMAT)
+
+    def test_full_video_format_selector(self, tmp_path):
+        """测试关闭仅音频模式时保持合流格式"""
+        fetcher = VideoFetcher(info_cache_dir=tmp_path, audio_only=False)
+
+        assert fetcher.ydl_opts['format'] == VideoFetcher.VIDEO_FORMAT
+
+    def test_download_reuses_cached_info(self, mock_ydl, tmp_path):
+        """测试下载基于缓存info执行，不再重复提取，并直接转码下载的音频"""
+        audio_file = tmp_path / 'media.m4a'
+        audio_file.write_bytes(b'0' * 1024)
+        mock_ydl.process_ie_result.return_value = {
+            'vcodec': 'none',
+            'acodec': 'mp4a.40.2',
+            'requested_downloads': [{'filepath': str(audio_file)}],
+        }
+        fetcher = VideoFetcher(info_cache_dir=tmp_path, audio_only=True)
+        workspace = WorkspaceManager(tmp_path / 'jobs').create('url')
+
+        with patch('src.ai_outreach.fetcher.extract_audio_from_video', return_value=tmp_path / 'audio.wav') as mock_extract:
+            fetcher.fetch_video_info(URL)
+            video_info = fetcher.download_and_extract_audio(URL, workspace=workspace)
+
+        assert mock_ydl.extract_info.call_count == 1
+        assert video_info.media_type == 'audio'
+        assert video_info.workspace is workspace
+        mock_extract.assert_called_once_with(audio_file, workspace.artifact('media_audio.wav'))
+        # 下载模板指向任务工作区
+        outtmpl = mock_ydl.cls.call_args[0][0]['outtmpl']
+        assert outtmpl.startswith(str(workspace.path))
+
+class TestSectionDownload:
+    """分段下载测试类"""
+
+    def test_parse_sections(self):
+        """测试区间解析：支持多种时间格式，排序并合并重叠区间"""
+        assert parse_sections("12:00-15:30, 0-90, 60-2:00") == [(0.0, 120.0), (720.0, 930.0)]
+        assert parse_sections("1:00:00-") == [(3600.0, float('inf'))]
+        assert parse_sections(None, max_minutes=5) == [(0.0, 300.0)]
+        assert parse_sections("0-30", max_minutes=5) == [(0.0, 30.0)]
+        assert parse_sections(None, max_minutes=0) == []
+
+    @pytest.mark.parametrize("spec", ["5:00", "3:00-1:00", "a-b"])
+    def test_invalid_sections(self, spec):
+        """测试非法区间抛出ValueError"""
+        with pytest.raises(ValueError):
+            parse_sections(spec)
+
+    def test_clip_sections(self):
+        """测试区间裁剪到视频时长，覆盖全片时退化为完整下载"""
+        assert clip_sections([(0.0, 300.0), (600.0, 900.0)], 700) == [(0.0, 300.0), (600.0, 700.0)]
+        assert clip_sections([(0.0, 600.0)], 125) == []
+
+    def test_download_only_requested_ranges(self, mock_ydl, tmp_path):
+        """测试只下载指定区间、多个区间拼接，元数据保留完整时长"""
+        mock_ydl.extract_info.return_value = dict(SAMPLE_INFO, duration=3600)
+        parts = [tmp_path / 'BV1test.0.m4a', tmp_path / 'BV1test.600.m4a']
+        for part in parts:
+            part.write_bytes(b'0' * 1024)
+        mock_ydl.process_ie_result.return_value = {
+            'vcodec': 'none',
+            'requested_downloads': [{'filepath': str(p)} for p in parts],
+        }
+        fetcher = VideoFetcher(info_cache_dir=tmp_path, audio_only=True)
+        workspace = WorkspaceManager(tmp_path / 'jobs').create('url')
+
+        with patch('src.ai_outreach.fetcher.concat_audio', return_value=tmp_path / 'audio.wav') as mock_concat, \
+             patch('src.ai_outreach.fetcher.extract_audio_from_video') as mock_extract:
+            video_info = fetcher.download_and_extract_audio(URL, workspace=workspace, sections=[(0.0, 120.0), (600.0, 660.0)])
+
+        opts = mock_ydl.cls.call_args[0][0]
+        ranges = list(opts['download_ranges']({}, mock_ydl))
+        assert [(r['start_time'], r['end_time']) for r in ranges] == [(0.0, 120.0), (600.0, 660.0)]
+        assert '%(section_start)s' in opts['outtmpl']
+        mock_concat.assert_called_once_with(parts, workspace.artifact('BV1test.0_audio.wav'))
+        mock_extract.assert_not_called()
+        assert video_info.duration == 3600
+        assert video_info.audio_duration == 180.0
+        assert video_info.sections_label == '00:00-02:00, 10:00-11:00'
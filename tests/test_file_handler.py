@@ -0,0 +1,156 @@
+"""
+本地文件处理模块测试
+"""
+
+import pytest
+from unittest.mock import patch, MagicMock
+from src.ai_outreach.audio_cache import AudioCache
+from src.ai_outreach.file_handler import FileHandler
+from src.ai_outreach.media_probe import MediaProbe
+
+SRT = "1\n00:00:00,000 --> 00:00:02,000\n大家好\n\n2\n00:00:02,000 --> 00:01:30,500\n今天聊聊字幕\n"
+
+def ffprobe_output(duration=12.0, subtitle_streams=()):
+    """构造ffprobe输出"""
+    streams = [
+        {'index': 0, 'codec_type': 'video', 'codec_name': 'h264'},
+        {'index': 1, 'codec_type': 'audio', 'codec_name': 'aac', 'sample_rate': '44100', 'channels': 2},
+    ]
+    for index, codec, language in subtitle_streams:
+        streams.append({'index': index, 'codec_type': 'subtitle', 'codec_name': codec, 'tags': {'language': language}})
+    return {'format': {'duration': str(duration), 'format_name': 'mov,mp4', 'bit_rate': '800000'}, 'streams': streams}
+
+@pytest.fixture
+def video(tmp_path):
+    """空的本地视频文件（测试中不实际解码）"""
+    path = tmp_path / '测试视频.mp4'
+    path.write_bytes(b'\x00' * 16)
+    return path
+
+@pytest.fixture
+def media_probe(tmp_path):
+    """使用临时数据库的媒体探测器"""
+    probe = MediaProbe(tmp_path / 'media_probe.sqlite3')
+    yield probe
+    probe.close()
+
+@pytest.fixture
+def mock_probe():
+    """模拟ffprobe"""
+    with patch('src.ai_outreach.media_probe.probe_media', return_value=ffprobe_output()) as mock:
+        yield mock
+
+class TestLocalSubtitles:
+    """本地字幕检测测试类"""
+
+    def test_sidecar_subtitle_skips_extraction(self, video, media_probe, mock_probe):
+        """测试同名字幕文件命中时跳过音频提取与媒体探测"""
+        (video.parent / '测试视频.srt').write_text(SRT, encoding='utf-8')
+
+        with patch('src.ai_outreach.file_handler.extract_audio_from_video') as mock_extract:
+            video_info = FileHandler(media_probe=media_probe).process_file(str(video))
+
+        mock_extract.assert_not_called()
+        mock_probe.assert_not_called()
+        assert video_info.subtitle_source == 'sidecar'
+        assert video_info.subtitles == '大家好 今天聊聊字幕'
+        assert video_info.duration == 90.5
+        assert video_info.audio_path is None
+
+    def test_sidecar_language_preference(self, video, media_probe):
+        """测试优先选择无语言标签的字幕，其次按语言偏好"""
+        for name in ['测试视频.en.vtt', '测试视频.zh-Hans.ass', '测试视频.ja.srt', '其他视频.srt']:
+            (video.parent / name).write_text('', encoding='utf-8')
+        handler = FileHandler(media_probe=media_probe)
+
+        names = [p.name for p in handler.find_sidecar_subtitles(video)]
+        assert names == ['测试视频.zh-Hans.ass', '测试视频.en.vtt', '测试视频.ja.srt']
+
+        (video.parent / '测试视频.vtt').write_text('', encoding='utf-8')
+        assert handler.find_sidecar_subtitles(video)[0].name == '测试视频.vtt'
+
+    def test_embedded_subtitle_stream(self, video, media_probe, mock_probe):
+        """测试内嵌字幕轨按语言偏好提取（位图字幕轨被忽略）"""
+        mock_probe.return_value = ffprobe_output(subtitle_streams=[
+            (2, 'subrip', 'eng'), (3, 'mov_text', 'chi'), (4, 'hdmv_pgs_subtitle', 'chi'),
+        ])
+
+        with patch('src.ai_outreach.file_handler.extract_subtitle_stream', return_value=SRT) as mock_stream, \
+             patch('src.ai_outreach.file_handler.extract_audio_from_video') as mock_extract:
+            video_info = FileHandler(media_probe=media_probe).process_file(str(video))
+
+        mock_stream.assert_called_once_with(video, 3)
+        mock_extract.assert_not_called()
+        assert video_info.subtitle_source == 'embedded'
+        assert len(video_info.subtitle_cues) == 2
+        # 时长取自媒体元数据，而不是最后一条字幕的结束时间
+        assert video_info.duration == 12.0
+
+    def test_sidecar_subtitle_uses_cached_probe_duration(self, video, media_probe, mock_probe):
+        """测试已探测过的视频使用同名字幕时，时长取自媒体元数据缓存"""
+        (video.parent / '测试视频.srt').write_text(SRT, encoding='utf-8')
+        media_probe.probe(video)
+
+        video_info = FileHandler(media_probe=media_probe).process_file(str(video))
+
+        assert video_info.subtitle_source == 'sidecar'
+        assert video_info.duration == 12.0
+        assert mock_probe.call_count == 1
+
+    def test_no_subtitles_falls_back_to_audio(self, video, tmp_path, media_probe, mock_probe):
+        """测试没有字幕时照常提取音频，且整个流程只探测一次"""
+        with patch('src.ai_outreach.file_handler.extract_audio_from_video', return_value=tmp_path / 'a.wav') as mock_extract:
+            video_info = FileHandler(media_probe=media_probe).process_file(str(video))
+
+        mock_extract.assert_called_once()
+        assert mock_probe.call_count == 1
+        assert video_info.subtitles is None
+        assert video_info.duration == 12.0
+        video_info.workspace.cleanup()
+
+    def test_disabled_by_config(self, video, tmp_path, media_probe, mock_probe):
+        """测试关闭 LOCAL_SUBTITLES 后不检测字幕"""
+        (video.parent / '测试视频.srt').write_text(SRT, encoding='utf-8')
+
+        with patch('src.ai_outreach.file_handler.config.LOCAL_SUBTITLES', False), \
+             patch('src.ai_outreach.file_handler.extract_audio_from_video', return_value=tmp_path / 'a.wav'):
+            video_info = FileHandler(media_probe=media_probe).process_file(str(video))
+
+        assert video_info.subtitles is None
+        video_info.workspace.cleanup()
+
+class TestExtractionCaches:
+    """转录缓存与音频缓存测试类"""
+
+    def test_transcript_cache_checked_before_extraction(self, video, media_probe, mock_probe):
+        """测试命中转录缓存时不调用ffmpeg/ffprobe"""
+        transcript_cache = MagicMock()
+        transcript_cache.get_cached_transcript_by_source.return_value = '缓存的转录'
+        transcript_cache.get_cache_info_by_source.return_value = {'duration': 33.0}
+
+        with patch('src.ai_outreach.file_handler.extract_audio_from_video') as mock_extract:
+            video_info = FileHandler(transcript_cache=transcript_cache, media_probe=media_probe).process_file(str(video))
+
+        mock_extract.assert_not_called()
+        mock_probe.assert_not_called()
+        assert video_info.cached_transcript == '缓存的转录'
+        assert video_info.duration == 33.0
+
+    def test_audio_cache_skips_second_decode(self, video, tmp_path, media_probe, mock_probe):
+        """测试第二次处理同一视频时复用缓存音频与媒体信息，不再解码或探测"""
+        handler = FileHandler(audio_cache=AudioCache(tmp_path / 'audio_cache', max_bytes=10_000), media_probe=media_probe)
+
+        def fake_extract(source, output):
+            output.write_bytes(b'audio')
+            return output
+
+        with patch('src.ai_outreach.file_handler.extract_audio_from_video', side_effect=fake_extract) as mock_extract:
+            first = handler.process_file(str(video))
+            first.workspace.cleanup()
+            second = handler.process_file(str(video))
+
+        assert mock_extract.call_count == 1
+        assert mock_probe.call_count == 1
+        assert second.duration == 12.0
+        assert second.audio_path.read_bytes() == b'audio'
+        second.workspace.cleanup()
@@ -0,0 +1,148 @@
+"""
+本地任务队列模块测试
+"""
+
+import multiprocessing
+import pytest
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+from src.ai_outreach.analyzer import AnalysisResult
+from src.ai_outreach.blogger_analyzer import VideoAnalysis
+from src.ai_outreach.job_queue import JobQueue
+from src.ai_outreach.worker import QueueWorker
+
+@pytest.fixture
+def queue(tmp_path):
+    queue = JobQueue(tmp_path / "jobs.sqlite3", visibility_timeout=60, max_attempts=2, retry_backoff=10)
+    yield queue
+    queue.close()
+
+def _drain(db_path, owner, out):
+    """子进程：不断领取并完成任务，记录领取到的任务ID"""
+    queue = JobQueue(Path(db_path))
+    while True:
+        job = queue.lease(owner)
+        if job is None:
+            break
+        out.put(job.id)
+        queue.complete(job.id, owner)
+    queue.close()
+
+class TestJobQueue:
+    """任务队列测试类"""
+
+    def test_enqueue_dedup(self, queue, tmp_path):
+        """测试同一路径只入队一次，force 可让已完成的任务重新入队"""
+        job_id = queue.enqueue('video', tmp_path / "a.mp4")
+        assert queue.enqueue('video', tmp_path / "a.mp4") is None
+
+        queue.complete(queue.lease('w1').id, 'w1')
+        assert queue.enqueue('video', tmp_path / "a.mp4", force=True) == job_id
+        assert queue.get(job_id).status == 'queued'
+
+    def test_lease_order(self, queue, tmp_path):
+        """测试按优先级领取，同优先级时视频任务先于博主任务"""
+        queue.enqueue('blogger', tmp_path / "b")
+        queue.enqueue('video', tmp_path / "low.mp4", priority=-1)
+        queue.enqueue('video', tmp_path / "v.mp4")
+
+        assert [Path(queue.lease('w').path).name for _ in range(3)] == ['v.mp4', 'b', 'low.mp4']
+        assert queue.lease('w') is None
+
+    def test_expired_lease_is_reclaimed_then_dead_lettered(self, queue, tmp_path):
+        """测试租约超时后任务重新可见，超过最大尝试次数进入死信"""
+        with patch('src.ai_outreach.job_queue.time.time', return_value=1000.0):
+            queue.enqueue('video', tmp_path / "a.mp4")
+            assert queue.lease('w1').attempts == 1
+        with patch('src.ai_outreach.job_queue.time.time', return_value=1100.0):
+            job = queue.lease('w2')
+            assert (job.attempts, job.lease_owner) == (2, 'w2')
+            # 原 worker 的租约已失效，不能提交
+            assert not queue.complete(job.id, 'w1')
+        with patch('src.ai_outreach.job_queue.time.time', return_value=1200.0):
+            assert queue.lease('w3') is None
+        assert queue.get(job.id).status == 'dead'
+
+    def test_fail_backoff_and_dead_letter(self, queue, tmp_path):
+        """测试失败后按退避时间重新排队，超过最大尝试次数进入死信并可重新入队"""
+        with patch('src.ai_outreach.job_queue.time.time', return_value=1000.0):
+            job_id = queue.enqueue('video', tmp_path / "a.mp4")
+            queue.lease('w')
+            assert queue.fail(job_id, 'w', 'ASR失败') == 'queued'
+            assert queue.lease('w') is None
+        with patch('src.ai_outreach.job_queue.time.time', return_value=1011.0):
+            assert queue.lease('w').id == job_id
+            assert queue.fail(job_id, 'w', 'ASR失败') == 'dead'
+
+        assert [job.last_error for job in queue.dead_letters()] == ['ASR失败']
+        assert queue.requeue_dead() == 1
+        assert queue.lease('w').attempts == 1
+
+    def test_release_does_not_count_attempt(self, queue, tmp_path):
+        """测试归还租约不计入尝试次数"""
+        job_id = queue.enqueue('blogger', tmp_path / "b")
+        queue.lease('w')
+        assert queue.release(job_id, 'w')
+        assert queue.get(job_id).attempts == 0
+
+    def test_concurrent_workers_lease_each_job_once(self, queue, tmp_path):
+        """测试多个进程竞争领取时每个任务只被领取一次"""
+        ids = [queue.enqueue('video', tmp_path / f"{i}.mp4") for i in range(20)]
+        out = multiprocessing.Queue()
+        workers = [multiprocessing.Process(target=_drain, args=(str(queue.db_path), f"w{i}", out)) for i in range(3)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join(timeout=30)
+
+        leased = [out.get(timeout=5) for _ in ids]
+        assert sorted(leased) == ids
+        assert queue.stats()['video']['done'] == 20
+
+class TestQueueWorker:
+    """worker 测试类"""
+
+    def test_blogger_job_fans_out_to_videos(self, queue, tmp_path):
+        """测试博主任务拆分为视频任务，视频任务全部完成后生成综合报告"""
+        folder = tmp_path / "01-博主"
+        folder.mkdir()
+        (folder / "人物 - 博主.md").write_text("---\n---\n", encoding='utf-8')
+        for name in ("1.mp4", "2.mp4"):
+            (folder / name).write_bytes(b"")
+
+        services = MagicMock()
+        services.generator.generate_blogger_comprehensive_report.return_value = Path("outputs/report.md")
+        worker = QueueWorker(queue, services=services, owner='w', poll_interval=0)
+        worker.blogger_analyzer.analyze_videos = MagicMock(side_effect=lambda files, **kwargs: [
+            VideoAnalysis(filename=files[0].name, title='', duration=60.0, transcript_text='文本',
+                          analysis_result=AnalysisResult({}))
+        ])
+        worker.blogger_analyzer.generate_comprehensive_analysis = MagicMock(return_value={})
+        blogger_id = queue.enqueue('blogger', folder)
+
+        worker.run(exit_when_idle=True)
+
+        blogger = queue.get(blogger_id)
+        assert blogger.status == 'done'
+        assert blogger.result['videos'] == 2
+        assert blogger.result['report_path'] == str(Path("outputs/report.md"))
+        assert worker.blogger_analyzer.analyze_videos.call_count == 2
+        assert [c.status for c in queue.children(blogger_id)] == ['done', 'done']
+
+    def test_video_failure_is_retried(self, queue, tmp_path):
+        """测试视频分析失败时记录错误并进入重试"""
+        video = tmp_path / "a.mp4"
+        video.write_bytes(b"")
+        worker = QueueWorker(queue, services=MagicMock(), owner='w', poll_interval=0)
+
+        def analyze_videos(files, progress, **kwargs):
+            progress('failed', video=files[0].name, error='ASR超时')
+            return []
+
+        worker.blogger_analyzer.analyze_videos = MagicMock(side_effect=analyze_videos)
+        job_id = queue.enqueue('video', video)
+
+        assert worker.run_once()
+
+        job = queue.get(job_id)
+        assert (job.status, job.attempts, job.last_error) == ('queued', 1, 'ASR超时')
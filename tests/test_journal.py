@@ -0,0 +1,169 @@
+"""
+批量运行日志模块测试
+"""
+
+import pytest
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+from src.ai_outreach.analyzer import AnalysisResult
+from src.ai_outreach.blogger_analyzer import BloggerAnalyzer, VideoAnalysis
+from src.ai_outreach.journal import BatchJournal
+from src.ai_outreach.planner import BloggerPlan
+from src.ai_outreach.scheduler import BloggerJob
+
+def video_result(filename):
+    return VideoAnalysis(filename=filename, title=filename, duration=60.0, transcript_text="转录文本",
+                         analysis_result=AnalysisResult({'content_style': '干货'})).to_dict()
+
+@pytest.fixture
+def journal(tmp_path):
+    return BatchJournal(tmp_path / "journals" / "batch.jsonl")
+
+class TestBatchJournal:
+    """日志折叠测试类"""
+
+    def test_fold_states_and_summary(self, journal):
+        """测试按状态变化折叠出最新状态与统计"""
+        with patch('src.ai_outreach.journal.time.time', side_effect=[0, 1, 3, 6, 10, 11, 20, 21, 22]):
+            for state in ('queued', 'extracting', 'transcribing', 'analyzing'):
+                journal.record('a', state)
+            journal.record('a', 'rendered', blogger_name='博主A', report_path='outputs/a.md')
+            journal.record('b', 'queued')
+            journal.record('b', 'extracting')
+            journal.record('b', 'failed', error='所有视频分析均失败')
+            journal.record('c', 'queued')
+
+        records = journal.replay()
+        assert records['a'].state == 'rendered'
+        assert records['a'].stage_seconds == {'extracting': 2, 'transcribing': 3, 'analyzing': 4}
+
+        summary = journal.summary(records)
+        assert (summary['total'], summary['success'], summary['failed'], summary['pending']) == (3, 1, 1, 1)
+        assert summary['results'][0]['duration'] == 9
+        assert summary['failed_analyses'][0]['error'] == '所有视频分析均失败'
+        assert journal.pending_jobs(records) == ['b', 'c']
+
+    def test_torn_last_line(self, journal):
+        """测试崩溃时写了一半的最后一行被跳过，续跑的新记录不受影响"""
+        journal.record('a', 'queued')
+        with open(journal.path, 'a', encoding='utf-8') as f:
+            f.write('{"ts": 1, "job": "a", "sta')
+
+        resumed = BatchJournal(journal.path)
+        assert resumed.replay()['a'].state == 'queued'
+        resumed.record('a', 'extracting')
+        assert resumed.replay()['a'].state == 'extracting'
+
+    def test_completed_videos_round_trip(self, journal):
+        """测试已完成的视频分析可从日志还原，失败的视频不计入"""
+        journal.record('a', 'analyzed', video='1.mp4', result=video_result('1.mp4'))
+        journal.record('a', 'failed', video='2.mp4', error='ASR失败')
+
+        completed = journal.completed_videos('a')
+
+        assert list(completed) == ['1.mp4']
+        assert completed['1.mp4'].analysis_result.content_style == '干货'
+        assert journal.replay()['a'].state == 'queued'
+
+class TestResume:
+    """断点续跑测试类"""
+
+    def test_analyze_videos_skips_completed(self):
+        """测试续跑时已完成的视频不再提取与分析"""
+        services = MagicMock()
+        services.file_handler.process_files.return_value = iter([])
+        analyzer = BloggerAnalyzer(services=services)
+        done = VideoAnalysis.from_dict(video_result('1.mp4'))
+
+        analyses = analyzer.analyze_videos([Path('1.mp4'), Path('2.mp4')], completed={'1.mp4': done})
+
+        assert analyses == [done]
+        services.file_handler.process_files.assert_called_once_with([Path('2.mp4')], quick_scan=False)
+
+    def test_analyze_planned_records_and_reuses(self, journal):
+        """测试博主分析时复用日志中的视频结果，并记录终态"""
+        from batch_analyze_bloggers import BatchBloggerAnalyzer
+
+        services = MagicMock()
+        services.analyzer.usage_snapshot.side_effect = [
+            {'calls': 0, 'prompt_tokens': 0, 'completion_tokens': 0},
+            {'calls': 2, 'prompt_tokens': 100, 'completion_tokens': 10, 'cache_hit_tokens': 60, 'cache_miss_tokens': 40},
+        ]
+        services.generator.generate_blogger_comprehensive_report.return_value = Path('outputs/a.md')
+        batch = BatchBloggerAnalyzer(services=services)
+        blogger_info = MagicMock()
+        blogger_info.name = '博主A'
+        batch.blogger_analyzer.analyze_blogger_folder = MagicMock(return_value={'blogger_info': blogger_info})
+        journal.record('dir/a', 'queued')
+        journal.record('dir/a', 'analyzed', video='1.mp4', result=video_result('1.mp4'))
+
+        result = batch.analyze_planned(BloggerPlan(job=BloggerJob(directory=Path('dir/a'), name='a')),
+                                       journal=journal)
+
+        assert result['status'] == 'success'
+        kwargs = batch.blogger_analyzer.analyze_blogger_folder.call_args.kwargs
+        assert list(kwargs['completed']) == ['1.mp4']
+        record = journal.replay()['dir/a']
+        assert (record.state, record.blogger_name, record.report_path) == ('rendered', '博主A', str(Path('outputs/a.md')))
+        assert journal.pending_jobs() == []
+        # 每个博主的LLM用量写入日志并汇总到运行统计
+        assert record.usage == {'calls': 2, 'prompt_tokens': 100, 'completion_tokens': 10,
+                                'cache_hit_tokens': 60, 'cache_miss_tokens': 40}
+        assert journal.summary()['usage']['cache_hit_tokens'] == 60
+
+    def test_resume_keeps_budget(self, journal):
+        """测试续跑时沿用原运行记录的预算与分析间隔，显式给出的参数优先"""
+        from batch_analyze_bloggers import BatchBloggerAnalyzer
+        from src.ai_outreach.journal import RUN_JOB
+        from src.ai_outreach.planner import RunPlan
+
+        batch = BatchBloggerAnalyzer(services=MagicMock())
+        batch.plan_run = MagicMock(return_value=RunPlan(plans=[]))
+        batch.print_summary = MagicMock()
+        journal.record(RUN_JOB, 'started', budget_yuan=20.0, budget_hours=2.0, delay=0)
+        journal.record('dir/a', 'queued')
+
+        batch.batch_analyze('', resume=str(journal.path), budget_hours=1.0)
+
+        kwargs = batch.plan_run.call_args.kwargs
+        assert (kwargs['budget_yuan'], kwargs['budget_hours'], kwargs['delay_seconds']) == (20.0, 1.0, 0)
+        assert kwargs['spent'] == 0.0 and kwargs['elapsed'] == pytest.approx(0.0, abs=1.0)
+        # 续跑生效的参数写入日志，再次续跑时沿用
+        assert journal.run_config() == {'budget_yuan': 20.0, 'budget_hours': 1.0, 'delay': 0}
+        assert batch.resume_config(journal)['budget_yuan'] == 20.0
+
+    def test_resume_counts_recorded_spend(self, journal):
+        """测试续跑时预算检查计入日志中已记录的花费（含失败后重试的尝试）"""
+        from batch_analyze_bloggers import BatchBloggerAnalyzer
+        from src.ai_outreach.journal import RUN_JOB
+
+        journal.record(RUN_JOB, 'started', budget_yuan=20.0)
+        journal.record('dir/a', 'failed', cost=5.0, error='超时')
+        journal.record('dir/a', 'rendered', cost=10.0)
+        journal.record('dir/b', 'queued')
+
+        guard = BatchBloggerAnalyzer(services=MagicMock()).budget_guard(journal, budget_yuan=20.0)
+
+        assert journal.spent() == 15.0
+        assert guard.spent == 15.0
+        assert BatchBloggerAnalyzer(services=MagicMock()).budget_guard(journal) is None
+
+    def test_resume_counts_recorded_elapsed(self, journal):
+        """测试续跑时耗时预算计入日志中每一次尝试的耗时（中断的尝试计到最后一条记录）"""
+        from batch_analyze_bloggers import BatchBloggerAnalyzer
+        from src.ai_outreach.journal import RUN_JOB
+
+        journal.record(RUN_JOB, 'started', ts=0.0, budget_hours=2.0)
+        journal.record('dir/a', 'extracting', ts=100.0)
+        journal.record('dir/a', 'failed', ts=400.0, error='超时')
+        journal.record('dir/a', 'extracting', ts=500.0)
+        journal.record('dir/a', 'analyzed', ts=600.0, video='1.mp4', result=video_result('1.mp4'))
+        journal.record('dir/a', 'rendered', ts=1100.0)
+        journal.record('dir/b', 'extracting', ts=1200.0)
+        journal.record('dir/b', 'analyzing', ts=1500.0)
+        journal.record('dir/c', 'skipped', ts=1600.0)
+
+        guard = BatchBloggerAnalyzer(services=MagicMock()).budget_guard(journal, budget_hours=2.0)
+
+        assert journal.elapsed() == 300.0 + 600.0 + 300.0
+        assert guard.elapsed == pytest.approx(1200.0, abs=1.0)
@@ -0,0 +1,163 @@
+"""
+LLM多提供商路由模块测试
+"""
+
+import random
+import time
+import pytest
+from types import SimpleNamespace
+from src.ai_outreach.llm_router import LatencyHistogram, LLMRouter, ProviderEndpoint
+
+def response(content="{}"):
+    return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))], usage=None)
+
+class FakeClient:
+    """模拟OpenAI兼容客户端：按预设延迟返回内容或抛出异常"""
+
+    def __init__(self, content="{}", delay=0.0, error=None):
+        self.content, self.delay, self.error = content, delay, error
+        self.calls = []
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, **kwargs):
+        self.calls.append(kwargs)
+        time.sleep(self.delay)
+        if self.error:
+            raise self.error
+        return response(self.content)
+
+def endpoint(name, client, weight=1.0, samples=0, latency=1.0):
+    """创建提供商，可预置延迟样本以启用对冲"""
+    e = ProviderEndpoint(name, client, f"{name}-model", weight)
+    for _ in range(samples):
+        e.histogram(100).record(latency)
+    return e
+
+class TestLatencyHistogram:
+    """延迟直方图测试类"""
+
+    def test_percentile(self):
+        """测试分位数取所在桶的上界"""
+        histogram = LatencyHistogram([1, 2, 5])
+        for seconds in [0.5] * 90 + [1.5] * 9 + [10]:
+            histogram.record(seconds)
+
+        assert histogram.percentile(50) == 1
+        assert histogram.percentile(95) == 2
+        assert histogram.percentile(100) == 5  # 超出最大桶时返回最大上界
+        assert LatencyHistogram().percentile(95) is None
+
+class TestLLMRouter:
+    """路由器测试类"""
+
+    def test_single_provider_calls_directly(self):
+        """测试单提供商时直接调用并填入该提供商的模型"""
+        client = FakeClient()
+        seen = []
+        router = LLMRouter([endpoint('deepseek', client)], on_response=seen.append)
+
+        result = router.complete(messages=[], max_tokens=100)
+
+        assert result.choices[0].message.content == "{}"
+        assert client.calls[0]['model'] == 'deepseek-model'
+        assert len(seen) == 1
+
+    def test_hedge_wins_over_slow_primary(self):
+        """测试主请求超过延迟分位数后对冲到另一提供商，并采用先返回的响应"""
+        slow, fast = FakeClient("慢", delay=1.0), FakeClient("快")
+        seen = []
+        router = LLMRouter([endpoint('slow', slow, weight=1, samples=20, latency=0.05),
+                            endpoint('fast', fast, weight=0.001)],
+                           hedge_min_seconds=0.05, on_response=seen.append, rng=random.Random(1))
+        router.candidates = lambda: router.endpoints  # 固定首选为慢提供商
+
+        started = time.time()
+        result = router.complete(messages=[], max_tokens=100)
+
+        assert result.choices[0].message.content == "快"
+        assert time.time() - started < 0.8
+        stats = {s['name']: s for s in router.stats()}
+        assert (stats['fast']['hedges'], stats['fast']['hedge_wins']) == (1, 1)
+
+        # 落败的主请求在后台完成后仍计入用量与延迟
+        time.sleep(1.2)
+        assert len(seen) == 2
+        router.close()
+
+    def test_hedge_after_failover_uses_current_provider_latency(self):
+        """测试故障转移后按替代提供商的延迟分布对冲（失败的首选提供商没有样本）"""
+        broken, slow, fast = FakeClient(error=RuntimeError("503")), FakeClient("慢", delay=1.0), FakeClient("快")
+        router = LLMRouter([endpoint('broken', broken),
+                            endpoint('slow', slow, samples=20, latency=0.05),
+                            endpoint('fast', fast)],
+                           hedge_min_seconds=0.05)
+        router.candidates = lambda: router.endpoints
+        hedge_delay = router.hedge_delay
+        asked = []
+        router.hedge_delay = lambda e, tokens: asked.append(e.name) or hedge_delay(e, tokens)
+
+        started = time.time()
+        result = router.complete(messages=[], max_tokens=100)
+
+        assert result.choices[0].message.content == "快"
+        assert time.time() - started < 0.8
+        assert asked == ['broken', 'slow']
+        stats = {s['name']: s for s in router.stats()}
+        assert (stats['fast']['hedges'], stats['fast']['hedge_wins']) == (1, 1)
+        router.close()
+
+    def test_no_hedge_without_samples(self):
+        """测试延迟样本不足时不发送对冲请求"""
+        slow, other = FakeClient("慢", delay=0.2), FakeClient("快")
+        router = LLMRouter([endpoint('slow', slow), endpoint('other', other)], hedge_min_seconds=0.01)
+        router.candidates = lambda: router.endpoints
+
+        assert router.complete(messages=[], max_tokens=100).choices[0].message.content == "慢"
+        assert other.calls == []
+        router.close()
+
+    @pytest.mark.parametrize("bad", [FakeClient(error=RuntimeError("503")), FakeClient(content="")])
+    def test_failover_on_error_or_invalid(self, bad):
+        """测试首选提供商异常或返回空内容时转移到下一个提供商"""
+        good = FakeClient("正常")
+        router = LLMRouter([endpoint('bad', bad), endpoint('good', good)])
+        router.candidates = lambda: router.endpoints
+
+        assert router.complete(messages=[], max_tokens=100).choices[0].message.content == "正常"
+        assert router.stats()[0]['failures'] == 1
+        router.close()
+
+    def test_all_providers_fail(self):
+        """测试全部提供商失败时抛出最后一个异常"""
+        router = LLMRouter([endpoint('a', FakeClient(error=RuntimeError("a"))),
+                            endpoint('b', FakeClient(error=RuntimeError("b")))])
+        router.candidates = lambda: router.endpoints
+
+        with pytest.raises(RuntimeError, match="b"):
+            router.complete(messages=[], max_tokens=100)
+        router.close()
+
+    def test_unhealthy_provider_cools_down(self):
+        """测试连续失败达到阈值后提供商进入冷却，排到候选末尾"""
+        bad = endpoint('bad', FakeClient(error=RuntimeError("503")), weight=100)
+        good = endpoint('good', FakeClient(), weight=1)
+        router = LLMRouter([bad, good], failure_threshold=2, cooldown=60)
+
+        router.candidates = lambda: [bad, good]
+        for _ in range(2):
+            router.complete(messages=[], max_tokens=100)
+        del router.candidates
+        assert not bad.healthy()
+
+        # 冷却后始终先选健康的提供商
+        assert all(router.candidates()[0] is good for _ in range(20))
+        router.close()
+
+    def test_weighted_selection(self):
+        """测试按权重选择首选提供商"""
+        a, b = endpoint('a', FakeClient(), weight=3), endpoint('b', FakeClient(), weight=1)
+        router = LLMRouter([a, b], rng=random.Random(0))
+
+        firsts = [router.candidates()[0].name for _ in range(2000)]
+
+        assert 0.7 < firsts.count('a') / len(firsts) < 0.8
@@ -0,0 +1,103 @@
+"""
+分层汇总（map-reduce）模块测试
+"""
+
+import json
+import pytest
+from unittest.mock import patch
+from src.ai_outreach.map_reduce import (MapReduceSummarizer, group_by_size, merge_locally, reduce_calls,
+                                        use_map_reduce)
+from src.ai_outreach.utils.exceptions import AnalysisError
+
+class FakeAnalyzer:
+    """模拟分析器：map 返回每组的标题列表，reduce 合并话题"""
+
+    def __init__(self, fail_map=(), fail_reduce=False):
+        self.fail_map, self.fail_reduce = fail_map, fail_reduce
+        self.calls = []
+
+    def summarize_for_synthesis(self, content, stage='map'):
+        self.calls.append(stage)
+        if stage == 'map':
+            titles = [line.split('】')[0].lstrip('【') for line in content.split('\n\n')]
+            if any(t in self.fail_map for t in titles):
+                raise AnalysisError("map失败")
+            return {'main_topics': titles, 'tone': '轻松'}
+        if self.fail_reduce:
+            raise AnalysisError("reduce失败")
+        topics = []
+        for block in content.split('\n\n'):
+            topics += json.loads(block.split('\n', 1)[1])['main_topics']
+        return {'main_topics': topics}
+
+def sections(n, chars=10):
+    return [(f"v{i}", "字" * chars) for i in range(n)]
+
+class TestTreeShape:
+    """分组与层数测试类"""
+
+    def test_group_by_size(self):
+        """测试按字符数与条目数上限分组，超长条目独占一组"""
+        assert group_by_size([5, 5, 5, 20, 1, 1, 1], max_chars=10, max_items=2) == [[0, 1], [2], [3], [4, 5], [6]]
+
+    def test_reduce_calls(self):
+        """测试每层合并调用数"""
+        assert reduce_calls(3, 4) == []
+        assert reduce_calls(5, 4) == [2]
+        assert reduce_calls(40, 4) == [10, 3]
+
+    @pytest.mark.parametrize("mode,chars,expected", [('auto', 100, False), ('auto', 1000, True),
+                                                     ('single', 1000, False), ('mapreduce', 1, True)])
+    def test_use_map_reduce(self, mode, chars, expected):
+        """测试按模式与阈值选择分层汇总"""
+        with patch.multiple('src.ai_outreach.map_reduce.config', COMPREHENSIVE_MODE=mode,
+                            MAPREDUCE_THRESHOLD_CHARS=500):
+            assert use_map_reduce(chars) == expected
+
+class TestMapReduceSummarizer:
+    """汇总执行测试类"""
+
+    def test_summarize_levels(self):
+        """测试40个视频分组摘要后逐层合并到不超过合并宽度，所有视频都被覆盖"""
+        analyzer = FakeAnalyzer()
+        summarizer = MapReduceSummarizer(analyzer, group_chars=1000, group_size=2, fan_in=4, workers=4)
+
+        digests, stats = summarizer.summarize(sections(40))
+
+        assert stats == {'groups': 20, 'levels': 3, 'failed_groups': 0}
+        assert len(digests) == 2
+        assert sorted(t for d in digests for t in d['main_topics']) == sorted(f"v{i}" for i in range(40))
+        assert sum(d['video_count'] for d in digests) == 40
+        assert analyzer.calls.count('reduce') == 5 + 1  # 单个摘要的批次直接沿用，不调用模型
+
+    def test_failed_group_is_skipped(self):
+        """测试单组摘要失败时跳过该组"""
+        summarizer = MapReduceSummarizer(FakeAnalyzer(fail_map=('v0',)), group_chars=1000, group_size=2, fan_in=4)
+
+        digests, stats = summarizer.summarize(sections(6))
+
+        assert stats['failed_groups'] == 1
+        assert sum(d['video_count'] for d in digests) == 4
+
+    def test_all_groups_fail(self):
+        """测试所有分组都失败时抛出分析异常"""
+        summarizer = MapReduceSummarizer(FakeAnalyzer(fail_map=('v0', 'v1')), group_chars=1000, group_size=1)
+
+        with pytest.raises(AnalysisError):
+            summarizer.summarize(sections(2))
+
+    def test_reduce_failure_merges_locally(self):
+        """测试合并调用失败时改为本地合并，汇总仍能收敛"""
+        summarizer = MapReduceSummarizer(FakeAnalyzer(fail_reduce=True), group_chars=1000, group_size=1, fan_in=2)
+
+        digests, stats = summarizer.summarize(sections(5))
+
+        assert len(digests) <= 2
+        assert sum(d['video_count'] for d in digests) == 5
+
+    def test_merge_locally(self):
+        """测试本地合并：列表字段去重取并集，文本字段取首个非空值"""
+        merged = merge_locally([{'main_topics': ['a', 'b'], 'tone': '', 'video_count': 2},
+                                {'main_topics': ['b', 'c'], 'tone': '犀利', 'video_count': 3}])
+
+        assert (merged['main_topics'], merged['tone'], merged['video_count']) == (['a', 'b', 'c'], '犀利', 5)
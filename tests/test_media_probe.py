@@ -0,0 +1,71 @@
+"""
+媒体元数据模块测试
+"""
+
+import os
+import pytest
+from unittest.mock import patch
+from src.ai_outreach.media_probe import MediaProbe
+from src.ai_outreach.utils.exceptions import AudioProcessingError
+
+FFPROBE = {
+    'format': {'duration': '125.5', 'format_name': 'mov,mp4', 'bit_rate': '900000'},
+    'streams': [
+        {'index': 0, 'codec_type': 'video', 'codec_name': 'h264'},
+        {'index': 1, 'codec_type': 'audio', 'codec_name': 'aac', 'sample_rate': '48000', 'channels': 2},
+        {'index': 2, 'codec_type': 'subtitle', 'codec_name': 'mov_text', 'tags': {'language': 'chi'}},
+    ],
+}
+
+@pytest.fixture
+def media(tmp_path):
+    path = tmp_path / 'video.mp4'
+    path.write_bytes(b'\x00' * 32)
+    return path
+
+class TestMediaProbe:
+    """媒体探测测试类"""
+
+    def test_probe_parses_ffprobe_output(self, tmp_path, media):
+        """测试解析时长、音频参数与字幕轨"""
+        probe = MediaProbe(tmp_path / 'probe.sqlite3')
+
+        with patch('src.ai_outreach.media_probe.probe_media', return_value=FFPROBE):
+            info = probe.probe(media)
+
+        assert info.duration == 125.5
+        assert info.has_video and info.has_audio
+        assert (info.audio_codec, info.sample_rate, info.channels) == ('aac', 48000, 2)
+        assert info.subtitle_streams == [{'index': 2, 'codec': 'mov_text', 'language': 'chi'}]
+
+    def test_results_persist_across_instances(self, tmp_path, media):
+        """测试探测结果持久化，新进程（新实例）无需再次运行ffprobe"""
+        with patch('src.ai_outreach.media_probe.probe_media', return_value=FFPROBE) as mock_probe:
+            MediaProbe(tmp_path / 'probe.sqlite3').probe(media)
+            info = MediaProbe(tmp_path / 'probe.sqlite3').probe(media)
+
+        assert mock_probe.call_count == 1
+        assert info.duration == 125.5
+
+    def test_modified_file_is_reprobed(self, tmp_path, media):
+        """测试文件修改（大小或修改时间变化）后重新探测"""
+        probe = MediaProbe(tmp_path / 'probe.sqlite3')
+
+        with patch('src.ai_outreach.media_probe.probe_media', return_value=FFPROBE) as mock_probe:
+            probe.probe(media)
+            stat = media.stat()
+            os.utime(media, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+            assert probe.get_cached(media) is None
+            probe.probe(media)
+
+        assert mock_probe.call_count == 2
+
+    def test_failed_probe_not_cached(self, tmp_path, media):
+        """测试探测失败时抛出异常且不写入缓存"""
+        probe = MediaProbe(tmp_path / 'probe.sqlite3')
+
+        with patch('src.ai_outreach.media_probe.probe_media', side_effect=AudioProcessingError('损坏的文件')):
+            with pytest.raises(AudioProcessingError):
+                probe.probe(media)
+
+        assert probe.get_cached(media) is None
@@ -0,0 +1,54 @@
+"""
+单视频分析流程模块测试
+"""
+
+import pytest
+from pathlib import Path
+from unittest.mock import MagicMock
+from src.ai_outreach.pipeline import analyze_source
+
+@pytest.fixture
+def services(tmp_path):
+    services = MagicMock()
+    services.generator.save_markdown_report.return_value = tmp_path / "report.md"
+    services.generator.save_transcript_text.return_value = tmp_path / "transcript.txt"
+    (tmp_path / "report.md").write_text("# 报告", encoding='utf-8')
+    return services
+
+def file_info(**kwargs):
+    info = MagicMock(title='标题', author='博主', duration=60.0, subtitles=None, cached_transcript=None,
+                     video_path=Path('a.mp4'))
+    for key, value in kwargs.items():
+        setattr(info, key, value)
+    return info
+
+class TestAnalyzeSource:
+    """分析流程测试类"""
+
+    def test_cached_transcript_skips_asr(self, services):
+        """测试本地文件已有缓存转录时不调用ASR，并按步骤回调报告进度"""
+        services.file_handler.process_file.return_value = file_info(cached_transcript="缓存文本")
+        steps = []
+
+        result = analyze_source(file='a.mp4', services=services, step=steps.append)
+
+        services.transcriber.transcribe_video.assert_not_called()
+        assert result['transcript_source'] == 'cache'
+        assert result['text_length'] == len("缓存文本")
+        assert steps == ["📁 处理本地文件...", "🧠 AI内容分析...", "📝 生成沟通脚本...", "💾 保存分析报告..."]
+        services.workspaces.create.return_value.cleanup.assert_called_once()
+
+    def test_output_copies_report(self, services, tmp_path):
+        """测试指定输出路径时报告复制到该路径"""
+        services.file_handler.process_file.return_value = file_info(cached_transcript="文本")
+        output = tmp_path / "out" / "custom.md"
+
+        result = analyze_source(file='a.mp4', services=services, output=str(output))
+
+        assert result['report_path'] == str(output)
+        assert output.read_text(encoding='utf-8') == "# 报告"
+
+    def test_requires_one_source(self, services):
+        """测试URL与文件必须二选一"""
+        with pytest.raises(ValueError):
+            analyze_source(services=services)
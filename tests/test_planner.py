@@ -0,0 +1,161 @@
+"""
+批量运行预检规划模块测试
+"""
+
+import pytest
+from pathlib import Path
+from unittest.mock import patch
+from src.ai_outreach.planner import BatchPlanner, BudgetGuard, CostRates
+from src.ai_outreach.scheduler import BloggerJob, MediaEstimate
+
+RATES = CostRates(asr_per_hour=3.6, llm_input_per_m=1.0, llm_output_per_m=2.0)
+
+def make_job(name, *media):
+    return BloggerJob(directory=Path(name), name=name, media=[MediaEstimate(Path(f"{name}/{i}.mp4"), *m)
+                                                               for i, m in enumerate(media)])
+
+@pytest.fixture(autouse=True)
+def plan_config():
+    """固定估算参数"""
+    with patch.multiple('src.ai_outreach.planner.config', PLAN_CHARS_PER_SECOND=4.0, PLAN_TOKENS_PER_CHAR=1.0,
+                        PLAN_OUTPUT_RATIO=0.5, PLAN_EXTRACT_SPEED=100.0, PLAN_ASR_SPEED=10.0,
+                        PLAN_LLM_TOKENS_PER_SECOND=100.0, EXTRACT_WORKERS=4, QUICK_SCAN_WINDOWS=4,
+                        QUICK_SCAN_WINDOW_SECONDS=45.0, LLM_STAGE_MAX_TOKENS={'digest': 400, 'comprehensive': 4000}):
+        yield
+
+@pytest.fixture
+def planner():
+    planner = BatchPlanner(rates=RATES)
+    # Prompt模板按固定长度计算
+    planner._template_chars = {'video_digest_v1': 1000,
+                               'analyze_blogger_comprehensive_v3': 2000}
+    return planner
+
+class TestBatchPlanner:
+    """预估测试类"""
+
+    def test_cached_media_skips_asr(self, planner):
+        """测试缓存命中的视频不计ASR，文本长度取缓存的实际字符数"""
+        plan = planner.estimate(make_job('a', (600.0, False), (1200.0, True, 3000)))
+
+        assert plan.asr_seconds == 600.0
+        assert plan.cache_hits == 1
+        assert plan.asr_cost == pytest.approx(0.6)
+        # 单视频摘要输入: 模板 + 系统提示 + 文本（2400 / 3000 字符），综合分析输入包含全部文本
+        assert plan.input_tokens == (1120 + 2400) + (1120 + 3000) + (2120 + 300 + 5400 + 80)
+        assert plan.output_tokens == 200 + 200 + 2000
+        assert plan.llm_cost == pytest.approx((plan.input_tokens * 1.0 + plan.output_tokens * 2.0) / 1e6)
+
+    def test_map_reduce_estimate(self, planner):
+        """测试转录较长时按分层汇总估算：综合分析输入为摘要而非全部转录，耗时按层数计算"""
+        planner._template_chars.update({'map_video_group_v1': 0, 'reduce_digests_v1': 0})
+        job = make_job('a', *[(600.0, True, 10000)] * 8)
+        with patch.multiple('src.ai_outreach.planner.config', COMPREHENSIVE_MODE='single'):
+            single = planner.estimate(job)
+        with patch.multiple('src.ai_outreach.planner.config', COMPREHENSIVE_MODE='mapreduce', MAPREDUCE_GROUP_CHARS=20100,
+                            MAPREDUCE_GROUP_SIZE=8, MAPREDUCE_FAN_IN=2, MAPREDUCE_WORKERS=4,
+                            LLM_STAGE_MAX_TOKENS={'digest': 400, 'comprehensive': 4000, 'map': 1000, 'reduce': 1000}):
+            tree = planner.estimate(job)
+
+        # 4组摘要（500 token）→ 2次合并 → 综合分析输入为2份摘要
+        assert tree.output_tokens == single.output_tokens + 4 * 500 + 2 * 500
+        assert tree.input_tokens == (8 * (1120 + 10000)                    # 单视频摘要
+                                     + (4 * 120 + 8 * 10040)               # 分组摘要
+                                     + (2 * 120 + 4 * 500)                 # 合并
+                                     + (2120 + 300 + 2 * 500))             # 综合分析
+        assert tree.wall_seconds == pytest.approx(single.wall_seconds + (500 + 500) / 100.0)
+
+    def test_quick_scan_caps_asr(self, planner):
+        """测试快速扫描时长视频只计采样窗口"""
+        planner.quick_scan = True
+
+        plan = planner.estimate(make_job('a', (3600.0, False), (120.0, False)))
+
+        assert plan.asr_seconds == 180.0 + 120.0
+
+    def test_budget_truncates_in_schedule_order(self, planner):
+        """测试按调度顺序截取预算内的博主，第一个超出预算后不再执行后续博主"""
+        jobs = [make_job('a', (3600.0, False)), make_job('b', (36000.0, False)), make_job('c', (60.0, False))]
+        costs = [planner.estimate(job).cost for job in jobs]
+
+        run_plan = planner.plan(jobs, budget_yuan=costs[0] + costs[2] + 0.01)
+
+        assert [p.within_budget for p in run_plan.plans] == [True, False, False]
+        assert run_plan.totals()['bloggers'] == 1
+        assert run_plan.totals(run_plan.plans)['bloggers'] == 3
+
+    def test_time_budget(self, planner):
+        """测试耗时预算"""
+        jobs = [make_job('a', (3600.0, False)), make_job('b', (3600.0, False))]
+
+        run_plan = planner.plan(jobs, budget_hours=0.15)
+
+        assert [p.within_budget for p in run_plan.plans] == [True, False]
+
+    def test_budget_counts_spent(self, planner):
+        """测试续跑时已花费的金额计入预检预算"""
+        jobs = [make_job('a', (3600.0, False)), make_job('b', (3600.0, False))]
+        cost = planner.estimate(jobs[0]).cost
+
+        run_plan = planner.plan(jobs, budget_yuan=cost * 2 + 0.01, spent=cost)
+
+        assert [p.within_budget for p in run_plan.plans] == [True, False]
+
+    def test_time_budget_counts_elapsed(self, planner):
+        """测试续跑时已运行的时间计入预检耗时预算"""
+        jobs = [make_job('a', (3600.0, False)), make_job('b', (3600.0, False))]
+        wall = planner.estimate(jobs[0]).wall_seconds
+
+        run_plan = planner.plan(jobs, budget_hours=(wall * 2 + 1) / 3600, elapsed=wall)
+
+        assert [p.within_budget for p in run_plan.plans] == [True, False]
+
+class TestBudgetGuard:
+    """运行时预算测试类"""
+
+    def test_records_actual_usage(self, planner):
+        """测试按实际token用量记录花费，超出预算后拒绝下一个博主"""
+        plan = planner.estimate(make_job('a', (3600.0, False)))
+        guard = BudgetGuard(budget_yuan=plan.asr_cost * 2, rates=RATES)
+
+        assert guard.allow(plan)
+        cost = guard.record(plan, {'prompt_tokens': 0, 'completion_tokens': 0},
+                            {'prompt_tokens': 1_000_000, 'completion_tokens': 500_000})
+
+        assert cost == pytest.approx(plan.asr_cost + 2.0)
+        assert not guard.allow(plan)
+
+    def test_cached_input_is_discounted(self, planner):
+        """测试命中前缀缓存的输入按缓存单价计费"""
+        plan = planner.estimate(make_job('a', (600.0, True, 100)))
+        guard = BudgetGuard(rates=CostRates(asr_per_hour=3.6, llm_input_per_m=1.0, llm_output_per_m=2.0,
+                                            llm_cached_input_per_m=0.25))
+
+        cost = guard.record(plan, {'prompt_tokens': 0, 'completion_tokens': 0, 'cache_hit_tokens': 0},
+                            {'prompt_tokens': 1_000_000, 'completion_tokens': 0, 'cache_hit_tokens': 800_000})
+
+        assert cost == pytest.approx(0.2 + 0.2)
+
+    def test_missing_usage_falls_back_to_estimate(self, planner):
+        """测试响应不含用量信息时按预估计费"""
+        plan = planner.estimate(make_job('a', (600.0, False)))
+        guard = BudgetGuard(rates=RATES)
+
+        usage = {'prompt_tokens': 0, 'completion_tokens': 0}
+        assert guard.record(plan, usage, dict(usage)) == pytest.approx(plan.cost)
+        assert guard.allow(plan)
+
+    def test_counts_spent_from_previous_run(self, planner):
+        """测试续跑时已花费的金额计入运行时预算"""
+        plan = planner.estimate(make_job('a', (3600.0, False)))
+        guard = BudgetGuard(budget_yuan=plan.cost * 1.5, rates=RATES, spent=plan.cost)
+
+        assert not guard.allow(plan)
+
+    def test_counts_elapsed_from_previous_run(self, planner):
+        """测试续跑时已运行的时间计入运行时耗时预算"""
+        plan = planner.estimate(make_job('a', (3600.0, False)))
+        guard = BudgetGuard(budget_hours=plan.wall_seconds * 1.5 / 3600, rates=RATES, elapsed=plan.wall_seconds)
+
+        assert guard.elapsed == pytest.approx(plan.wall_seconds, abs=1.0)
+        assert not guard.allow(plan)
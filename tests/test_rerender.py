@@ -0,0 +1,87 @@
+"""
+报告重建测试
+"""
+
+from unittest.mock import patch
+
+from src.ai_outreach.analyzer import AnalysisResult
+from src.ai_outreach.blogger_analyzer import BloggerInfo
+from src.ai_outreach.generator import ScriptGenerator, analysis_path
+from src.ai_outreach import rerender
+from src.ai_outreach.rerender import find_analysis_files, rerender_reports
+
+ANALYSIS = {
+    'content_style': '干货分享', 'core_values': ['长期主义'], 'golden_sentences': ['慢就是快'],
+    'main_topics': ['剪辑'], 'pain_points': ['选题难'], 'value_propositions': ['效率'],
+    'tone': '轻松', 'target_audience': '新手', 'blogger_characteristics': {'expertise': '剪辑'},
+    'methodology_mapping': {'trust_hook': '实操演示'}, 'optimal_outreach_script': '我叫LMW。',
+}
+VIDEO_INFO = {'title': '剪辑入门', 'author': '小王', 'duration': 120.0, 'input_type': 'file'}
+
+
+def _video_report(tmp_path):
+    generator = ScriptGenerator()
+    with patch('src.ai_outreach.generator.config.OUTPUT_DIR', tmp_path):
+        script_result = generator.generate_scripts(AnalysisResult(ANALYSIS), VIDEO_INFO)
+        return generator.save_markdown_report(script_result, VIDEO_INFO)
+
+
+class TestAnalysisPersistence:
+    """结构化分析结果持久化与重建测试类"""
+    
+    def test_video_report_round_trip(self, tmp_path):
+        """测试单视频报告保存分析结果，重建后内容不变"""
+        report_path = _video_report(tmp_path)
+        original = report_path.read_text(encoding='utf-8')
+        assert analysis_path(report_path).exists()
+        
+        report_path.unlink()
+        assert ScriptGenerator().rerender_report(analysis_path(report_path)) == report_path
+        assert report_path.read_text(encoding='utf-8') == original
+    
+    def test_blogger_report_round_trip(self, tmp_path, monkeypatch):
+        """测试博主综合分析报告保存分析结果，重建后内容不变"""
+        monkeypatch.chdir(tmp_path)
+        analysis_result = {
+            'blogger_info': BloggerInfo(name='小王', platform='B站'),
+            'video_summaries': [{'title': '剪辑入门', 'duration': 120.0, 'tone': '轻松'}],
+            'comprehensive_analysis': AnalysisResult(ANALYSIS),
+            'total_videos': 1, 'quick_scan': False, 'sampled_videos': 0,
+        }
+        report_path = ScriptGenerator().generate_blogger_comprehensive_report(analysis_result)
+        original = report_path.read_text(encoding='utf-8')
+        
+        preview = tmp_path / 'preview'
+        preview.mkdir()
+        rebuilt = ScriptGenerator().rerender_report(analysis_path(report_path), preview)
+        assert rebuilt == preview / report_path.name
+        assert rebuilt.read_text(encoding='utf-8') == original
+
+
+class TestRerenderReports:
+    """批量重建测试类"""
+    
+    def test_find_and_rerender(self, tmp_path):
+        """测试递归查找分析结果并记录失败的文件"""
+        report_path = _video_report(tmp_path)
+        broken = tmp_path / 'nested' / 'broken.analysis.json'
+        broken.parent.mkdir()
+        broken.write_text('{"kind": "unknown"}', encoding='utf-8')
+        
+        files = find_analysis_files([tmp_path, analysis_path(report_path)])
+        assert len(files) == 2
+        
+        summary = rerender_reports(files, workers=1)
+        assert (summary.total, summary.rendered) == (2, 1)
+        assert summary.failed[0][0].endswith('broken.analysis.json')
+    
+    def test_process_pool(self, tmp_path):
+        """测试超过阈值时使用进程池渲染"""
+        report_path = _video_report(tmp_path)
+        output_dir = tmp_path / 'out'
+        
+        with patch.object(rerender, 'SERIAL_THRESHOLD', 0):
+            summary = rerender_reports([analysis_path(report_path)], workers=2, output_dir=output_dir)
+        
+        assert summary.rendered == 1
+        assert (output_dir / report_path.name).read_text(encoding='utf-8') == report_path.read_text(encoding='utf-8')
@@ -0,0 +1,147 @@
+"""
+快速扫描采样模块测试
+"""
+
+import pytest
+from unittest.mock import patch, MagicMock
+from src.ai_outreach.file_handler import FileHandler
+from src.ai_outreach.sampling import (
+    SampleWindow,
+    format_sampled_transcript,
+    plan_even_windows,
+    plan_windows,
+)
+from src.ai_outreach.transcriber import TencentASRTranscriber, TranscriptResult
+from src.ai_outreach.transcript_cache import TranscriptCache
+from src.ai_outreach.utils.exceptions import AudioProcessingError, TranscriptionError
+
+class TestWindowPlanning:
+    """采样窗口规划测试类"""
+
+    def test_even_windows_centered_in_segments(self):
+        """测试均匀采样在每段中心取窗口"""
+        windows = plan_even_windows(1800, 4, 45)
+
+        assert [w.start for w in windows] == [202.5, 652.5, 1102.5, 1552.5]
+        assert all(w.duration == 45 for w in windows)
+
+    def test_short_media_not_sampled(self):
+        """测试视频不长于采样总时长时不采样"""
+        assert plan_even_windows(150, 4, 45) == []
+
+    def test_speech_strategy_picks_densest_windows(self, tmp_path):
+        """测试语音密度策略选出语音占比最高的窗口，并按时间顺序返回"""
+        ratios = {0: 0.1, 1: 0.9, 2: 0.2, 3: 0.8, 4: 0.3, 5: 0.95}
+
+        def fake_ratio(media_path, start, duration):
+            return ratios[int(start // 100)]
+
+        with patch('src.ai_outreach.sampling.measure_speech_ratio', side_effect=fake_ratio) as mock_ratio:
+            windows = plan_windows(tmp_path / 'v.mp4', 600, count=2, window_seconds=30, strategy='speech')
+
+        assert mock_ratio.call_count == 6
+        # 每个候选只解码中间的一小段
+        assert all(call.args[2] == 8.0 for call in mock_ratio.call_args_list)
+        assert [int(w.start // 100) for w in windows] == [1, 5]
+
+    def test_speech_strategy_falls_back_to_even(self, tmp_path):
+        """测试语音检测失败时回退为均匀采样"""
+        with patch('src.ai_outreach.sampling.measure_speech_ratio', side_effect=AudioProcessingError('ffmpeg失败')):
+            windows = plan_windows(tmp_path / 'v.mp4', 1800, count=4, window_seconds=45, strategy='speech')
+
+        assert windows == plan_even_windows(1800, 4, 45)
+
+    def test_window_length_capped_for_short_asr(self, tmp_path):
+        """测试窗口时长不超过短音频识别上限"""
+        windows = plan_windows(tmp_path / 'v.mp4', 3600, count=2, window_seconds=300, strategy='even')
+
+        assert all(w.duration == 60 for w in windows)
+
+    def test_format_sampled_transcript(self):
+        """测试采样文本按时间标注并跳过空片段"""
+        windows = [SampleWindow(5, 30), SampleWindow(610, 30), SampleWindow(3725, 30)]
+
+        text = format_sampled_transcript(windows, ['开场白', '', '结尾'])
+
+        assert text == '[00:05] 开场白\n[1:02:05] 结尾'
+
+class TestQuickScanFile:
+    """本地文件快速扫描测试类"""
+
+    def test_long_video_extracts_only_windows(self, tmp_path):
+        """测试长视频只提取采样窗口，不完整解码、不写入音频缓存"""
+        video = tmp_path / 'long.mp4'
+        video.write_bytes(b'\x00')
+        media_probe = MagicMock()
+        media_probe.probe.return_value.duration = 1800.0
+        media_probe.probe.return_value.subtitle_streams = []
+        audio_cache = MagicMock()
+        audio_cache.get.return_value = None
+
+        with patch('src.ai_outreach.file_handler.config.QUICK_SCAN_STRATEGY', 'even'), \
+             patch('src.ai_outreach.file_handler.extract_audio_windows') as mock_windows, \
+             patch('src.ai_outreach.file_handler.extract_audio_from_video') as mock_extract:
+            video_info = FileHandler(media_probe=media_probe, audio_cache=audio_cache).process_file(str(video), quick_scan=True)
+
+        mock_extract.assert_not_called()
+        audio_cache.put.assert_not_called()
+        windows = mock_windows.call_args[0][1]
+        assert len(windows) == len(video_info.sample_windows) == len(video_info.sample_paths)
+        assert video_info.duration == 1800.0
+        assert all(p.parent == video_info.workspace.path for p in video_info.sample_paths)
+        video_info.workspace.cleanup()
+
+    def test_short_video_processed_normally(self, tmp_path):
+        """测试短视频在快速扫描模式下仍完整提取"""
+        video = tmp_path / 'short.mp4'
+        video.write_bytes(b'\x00')
+        media_probe = MagicMock()
+        media_probe.probe.return_value.duration = 90.0
+        media_probe.probe.return_value.subtitle_streams = []
+
+        with patch('src.ai_outreach.file_handler.extract_audio_windows') as mock_windows, \
+             patch('src.ai_outreach.file_handler.extract_audio_from_video') as mock_extract:
+            video_info = FileHandler(media_probe=media_probe).process_file(str(video), quick_scan=True)
+
+        mock_windows.assert_not_called()
+        mock_extract.assert_called_once()
+        assert video_info.sample_paths == []
+        video_info.workspace.cleanup()
+
+class TestSampledTranscription:
+    """采样转录测试类"""
+
+    @pytest.fixture
+    def transcriber(self, tmp_path):
+        """不初始化腾讯云客户端的转录器"""
+        with patch('src.ai_outreach.transcript_cache.config.OUTPUT_DIR', tmp_path):
+            cache = TranscriptCache()
+        transcriber = TencentASRTranscriber.__new__(TencentASRTranscriber)
+        transcriber.cache = cache
+        transcriber.extraction_stage = None
+        return transcriber
+
+    def test_samples_transcribed_and_cached_separately(self, tmp_path, transcriber):
+        """测试逐片段转录、跳过空片段，采样结果不写入完整转录缓存"""
+        source = tmp_path / 'long.mp4'
+        source.write_bytes(b'\x00')
+        windows = [SampleWindow(100, 45), SampleWindow(500, 45)]
+        paths = [tmp_path / 's_00.wav', tmp_path / 's_01.wav']
+        outcomes = [TranscriptResult('大家好', 1.0), TranscriptionError('转录结果为空')]
+
+        with patch.object(transcriber, 'transcribe_short_audio', side_effect=outcomes) as mock_short:
+            result = transcriber.transcribe_samples(windows, paths, cache_source=source, duration=1800)
+            cached = transcriber.transcribe_samples(windows, paths, cache_source=source, duration=1800)
+
+        assert mock_short.call_count == 2
+        assert all(call.kwargs['use_cache'] is False for call in mock_short.call_args_list)
+        assert result.sampled and cached.sampled
+        assert result.text == cached.text == '[01:40] 大家好'
+        assert result.words == [{'start': 100, 'end': 145, 'text': '大家好'}]
+        assert transcriber.cache.get_cached_transcript_by_source(source) is None
+
+    def test_all_samples_failed(self, tmp_path, transcriber):
+        """测试所有片段转录失败时抛出异常"""
+        with patch.object(transcriber, 'transcribe_short_audio', side_effect=TranscriptionError('空')):
+            with pytest.raises(TranscriptionError):
+                transcriber.transcribe_samples([SampleWindow(0, 30)], [tmp_path / 'a.wav'])
@@ -0,0 +1,108 @@
+"""
+博主批量调度模块测试
+"""
+
+import pytest
+from pathlib import Path
+from unittest.mock import MagicMock
+from src.ai_outreach.blogger_analyzer import BloggerInfo
+from src.ai_outreach.scheduler import BloggerScheduler, parse_follower_count
+
+# 目录名 -> (状态, 平台, 粉丝数, 各视频时长, 已缓存的视频序号)
+BLOGGERS = {
+    '01-大博主': ('待评估', 'B站', '12.5万', [1800, 1200], []),
+    '02-重点': ('重点跟进', '抖音', '3w', [600], []),
+    '03-小博主': ('待评估', 'B站', '5k', [300], []),
+    '04-已缓存': ('', 'B站', '800', [2400, 600], [0, 1]),
+}
+
+@pytest.fixture
+def blogger_dirs(tmp_path):
+    """创建博主目录（每个视频的时长写在文件内容中，供模拟探测读取）"""
+    dirs = []
+    for name, (_, _, _, durations, _) in BLOGGERS.items():
+        directory = tmp_path / name
+        directory.mkdir()
+        (directory / f"人物 - {name}.md").write_text("---\n---\n", encoding='utf-8')
+        for i, duration in enumerate(durations):
+            (directory / f"v{i}.mp4").write_text(str(duration))
+        dirs.append(directory)
+    return dirs
+
+@pytest.fixture
+def scheduler():
+    def parse(info_file: Path) -> BloggerInfo:
+        status, platform, followers, _, _ = BLOGGERS[info_file.parent.name]
+        return BloggerInfo(name=info_file.parent.name, status=status, platform=platform, follower_count=followers)
+
+    def cache_info(media_path: Path):
+        cached = BLOGGERS[media_path.parent.name][4]
+        if int(media_path.stem[1:]) in cached:
+            return {'duration': float(media_path.read_text()), 'text_length': 1000}
+        return None
+
+    transcript_cache = MagicMock()
+    transcript_cache.get_cache_info_by_source.side_effect = cache_info
+    media_probe = MagicMock()
+    media_probe.get_cached.return_value = None
+    media_probe.probe.side_effect = lambda path: MagicMock(duration=float(path.read_text()))
+    return BloggerScheduler(parse, transcript_cache=transcript_cache, media_probe=media_probe,
+                            status_priority=['重点跟进', '待评估'])
+
+def names(jobs):
+    return [job.directory.name for job in jobs]
+
+class TestFollowerCount:
+    """粉丝数解析测试类"""
+
+    @pytest.mark.parametrize("value, expected", [
+        ("12000", 12000), ("12,000", 12000), ("1.2万", 12000), ("3w", 30000),
+        ("5k", 5000), ("10万+", 100000), ("", 0), ("未知", 0),
+    ])
+    def test_parse(self, value, expected):
+        """测试常见粉丝数写法"""
+        assert parse_follower_count(value) == expected
+
+class TestBloggerScheduler:
+    """调度策略测试类"""
+
+    def test_survey_uses_cache_before_probe(self, scheduler, blogger_dirs):
+        """测试缓存命中的视频直接使用缓存时长，不运行ffprobe"""
+        job = scheduler.survey(blogger_dirs[3])
+
+        assert job.duration == 3000
+        assert job.remaining == 0
+        assert job.warmth == 1.0
+        scheduler.media_probe.probe.assert_not_called()
+
+    def test_priority_policy(self, scheduler, blogger_dirs):
+        """测试优先级策略：先按状态，再按粉丝数降序"""
+        jobs = scheduler.schedule(blogger_dirs, policy='priority')
+
+        assert names(jobs) == ['02-重点', '01-大博主', '03-小博主', '04-已缓存']
+
+    def test_sjf_policy(self, scheduler, blogger_dirs):
+        """测试最短作业优先：按未缓存时长升序，全部缓存的博主最先完成"""
+        jobs = scheduler.schedule(blogger_dirs, policy='sjf')
+
+        assert names(jobs) == ['04-已缓存', '03-小博主', '02-重点', '01-大博主']
+
+    def test_fair_policy_interleaves_groups(self, scheduler, blogger_dirs):
+        """测试公平轮转：抖音的博主不会排在所有B站博主之后"""
+        jobs = scheduler.schedule(blogger_dirs, policy='fair', group_by='platform')
+
+        assert names(jobs).index('02-重点') < names(jobs).index('01-大博主')
+        assert set(names(jobs)) == set(BLOGGERS)
+
+    def test_custom_keys(self, scheduler, blogger_dirs):
+        """测试自定义排序键"""
+        jobs = scheduler.schedule(blogger_dirs, order_by=['-duration'])
+
+        assert names(jobs)[0] == '01-大博主'
+
+    def test_unknown_policy_or_key(self, scheduler, blogger_dirs):
+        """测试未知的策略或排序键抛出ValueError"""
+        with pytest.raises(ValueError):
+            scheduler.schedule(blogger_dirs, policy='random')
+        with pytest.raises(ValueError):
+            scheduler.schedule(blogger_dirs, order_by=['size'])
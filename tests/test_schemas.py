@@ -0,0 +1,53 @@
+"""
+结构化输出模式测试
+"""
+
+from src.ai_outreach.schemas import (ComprehensiveAnalysis, ContentAnalysis, VideoDigest, describe_fields,
+                                     placeholder_values, validate_output)
+
+
+class TestValidateOutput:
+    """输出校验测试类"""
+    
+    def test_valid_output_keeps_extra_fields(self):
+        """测试合法输出通过校验并保留模式之外的字段"""
+        data, failed = validate_output(VideoDigest, {'main_topics': ['话题'], 'content_style': '风格',
+                                                     'tone': '语调', 'video_count': 2})
+        
+        assert failed == []
+        assert data == {'main_topics': ['话题'], 'content_style': '风格', 'tone': '语调', 'video_count': 2}
+    
+    def test_reports_missing_and_invalid_fields(self):
+        """测试定位缺失与类型错误的顶层字段，单个字符串按一项数组处理"""
+        data, failed = validate_output(VideoDigest, {'main_topics': '话题', 'content_style': 3})
+        
+        assert failed == ['content_style', 'tone']
+        assert data == {'main_topics': ['话题']}
+    
+    def test_nested_error_reported_as_top_level_field(self):
+        """测试嵌套对象缺少子字段时整体重新请求"""
+        _, failed = validate_output(ComprehensiveAnalysis, {'methodology_mapping': {'trust_hook': '钩子'}})
+        
+        assert 'methodology_mapping' in failed
+        assert 'optimal_outreach_script' in failed
+
+
+class TestPlaceholders:
+    """占位值与字段说明测试类"""
+    
+    def test_placeholder_values_are_valid(self):
+        """测试占位值本身符合模式"""
+        names = list(ContentAnalysis.model_fields)
+        data, failed = validate_output(ContentAnalysis, placeholder_values(ContentAnalysis, names))
+        
+        assert failed == []
+        assert data['pain_points'] == []
+        assert data['blogger_characteristics']['expertise'] == '未能分析'
+    
+    def test_describe_fields(self):
+        """测试字段说明包含类型与嵌套子字段"""
+        text = describe_fields(ContentAnalysis, ['pain_points', 'methodology_mapping'])
+        
+        assert text.splitlines()[0].startswith('- pain_points：')
+        assert '字符串数组' in text
+        assert 'trust_hook' in text and 'tone' not in text
@@ -0,0 +1,97 @@
+"""
+HTTP服务模块测试
+"""
+
+import json
+import threading
+import pytest
+from unittest.mock import MagicMock, patch
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+from src.ai_outreach.server import AnalysisService, create_server
+
+@pytest.fixture
+def release():
+    """控制模拟流水线何时完成"""
+    event = threading.Event()
+    yield event
+    event.set()
+
+@pytest.fixture
+def base_url(tmp_path, release):
+    report = tmp_path / "report.md"
+    report.write_text("# 分析报告", encoding='utf-8')
+
+    def fake_analyze(step=None, **kwargs):
+        step("🧠 AI内容分析...")
+        release.wait(5)
+        if kwargs['file'].endswith("bad.mp4"):
+            raise RuntimeError("ASR失败")
+        return {'report_path': str(report), 'title': '标题', 'author': '博主', 'duration': 60.0,
+                'text_length': 100, 'transcript_source': 'asr', 'transcript_path': None}
+
+    services = MagicMock()
+    services.loaded.return_value = None  # 分析器尚未初始化
+    service = AnalysisService(services=services, workers=2)
+    server = create_server(service, host="127.0.0.1", port=0)
+    thread = threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+    with patch('src.ai_outreach.pipeline.analyze_source', side_effect=fake_analyze):
+        thread.start()
+        yield f"http://127.0.0.1:{server.server_address[1]}"
+        server.shutdown()
+        server.server_close()
+        service.shutdown()
+
+def call(url, payload=None):
+    data = json.dumps(payload).encode('utf-8') if payload is not None else None
+    try:
+        with urlopen(Request(url, data=data, method='POST' if data else 'GET'), timeout=10) as response:
+            body = response.read().decode('utf-8')
+            return response.status, json.loads(body) if 'json' in response.headers['Content-Type'] else body
+    except HTTPError as e:
+        return e.code, json.loads(e.read().decode('utf-8'))
+
+class TestServiceAPI:
+    """HTTP接口测试类"""
+
+    def test_submit_poll_and_fetch_report(self, base_url, tmp_path, release):
+        """测试提交任务、等待完成并获取Markdown报告"""
+        video = tmp_path / "a.mp4"
+        video.write_bytes(b"")
+
+        status, job = call(f"{base_url}/jobs", {'file': str(video)})
+        assert status == 202
+        assert job['status'] in ('queued', 'running')
+
+        # 未完成时报告不可用
+        assert call(f"{base_url}{job['links']['report']}")[0] == 409
+
+        release.set()
+        status, job = call(f"{base_url}/jobs/{job['id']}?wait=5")
+        assert (status, job['status'], job['result']['title']) == (200, 'done', '标题')
+        assert call(f"{base_url}/jobs/{job['id']}/report") == (200, "# 分析报告")
+        assert call(f"{base_url}/health")[1]['jobs'] == {'done': 1}
+
+    def test_failed_job(self, base_url, tmp_path, release):
+        """测试流水线异常时任务标记为失败"""
+        video = tmp_path / "bad.mp4"
+        video.write_bytes(b"")
+        release.set()
+
+        _, job = call(f"{base_url}/jobs", {'file': str(video)})
+        _, job = call(f"{base_url}/jobs/{job['id']}?wait=5")
+
+        assert (job['status'], job['error']) == ('failed', 'ASR失败')
+
+    @pytest.mark.parametrize("payload", [{}, {'file': '/no/such/file.mp4'}, {'file': 'a', 'url': 'b'},
+                                         {'url': 'https://example.com/v', 'sections': 'abc'}])
+    def test_invalid_requests(self, base_url, payload):
+        """测试无效请求返回400"""
+        status, body = call(f"{base_url}/jobs", payload)
+
+        assert status == 400
+        assert body['error']
+
+    def test_unknown_job(self, base_url):
+        """测试未知任务返回404"""
+        assert call(f"{base_url}/jobs/nope")[0] == 404
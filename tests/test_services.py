@@ -0,0 +1,59 @@
+"""
+服务容器测试
+"""
+
+import threading
+from unittest.mock import patch, MagicMock
+from src.ai_outreach.services import ServiceContainer, get_services
+
+class TestServiceContainer:
+    """服务容器测试类"""
+
+    def test_instances_are_reused(self):
+        """测试同一服务只创建一次"""
+        container = ServiceContainer()
+        factory = MagicMock(side_effect=lambda: object())
+
+        first = container._get('svc', factory)
+        second = container._get('svc', factory)
+
+        assert first is second
+        assert factory.call_count == 1
+
+    def test_concurrent_access_initializes_once(self):
+        """测试多线程并发获取时只初始化一次"""
+        container = ServiceContainer()
+        calls = []
+        barrier = threading.Barrier(8)
+
+        def factory():
+            calls.append(1)
+            return object()
+
+        def worker(results):
+            barrier.wait()
+            results.append(container._get('svc', factory))
+
+        results = []
+        threads = [threading.Thread(target=worker, args=(results,)) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert len(calls) == 1
+        assert len({id(r) for r in results}) == 1
+
+    def test_transcriber_shares_transcript_cache(self):
+        """测试转录器复用容器中的缓存实例与ffmpeg进程池"""
+        container = ServiceContainer()
+
+        with patch('src.ai_outreach.transcriber.TencentASRTranscriber.__init__', return_value=None) as mock_init:
+            transcriber = container.transcriber
+
+        mock_init.assert_called_once_with(cache=container.transcript_cache, extraction_stage=container.extraction_stage)
+        assert container.transcriber is transcriber
+
+    def test_global_container_is_singleton(self):
+        """测试全局容器为单例"""
+        assert get_services() is get_services()
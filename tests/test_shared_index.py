@@ -0,0 +1,71 @@
+"""
+多进程共享索引测试
+"""
+
+import json
+import multiprocessing
+from unittest.mock import patch
+
+from src.ai_outreach.transcript_cache import TranscriptCache
+from src.ai_outreach.utils.shared_index import load_index, merge_and_save
+
+
+def _write_entries(index_file, prefix, count):
+    """子进程：逐条写入索引（模拟worker各自持有的内存索引）"""
+    index = {}
+    for i in range(count):
+        key = f"{prefix}{i}"
+        index[key] = {'n': i}
+        index = merge_and_save(index_file, index, [key], [])
+
+
+class TestMergeAndSave:
+    """索引合并保存测试类"""
+
+    def test_merges_with_entries_written_by_others(self, tmp_path):
+        """测试保存时保留磁盘上其他进程写入的条目，并返回合并后的索引"""
+        index_file = tmp_path / 'index.json'
+        index_file.write_text(json.dumps({'other': 1}), encoding='utf-8')
+
+        merged = merge_and_save(index_file, {'mine': 2}, ['mine'], [])
+
+        assert merged == {'other': 1, 'mine': 2}
+        assert load_index(index_file) == merged
+
+    def test_removed_and_reset(self, tmp_path):
+        """测试删除的键从磁盘索引移除，清空时丢弃全部条目"""
+        index_file = tmp_path / 'index.json'
+        index_file.write_text(json.dumps({'a': 1, 'b': 2}), encoding='utf-8')
+
+        assert merge_and_save(index_file, {}, [], ['a']) == {'b': 2}
+        assert merge_and_save(index_file, {'c': 3}, ['c'], [], reset=True) == {'c': 3}
+
+    def test_concurrent_processes_lose_no_entries(self, tmp_path):
+        """测试多个进程并发写入同一索引文件不丢条目"""
+        index_file = tmp_path / 'index.json'
+        ctx = multiprocessing.get_context('spawn')
+        workers = [ctx.Process(target=_write_entries, args=(index_file, f"p{n}-", 20)) for n in range(4)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join(timeout=60)
+
+        assert len(load_index(index_file)) == 80
+
+
+class TestTranscriptCacheSharedIndex:
+    """转录缓存共享索引测试类"""
+
+    def test_instances_keep_each_others_entries(self, tmp_path):
+        """测试两个缓存实例先后保存后，两者的转录都能命中"""
+        with patch('src.ai_outreach.transcript_cache.config.OUTPUT_DIR', tmp_path):
+            first = TranscriptCache()
+            second = TranscriptCache()
+            first.save_transcript_cache_by_url('https://example.com/a', '第一段转录')
+            second.save_transcript_cache_by_url('https://example.com/b', '第二段转录')
+
+            reloaded = TranscriptCache()
+            assert reloaded.get_cached_transcript_by_url('https://example.com/a') == '第一段转录'
+            assert reloaded.get_cached_transcript_by_url('https://example.com/b') == '第二段转录'
+            assert reloaded.clear_cache() == 2
+            assert TranscriptCache().get_cache_stats()['cache_count'] == 0
@@ -0,0 +1,51 @@
+"""
+CLI启动耗时测试
+"""
+
+import pytest
+from src.ai_outreach.utils.startup_profile import (
+    HEAVY_MODULES,
+    StartupProfile,
+    format_digest,
+    parse_importtime,
+    profile_command,
+)
+
+SAMPLE_IMPORTTIME = """import time: self [us] | cumulative | imported package
+import time:       412 |      13529 | dotenv
+import time:       864 |     496120 |   openai
+import time:       766 |     310795 |     openai.types
+import time:      4838 |     500957 | src.ai_outreach.analyzer
+"""
+
+class TestImportTimeParsing:
+    """importtime解析测试类"""
+
+    def test_parse_importtime_records(self):
+        """测试解析导入耗时记录及嵌套深度"""
+        records = parse_importtime(SAMPLE_IMPORTTIME)
+
+        assert [r.module for r in records] == ['dotenv', 'openai', 'openai.types', 'src.ai_outreach.analyzer']
+        assert [r.depth for r in records] == [0, 1, 2, 0]
+        assert records[1].cumulative_us == 496120
+
+    def test_digest_flags_heavy_imports(self):
+        """测试摘要标记重量级依赖"""
+        profile = StartupProfile(argv=['--help'], wall_time=0.5, returncode=0,
+                                 records=parse_importtime(SAMPLE_IMPORTTIME))
+
+        assert profile.heavy_imports() == ['openai']
+        digest = format_digest(profile, top=1)
+        assert 'src.ai_outreach.analyzer' in digest
+        assert 'openai' in digest
+
+class TestStartupBenchmark:
+    """启动基准测试类"""
+
+    @pytest.mark.parametrize('argv', [['--help'], ['config-check']])
+    def test_light_commands_skip_heavy_imports(self, argv):
+        """测试轻量命令不加载重量级依赖"""
+        profile = profile_command(argv)
+
+        assert profile.records, "未获取到 importtime 输出"
+        assert not set(profile.heavy_imports()) & set(HEAVY_MODULES)
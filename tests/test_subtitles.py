@@ -0,0 +1,133 @@
+"""
+字幕解析模块测试
+"""
+
+import json
+from src.ai_outreach.subtitles import (
+    Cue,
+    cues_to_text,
+    dedupe_rolling,
+    parse_json3,
+    parse_subtitles,
+    parse_timed_text,
+)
+
+# YouTube 自动字幕：每条包含上一行，并穿插10ms的过渡条目
+ROLLING_VTT = """WEBVTT
+Kind: captions
+Language: zh
+
+00:00:00.000 --> 00:00:02.000 align:start position:0%
+大家好<00:00:00.500><c>我是</c><00:00:01.000><c>测试博主</c>
+
+00:00:02.000 --> 00:00:02.010 align:start position:0%
+大家好我是测试博主
+
+00:00:02.010 --> 00:00:04.000 align:start position:0%
+大家好我是测试博主
+今天聊聊<c>字幕</c>
+
+00:00:04.000 --> 00:00:04.010 align:start position:0%
+今天聊聊字幕
+
+00:00:04.010 --> 00:00:06.000 align:start position:0%
+今天聊聊字幕
+谢谢观看
+"""
+
+SRT = """1
+00:00:01,000 --> 00:00:02,500
+<i>第一句</i>
+
+2
+00:01:02,000 --> 00:01:03,000
+第二句
+第二句下半
+"""
+
+class TestTimedTextParsing:
+    """VTT/SRT 解析测试类"""
+
+    def test_parse_srt_keeps_timestamps(self):
+        """测试SRT解析保留时间戳并去除序号与标签"""
+        cues = list(parse_timed_text(SRT.splitlines()))
+
+        assert cues == [
+            Cue(1.0, 2.5, '第一句'),
+            Cue(62.0, 63.0, '第二句\n第二句下半'),
+        ]
+
+    def test_vtt_header_and_inline_tags_removed(self):
+        """测试VTT头部与内联时间标签被移除"""
+        cues = list(parse_timed_text(ROLLING_VTT.splitlines()))
+
+        assert cues[0].text == '大家好我是测试博主'
+        assert all('WEBVTT' not in c.text and 'Kind' not in c.text for c in cues)
+
+class TestRollingDedup:
+    """滚动字幕去重测试类"""
+
+    def test_rolling_vtt_collapsed(self):
+        """测试滚动重复的自动字幕每行只保留一次"""
+        cues = parse_subtitles(ROLLING_VTT, 'vtt')
+
+        assert [c.text for c in cues] == ['大家好我是测试博主', '今天聊聊字幕', '谢谢观看']
+        assert cues[0].start == 0.0
+        assert cues[1].start == 2.01
+        assert cues_to_text(cues) == '大家好我是测试博主 今天聊聊字幕 谢谢观看'
+
+    def test_progressive_line_growth_merged(self):
+        """测试逐字增长的字幕合并为最完整的一行"""
+        cues = list(dedupe_rolling([
+            Cue(0.0, 1.0, 'hello'),
+            Cue(1.0, 2.0, 'hello world'),
+            Cue(2.0, 3.0, 'next line'),
+        ]))
+
+        assert cues == [Cue(0.0, 2.0, 'hello world'), Cue(2.0, 3.0, 'next line')]
+
+    def test_distinct_repeats_outside_window_kept(self):
+        """测试相隔较远的相同内容不会被误删"""
+        texts = ['好', 'a', 'b', 'c', '好']
+        cues = list(dedupe_rolling([Cue(i, i + 1, t) for i, t in enumerate(texts)]))
+
+        assert [c.text for c in cues] == texts
+
+class TestJson3Parsing:
+    """JSON3 解析测试类"""
+
+    def test_parse_json3_skips_newline_events(self):
+        """测试JSON3解析跳过换行追加事件并合并滚动重复"""
+        data = {'events': [
+            {'tStartMs': 0, 'dDurationMs': 2000, 'segs': [{'utf8': '大家好'}, {'utf8': '我是', 'tOffsetMs': 500}]},
+            {'tStartMs': 1500, 'dDurationMs': 10, 'aAppend': 1, 'segs': [{'utf8': '\n'}]},
+            {'tStartMs': 2000, 'dDurationMs': 1500, 'segs': [{'utf8': '大家好我是'}]},
+            {'tStartMs': 3500, 'dDurationMs': 1000},
+            {'tStartMs': 4000, 'dDurationMs': 1000, 'segs': [{'utf8': '再见'}]},
+        ]}
+
+        assert len(list(parse_json3(data))) == 3
+
+        cues = parse_subtitles(json.dumps(data), 'json3')
+        assert cues == [Cue(0.0, 3.5, '大家好我是'), Cue(4.0, 5.0, '再见')]
+
+class TestAssParsing:
+    """ASS 解析测试类"""
+
+    def test_parse_ass_dialogue(self):
+        """测试ASS解析Dialogue行，移除样式标签并保留文本中的逗号"""
+        ass = """[Script Info]
+Title: 测试
+
+[V4+ Styles]
+Format: Name, Fontname
+Style: Default,Arial
+
+[Events]
+Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text
+Comment: 0,0:00:00.00,0:00:01.00,Default,,0,0,0,,注释
+Dialogue: 0,0:00:01.00,0:00:03.50,Default,,0,0,0,,{\\b1}你好，{\\i1}世界{\\i0}, 第二段\\N换行
+"""
+        cues = parse_subtitles(ass, 'ass')
+
+        assert cues == [Cue(1.0, 3.5, '你好，世界, 第二段'), Cue(1.0, 3.5, '换行')]
@@ -0,0 +1,66 @@
+"""
+任务工作区测试
+"""
+
+import json
+import os
+import threading
+from src.ai_outreach.utils.workspace import OWNER_MARKER, WorkspaceManager
+
+class TestJobWorkspace:
+    """任务工作区测试类"""
+
+    def test_concurrent_jobs_get_isolated_dirs(self, tmp_path):
+        """测试并发任务的同名产物互不覆盖"""
+        manager = WorkspaceManager(tmp_path / 'jobs')
+        workspaces = []
+
+        def job(index):
+            workspace = manager.create('video')
+            workspace.artifact('video_audio.wav').write_text(str(index))
+            workspaces.append(workspace)
+
+        threads = [threading.Thread(target=job, args=(i,)) for i in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert len({w.path for w in workspaces}) == 8
+        assert sorted(w.artifact('video_audio.wav').read_text() for w in workspaces) == [str(i) for i in range(8)]
+
+    def test_context_manager_cleans_up(self, tmp_path):
+        """测试任务结束（包括异常）时删除整个工作区"""
+        manager = WorkspaceManager(tmp_path / 'jobs')
+
+        try:
+            with manager.create('job') as workspace:
+                workspace.artifact('audio.wav').write_bytes(b'data')
+                raise RuntimeError('任务失败')
+        except RuntimeError:
+            pass
+
+        assert not workspace.path.exists()
+
+    def test_cleanup_stale_removes_dead_owner_dirs(self, tmp_path):
+        """测试启动时清理属主进程已退出的遗留工作区，保留运行中的任务"""
+        manager = WorkspaceManager(tmp_path / 'jobs')
+        alive = manager.create('alive')
+        crashed = manager.create('crashed')
+        marker = crashed.path / OWNER_MARKER
+        owner = json.loads(marker.read_text(encoding='utf-8'))
+        owner['pid'] = 2 ** 22 + 1  # 超出pid范围，视为已退出
+        marker.write_text(json.dumps(owner), encoding='utf-8')
+
+        removed = WorkspaceManager(tmp_path / 'jobs').cleanup_stale()
+
+        assert removed == 1
+        assert alive.path.exists()
+        assert not crashed.path.exists()
+
+    def test_job_id_contains_pid(self, tmp_path):
+        """测试工作区目录名包含标签与进程号"""
+        workspace = WorkspaceManager(tmp_path / 'jobs').create('我的 视频/1')
+
+        assert workspace.job_id.startswith('我的_视频_1-')
+        assert f'-{os.getpid()}-' in workspace.job_id